@@ -0,0 +1,79 @@
+"""
+Benchmark de escalado de `extraer_y_escribir_paralelo` de 1 a N procesos.
+
+Genera un genoma y un conjunto de picos sintéticos, y mide el tiempo de
+extracción y escritura para cada número de procesos, comparado con el
+modo secuencial (`extraer_secuencias` + `escribir_fasta`).
+
+Uso:
+    python bench/bench_paralelo.py --picos 2000000 --max-procesos 8
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import os
+import sys
+import time
+import shutil
+import random
+import logging
+import argparse
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "src"))
+
+from peaks import extraer_secuencias
+from io_utils import escribir_fasta
+from parallel import extraer_y_escribir_paralelo
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+def generar_datos(picos: int, longitud: int, semilla: int = 0):
+    """Devuelve un genoma aleatorio y coordenadas repartidas en 139 TF."""
+    rnd = random.Random(semilla)
+    genoma = "".join(rnd.choices("ACGT", k=longitud))
+    coords = {}
+    for _ in range(picos):
+        tf = f"tf{rnd.randrange(139):03d}"
+        start = rnd.randrange(1, longitud - 1000)
+        coords.setdefault(tf, []).append(
+            (start, start + rnd.randrange(100, 600)))
+    return genoma, coords
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argp.add_argument("--picos", type=int, default=500_000)
+    argp.add_argument("--longitud", type=int, default=4_641_652)
+    argp.add_argument("--max-procesos", type=int,
+                      default=os.cpu_count() or 1)
+    args = argp.parse_args()
+
+    logging.disable(logging.WARNING)
+    genoma, coords = generar_datos(args.picos, args.longitud)
+    salida = tempfile.mkdtemp(prefix="bench_paralelo_")
+    print(f"{args.picos} picos, genoma de {args.longitud} bp, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'modo':<14}{'segundos':>10}{'aceleración':>14}")
+    try:
+        inicio = time.perf_counter()
+        escribir_fasta(extraer_secuencias(coords, genoma), salida)
+        base = time.perf_counter() - inicio
+        print(f"{'secuencial':<14}{base:>10.2f}{1.0:>14.2f}")
+
+        for procesos in range(1, args.max_procesos + 1):
+            inicio = time.perf_counter()
+            extraer_y_escribir_paralelo(coords, genoma, salida,
+                                        procesos=procesos)
+            segundos = time.perf_counter() - inicio
+            print(f"{f'{procesos} procesos':<14}{segundos:>10.2f}"
+                  f"{base / segundos:>14.2f}")
+    finally:
+        shutil.rmtree(salida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark de los motores de lectura de `lectura_peaks`.
+
+Genera un TSV sintético con el mismo esquema que
+`data/union_peaks_file.tsv` y mide, para cada parser, el tiempo de
+lectura y el pico de memoria residente (RSS). Cada motor se ejecuta en
+un subproceso independiente para que el RSS no se contamine entre
+mediciones.
+
+Uso:
+    python bench/bench_parsers.py --rows 10000000 --tmp /tmp
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import resource
+import subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "src"))
+
+CABECERA = ("\tDataset_Ids\tTF_name\tPeak_start\tPeak_end\tPeak_center\t"
+            "Peak_number\tMax_Fold_Enrichment\tMax_Norm_Fold_Enrichment\t"
+            "Proximal_genes\tCenter_position_type\n")
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+def generar_tsv(ruta: str, filas: int, semilla: int = 0) -> None:
+    """Escribe un TSV sintético de `filas` picos."""
+    rnd = random.Random(semilla)
+    tfs = [f"tf{i:03d}" for i in range(139)]
+    with open(ruta, "w", encoding="utf-8") as arch:
+        arch.write(CABECERA)
+        for i in range(filas):
+            tf = tfs[rnd.randrange(len(tfs))]
+            start = rnd.randrange(1, 4_600_000)
+            end = start + rnd.randrange(100, 600)
+            arch.write(
+                f"{i}\t{tf} inducible 1,{tf} inducible 2\t{tf}\t{start}.0\t"
+                f"{end}.0\t{(start + end) // 2}.0\t{i % 50 + 1}\t"
+                f"{rnd.uniform(1, 90):.2f}\t{rnd.random():.6f}\t"
+                f"genA-genB,genC\tintergenic\n")
+
+
+def medir(ruta: str, parser: str) -> dict:
+    """Lee `ruta` con `parser` y devuelve tiempo y RSS máximo."""
+    import logging
+    from peaks import lectura_peaks
+    logging.disable(logging.WARNING)
+    inicio = time.perf_counter()
+    coords = lectura_peaks(ruta, parser=parser)
+    segundos = time.perf_counter() - inicio
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "parser": parser,
+        "segundos": round(segundos, 2),
+        "rss_mb": round(rss_kb / 1024, 1),
+        "picos": sum(len(v) for v in coords.values()),
+    }
+
+
+def main():
+    argp = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argp.add_argument("--rows", type=int, default=1_000_000)
+    argp.add_argument("--tmp", default="/tmp")
+    argp.add_argument("--parsers", nargs="+",
+                      default=["c", "pyarrow", "native"])
+    argp.add_argument("--_medir", nargs=2, help=argparse.SUPPRESS)
+    args = argp.parse_args()
+
+    if args._medir:
+        print(json.dumps(medir(*args._medir)))
+        return
+
+    ruta = os.path.join(args.tmp, f"bench_peaks_{args.rows}.tsv")
+    if not os.path.exists(ruta):
+        generar_tsv(ruta, args.rows)
+    tam_mb = os.path.getsize(ruta) / 2**20
+    print(f"Archivo: {ruta} ({args.rows} filas, {tam_mb:.0f} MB)")
+    print(f"{'parser':<10}{'segundos':>10}{'RSS (MB)':>12}")
+    for parser in args.parsers:
+        salida = subprocess.run(
+            [sys.executable, __file__, "--_medir", ruta, parser],
+            capture_output=True, text=True, check=True)
+        r = json.loads(salida.stdout.strip().splitlines()[-1])
+        print(f"{r['parser']:<10}{r['segundos']:>10}{r['rss_mb']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,19 +7,39 @@ Módulos disponibles:
 - io_utils: Utilidades de entrada/salida
 - logging_config: Configuración del sistema de logging
 - args_config: Configuración de argumentos CLI
+- pipeline: Modo streaming con memoria acotada
+- parallel: Extracción en paralelo con genoma compartido
+- batch: Modo por lotes con un único genoma cargado
+- server: Servidor residente de extracción (socket Unix)
+- extractor: Clase PeakExtractor con genoma y picos en caché
+- windows: Ventanas de ancho fijo exportadas como matrices .npy
+- compresion: Lectura de entradas gzip/BGZF y acceso aleatorio por bloques
+- motifs: Búsqueda de motivos IUPAC y PWM en los picos
+- kmers: Conteo vectorizado de k-mers por TF frente al genoma
+- fondo: Secuencias de fondo emparejadas por longitud y GC
+- estadisticas: Longitud, GC, N y CpG por pico con sumas acumuladas
+- progreso: Reporte periódico de avance y rendimiento
+- metricas: Exportación de métricas para Prometheus (textfile)
+- tabular: Secuencias en Parquet o Arrow IPC particionadas por TF
 """
 
-from .genome import cargar_genoma
-from .peaks import lectura_peaks, extraer_secuencias
+from .genome import cargar_genoma, abrir_genoma
+from .peaks import (lectura_peaks, iterar_peaks, extraer_secuencias,
+                    crear_filtros)
 from .io_utils import escribir_fasta
 from .logging_config import configurar_logging
 from .args_config import configurar_argumentos
+from .extractor import PeakExtractor
 
 __all__ = [
     'cargar_genoma',
+    'abrir_genoma',
     'lectura_peaks',
+    'iterar_peaks',
     'extraer_secuencias',
+    'crear_filtros',
     'escribir_fasta',
     'configurar_logging',
-    'configurar_argumentos'
+    'configurar_argumentos',
+    'PeakExtractor'
 ]
\ No newline at end of file
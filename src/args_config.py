@@ -19,10 +19,109 @@ Funciones:
             -v, --verbose     Activa el modo DEBUG en consola.
             -l, --line_length Longitud máxima de línea en los FASTA
                               (default: 80).
+            --parser          Motor de lectura del TSV de picos:
+                              auto, c, pyarrow o native (default:
+                              "auto": `csv` sin pandas para archivos
+                              pequeños, "c" para los demás).
+            --chunksize       Lee los picos por bloques de N filas y
+                              escribe los FASTA de forma incremental.
+            --streaming       Extrae y escribe TF por TF, liberando las
+                              secuencias de cada uno.
+            --max-memory      Presupuesto de memoria (p. ej. 512M, 2G);
+                              activa el modo streaming si el modo
+                              completo lo excedería.
+            --secuencial      Desactiva la carga concurrente de genoma
+                              y picos.
+            --procesos        Número de procesos para leer el TSV por
+                              rangos y extraer/escribir en paralelo
+                              (default: 1).
+            --window          Exporta ventanas de N bp alrededor del
+                              ancla de cada pico como matrices .npy por
+                              TF en lugar de FASTA.
+            --anchor          Ancla de la ventana: center (Peak_center),
+                              start o end (default: "center").
+            --one-hot         Guarda las ventanas codificadas one-hot.
+            --circular        Trata el genoma como circular: los picos
+                              que cruzan el origen (start > end o
+                              end > longitud) se extraen en dos partes.
+            --strand          Usa la columna Strand del TSV; los picos
+                              de la hebra - se escriben como reverso
+                              complementario.
+            --tf              Extrae solo los TF indicados.
+            --min-fold-enrichment
+                              Descarta los picos con Max_Fold_Enrichment
+                              menor que el umbral.
+            --top-n           Conserva los N picos más enriquecidos de
+                              cada TF.
+            --sample          Conserva N picos válidos al azar de cada
+                              TF, reproducibles con --seed.
+            --sample-frac     Conserva al azar una fracción (0-1] de los
+                              picos válidos de cada TF (excluyente con
+                              --sample).
+            --sample-weighted Con --sample, muestrea con probabilidad
+                              proporcional a Max_Fold_Enrichment.
+            --motifs          Archivo de motivos (consensos IUPAC y PWM
+                              JASPAR) que se buscan en ambas hebras de
+                              los picos; los sitios se escriben en
+                              <outdir>/motivos.tsv.
+            --motif-threshold Puntuación relativa mínima (0-1) de las
+                              PWM (default: 0.8).
+            --kmers           Longitudes de k-mer (1-16) a contar en los
+                              picos de cada TF; conteos en
+                              <outdir>/kmers/ y k-mers enriquecidos
+                              frente al genoma en
+                              <outdir>/kmers_enriquecidos.tsv.
+            --canonical       Cuenta cada k-mer junto con su reverso
+                              complementario.
+            --top-kmers       k-mers enriquecidos por TF y k en el TSV
+                              (default: 50).
+            --background      Genera N secuencias de fondo por pico con
+                              la misma longitud y clase de GC en
+                              <outdir>/fondo/<TF>.fa.
+            --gc-bins         Clases de GC del fondo (default: 20).
+            --seed            Semilla del muestreo aleatorio del fondo
+                              y de --sample (default: 0).
+            --peak-stats      Escribe longitud, GC, N y CpG de cada pico
+                              en <outdir>/<TF>.estadisticas.tsv o
+                              .parquet (tsv o parquet).
+            --table           Escribe cada pico (TF, número, start, end,
+                              longitud y secuencia) en un conjunto de
+                              datos columnar particionado por TF en
+                              <outdir>/secuencias/ (parquet o arrow;
+                              requiere pyarrow).
+            --resume          Reanuda una ejecución interrumpida: omite
+                              los TF registrados como terminados en
+                              <outdir>/.tf_completados.tsv y rehace los
+                              demás.
+            --progress-interval
+                              Segundos entre líneas de avance en el log
+                              cuando la salida no es una terminal; en
+                              una terminal la línea se actualiza de
+                              forma continua; 0 lo desactiva
+                              (default: 30).
+            --metrics-file    Archivo .prom (formato de texto de
+                              Prometheus) con duraciones por etapa,
+                              filas leídas y rechazadas, picos
+                              extraídos, bytes escritos, RSS máximo y
+                              tiempo de carga del genoma.
+            --metrics-interval
+                              Segundos entre actualizaciones de
+                              --metrics-file durante la ejecución; 0
+                              solo lo escribe al final (default: 60).
 
         Argumentos restantes:
             args_restantes    Cualquier otro parámetro posicional no
                               reconocido, almacenado como lista.
+
+    configurar_argumentos_lote() -> argparse.ArgumentParser
+        Parser del modo por lotes (batch.py): -g/--genome obligatorio,
+        -m/--manifest o --glob (excluyentes), -o/--outdir, -w/--workers,
+        --resumen, --logs, -v, -l y --parser.
+
+    configurar_argumentos_servidor() -> argparse.ArgumentParser
+        Parser del servidor residente (server.py): -g/--genome
+        obligatorio, -p/--peaks opcional, --socket o --port
+        (excluyentes), --logs y -v.
 Autor:
     Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
 
@@ -37,6 +136,63 @@ Versión:
 # =============================================================================
 import argparse
 
+try:
+    from .kmers import K_MINIMO, K_MAXIMO
+except ImportError:
+    from kmers import K_MINIMO, K_MAXIMO
+
+_UNIDADES = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+def tamano_memoria(valor: str) -> int:
+    """Convierte un tamaño como '512M' o '2G' a bytes (tipo argparse).
+
+    Args:
+        valor (str): Número con sufijo opcional K, M, G o T (base 1024).
+
+    Returns:
+        int: Tamaño en bytes.
+
+    Raises:
+        argparse.ArgumentTypeError: Si el formato no es válido.
+    """
+    texto = valor.strip().upper()
+    if texto.endswith("B"):
+        texto = texto[:-1]
+    unidad = texto[-1:] if texto[-1:] in _UNIDADES else ""
+    numero = texto[:-1] if unidad else texto
+    try:
+        bytes_ = int(float(numero) * _UNIDADES[unidad])
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Tamaño de memoria inválido: '{valor}'")
+    if bytes_ <= 0:
+        raise argparse.ArgumentTypeError(
+            f"El tamaño de memoria debe ser positivo: '{valor}'")
+    return bytes_
+
+def longitud_kmer(valor: str) -> int:
+    """Convierte una longitud de k-mer y comprueba su rango (tipo argparse).
+
+    Args:
+        valor (str): Entero entre K_MINIMO y K_MAXIMO.
+
+    Returns:
+        int: Longitud del k-mer.
+
+    Raises:
+        argparse.ArgumentTypeError: Si no es un entero en el rango.
+    """
+    try:
+        k = int(valor)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Longitud de k-mer inválida: '{valor}'")
+    if not K_MINIMO <= k <= K_MAXIMO:
+        raise argparse.ArgumentTypeError(
+            f"La longitud de k-mer debe estar entre {K_MINIMO} y "
+            f"{K_MAXIMO}: '{valor}'")
+    return k
+
 def configurar_argumentos():
     """Configura y retorna el parser de argumentos
     
@@ -65,9 +221,181 @@ def configurar_argumentos():
     parser.add_argument("-l", "--line_length", type=int, default=80,
                       help="Número de caracteres por línea en el archivo" \
                       " FASTA")
+    parser.add_argument("--parser",
+                      choices=["auto", "c", "pyarrow", "native"],
+                      default="auto",
+                      help="Motor de lectura del TSV de picos (auto usa "
+                      "csv sin pandas en archivos pequeños; pyarrow se "
+                      "usa solo si está instalado)")
+    parser.add_argument("--chunksize", type=int, default=None,
+                      help="Procesar el TSV de picos por bloques de N "
+                      "filas (memoria acotada por el bloque)")
+    parser.add_argument("--streaming", action="store_true",
+                      help="Extraer y escribir TF por TF con memoria "
+                      "acotada")
+    parser.add_argument("--max-memory", type=tamano_memoria, default=None,
+                      help="Presupuesto de memoria (p. ej. 512M, 2G); "
+                      "elige el modo streaming automáticamente")
+    parser.add_argument("--secuencial", action="store_true",
+                      help="Cargar genoma y picos uno tras otro, sin "
+                      "solaparlos en hilos")
+    parser.add_argument("--procesos", type=int, default=1,
+                      help="Procesos para leer el TSV por rangos de bytes "
+                      "y extraer/escribir con el genoma compartido")
+    parser.add_argument("--window", type=int, default=None,
+                      help="Exportar ventanas de N bp alrededor del ancla "
+                      "como matrices .npy por TF")
+    parser.add_argument("--anchor", choices=["center", "start", "end"],
+                      default="center",
+                      help="Ancla de las ventanas (center usa Peak_center)")
+    parser.add_argument("--one-hot", action="store_true",
+                      help="Guardar las ventanas codificadas one-hot "
+                      "(n_picos, N, 4)")
+    parser.add_argument("--circular", action="store_true",
+                      help="Genoma circular: extraer los picos que cruzan "
+                      "el origen (start > end o end > longitud)")
+    parser.add_argument("--strand", action="store_true",
+                      help="Usar la columna Strand; los picos de la hebra "
+                      "- se escriben como reverso complementario")
+    parser.add_argument("--tf", nargs="+", default=None, metavar="TF",
+                      help="Extraer solo estos TF (se filtran al leer)")
+    parser.add_argument("--min-fold-enrichment", type=float, default=None,
+                      help="Umbral mínimo de Max_Fold_Enrichment")
+    parser.add_argument("--top-n", type=int, default=None,
+                      help="Conservar los N picos con mayor "
+                      "Max_Fold_Enrichment de cada TF")
+    muestreo = parser.add_mutually_exclusive_group()
+    muestreo.add_argument("--sample", type=int, default=None, metavar="N",
+                      help="Conservar N picos al azar de cada TF "
+                      "(reproducible con --seed)")
+    muestreo.add_argument("--sample-frac", type=float, default=None,
+                      metavar="F",
+                      help="Conservar al azar una fracción F de los picos "
+                      "de cada TF")
+    parser.add_argument("--sample-weighted", action="store_true",
+                      help="Con --sample, ponderar por Max_Fold_Enrichment")
+    parser.add_argument("--motifs", default=None,
+                      help="Archivo de motivos (líneas 'nombre CONSENSO' "
+                      "IUPAC y PWM en formato JASPAR) a buscar en los "
+                      "picos")
+    parser.add_argument("--motif-threshold", type=float, default=0.8,
+                      help="Puntuación relativa mínima de las PWM, de 0 "
+                      "a 1")
+    parser.add_argument("--kmers", type=longitud_kmer, nargs="+", default=None,
+                      help="Longitudes de k-mer a contar en los picos de "
+                      "cada TF (p. ej. 6 8 10)")
+    parser.add_argument("--canonical", action="store_true",
+                      help="Contar los k-mers junto con su reverso "
+                      "complementario")
+    parser.add_argument("--top-kmers", type=int, default=50,
+                      help="k-mers más enriquecidos por TF y k en "
+                      "kmers_enriquecidos.tsv")
+    parser.add_argument("--background", type=int, default=None,
+                      metavar="N",
+                      help="Generar N secuencias de fondo por pico, "
+                      "emparejadas por longitud y GC")
+    parser.add_argument("--gc-bins", type=int, default=20,
+                      help="Número de clases de GC del fondo")
+    parser.add_argument("--seed", type=int, default=0,
+                      help="Semilla del muestreo aleatorio")
+    parser.add_argument("--peak-stats", choices=["tsv", "parquet"],
+                      default=None,
+                      help="Escribir estadísticas de composición por pico "
+                      "(longitud, GC, N, CpG) junto a los FASTA")
+    parser.add_argument("--table", choices=["parquet", "arrow"],
+                      default=None,
+                      help="Escribir también las secuencias como tabla "
+                      "columnar (Parquet o Arrow IPC) particionada por TF")
+    parser.add_argument("--resume", action="store_true",
+                      help="Omitir los TF ya terminados en --outdir y "
+                      "rehacer solo los faltantes o incompletos")
+    parser.add_argument("--progress-interval", type=float, default=30.0,
+                      help="Segundos entre reportes de avance fuera de "
+                      "una terminal (0 lo desactiva)")
+    parser.add_argument("--metrics-file", default=None,
+                      help="Archivo .prom para el recolector textfile de "
+                      "Prometheus")
+    parser.add_argument("--metrics-interval", type=float, default=60.0,
+                      help="Segundos entre actualizaciones de "
+                      "--metrics-file (0: solo al final)")
     
     # Manejar argumentos desconocidos
     parser.add_argument('args_restantes', nargs=argparse.REMAINDER)
     
     return parser
 
+
+
+def configurar_argumentos_lote():
+    """Configura y retorna el parser de argumentos del modo por lotes
+
+    Returns:
+        argparse.ArgumentParser: Parser configurado
+    """
+    parser = argparse.ArgumentParser(
+        description="Extrae secuencias FASTA de varios archivos de picos " \
+        "contra un mismo genoma cargado una sola vez"
+    )
+
+    # Argumentos requeridos
+    parser.add_argument("-g", "--genome", required=True,
+                      help="Archivo FASTA del genoma")
+    entradas = parser.add_mutually_exclusive_group(required=True)
+    entradas.add_argument("-m", "--manifest",
+                      help="TSV con una entrada por línea: archivo de " \
+                      "picos y, opcionalmente, directorio de salida")
+    entradas.add_argument("--glob",
+                      help="Patrón glob de archivos de picos")
+
+    # Argumentos opcionales
+    parser.add_argument("-o", "--outdir", default="TF_picos_fasta",
+                      help="Directorio base de salida para las entradas " \
+                      "sin directorio propio")
+    parser.add_argument("-w", "--workers", type=int, default=4,
+                      help="Archivos de picos procesados a la vez")
+    parser.add_argument("--resumen", default=None,
+                      help="Ruta del TSV con el resumen consolidado")
+    parser.add_argument("--logs", default="logs",
+                      help="Directorio para archivos de log")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                      help="Mostrar mensajes DEBUG")
+    parser.add_argument("-l", "--line_length", type=int, default=80,
+                      help="Número de caracteres por línea en el archivo" \
+                      " FASTA")
+    parser.add_argument("--parser",
+                      choices=["auto", "c", "pyarrow", "native"],
+                      default="auto",
+                      help="Motor de lectura de los TSV de picos")
+
+    return parser
+
+
+def configurar_argumentos_servidor():
+    """Configura y retorna el parser de argumentos del servidor residente
+
+    Returns:
+        argparse.ArgumentParser: Parser configurado
+    """
+    parser = argparse.ArgumentParser(
+        description="Servidor residente de extracción de secuencias " \
+        "con el genoma cargado en memoria"
+    )
+
+    # Argumentos requeridos
+    parser.add_argument("-g", "--genome", required=True,
+                      help="Archivo FASTA del genoma")
+    destino = parser.add_mutually_exclusive_group(required=True)
+    destino.add_argument("--socket",
+                      help="Ruta del socket de dominio Unix")
+    destino.add_argument("--port", type=int,
+                      help="Puerto TCP en 127.0.0.1")
+
+    # Argumentos opcionales
+    parser.add_argument("-p", "--peaks", default=None,
+                      help="Archivo TSV de picos para indexar por TF")
+    parser.add_argument("--logs", default="logs",
+                      help="Directorio para archivos de log")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                      help="Mostrar mensajes DEBUG")
+
+    return parser
@@ -0,0 +1,317 @@
+"""
+Modo por lotes: muchos archivos de picos contra un único genoma cargado.
+
+El genoma se carga una sola vez y se comparte (por referencia) entre los
+hilos de un pool acotado que procesa cada archivo de picos con
+`lectura_peaks`, `extraer_secuencias` y `escribir_fasta`. Al final se
+registra, y opcionalmente se escribe en TSV, un resumen consolidado con
+tiempos y conteos de picos por entrada.
+
+Contiene:
+
+  - leer_manifiesto(manifest_path, outdir_base) -> List[Tuple[str, str]]
+    ------------------------------------------------------------
+    Lee un TSV `peaks<TAB>outdir` (la segunda columna es opcional).
+
+  - entradas_desde_glob(patron, outdir_base) -> List[Tuple[str, str]]
+    ------------------------------------------------------------
+    Construye las entradas a partir de un patrón glob; cada archivo se
+    escribe en `outdir_base/<nombre sin extensión>`.
+
+  - validar_entradas(entradas) -> None
+    ------------------------------------------------------------
+    Rechaza lotes en los que dos entradas comparten directorio de salida.
+
+  - procesar_lote(genoma, entradas, ...) -> List[dict]
+    ------------------------------------------------------------
+    Procesa todas las entradas con un pool de `workers` hilos. Un error
+    en una entrada se registra en su resumen sin detener el resto.
+
+Uso:
+    python batch.py -g genoma.fa -m manifiesto.tsv -o resultados/ -w 4
+    python batch.py -g genoma.fa --glob "picos/*.tsv" -o resultados/
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import os
+import sys
+import glob
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+try:
+    from .genome import cargar_genoma
+    from .peaks import lectura_peaks, extraer_secuencias
+    from .io_utils import escribir_fasta
+except ImportError:
+    from genome import cargar_genoma
+    from peaks import lectura_peaks, extraer_secuencias
+    from io_utils import escribir_fasta
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+# Extensiones de compresión que se quitan antes de la del TSV
+EXTENSIONES_COMPRESION = (".gz", ".bgz")
+
+# Columnas del resumen consolidado
+COLUMNAS_RESUMEN = ["peaks", "outdir", "estado", "segundos", "picos_totales",
+                    "picos_validos", "picos_invalidos", "secuencias",
+                    "archivos"]
+
+def leer_manifiesto(
+        manifest_path: str,
+        outdir_base: str = "TF_picos_fasta"
+    ) -> List[Tuple[str, str]]:
+    """
+    Lee un manifiesto de archivos de picos.
+
+    Cada línea no vacía y que no empiece con '#' contiene la ruta del TSV
+    de picos y, opcionalmente tras un tabulador, su directorio de salida.
+    Si falta, se usa `outdir_base/<nombre sin extensión>`. Las rutas
+    relativas se resuelven respecto al directorio del manifiesto.
+
+    Args:
+        manifest_path (str): Ruta al manifiesto.
+        outdir_base (str): Directorio base para las entradas sin salida.
+
+    Returns:
+        List[Tuple[str, str]]: Pares (peaks_path, output_dir).
+
+    Raises:
+        FileNotFoundError: Si el manifiesto no existe.
+        ValueError: Si el manifiesto no contiene entradas.
+    """
+    if not os.path.isfile(manifest_path):
+        msg = f"Manifiesto no encontrado: {manifest_path}"
+        logger.error(msg)
+        raise FileNotFoundError(msg)
+
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    entradas: List[Tuple[str, str]] = []
+    with open(manifest_path, mode="r", encoding="utf-8") as arch:
+        for linea in arch:
+            linea = linea.strip()
+            if not linea or linea.startswith("#"):
+                continue
+            campos = [c.strip() for c in linea.split("\t")]
+            peaks_path = os.path.join(base, campos[0])
+            if len(campos) > 1 and campos[1]:
+                output_dir = os.path.join(base, campos[1])
+            else:
+                output_dir = _outdir_por_defecto(peaks_path, outdir_base)
+            entradas.append((peaks_path, output_dir))
+
+    if not entradas:
+        msg = f"El manifiesto no contiene entradas: {manifest_path}"
+        logger.error(msg)
+        raise ValueError(msg)
+    return entradas
+
+
+def entradas_desde_glob(
+        patron: str,
+        outdir_base: str = "TF_picos_fasta"
+    ) -> List[Tuple[str, str]]:
+    """
+    Construye las entradas del lote a partir de un patrón glob.
+
+    Args:
+        patron (str): Patrón glob de archivos de picos.
+        outdir_base (str): Directorio base de salida.
+
+    Returns:
+        List[Tuple[str, str]]: Pares (peaks_path, output_dir), ordenados.
+
+    Raises:
+        ValueError: Si el patrón no coincide con ningún archivo.
+    """
+    rutas = sorted(glob.glob(patron))
+    if not rutas:
+        msg = f"Ningún archivo coincide con el patrón: {patron}"
+        logger.error(msg)
+        raise ValueError(msg)
+    return [(ruta, _outdir_por_defecto(ruta, outdir_base)) for ruta in rutas]
+
+
+def _outdir_por_defecto(peaks_path: str, outdir_base: str) -> str:
+    """
+    Directorio de salida `outdir_base/<nombre sin extensión>`. En los
+    archivos comprimidos (`picos.tsv.gz`) se quitan ambas extensiones.
+    """
+    nombre = os.path.basename(peaks_path)
+    raiz, extension = os.path.splitext(nombre)
+    if extension.lower() in EXTENSIONES_COMPRESION:
+        nombre = raiz
+    nombre = os.path.splitext(nombre)[0]
+    return os.path.join(outdir_base, nombre)
+
+
+def validar_entradas(entradas: List[Tuple[str, str]]) -> None:
+    """
+    Comprueba que ninguna pareja de entradas comparta directorio de
+    salida: sus hilos escribirían y renombrarían los mismos FASTA a la
+    vez y una entrada sobrescribiría a la otra.
+
+    Args:
+        entradas (List[Tuple[str, str]]): Pares (peaks_path, output_dir).
+
+    Raises:
+        ValueError: Si dos entradas usan el mismo directorio de salida.
+    """
+    vistos = {}
+    for peaks_path, output_dir in entradas:
+        clave = os.path.normcase(os.path.abspath(output_dir))
+        if clave in vistos:
+            msg = (f"Directorio de salida repetido '{output_dir}' para "
+                   f"'{vistos[clave]}' y '{peaks_path}'")
+            logger.error(msg)
+            raise ValueError(msg)
+        vistos[clave] = peaks_path
+
+
+def _procesar_entrada(
+        genoma: str,
+        peaks_path: str,
+        output_dir: str,
+        chars_por_linea: int,
+        parser: str
+    ) -> dict:
+    """Procesa un archivo de picos y devuelve su fila de resumen."""
+    inicio = time.perf_counter()
+    resumen = dict.fromkeys(COLUMNAS_RESUMEN, 0)
+    resumen.update(peaks=peaks_path, outdir=output_dir, estado="ok")
+    try:
+        estadisticas: dict = {}
+        coordenadas = lectura_peaks(peaks_path, parser, estadisticas)
+        extraccion: dict = {}
+        secuencias = extraer_secuencias(coordenadas, genoma, extraccion)
+        archivos = escribir_fasta(secuencias, output_dir, chars_por_linea)
+        resumen.update(
+            picos_totales=estadisticas['picos_totales'],
+            picos_validos=estadisticas['picos_validos'],
+            picos_invalidos=estadisticas['picos_invalidos'],
+            secuencias=extraccion.get('sec_validos', 0),
+            archivos=len(archivos))
+    except Exception as e:
+        logger.error("Error procesando '%s': %s", peaks_path, e)
+        resumen["estado"] = f"error: {e}"
+    resumen["segundos"] = round(time.perf_counter() - inicio, 3)
+    return resumen
+
+
+def procesar_lote(
+        genoma: str,
+        entradas: List[Tuple[str, str]],
+        chars_por_linea: int = 80,
+        parser: str = "auto",
+        workers: int = 4
+    ) -> List[dict]:
+    """
+    Procesa varios archivos de picos contra un genoma ya cargado.
+
+    Args:
+        genoma (str): Secuencia completa del genoma.
+        entradas (List[Tuple[str, str]]): Pares (peaks_path, output_dir).
+        chars_por_linea (int): Caracteres por línea en los FASTA.
+        parser (str): Motor de lectura del TSV de picos.
+        workers (int): Máximo de archivos procesados a la vez.
+
+    Returns:
+        List[dict]: Un resumen por entrada, en el orden de `entradas`,
+            con las claves de `COLUMNAS_RESUMEN`.
+
+    Raises:
+        ValueError: Si dos entradas comparten directorio de salida.
+    """
+    validar_entradas(entradas)
+    with ThreadPoolExecutor(max_workers=max(workers, 1),
+                            thread_name_prefix="lote") as pool:
+        futuros = [pool.submit(_procesar_entrada, genoma, peaks_path,
+                               output_dir, chars_por_linea, parser)
+                   for peaks_path, output_dir in entradas]
+        return [futuro.result() for futuro in futuros]
+
+
+def escribir_resumen(resumenes: List[dict], ruta: str) -> None:
+    """
+    Escribe el resumen consolidado del lote como TSV.
+
+    Args:
+        resumenes (List[dict]): Resultado de `procesar_lote`.
+        ruta (str): Ruta del TSV de salida.
+    """
+    with open(ruta, mode="w", encoding="utf-8") as arch:
+        arch.write("\t".join(COLUMNAS_RESUMEN) + "\n")
+        for fila in resumenes:
+            arch.write("\t".join(str(fila[c]) for c in COLUMNAS_RESUMEN)
+                       + "\n")
+
+
+def registrar_resumen(resumenes: List[dict], segundos_genoma: float) -> None:
+    """Registra en el log el resumen consolidado del lote."""
+    lineas = [f"  {os.path.basename(r['peaks'])}: {r['estado']}, "
+              f"{r['segundos']:.2f} s, picos válidos={r['picos_validos']}, "
+              f"inválidos={r['picos_invalidos']}, "
+              f"archivos={r['archivos']}"
+              for r in resumenes]
+    correctos = sum(r["estado"] == "ok" for r in resumenes)
+    logger.info(
+        "Resumen del lote (%d/%d correctos; genoma cargado en %.2f s):\n%s",
+        correctos, len(resumenes), segundos_genoma, "\n".join(lineas))
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+def main(argv: Optional[List[str]] = None) -> int:
+    try:
+        from .args_config import configurar_argumentos_lote
+        from .logging_config import configurar_logging
+    except ImportError:
+        from args_config import configurar_argumentos_lote
+        from logging_config import configurar_logging
+
+    args = configurar_argumentos_lote().parse_args(argv)
+    logger_raiz = configurar_logging(args.logs, args.verbose)
+
+    try:
+        if args.manifest:
+            entradas = leer_manifiesto(args.manifest, args.outdir)
+        else:
+            entradas = entradas_desde_glob(args.glob, args.outdir)
+        validar_entradas(entradas)
+
+        inicio = time.perf_counter()
+        genoma = cargar_genoma(args.genome)
+        segundos_genoma = time.perf_counter() - inicio
+
+        resumenes = procesar_lote(genoma, entradas, args.line_length,
+                                  args.parser, args.workers)
+        registrar_resumen(resumenes, segundos_genoma)
+        if args.resumen:
+            escribir_resumen(resumenes, args.resumen)
+    except Exception:
+        logger_raiz.exception("Error durante la ejecución del lote")
+        return 1
+
+    return 0 if all(r["estado"] == "ok" for r in resumenes) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,360 @@
+"""
+Lectura transparente de archivos comprimidos con gzip o BGZF.
+
+Los archivos se reconocen por sus bytes mágicos (1f 8b), no por la
+extensión, y se descomprimen en streaming al leerlos.
+
+Contiene:
+
+  - es_gzip(ruta) -> bool
+    ------------------------------------------------------------
+    Indica si el archivo empieza con la firma gzip.
+
+  - es_bgzf(ruta) -> bool
+    ------------------------------------------------------------
+    Indica si el archivo es gzip por bloques (BGZF, `bgzip`), con el
+    subcampo extra "BC" en la cabecera del primer bloque.
+
+  - abrir_texto(ruta, newline=None) -> IO[str]
+    ------------------------------------------------------------
+    Abre un archivo de texto UTF-8, comprimido o no.
+
+  - tamano_sin_comprimir(ruta) -> int
+    ------------------------------------------------------------
+    Tamaño (exacto o estimado) del contenido descomprimido, para las
+    heurísticas que dependen del tamaño del archivo.
+
+  - GenomaBGZF(ruta, ruta_fai=None, ruta_gzi=None)
+    ------------------------------------------------------------
+    Vista de solo lectura de un FASTA comprimido con BGZF e indexado
+    (`samtools faidx`, que genera los índices .fai y .gzi). Expone
+    `len()` y recorte por `slice` sobre la secuencia concatenada de todos
+    los registros, igual que `cargar_genoma`, e infla solo los bloques
+    que contienen las bases pedidas.
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import os
+import gzip
+import zlib
+import struct
+import bisect
+import logging
+import threading
+from collections import OrderedDict
+from typing import IO, List, Optional, Tuple
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Firma de los archivos gzip (y, por tanto, BGZF)
+MAGIA_GZIP = b"\x1f\x8b"
+
+# Bloques BGZF descomprimidos que se conservan en caché (de hasta 64 KiB)
+BLOQUES_EN_CACHE = 64
+
+# Relación de compresión supuesta cuando no se conoce el tamaño real
+RELACION_COMPRESION = 4
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+def es_gzip(ruta: str) -> bool:
+    """
+    Indica si el archivo está comprimido con gzip (o BGZF).
+
+    Args:
+        ruta (str): Ruta al archivo.
+
+    Returns:
+        bool: True si los dos primeros bytes son la firma gzip.
+    """
+    with open(ruta, mode="rb") as arch:
+        return arch.read(2) == MAGIA_GZIP
+
+
+def _tamano_bloque(cabecera: bytes) -> Optional[int]:
+    """
+    Devuelve el tamaño total del bloque BGZF cuya cabecera se recibe
+    (12 bytes fijos más el campo extra), o None si no es un bloque BGZF.
+    """
+    if len(cabecera) < 12 or cabecera[:2] != MAGIA_GZIP \
+            or not cabecera[3] & 4:
+        return None
+    xlen = struct.unpack_from("<H", cabecera, 10)[0]
+    extra = cabecera[12:12 + xlen]
+    i = 0
+    while i + 4 <= len(extra):
+        longitud = struct.unpack_from("<H", extra, i + 2)[0]
+        if extra[i:i + 2] == b"BC" and longitud == 2:
+            return struct.unpack_from("<H", extra, i + 4)[0] + 1
+        i += 4 + longitud
+    return None
+
+
+def es_bgzf(ruta: str) -> bool:
+    """
+    Indica si el archivo está comprimido con BGZF (gzip por bloques).
+
+    Args:
+        ruta (str): Ruta al archivo.
+
+    Returns:
+        bool: True si la cabecera del primer bloque lleva el subcampo
+            extra "BC" con el tamaño del bloque.
+    """
+    with open(ruta, mode="rb") as arch:
+        cabecera = arch.read(12)
+        if len(cabecera) < 12:
+            return False
+        cabecera += arch.read(struct.unpack_from("<H", cabecera, 10)[0])
+    return _tamano_bloque(cabecera) is not None
+
+
+def abrir_texto(ruta: str, newline: Optional[str] = None) -> IO[str]:
+    """
+    Abre un archivo de texto UTF-8, descomprimiéndolo en streaming si
+    está comprimido con gzip o BGZF.
+
+    Args:
+        ruta (str): Ruta al archivo.
+        newline (Optional[str]): Igual que en `open`.
+
+    Returns:
+        IO[str]: Archivo abierto en modo texto.
+    """
+    if es_gzip(ruta):
+        return gzip.open(ruta, mode="rt", encoding="utf-8", newline=newline)
+    return open(ruta, mode="r", encoding="utf-8", newline=newline)
+
+
+def _leer_fai(ruta_fai: str) -> List[Tuple[int, int, int, int]]:
+    """
+    Lee un índice .fai y devuelve, por registro y en orden,
+    (longitud, desplazamiento, bases por línea, bytes por línea).
+    """
+    registros = []
+    with open(ruta_fai, mode="r", encoding="utf-8") as arch:
+        for num_linea, linea in enumerate(arch, 1):
+            if not linea.strip():
+                continue
+            campos = linea.rstrip("\r\n").split("\t")
+            try:
+                longitud, desplazamiento, bases, bytes_ = (
+                    int(c) for c in campos[1:5])
+            except ValueError:
+                bases = 0
+            if bases <= 0:
+                msg = f"Índice .fai inválido '{ruta_fai}' (línea {num_linea})"
+                logger.error(msg)
+                raise ValueError(msg)
+            registros.append((longitud, desplazamiento, bases, bytes_))
+    return registros
+
+
+def _leer_gzi(ruta_gzi: str) -> Tuple[List[int], List[int]]:
+    """
+    Lee un índice .gzi de BGZF y devuelve los desplazamientos
+    comprimidos y descomprimidos del inicio de cada bloque indexado,
+    incluido el primero (0, 0), que el formato no almacena.
+    """
+    with open(ruta_gzi, mode="rb") as arch:
+        datos = arch.read()
+    if len(datos) < 8:
+        msg = f"Índice .gzi inválido '{ruta_gzi}'"
+        logger.error(msg)
+        raise ValueError(msg)
+    n = struct.unpack_from("<Q", datos)[0]
+    if len(datos) < 8 + 16 * n:
+        msg = f"Índice .gzi truncado '{ruta_gzi}'"
+        logger.error(msg)
+        raise ValueError(msg)
+    pares = struct.unpack_from(f"<{2 * n}Q", datos, 8)
+    comprimidos, descomprimidos = [0], [0]
+    for comprimido, descomprimido in zip(pares[::2], pares[1::2]):
+        if comprimido:
+            comprimidos.append(comprimido)
+            descomprimidos.append(descomprimido)
+    return comprimidos, descomprimidos
+
+
+def tamano_sin_comprimir(ruta: str) -> int:
+    """
+    Tamaño del contenido descomprimido del archivo.
+
+    Para archivos sin comprimir es el tamaño en disco. Para FASTA BGZF
+    indexados, la suma de las longitudes del .fai; para gzip de un solo
+    miembro, el campo ISIZE del final (módulo 2**32). En otro caso se
+    estima con `RELACION_COMPRESION`.
+
+    Args:
+        ruta (str): Ruta al archivo.
+
+    Returns:
+        int: Bytes (o bases, con .fai) sin comprimir.
+    """
+    tamano = os.path.getsize(ruta)
+    if tamano < 18 or not es_gzip(ruta):
+        return tamano
+    if os.path.isfile(ruta + ".fai"):
+        return sum(r[0] for r in _leer_fai(ruta + ".fai"))
+    with open(ruta, mode="rb") as arch:
+        arch.seek(-4, os.SEEK_END)
+        isize = struct.unpack("<I", arch.read(4))[0]
+    return isize if isize >= tamano else tamano * RELACION_COMPRESION
+
+
+class GenomaBGZF:
+    """
+    Vista de solo lectura de un FASTA BGZF indexado.
+
+    Como `GenomaMapeado`, expone `len()` y recorte por `slice`, que es
+    todo lo que necesita `extraer_secuencias`. Cada recorte se traduce a
+    desplazamientos en el archivo descomprimido con el .fai, se localizan
+    sus bloques con el .gzi y solo esos se inflan; los últimos bloques
+    usados se conservan en caché. Es seguro compartirlo entre hilos.
+
+    Args:
+        ruta (str): FASTA comprimido con BGZF.
+        ruta_fai (Optional[str]): Índice .fai (por defecto, ruta + ".fai").
+        ruta_gzi (Optional[str]): Índice .gzi (por defecto, ruta + ".gzi").
+
+    Raises:
+        FileNotFoundError: Si falta el archivo o alguno de sus índices.
+        ValueError: Si los índices no son válidos o no hay secuencia.
+    """
+
+    def __init__(
+            self,
+            ruta: str,
+            ruta_fai: Optional[str] = None,
+            ruta_gzi: Optional[str] = None
+        ):
+        ruta_fai = ruta_fai or ruta + ".fai"
+        ruta_gzi = ruta_gzi or ruta + ".gzi"
+        for archivo in (ruta, ruta_fai, ruta_gzi):
+            if not os.path.isfile(archivo):
+                msg = f"Archivo no encontrado: {archivo}"
+                logger.error(msg)
+                raise FileNotFoundError(msg)
+
+        self.ruta = ruta
+        self._registros = _leer_fai(ruta_fai)
+        self._comprimidos, self._descomprimidos = _leer_gzi(ruta_gzi)
+        # Posición de cada registro en la secuencia concatenada
+        self._inicios = [0]
+        for longitud, *_ in self._registros:
+            self._inicios.append(self._inicios[-1] + longitud)
+        if not self._inicios[-1]:
+            msg = "Archivo FASTA vacío"
+            logger.error(msg)
+            raise ValueError(msg)
+
+        self._arch = open(ruta, mode="rb")
+        self._cache: "OrderedDict[int, Tuple[int, bytes]]" = OrderedDict()
+        self._candado = threading.Lock()
+        self.bloques_inflados = 0
+
+    def __len__(self) -> int:
+        return self._inicios[-1]
+
+    def __getitem__(self, rango: slice) -> str:
+        inicio, fin, _ = rango.indices(len(self))
+        partes = []
+        while inicio < fin:
+            # Un recorte puede abarcar varios registros del FASTA
+            r = bisect.bisect_right(self._inicios, inicio) - 1
+            hasta = min(fin, self._inicios[r + 1])
+            partes.append(self._leer_registro(
+                r, inicio - self._inicios[r], hasta - self._inicios[r]))
+            inicio = hasta
+        return "".join(partes)
+
+    def _leer_registro(self, r: int, inicio: int, fin: int) -> str:
+        """Bases [inicio, fin) del registro `r`, sin saltos de línea."""
+        _, desplazamiento, bases_linea, bytes_linea = self._registros[r]
+
+        def _posicion(base: int) -> int:
+            return (desplazamiento + base // bases_linea * bytes_linea
+                    + base % bases_linea)
+
+        datos = self._leer_descomprimido(_posicion(inicio),
+                                         _posicion(fin - 1) + 1)
+        return datos.translate(None, b"\r\n").upper().decode("ascii")
+
+    def _leer_descomprimido(self, inicio: int, fin: int) -> bytes:
+        """Bytes [inicio, fin) del archivo descomprimido."""
+        i = bisect.bisect_right(self._descomprimidos, inicio) - 1
+        with self._candado:
+            posicion = self._descomprimidos[i]
+            compr = self._comprimidos[i]
+            partes = []
+            while posicion < fin:
+                bloque, siguiente = self._bloque(compr)
+                if not bloque:
+                    msg = f"Fin de datos inesperado en '{self.ruta}'"
+                    logger.error(msg)
+                    raise ValueError(msg)
+                partes.append(bloque[max(inicio - posicion, 0):
+                                     fin - posicion])
+                posicion += len(bloque)
+                compr = siguiente
+        return b"".join(partes)
+
+    def _bloque(self, desplazamiento: int) -> Tuple[bytes, int]:
+        """
+        Devuelve el bloque BGZF que empieza en `desplazamiento`
+        descomprimido y el desplazamiento del bloque siguiente.
+        """
+        if desplazamiento in self._cache:
+            self._cache.move_to_end(desplazamiento)
+            datos = self._cache[desplazamiento]
+            return datos[1], datos[0]
+
+        self._arch.seek(desplazamiento)
+        cabecera = self._arch.read(12)
+        if len(cabecera) == 12:
+            cabecera += self._arch.read(
+                struct.unpack_from("<H", cabecera, 10)[0])
+        tamano = _tamano_bloque(cabecera)
+        if tamano is None:
+            if not cabecera:
+                return b"", desplazamiento
+            msg = (f"Bloque BGZF inválido en '{self.ruta}' "
+                   f"(byte {desplazamiento})")
+            logger.error(msg)
+            raise ValueError(msg)
+        try:
+            bloque = zlib.decompress(
+                cabecera + self._arch.read(tamano - len(cabecera)),
+                wbits=31)
+        except zlib.error as e:
+            msg = (f"Bloque BGZF dañado en '{self.ruta}' "
+                   f"(byte {desplazamiento}): {e}")
+            logger.error(msg)
+            raise ValueError(msg)
+        self.bloques_inflados += 1
+
+        siguiente = desplazamiento + tamano
+        self._cache[desplazamiento] = (siguiente, bloque)
+        while len(self._cache) > BLOQUES_EN_CACHE:
+            self._cache.popitem(last=False)
+        return bloque, siguiente
+
+    def cerrar(self) -> None:
+        """Cierra el archivo comprimido."""
+        self._arch.close()
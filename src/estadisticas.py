@@ -0,0 +1,244 @@
+"""
+Estadísticas de composición por pico calculadas durante la extracción.
+
+En lugar de releer los FASTA generados, la longitud, el porcentaje de GC,
+el número de bases ambiguas (N) y el número de dinucleótidos CpG de cada
+pico se obtienen de sumas acumuladas sobre el genoma completo, calculadas
+una sola vez: cada estadística de un pico es la resta de dos posiciones
+del arreglo, de modo que su costo no depende de la longitud del pico.
+Las sumas de GC y de N son las de `fondo.prefijos_gc`; la de CpG cuenta
+los dinucleótidos que empiezan antes de cada posición.
+
+`extraer_secuencias` acepta un objeto `EstadisticasPicos` y le entrega
+las coordenadas de cada TF en la misma pasada en la que recorta las
+secuencias. Los picos se numeran como los registros `>TF_pico_<n>` de
+los FASTA, también cuando llegan por lotes.
+
+Cada TF produce `<outdir>/<TF>.estadisticas.tsv` (o `.parquet`) con las
+columnas `COLUMNAS_ESTADISTICAS`.
+
+Contiene:
+
+  - EstadisticasPicos(genoma)
+    ------------------------------------------------------------
+    Sumas acumuladas del genoma y filas acumuladas por TF:
+      * agregar(tf, rangos, circular=False) -> int
+      * escribir(output_dir, formato="tsv") -> List[str]
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+from __future__ import annotations
+
+import os
+import logging
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+try:
+    from . import windows
+    from .fondo import prefijos_gc
+except ImportError:
+    import windows
+    from fondo import prefijos_gc
+
+# numpy y pandas se importan dentro de las funciones (arranque rápido)
+if TYPE_CHECKING:
+    import numpy as np
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Columnas de la tabla de estadísticas de cada TF
+COLUMNAS_ESTADISTICAS = ["pico", "start", "end", "longitud", "gc",
+                         "n", "cpg"]
+
+# Formatos de salida admitidos
+FORMATOS = ("tsv", "parquet")
+
+# =============================================================================
+# CLASES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+class EstadisticasPicos:
+    """
+    Estadísticas de composición de los picos a partir de sumas
+    acumuladas del genoma (tres arreglos de 4 bytes por base).
+
+    Args:
+        genoma: Secuencia del genoma (cadena o `GenomaBGZF`).
+    """
+
+    def __init__(self, genoma):
+        import numpy as np
+
+        self.gc, self.ambiguas = prefijos_gc(genoma)
+        arreglo = windows.genoma_como_arreglo(genoma)
+        self.longitud = len(arreglo)
+
+        # cpg[i]: dinucleótidos CG que empiezan antes de la posición i
+        es_c = (arreglo == ord("C")) | (arreglo == ord("c"))
+        es_g = (arreglo == ord("G")) | (arreglo == ord("g"))
+        self.cpg = np.zeros(self.longitud + 1, dtype=self.gc.dtype)
+        if self.longitud > 1:
+            np.cumsum(es_c[:-1] & es_g[1:], dtype=self.gc.dtype,
+                      out=self.cpg[1:-1])
+            self.cpg[-1] = self.cpg[-2]
+        # CpG que cruza el origen de un genoma circular
+        self._cpg_origen = int(self.longitud > 1 and es_c[-1] and es_g[0])
+
+        self._filas: Dict[str, List[Tuple[np.ndarray, ...]]] = {}
+        self.contadores: Dict[str, int] = {}
+
+    def _suma(self, prefijo: np.ndarray, inicios: np.ndarray,
+              finales: np.ndarray) -> np.ndarray:
+        """Suma en [inicio, final) con final <= longitud."""
+        import numpy as np
+
+        return (prefijo[finales].astype(np.int64)
+                - prefijo[inicios].astype(np.int64))
+
+    def _cpg(self, inicios: np.ndarray, finales: np.ndarray) -> np.ndarray:
+        """CpG completamente dentro de [inicio, final)."""
+        import numpy as np
+
+        return self._suma(self.cpg, inicios,
+                          np.maximum(finales - 1, inicios))
+
+    def agregar(self, tf: str, rangos: List[Tuple[int, int]],
+                circular: bool = False) -> int:
+        """
+        Calcula las estadísticas de los rangos válidos de un TF (con las
+        mismas reglas que `extraer_secuencias`) y las acumula.
+
+        Args:
+            tf (str): Nombre del TF.
+            rangos (List[Tuple[int, int]]): (start, end) 0-based; se
+                ignoran elementos adicionales como la hebra.
+            circular (bool): Admitir rangos que cruzan el origen.
+
+        Returns:
+            int: Número de picos válidos agregados.
+        """
+        import numpy as np
+
+        if not rangos:
+            return 0
+        coords = np.array([(r[0], r[1]) for r in rangos], dtype=np.int64)
+        start, end = coords[:, 0], coords[:, 1]
+        largo = self.longitud
+        lineales = (0 <= start) & (start < end) & (end <= largo)
+        tamanos = end - start
+        if circular and largo:
+            # Misma regla que `_longitud_circular`
+            envuelto = np.where(end > start, end - start,
+                                end + largo - start)
+            circulares = (~lineales & (start >= 0) & (end >= 0)
+                          & (start != end) & (0 < envuelto)
+                          & (envuelto <= largo))
+            tamanos = np.where(circulares, envuelto, tamanos)
+            validos = lineales | circulares
+        else:
+            validos = lineales
+        start, end, tamanos = start[validos], end[validos], tamanos[validos]
+        if not len(start):
+            return 0
+
+        # Rangos ya reducidos al genoma: [inicio, fin) con fin <= 2 * largo
+        inicios = start % largo
+        fines = inicios + tamanos
+        cruza = fines > largo
+        corte = np.minimum(fines, largo)
+        resto = np.where(cruza, fines - largo, 0)
+        ceros = np.zeros_like(resto)
+
+        gc = (self._suma(self.gc, inicios, corte)
+              + self._suma(self.gc, ceros, resto))
+        n = (self._suma(self.ambiguas, inicios, corte)
+             + self._suma(self.ambiguas, ceros, resto))
+        cpg = self._cpg(inicios, corte) + np.where(
+            cruza, self._cpg(ceros, resto) + self._cpg_origen, 0)
+
+        previos = self.contadores.get(tf, 0)
+        numeros = np.arange(previos + 1, previos + len(start) + 1)
+        self._filas.setdefault(tf, []).append(
+            (numeros, start, end, tamanos, gc, n, cpg))
+        self.contadores[tf] = previos + len(start)
+        return len(start)
+
+    def tabla(self, tf: str):
+        """
+        DataFrame con las estadísticas acumuladas de un TF; `gc` es el
+        porcentaje de G/C sobre la longitud del pico.
+        """
+        import numpy as np
+        import pandas as pd
+
+        partes = self._filas.get(tf, [])
+        columnas = [np.concatenate([p[i] for p in partes])
+                    if partes else np.empty(0, dtype=np.int64)
+                    for i in range(len(COLUMNAS_ESTADISTICAS))]
+        tabla = pd.DataFrame(dict(zip(COLUMNAS_ESTADISTICAS, columnas)))
+        tabla["gc"] = (100 * tabla["gc"]
+                       / tabla["longitud"].clip(lower=1)).round(2)
+        return tabla
+
+    def escribir(self, output_dir: str, formato: str = "tsv") -> List[str]:
+        """
+        Escribe una tabla por TF junto a los FASTA.
+
+        Args:
+            output_dir (str): Directorio de salida.
+            formato (str): "tsv" o "parquet"; sin pyarrow, "parquet" se
+                degrada a "tsv" con una advertencia.
+
+        Returns:
+            List[str]: Rutas de los archivos escritos.
+
+        Raises:
+            ValueError: Si el formato no es válido.
+            RuntimeError: Si no se puede escribir un archivo.
+        """
+        if formato not in FORMATOS:
+            msg = f"Formato de estadísticas inválido '{formato}'"
+            logger.error(msg)
+            raise ValueError(msg)
+        if formato == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                logger.warning(
+                    "pyarrow no está instalado; estadísticas en TSV")
+                formato = "tsv"
+
+        archivos: List[str] = []
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            for tf in self._filas:
+                ruta = os.path.join(output_dir,
+                                    f"{tf}.estadisticas.{formato}")
+                tabla = self.tabla(tf)
+                if formato == "parquet":
+                    tabla.to_parquet(ruta, index=False)
+                else:
+                    tabla.to_csv(ruta, sep="\t", index=False)
+                archivos.append(ruta)
+        except OSError as e:
+            msg = (f"No se pudieron escribir las estadísticas en "
+                   f"'{output_dir}': {e}")
+            logger.error(msg)
+            raise RuntimeError(msg)
+        logger.info("Estadísticas por pico: %d picos de %d TF",
+                    sum(self.contadores.values()), len(archivos))
+        return archivos
@@ -0,0 +1,269 @@
+"""
+API reutilizable para notebooks y servicios: la clase `PeakExtractor`.
+
+A diferencia de las funciones libres del paquete, `PeakExtractor`
+conserva el genoma cargado y memoriza los archivos de picos ya leídos,
+de modo que las llamadas sucesivas no vuelven a cargar ni a parsear
+nada que no haya cambiado.
+
+Contiene:
+
+  - PeakExtractor(genome_path=None, genoma=None, peaks_path=None, ...)
+    ------------------------------------------------------------
+    * coordenadas(peaks_path)  -> Dict[str, List[Tuple[int, int]]]
+      Lectura de picos memorizada por (ruta, mtime) con desalojo LRU.
+    * extract(tf=None, region=None, peaks_path=None)
+      Secuencia(s) de una región, de un TF o de todos los TF.
+    * iter_fasta(peaks_path=None, chars_por_linea=80, tf=None)
+      Registros FASTA (tf, texto) en el formato de `escribir_fasta`.
+    * cerrar()
+      Cierra el genoma BGZF abierto por el extractor; también al salir
+      de un bloque `with`.
+
+Ejemplo:
+    >>> from src import PeakExtractor
+    >>> with PeakExtractor("genoma.fa", peaks_path="picos.tsv") as px:
+    ...     px.extract(tf="lexA")[:2]
+    ...     px.extract(region=(100, 160))
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    from .genome import abrir_genoma
+    from .peaks import lectura_peaks, extraer_secuencias
+    from .io_utils import formatear_registro
+    from .compresion import GenomaBGZF
+except ImportError:
+    from genome import abrir_genoma
+    from peaks import lectura_peaks, extraer_secuencias
+    from io_utils import formatear_registro
+    from compresion import GenomaBGZF
+
+# =============================================================================
+# CLASES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+Region = Tuple[int, int]
+
+class PeakExtractor:
+    """
+    Extractor de secuencias con el genoma y los picos en caché.
+
+    Args:
+        genome_path (Optional[str]): FASTA del genoma; se carga una vez
+            (un FASTA BGZF indexado se lee por bloques con `abrir_genoma`
+            y su archivo queda abierto hasta `cerrar`).
+        genoma (Optional[str]): Secuencia ya cargada (alternativa a
+            `genome_path`).
+        peaks_path (Optional[str]): TSV de picos por defecto para
+            `extract` e `iter_fasta`.
+        max_archivos (int): Archivos de picos que se mantienen en caché.
+        parser (str): Motor de lectura del TSV ("auto", "c", "pyarrow",
+            "native").
+
+    Raises:
+        ValueError: Si no se indica exactamente uno de `genome_path` y
+            `genoma`, o `max_archivos` no es positivo.
+    """
+
+    def __init__(
+            self,
+            genome_path: Optional[str] = None,
+            genoma: Optional[str] = None,
+            peaks_path: Optional[str] = None,
+            max_archivos: int = 8,
+            parser: str = "auto"
+        ):
+        if (genome_path is None) == (genoma is None):
+            raise ValueError("Indique genome_path o genoma (solo uno)")
+        if max_archivos <= 0:
+            raise ValueError(
+                f"max_archivos debe ser positivo: {max_archivos}")
+        self.genoma = abrir_genoma(genome_path) if genoma is None else genoma
+        # Solo se cierra el genoma que abrió el propio extractor
+        self._genoma_propio = genoma is None
+        self.peaks_path = peaks_path
+        self.max_archivos = max_archivos
+        self.parser = parser
+        self._cache: "OrderedDict[Tuple[str, int], Dict[str, List[Region]]]"
+        self._cache = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    # -------------------------------------------------------------------------
+    # Recursos
+    # -------------------------------------------------------------------------
+    def cerrar(self) -> None:
+        """
+        Cierra el archivo del genoma si es un BGZF abierto desde
+        `genome_path`; un genoma recibido en `genoma` no se toca.
+        """
+        if self._genoma_propio and isinstance(self.genoma, GenomaBGZF):
+            self.genoma.cerrar()
+
+    def __enter__(self) -> "PeakExtractor":
+        return self
+
+    def __exit__(self, *excepcion) -> None:
+        self.cerrar()
+
+    # -------------------------------------------------------------------------
+    # Caché de picos
+    # -------------------------------------------------------------------------
+    def coordenadas(
+            self,
+            peaks_path: Optional[str] = None
+        ) -> Dict[str, List[Region]]:
+        """
+        Devuelve las coordenadas por TF de un archivo de picos, leyéndolo
+        solo si no está en caché o cambió su fecha de modificación.
+
+        Args:
+            peaks_path (Optional[str]): TSV de picos; por defecto, el del
+                constructor.
+
+        Returns:
+            Dict[str, List[Tuple[int, int]]]: Coordenadas por TF. No debe
+                modificarse: es el objeto compartido de la caché.
+
+        Raises:
+            ValueError: Si no hay archivo de picos que usar.
+            FileNotFoundError: Si el archivo no existe.
+        """
+        ruta = peaks_path or self.peaks_path
+        if ruta is None:
+            raise ValueError("No se indicó archivo de picos")
+        ruta = os.path.abspath(ruta)
+        if not os.path.isfile(ruta):
+            msg = f"Archivo de picos no encontrado: {ruta}"
+            logger.error(msg)
+            raise FileNotFoundError(msg)
+        clave = (ruta, os.stat(ruta).st_mtime_ns)
+
+        with self._candado:
+            if clave in self._cache:
+                self._cache.move_to_end(clave)
+                self.aciertos += 1
+                return self._cache[clave]
+
+        coords = lectura_peaks(ruta, self.parser)
+        with self._candado:
+            self.fallos += 1
+            # Descartar versiones anteriores del mismo archivo
+            for vieja in [c for c in self._cache if c[0] == ruta]:
+                del self._cache[vieja]
+            self._cache[clave] = coords
+            while len(self._cache) > self.max_archivos:
+                desalojada, _ = self._cache.popitem(last=False)
+                logger.debug("Caché de picos: se desaloja '%s'",
+                             desalojada[0])
+        return coords
+
+    def limpiar_cache(self) -> None:
+        """Vacía la caché de archivos de picos."""
+        with self._candado:
+            self._cache.clear()
+
+    # -------------------------------------------------------------------------
+    # Extracción
+    # -------------------------------------------------------------------------
+    def extract(
+            self,
+            tf: Optional[str] = None,
+            region: Optional[Union[Region, List[Region]]] = None,
+            peaks_path: Optional[str] = None
+        ) -> Union[str, List[Optional[str]], Dict[str, List[str]]]:
+        """
+        Extrae secuencias del genoma en caché.
+
+        Args:
+            tf (Optional[str]): TF cuyas secuencias de picos se devuelven.
+            region (Optional[Union[Tuple[int, int], List[Tuple[int, int]]]]):
+                Una región (start, end) 0-based o una lista de regiones.
+            peaks_path (Optional[str]): TSV de picos para `tf` o para
+                extraer todos los TF.
+
+        Returns:
+            - Con `region` única: la secuencia (str).
+            - Con lista de regiones: lista de secuencias, con None en las
+              regiones fuera de rango.
+            - Con `tf`: lista de secuencias de sus picos.
+            - Sin `tf` ni `region`: diccionario TF -> secuencias.
+
+        Raises:
+            ValueError: Si se indican `tf` y `region` a la vez, o la
+                región única está fuera del genoma.
+            KeyError: Si el TF no está en el archivo de picos.
+        """
+        if tf is not None and region is not None:
+            raise ValueError("Indique tf o region, no ambos")
+
+        if region is not None:
+            unica = isinstance(region, tuple)
+            regiones = [region] if unica else list(region)
+            longitud = len(self.genoma)
+            secuencias = [
+                self.genoma[start:end] if 0 <= start < end <= longitud
+                else None
+                for start, end in regiones]
+            if unica:
+                if secuencias[0] is None:
+                    raise ValueError(f"Región fuera del genoma: {region}")
+                return secuencias[0]
+            return secuencias
+
+        coords = self.coordenadas(peaks_path)
+        if tf is not None:
+            if tf not in coords:
+                raise KeyError(f"TF desconocido: {tf}")
+            return extraer_secuencias({tf: coords[tf]}, self.genoma, {})[tf]
+        return extraer_secuencias(coords, self.genoma, {})
+
+    def iter_fasta(
+            self,
+            peaks_path: Optional[str] = None,
+            chars_por_linea: int = 80,
+            tf: Optional[str] = None
+        ) -> Iterator[Tuple[str, str]]:
+        """
+        Produce los registros FASTA de los picos, TF por TF, sin
+        materializar todas las secuencias a la vez.
+
+        Args:
+            peaks_path (Optional[str]): TSV de picos.
+            chars_por_linea (int): Caracteres por línea de secuencia.
+            tf (Optional[str]): Limitar a un TF.
+
+        Yields:
+            Tuple[str, str]: (TF, registro FASTA con la cabecera
+                `>TF_pico_<n>_len=<longitud>`).
+        """
+        coords = self.coordenadas(peaks_path)
+        nombres = [tf] if tf is not None else list(coords)
+        for nombre in nombres:
+            if nombre not in coords:
+                raise KeyError(f"TF desconocido: {nombre}")
+            secuencias = extraer_secuencias(
+                {nombre: coords[nombre]}, self.genoma, {})[nombre]
+            for i, secuencia in enumerate(secuencias, start=1):
+                yield nombre, formatear_registro(
+                    nombre, i, secuencia, chars_por_linea)
@@ -0,0 +1,338 @@
+"""
+Secuencias de fondo emparejadas con los picos de cada TF.
+
+Los análisis de enriquecimiento de motivos comparan los picos con un
+conjunto de fondo que tenga la misma distribución de longitud y de
+contenido GC. Este módulo construye ese conjunto a partir del genoma ya
+cargado y de las coordenadas de `lectura_peaks`:
+
+  1. Se calculan una vez las sumas acumuladas de G/C y de bases
+     ambiguas (N) del genoma, con las que el GC de cualquier intervalo
+     cuesta O(1).
+  2. Cada pico pide `veces` intervalos de su misma longitud y de su
+     misma clase de GC (`bins_gc` clases de igual anchura).
+  3. En cada ronda se sortean con NumPy varios inicios aleatorios por
+     petición pendiente, se calcula su GC con las sumas acumuladas y se
+     acepta el primero de la clase pedida que no contenga N ni se
+     solape con los picos del TF ni con otro intervalo aceptado. En un
+     genoma circular, los picos que cruzan el origen no piden fondo,
+     pero sus dos tramos cuentan como ocupados.
+
+Los intervalos aceptados se recortan del genoma y se escriben con
+`escribir_fasta` en `<outdir>/fondo/<TF>.fa`.
+
+Contiene:
+
+  - prefijos_gc(genoma) -> (gc, ambiguas)
+    ------------------------------------------------------------
+    Sumas acumuladas de G/C y de bases distintas de A, C, G, T.
+
+  - generar_fondo(tf_coordenadas, genoma, veces=1, bins_gc=20,
+                  semilla=0, prefijos=None, circular=False)
+      -> Dict[str, List[str]]
+    ------------------------------------------------------------
+    Secuencias de fondo por TF, emparejadas por longitud y GC.
+
+  - escribir_fondo(tf_coordenadas, genoma, output_dir, ...) -> List[str]
+    ------------------------------------------------------------
+    Genera el fondo y lo escribe en `<output_dir>/fondo`.
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+from __future__ import annotations
+
+import os
+import time
+import zlib
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+try:
+    from . import windows
+    from .io_utils import escribir_fasta
+except ImportError:
+    import windows
+    from io_utils import escribir_fasta
+
+# numpy se importa dentro de las funciones (arranque rápido)
+if TYPE_CHECKING:
+    import numpy as np
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Inicios aleatorios sorteados por petición pendiente en cada ronda
+CANDIDATOS_POR_RONDA = 16
+
+# Rondas de muestreo antes de desistir de las peticiones pendientes
+RONDAS_MAXIMAS = 64
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+def prefijos_gc(genoma) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sumas acumuladas de G/C y de bases ambiguas del genoma.
+
+    Args:
+        genoma: Secuencia del genoma (cadena o `GenomaBGZF`).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (gc, ambiguas), de longitud
+            len(genoma) + 1; el GC de [s, e) es gc[e] - gc[s].
+    """
+    import numpy as np
+
+    arreglo = windows.genoma_como_arreglo(genoma)
+    tipo = np.uint32 if len(arreglo) < 2**32 else np.int64
+    gc = np.zeros(len(arreglo) + 1, dtype=tipo)
+    ambiguas = np.zeros(len(arreglo) + 1, dtype=tipo)
+    es_gc = np.zeros(256, dtype=bool)
+    es_base = np.zeros(256, dtype=bool)
+    for base in b"GCgc":
+        es_gc[base] = True
+    for base in b"ACGTacgt":
+        es_base[base] = True
+    np.cumsum(es_gc[arreglo], dtype=tipo, out=gc[1:])
+    np.cumsum(~es_base[arreglo], dtype=tipo, out=ambiguas[1:])
+    return gc, ambiguas
+
+
+def _clase_gc(gc: np.ndarray, longitudes: np.ndarray,
+              bins_gc: int) -> np.ndarray:
+    """Clase de GC (0 .. bins_gc - 1) de cada intervalo."""
+    import numpy as np
+
+    fraccion = gc / np.maximum(longitudes, 1)
+    return np.minimum((fraccion * bins_gc).astype(np.int64), bins_gc - 1)
+
+
+def _ocupados(inicios: np.ndarray,
+              finales: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Une intervalos [inicio, final) en intervalos disjuntos ordenados."""
+    import numpy as np
+
+    if not len(inicios):
+        return inicios, finales
+    orden = np.argsort(inicios, kind="stable")
+    inicios, finales = inicios[orden], np.maximum.accumulate(finales[orden])
+    nuevos = np.concatenate(([True], inicios[1:] > finales[:-1]))
+    grupos = np.flatnonzero(nuevos)
+    ultimos = np.concatenate((grupos[1:] - 1, [len(inicios) - 1]))
+    return inicios[grupos], finales[ultimos]
+
+
+def _solapa(inicios: np.ndarray, finales: np.ndarray,
+            ocupados: Tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """Si cada [inicio, final) se solapa con algún intervalo ocupado."""
+    import numpy as np
+
+    ini_ocup, fin_ocup = ocupados
+    if not len(ini_ocup):
+        return np.zeros(len(inicios), dtype=bool)
+    # Primer ocupado que termina después del inicio del candidato
+    idx = np.searchsorted(fin_ocup, inicios, side="right")
+    dentro = idx < len(ini_ocup)
+    solapa = np.zeros(len(inicios), dtype=bool)
+    solapa[dentro] = ini_ocup[idx[dentro]] < finales[dentro]
+    return solapa
+
+
+def _muestrear_tf(
+        rangos: List[Tuple[int, int]],
+        prefijos: Tuple[np.ndarray, np.ndarray],
+        veces: int,
+        bins_gc: int,
+        generador: np.random.Generator,
+        circular: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Inicios y longitudes de los intervalos de fondo de un TF, en el
+    orden de los picos que los pidieron (los no encontrados se omiten),
+    y el número de intervalos pedidos por los picos válidos.
+    """
+    import numpy as np
+
+    gc, ambiguas = prefijos
+    largo_genoma = len(gc) - 1
+    crudos = np.array([(r[0], r[1]) for r in rangos], dtype=np.int64)
+    picos = crudos[(0 <= crudos[:, 0]) & (crudos[:, 0] < crudos[:, 1])
+                   & (crudos[:, 1] <= largo_genoma)]
+    ini_ocupados, fin_ocupados = picos[:, 0], picos[:, 1]
+    if circular and largo_genoma:
+        # Los picos que cruzan el origen ocupan [inicio, largo) y
+        # [0, resto), recortados como en `peaks._recorte_circular`
+        start, end = crudos[:, 0], crudos[:, 1]
+        tamano = end + largo_genoma - start
+        cruzan = ((0 <= end) & (end < start) & (0 < tamano)
+                  & (tamano <= largo_genoma))
+        inicio = start[cruzan] % largo_genoma
+        fin = inicio + tamano[cruzan]
+        resto = fin > largo_genoma
+        ini_ocupados = np.concatenate((ini_ocupados, inicio,
+                                       np.zeros(resto.sum(), np.int64)))
+        fin_ocupados = np.concatenate((
+            fin_ocupados, np.minimum(fin, largo_genoma),
+            fin[resto] - largo_genoma))
+    longitudes_picos = picos[:, 1] - picos[:, 0]
+
+    # Una petición por pico y repetición: (longitud, clase de GC)
+    longitudes = np.repeat(longitudes_picos, veces)
+    clases = np.repeat(_clase_gc(
+        gc[picos[:, 1]].astype(np.int64) - gc[picos[:, 0]],
+        longitudes_picos, bins_gc), veces)
+    aceptados = np.full(len(longitudes), -1, dtype=np.int64)
+    ocupados = _ocupados(ini_ocupados, fin_ocupados)
+
+    for _ in range(RONDAS_MAXIMAS):
+        pendientes = np.flatnonzero(aceptados < 0)
+        if not len(pendientes):
+            break
+        largo = longitudes[pendientes]
+        # Inicios uniformes en [0, largo_genoma - largo]
+        inicios = (generador.random((len(pendientes),
+                                     CANDIDATOS_POR_RONDA))
+                   * (largo_genoma - largo + 1)[:, None]).astype(np.int64)
+        finales = inicios + largo[:, None]
+        validos = ((ambiguas[finales] - ambiguas[inicios]) == 0) & (
+            _clase_gc(gc[finales].astype(np.int64) - gc[inicios],
+                      largo[:, None], bins_gc)
+            == clases[pendientes][:, None])
+        validos &= ~_solapa(inicios.ravel(), finales.ravel(),
+                            ocupados).reshape(validos.shape)
+
+        # Primer candidato válido de cada petición
+        con_candidato = validos.any(axis=1)
+        filas = np.flatnonzero(con_candidato)
+        elegidos = inicios[filas, validos[filas].argmax(axis=1)]
+        fin_elegidos = elegidos + largo[filas]
+
+        # Entre los elegidos de la ronda, descartar los que se solapan con
+        # uno anterior en el genoma
+        orden = np.argsort(elegidos, kind="stable")
+        fin_previo = np.concatenate((
+            [-1], np.maximum.accumulate(fin_elegidos[orden])[:-1]))
+        libres = orden[elegidos[orden] >= fin_previo]
+        aceptados[pendientes[filas[libres]]] = elegidos[libres]
+        ocupados = _ocupados(
+            np.concatenate((ocupados[0], elegidos[libres])),
+            np.concatenate((ocupados[1], fin_elegidos[libres])))
+
+    encontrados = aceptados >= 0
+    return aceptados[encontrados], longitudes[encontrados], len(aceptados)
+
+
+def generar_fondo(
+        tf_coordenadas: Dict[str, List[Tuple[int, int]]],
+        genoma,
+        veces: int = 1,
+        bins_gc: int = 20,
+        semilla: int = 0,
+        prefijos: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        circular: bool = False
+    ) -> Dict[str, List[str]]:
+    """
+    Genera, para cada TF, `veces` secuencias de fondo por pico con su
+    misma longitud y clase de GC, sin N y sin solaparse con los picos del
+    TF ni entre sí.
+
+    Args:
+        tf_coordenadas (Dict[str, List[Tuple[int, int]]]): Coordenadas
+            por TF, como las devuelve `lectura_peaks` (se ignoran la
+            hebra y los rangos fuera del genoma).
+        genoma: Secuencia del genoma (cadena o `GenomaBGZF`).
+        veces (int): Secuencias de fondo por pico.
+        bins_gc (int): Número de clases de GC de igual anchura.
+        semilla (int): Semilla del generador; cada TF usa una semilla
+            derivada de su nombre, de modo que el resultado no depende
+            del orden ni de los demás TF.
+        prefijos (Optional[Tuple]): Resultado de `prefijos_gc` para
+            reutilizarlo entre llamadas.
+        circular (bool): Genoma circular: los picos con start > end
+            cruzan el origen; no piden fondo, pero el fondo no se solapa
+            con ellos.
+
+    Returns:
+        Dict[str, List[str]]: Secuencias de fondo por TF.
+
+    Raises:
+        ValueError: Si `veces` o `bins_gc` no son positivos.
+    """
+    import numpy as np
+
+    if veces <= 0 or bins_gc <= 0:
+        msg = (f"veces y bins_gc deben ser positivos: "
+               f"veces={veces}, bins_gc={bins_gc}")
+        logger.error(msg)
+        raise ValueError(msg)
+    if prefijos is None:
+        prefijos = prefijos_gc(genoma)
+
+    fondo: Dict[str, List[str]] = {}
+    for tf, rangos in tf_coordenadas.items():
+        if not rangos:
+            continue
+        generador = np.random.default_rng(
+            [semilla, zlib.crc32(tf.encode("utf-8"))])
+        # Los picos fuera del genoma o vacíos no piden fondo
+        inicios, longitudes, pedidas = _muestrear_tf(
+            rangos, prefijos, veces, bins_gc, generador, circular)
+        if len(inicios) < pedidas:
+            logger.warning("%s: solo %d de %d secuencias de fondo "
+                           "emparejadas", tf, len(inicios), pedidas)
+        fondo[tf] = [genoma[s:s + n] for s, n in
+                     zip(inicios.tolist(), longitudes.tolist())]
+    return fondo
+
+
+def escribir_fondo(
+        tf_coordenadas: Dict[str, List[Tuple[int, int]]],
+        genoma,
+        output_dir: str,
+        chars_por_linea: int = 80,
+        veces: int = 1,
+        bins_gc: int = 20,
+        semilla: int = 0,
+        circular: bool = False
+    ) -> List[str]:
+    """
+    Genera el fondo de cada TF y lo escribe con `escribir_fasta` en
+    `<output_dir>/fondo/<TF>.fa`.
+
+    Args:
+        tf_coordenadas (Dict[str, List[Tuple[int, int]]]): Coordenadas
+            por TF.
+        genoma: Secuencia del genoma (cadena o `GenomaBGZF`).
+        output_dir (str): Directorio de salida.
+        chars_por_linea (int): Caracteres por línea de los FASTA.
+        veces (int): Secuencias de fondo por pico.
+        bins_gc (int): Número de clases de GC.
+        semilla (int): Semilla del generador.
+        circular (bool): Genoma circular (ver `generar_fondo`).
+
+    Returns:
+        List[str]: Rutas de los FASTA de fondo.
+    """
+    inicio = time.perf_counter()
+    fondo = generar_fondo(tf_coordenadas, genoma, veces, bins_gc, semilla,
+                          circular=circular)
+    archivos = escribir_fasta(fondo, os.path.join(output_dir, "fondo"),
+                              chars_por_linea)
+    logger.info("Fondo emparejado: %d secuencias de %d TF en %.2f s",
+                sum(len(s) for s in fondo.values()), len(fondo),
+                time.perf_counter() - inicio)
+    return archivos
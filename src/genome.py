@@ -15,6 +15,14 @@ Contiene:
       * Comprueba que la secuencia no esté vacía.
       * Maneja errores de formato, archivo inexistente y problemas
         de codificación.
+      * Descomprime en streaming los archivos gzip o BGZF, detectados
+        por sus bytes mágicos.
+
+  - abrir_genoma(genoma_path: str) -> Union[str, GenomaBGZF]
+    ------------------------------------------------------------
+    Si el FASTA está comprimido con BGZF y tiene índices .fai y .gzi,
+    devuelve una vista `GenomaBGZF` que solo infla los bloques que se
+    recortan; en otro caso, carga el genoma con `cargar_genoma`.
 
 Autor:
     Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
@@ -29,8 +37,15 @@ Versión:
 # IMPORTS
 # =============================================================================
 import os
+import zlib
+import gzip
 import logging
-from typing import TextIO
+from typing import TextIO, Union
+
+try:
+    from .compresion import abrir_texto, es_bgzf, GenomaBGZF
+except ImportError:
+    from compresion import abrir_texto, es_bgzf, GenomaBGZF
 
 # =============================================================================
 # FUNCIONES
@@ -45,7 +60,8 @@ def cargar_genoma(genoma_path : str) -> str:
 
     Esta función lee un archivo FASTA que debe comenzar con una línea de 
     encabezado (">...") seguida de una o más líneas de secuencia. Se concatena 
-    y devuelve como una sola cadena de bases en mayúsculas.
+    y devuelve como una sola cadena de bases en mayúsculas. Los archivos
+    comprimidos con gzip o BGZF se descomprimen al vuelo.
 
     Args:
         genoma_path (str): Ruta al archivo FASTA del genoma.
@@ -62,7 +78,7 @@ def cargar_genoma(genoma_path : str) -> str:
     # Intentamos abrir primero para capturar PermissionError
     try:
         #Abrir el archivo
-        with open(genoma_path, mode="r", encoding="utf-8") as archivo:
+        with abrir_texto(genoma_path) as archivo:
             #Leer y validar encabezado FASTA
             encabezado = archivo.readline().strip()
             if not encabezado.startswith('>'):
@@ -89,6 +105,10 @@ def cargar_genoma(genoma_path : str) -> str:
         msg = f"Error de codificación al leer '{genoma_path}': {e}"
         logger.error(msg)
         raise ValueError(msg)
+    except (gzip.BadGzipFile, EOFError, zlib.error) as e:
+        msg = f"Archivo comprimido dañado '{genoma_path}': {e}"
+        logger.error(msg)
+        raise ValueError(msg)
         
     # Si el archivo está vacio
     if not secuencia:
@@ -98,4 +118,33 @@ def cargar_genoma(genoma_path : str) -> str:
     
     logger.info("Genoma cargado; longitud: %d bp", len(secuencia))
     return secuencia
-    
\ No newline at end of file
+    
+
+def abrir_genoma(genoma_path: str) -> Union[str, GenomaBGZF]:
+    """
+    Abre el genoma con acceso aleatorio si es posible.
+
+    Un FASTA comprimido con BGZF que tenga junto a él los índices
+    `<genoma>.fai` y `<genoma>.gzi` (`samtools faidx`) se devuelve como
+    `GenomaBGZF`: no se descomprime entero, solo los bloques que contienen
+    los picos. Cualquier otro archivo se carga con `cargar_genoma`.
+
+    Args:
+        genoma_path (str): Ruta al archivo FASTA del genoma.
+
+    Returns:
+        Union[str, GenomaBGZF]: Secuencia completa o vista indexada; ambas
+            admiten `len()` y recorte por `slice`.
+
+    Raises:
+        FileNotFoundError: Si `genoma_path` no existe.
+        ValueError: Si el archivo o sus índices no son válidos.
+    """
+    if (os.path.isfile(genoma_path) and es_bgzf(genoma_path)
+            and os.path.isfile(genoma_path + ".fai")
+            and os.path.isfile(genoma_path + ".gzi")):
+        genoma = GenomaBGZF(genoma_path)
+        logger.info("Genoma BGZF indexado; longitud: %d bp (acceso "
+                    "aleatorio por bloques)", len(genoma))
+        return genoma
+    return cargar_genoma(genoma_path)
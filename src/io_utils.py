@@ -4,11 +4,32 @@ secuencias agrupadas por factor de transcripción (TF).
 
 Este módulo ofrece:
 
+  - formatear_registro(tf, numero, secuencia, chars_por_linea) -> str
+    --------------------------------------------------------
+    Construye el texto FASTA de un pico con el formato de cabecera y
+    longitud de línea usados por `escribir_fasta`.
+
   - escribir_fasta(tf_secuencias, output_dir, chars_por_linea)
     --------------------------------------------------------
     Dado un diccionario TF → lista de secuencias de ADN, crea un
     archivo FASTA por cada TF, con headers informativos
     (`>TF_pico_<n>_len=<longitud>`) y líneas de longitud fija.
+    Con `contadores` permite escribir por lotes: los TF ya vistos se
+    añaden al final de su archivo y la numeración de picos continúa.
+    Cada archivo nuevo se escribe en `<TF>.fa.tmp` y se renombra de forma
+    atómica al terminar, de modo que un `.fa` nunca queda truncado por
+    una interrupción a mitad de la escritura.
+
+  - iniciar_diario(output_dir, reanudar=False) -> Dict[str, int]
+    --------------------------------------------------------
+    Prepara el diario de TF terminados: lo borra en una ejecución nueva
+    o, al reanudar, devuelve los TF cuyo FASTA está completo y elimina
+    los temporales que dejó una ejecución interrumpida.
+
+  - registrar_completados(output_dir, tfs, contadores) -> None
+    --------------------------------------------------------
+    Añade al diario los TF terminados, con su número de secuencias y el
+    tamaño de su FASTA.
 
 Autor:
     Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
@@ -25,8 +46,24 @@ Versión:
 # =============================================================================
 
 import os
+import glob
 import logging
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from . import progreso
+except ImportError:
+    import progreso
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Diario de TF terminados, dentro del directorio de salida
+DIARIO = ".tf_completados.tsv"
+
+# Sufijo de los FASTA en escritura
+SUFIJO_TEMPORAL = ".tmp"
 
 # =============================================================================
 # FUNCIONES
@@ -34,10 +71,39 @@ from typing import Dict, List
 
 logger = logging.getLogger(__name__)
 
+def formatear_registro(
+        tf: str,
+        numero: int,
+        secuencia: str,
+        chars_por_linea: int = 80
+    ) -> str:
+    """
+    Devuelve el registro FASTA de un pico: cabecera
+    `>TF_pico_<n>_len=<longitud>` y la secuencia en líneas de longitud
+    fija, cada una terminada en salto de línea.
+
+    Args:
+        tf (str): Nombre del TF.
+        numero (int): Número del pico dentro del TF (desde 1).
+        secuencia (str): Secuencia de ADN.
+        chars_por_linea (int): Número máximo de caracteres por línea.
+
+    Returns:
+        str: Registro FASTA completo.
+    """
+    #Dividir la secuencia en líneas de longitud fija
+    lineas = [secuencia[j:j + chars_por_linea]
+              for j in range(0, len(secuencia), chars_por_linea)]
+    lineas.insert(0, f">{tf}_pico_{numero}_len={len(secuencia)}")
+    lineas.append("")
+    return "\n".join(lineas)
+
+
 def escribir_fasta(
         tf_secuencias: Dict[str, List[str]],
         output_dir: str = "TF_picos_fasta",
-        chars_por_linea: int = 80
+        chars_por_linea: int = 80,
+        contadores: Optional[Dict[str, int]] = None
     ) -> List[str]:
 
     """
@@ -52,6 +118,14 @@ def escribir_fasta(
             Se crea si no existe.
         chars_por_linea (int):
             Número máximo de caracteres por línea en el FASTA.
+        contadores (Optional[Dict[str, int]]):
+            Picos ya escritos por TF en llamadas anteriores. Si un TF
+            está presente, su archivo se abre en modo añadir y la
+            numeración continúa; si no, el archivo se crea desde cero.
+            Se actualiza en sitio, por lo que los lotes de un TF pueden
+            llegar de forma no contigua. Los lotes añadidos escriben
+            directamente en el archivo final; el diario
+            (`registrar_completados`) indica cuándo un TF está completo.
 
     Returns:
         List[str]: Lista de rutas (como cadenas) de los archivos FASTA 
@@ -82,30 +156,146 @@ def escribir_fasta(
             continue
 
         nombre_archivo = os.path.join(output_dir, f"{tf}.fa")
+        previos = contadores.get(tf, 0) if contadores is not None else 0
+        modo = "a" if previos else "w"
+        # Un archivo nuevo se escribe aparte y se renombra al terminar
+        destino = (nombre_archivo if previos
+                   else nombre_archivo + SUFIJO_TEMPORAL)
         try:
-            with open(
-                nombre_archivo, mode="w", encoding="utf-8") as arch_salida:
-                for i, secuencia in enumerate(secuencias, start=1):
-                    #Escribir la cabecera de cada secuencia
-                    arch_salida.write(
-                        f">{tf}_pico_{i}_len={len(secuencia)}\n")
-                    for j in range(0, len(secuencia), chars_por_linea):
-                        #Dividir la secuencia en líneas de longitud fija
-                        arch_salida.write(
-                            f"{secuencia[j:j+chars_por_linea]}\n")
+            escritos = 0
+            with open(destino, mode=modo, encoding="utf-8") as arch_salida:
+                for i, secuencia in enumerate(secuencias, start=previos + 1):
+                    escritos += arch_salida.write(
+                        formatear_registro(tf, i, secuencia, chars_por_linea))
+            progreso.avanzar("bytes", escritos)
+            if not previos:
+                os.replace(destino, nombre_archivo)
 
             archivos_generados.append(nombre_archivo)
-            logger.info(
-                "Archivo generado: '%s' ('%d secuencias)",
-                nombre_archivo,
-                len(secuencias)
-            )
+            if contadores is not None:
+                contadores[tf] = previos + len(secuencias)
+            if previos:
+                logger.debug(
+                    "Archivo ampliado: '%s' (+%d secuencias)",
+                    nombre_archivo,
+                    len(secuencias)
+                )
+            else:
+                logger.info(
+                    "Archivo generado: '%s' ('%d secuencias)",
+                    nombre_archivo,
+                    len(secuencias)
+                )
         except IOError as e:
             logger.error(f"Error generando archivo para {tf}: {str(e)}")
             raise
 
     return archivos_generados
 
+
+def _leer_diario(output_dir: str) -> Dict[str, int]:
+    """
+    TF del diario cuyo FASTA existe y conserva el tamaño registrado, con
+    su número de secuencias. Las líneas incompletas se ignoran.
+    """
+    ruta = os.path.join(output_dir, DIARIO)
+    completados: Dict[str, int] = {}
+    if not os.path.isfile(ruta):
+        return completados
+    with open(ruta, mode="r", encoding="utf-8") as arch:
+        for linea in arch:
+            campos = linea.rstrip("\n").split("\t")
+            if len(campos) != 3 or not linea.endswith("\n"):
+                continue
+            tf, secuencias, tamano = campos
+            fasta = os.path.join(output_dir, f"{tf}.fa")
+            if (os.path.isfile(fasta)
+                    and str(os.path.getsize(fasta)) == tamano):
+                completados[tf] = int(secuencias)
+            else:
+                completados.pop(tf, None)
+                logger.warning("FASTA incompleto o modificado; se "
+                               "regenera: '%s'", fasta)
+    return completados
+
+
+def iniciar_diario(output_dir: str, reanudar: bool = False) -> Dict[str, int]:
+    """
+    Prepara el diario de TF terminados de `output_dir`.
+
+    Args:
+        output_dir (str): Directorio de salida de los FASTA.
+        reanudar (bool): Conservar el diario y devolver los TF ya
+            terminados; si es False se empieza una ejecución nueva.
+
+    Returns:
+        Dict[str, int]: TF terminados y su número de secuencias (vacío
+            si no se reanuda).
+
+    Raises:
+        RuntimeError: Si no se puede preparar el directorio.
+    """
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        if not reanudar:
+            ruta = os.path.join(output_dir, DIARIO)
+            if os.path.exists(ruta):
+                os.remove(ruta)
+            return {}
+        # Temporales de una ejecución interrumpida
+        for temporal in glob.glob(os.path.join(
+                glob.escape(output_dir), "*.fa" + SUFIJO_TEMPORAL)):
+            os.remove(temporal)
+    except OSError as e:
+        msg = f"No se pudo preparar el diario en '{output_dir}': {e}"
+        logger.error(msg)
+        raise RuntimeError(msg)
+
+    completados = _leer_diario(output_dir)
+    logger.info("Reanudando: %d TF terminados (%d secuencias) se omiten",
+                len(completados), sum(completados.values()))
+    return completados
+
+
+def registrar_completados(
+        output_dir: str,
+        tfs: Iterable[str],
+        contadores: Dict[str, int]
+    ) -> None:
+    """
+    Añade al diario los TF terminados. Cada línea (TF, secuencias,
+    tamaño del FASTA) se escribe completa y se sincroniza con el disco
+    antes de volver, de modo que una interrupción no deja un TF marcado
+    como terminado sin su archivo.
+
+    Args:
+        output_dir (str): Directorio de salida de los FASTA.
+        tfs (Iterable[str]): TF terminados; se omiten los que no tienen
+            secuencias escritas en `contadores`.
+        contadores (Dict[str, int]): Secuencias escritas por TF.
+
+    Raises:
+        RuntimeError: Si no se puede escribir el diario.
+    """
+    lineas = []
+    for tf in tfs:
+        if contadores.get(tf):
+            fasta = os.path.join(output_dir, f"{tf}.fa")
+            lineas.append(f"{tf}\t{contadores[tf]}\t"
+                          f"{os.path.getsize(fasta)}\n")
+    if not lineas:
+        return
+    try:
+        with open(os.path.join(output_dir, DIARIO), mode="a",
+                  encoding="utf-8") as arch:
+            arch.writelines(lineas)
+            arch.flush()
+            os.fsync(arch.fileno())
+    except OSError as e:
+        msg = f"No se pudo actualizar el diario en '{output_dir}': {e}"
+        logger.error(msg)
+        raise RuntimeError(msg)
+
 """
 Comentarios:
   Me gusta mucho como manejas los exception, son específicos y muy bien planteados en el flujo del programa. Hay cosas
@@ -0,0 +1,376 @@
+"""
+Conteo vectorizado de k-mers en los picos de cada TF frente al genoma.
+
+Las secuencias se codifican con 2 bits por base (A=0, C=1, G=2, T=3) y
+el código de cada k-mer se construye con NumPy desplazando y combinando
+k vistas desplazadas del arreglo de bases, sin recorrer las cadenas en
+Python. Las ventanas que contienen una base distinta de A, C, G o T (o el
+separador entre picos) se descartan con una suma acumulada. Los códigos
+se cuentan con `bincount` cuando 4**k cabe en memoria y ordenando los
+códigos en los demás casos. En modo canónico cada k-mer se cuenta junto
+con su reverso complementario, usando el menor de ambos códigos.
+
+Cada TF produce `<outdir>/kmers/<TF>_k<k>.npz` con los k-mers presentes
+(`codigos`) y sus conteos (`conteos`), y todos los TF comparten el TSV
+`<outdir>/kmers_enriquecidos.tsv` con los k-mers más enriquecidos frente
+al genoma.
+
+Contiene:
+
+  - contar_kmers(secuencias, k, canonico=False) -> (codigos, conteos)
+    ------------------------------------------------------------
+    Conteo disperso de los k-mers de una lista de secuencias.
+
+  - contar_kmers_genoma(genoma, k, canonico=False) -> (codigos, conteos)
+    ------------------------------------------------------------
+    Conteo disperso de los k-mers del genoma, por bloques.
+
+  - sumar_conteos(a, b) -> (codigos, conteos)
+
+  - decodificar_kmers(codigos, k) -> List[str]
+
+  - acumular_kmers(acumulados, tf_secuencias, ks, canonico=False) -> None
+    ------------------------------------------------------------
+    Suma los conteos de un lote de secuencias a los acumulados por TF.
+
+  - escribir_kmers(acumulados, genoma, output_dir, canonico=False,
+                   top=50) -> List[str]
+    ------------------------------------------------------------
+    Guarda los conteos por TF y el TSV de k-mers enriquecidos.
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+from __future__ import annotations
+
+import os
+import time
+import logging
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+# numpy se importa dentro de las funciones (arranque rápido)
+if TYPE_CHECKING:
+    import numpy as np
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Longitudes de k-mer admitidas (los códigos caben en uint32)
+K_MINIMO = 1
+K_MAXIMO = 16
+
+# Hasta 4**K_DENSO códigos se cuenta con bincount; por encima, ordenando
+K_DENSO = 10
+
+# Bases del genoma procesadas por bloque en contar_kmers_genoma
+BASES_POR_BLOQUE = 1 << 24
+
+# Pseudoconteo de las frecuencias del enriquecimiento
+PSEUDOCONTEO = 0.5
+
+# Columnas del TSV de k-mers enriquecidos
+COLUMNAS_KMERS = ["TF", "k", "kmer", "conteo", "frecuencia",
+                  "conteo_genoma", "frecuencia_genoma",
+                  "log2_enriquecimiento"]
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+Conteos = Tuple["np.ndarray", "np.ndarray"]
+
+def _validar_k(k: int) -> None:
+    """Lanza ValueError si `k` está fuera de [K_MINIMO, K_MAXIMO]."""
+    if not K_MINIMO <= k <= K_MAXIMO:
+        msg = f"k debe estar entre {K_MINIMO} y {K_MAXIMO}: {k}"
+        logger.error(msg)
+        raise ValueError(msg)
+
+
+def _codificar_2bits(texto: bytes) -> np.ndarray:
+    """Códigos A=0, C=1, G=2, T=3 (mayúsculas o minúsculas); 4 en otro caso."""
+    import numpy as np
+
+    tabla = np.full(256, 4, dtype=np.uint8)
+    for codigo, base in enumerate("ACGT"):
+        tabla[ord(base)] = tabla[ord(base.lower())] = codigo
+    return tabla[np.frombuffer(texto, dtype=np.uint8)]
+
+
+def _codigos_kmer(bases: np.ndarray, k: int, canonico: bool) -> np.ndarray:
+    """
+    Códigos uint32 de todos los k-mers de `bases` sin bases inválidas.
+    """
+    import numpy as np
+
+    n = len(bases) - k + 1
+    if n <= 0:
+        return np.empty(0, dtype=np.uint32)
+
+    # Ventanas sin ninguna base inválida (suma acumulada de inválidas)
+    invalidas = np.concatenate(([0], np.cumsum(bases > 3, dtype=np.int64)))
+    validas = invalidas[k:] == invalidas[:n]
+
+    dos_bits = (bases & 3).astype(np.uint32)
+    codigos = np.zeros(n, dtype=np.uint32)
+    for j in range(k):
+        codigos <<= 2
+        codigos |= dos_bits[j:j + n]
+    if canonico:
+        # El complemento de un código de 2 bits es 3 - código; la
+        # primera base del reverso es el complemento de la última
+        reverso = np.zeros(n, dtype=np.uint32)
+        for j in range(k - 1, -1, -1):
+            reverso <<= 2
+            reverso |= 3 - dos_bits[j:j + n]
+        np.minimum(codigos, reverso, out=codigos)
+    return codigos[validas]
+
+
+def _contar_codigos(codigos: np.ndarray, k: int) -> Conteos:
+    """Conteo disperso (códigos presentes ordenados y sus conteos)."""
+    import numpy as np
+
+    if k <= K_DENSO:
+        densos = np.bincount(codigos, minlength=4 ** k)
+        presentes = np.flatnonzero(densos)
+        return presentes.astype(np.uint32), densos[presentes].astype(np.int64)
+    presentes, conteos = np.unique(codigos, return_counts=True)
+    return presentes.astype(np.uint32), conteos.astype(np.int64)
+
+
+def contar_kmers(
+        secuencias: List[str],
+        k: int,
+        canonico: bool = False
+    ) -> Conteos:
+    """
+    Cuenta los k-mers de un conjunto de secuencias. Los k-mers no cruzan
+    de una secuencia a la siguiente.
+
+    Args:
+        secuencias (List[str]): Secuencias de los picos.
+        k (int): Longitud del k-mer.
+        canonico (bool): Contar cada k-mer junto con su reverso
+            complementario.
+
+    Returns:
+        Conteos: (codigos uint32 ordenados, conteos int64) de los k-mers
+            presentes.
+
+    Raises:
+        ValueError: Si `k` está fuera del rango admitido.
+    """
+    _validar_k(k)
+    bases = _codificar_2bits("N".join(secuencias).encode("ascii"))
+    return _contar_codigos(_codigos_kmer(bases, k, canonico), k)
+
+
+def contar_kmers_genoma(genoma, k: int, canonico: bool = False) -> Conteos:
+    """
+    Cuenta los k-mers del genoma por bloques de `BASES_POR_BLOQUE` bases
+    (solapados k - 1 bases), de modo que la memoria no depende del tamaño
+    del genoma. Acepta la cadena de `cargar_genoma` o una vista indexada
+    (`GenomaBGZF`).
+
+    Args:
+        genoma: Secuencia del genoma (admite recortes y len()).
+        k (int): Longitud del k-mer.
+        canonico (bool): Contar cada k-mer junto con su reverso
+            complementario.
+
+    Returns:
+        Conteos: (codigos, conteos) de los k-mers presentes.
+
+    Raises:
+        ValueError: Si `k` está fuera del rango admitido.
+    """
+    _validar_k(k)
+    total = None
+    for inicio in range(0, max(len(genoma) - k + 1, 1), BASES_POR_BLOQUE):
+        bloque = genoma[inicio:inicio + BASES_POR_BLOQUE + k - 1]
+        conteos = _contar_codigos(
+            _codigos_kmer(_codificar_2bits(bloque.encode("ascii")), k,
+                          canonico), k)
+        total = conteos if total is None else sumar_conteos(total, conteos)
+    return total
+
+
+def sumar_conteos(a: Conteos, b: Conteos) -> Conteos:
+    """Suma dos conteos dispersos."""
+    import numpy as np
+
+    codigos = np.concatenate((a[0], b[0]))
+    conteos = np.concatenate((a[1], b[1]))
+    orden = np.argsort(codigos, kind="stable")
+    codigos, conteos = codigos[orden], conteos[orden]
+    if not len(codigos):
+        return codigos, conteos
+    inicios = np.flatnonzero(np.concatenate(([True],
+                                             codigos[1:] != codigos[:-1])))
+    return codigos[inicios], np.add.reduceat(conteos, inicios)
+
+
+def decodificar_kmers(codigos: np.ndarray, k: int) -> List[str]:
+    """Convierte códigos de 2 bits por base en cadenas de longitud k."""
+    import numpy as np
+
+    codigos = np.asarray(codigos, dtype=np.uint32)
+    desplazamientos = np.arange(2 * (k - 1), -1, -2, dtype=np.uint32)
+    indices = (codigos[:, None] >> desplazamientos) & 3
+    letras = np.frombuffer(b"ACGT", dtype=np.uint8)[indices]
+    return [b.decode("ascii")
+            for b in np.ascontiguousarray(letras).view(f"S{k}").ravel()]
+
+
+def acumular_kmers(
+        acumulados: Dict[str, Dict[int, Conteos]],
+        tf_secuencias: Dict[str, List[str]],
+        ks: List[int],
+        canonico: bool = False
+    ) -> None:
+    """
+    Suma a `acumulados[tf][k]` los k-mers de un lote de secuencias, para
+    que el resultado no dependa de cómo se dividan los picos en lotes.
+
+    Args:
+        acumulados (Dict[str, Dict[int, Conteos]]): Conteos por TF y k;
+            se modifica en sitio.
+        tf_secuencias (Dict[str, List[str]]): Secuencias por TF, como las
+            devuelve `extraer_secuencias`.
+        ks (List[int]): Longitudes de k-mer.
+        canonico (bool): Conteo canónico.
+    """
+    for tf, secuencias in tf_secuencias.items():
+        if not secuencias:
+            continue
+        por_k = acumulados.setdefault(tf, {})
+        for k in ks:
+            conteos = contar_kmers(secuencias, k, canonico)
+            por_k[k] = (sumar_conteos(por_k[k], conteos) if k in por_k
+                        else conteos)
+
+
+def _enriquecidos(
+        tf: str,
+        k: int,
+        conteos: Conteos,
+        fondo: Conteos,
+        top: int,
+        conteo_minimo: int
+    ) -> List[tuple]:
+    """
+    Filas del TSV con los `top` k-mers de mayor log2(frecuencia en los
+    picos / frecuencia en el genoma) entre los vistos al menos
+    `conteo_minimo` veces.
+    """
+    import numpy as np
+
+    codigos, n = conteos
+    seleccion = n >= conteo_minimo
+    codigos, n = codigos[seleccion], n[seleccion]
+    if not len(codigos):
+        return []
+
+    # Conteo del genoma de cada k-mer de los picos (0 si no aparece)
+    posiciones = np.searchsorted(fondo[0], codigos)
+    posiciones = np.minimum(posiciones, max(len(fondo[0]) - 1, 0))
+    n_genoma = np.zeros(len(codigos), dtype=np.int64)
+    if len(fondo[0]):
+        presentes = fondo[0][posiciones] == codigos
+        n_genoma[presentes] = fondo[1][posiciones[presentes]]
+
+    frecuencia = n / conteos[1].sum()
+    frecuencia_genoma = n_genoma / max(int(fondo[1].sum()), 1)
+    log2 = np.log2((n + PSEUDOCONTEO) / (conteos[1].sum() + PSEUDOCONTEO)
+                   / ((n_genoma + PSEUDOCONTEO)
+                      / (fondo[1].sum() + PSEUDOCONTEO)))
+
+    # Mayor enriquecimiento primero; a igualdad, mayor conteo y código
+    orden = np.lexsort((codigos, -n, -log2))[:top]
+    kmers = decodificar_kmers(codigos[orden], k)
+    return [(tf, k, kmer, int(n[i]), round(float(frecuencia[i]), 8),
+             int(n_genoma[i]), round(float(frecuencia_genoma[i]), 8),
+             round(float(log2[i]), 4))
+            for kmer, i in zip(kmers, orden.tolist())]
+
+
+def escribir_kmers(
+        acumulados: Dict[str, Dict[int, Conteos]],
+        genoma,
+        output_dir: str,
+        canonico: bool = False,
+        top: int = 50,
+        conteo_minimo: int = 2
+    ) -> List[str]:
+    """
+    Guarda los conteos de cada TF y k en `<output_dir>/kmers/<TF>_k<k>.npz`
+    (arreglos `codigos` y `conteos`) y los `top` k-mers más enriquecidos
+    de cada TF frente al genoma en `<output_dir>/kmers_enriquecidos.tsv`.
+
+    Args:
+        acumulados (Dict[str, Dict[int, Conteos]]): Resultado de
+            `acumular_kmers`.
+        genoma: Secuencia del genoma (cadena o `GenomaBGZF`).
+        output_dir (str): Directorio de salida.
+        canonico (bool): Conteo canónico (debe coincidir con el de los
+            picos).
+        top (int): k-mers por TF y k en el TSV.
+        conteo_minimo (int): Conteo mínimo en los picos para figurar en
+            el TSV.
+
+    Returns:
+        List[str]: Rutas de los archivos escritos.
+
+    Raises:
+        RuntimeError: Si no se puede escribir un archivo.
+    """
+    import numpy as np
+
+    inicio = time.perf_counter()
+    ks = sorted({k for por_k in acumulados.values() for k in por_k})
+    fondos = {k: contar_kmers_genoma(genoma, k, canonico) for k in ks}
+    logger.debug("k-mers del genoma contados en %.2f s",
+                 time.perf_counter() - inicio)
+
+    directorio = os.path.join(output_dir, "kmers")
+    archivos: List[str] = []
+    filas: List[tuple] = []
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        for tf, por_k in acumulados.items():
+            for k, (codigos, conteos) in sorted(por_k.items()):
+                ruta = os.path.join(directorio, f"{tf}_k{k}.npz")
+                np.savez(ruta, codigos=codigos,
+                         conteos=conteos.astype(np.uint32))
+                archivos.append(ruta)
+                filas.extend(_enriquecidos(tf, k, (codigos, conteos),
+                                           fondos[k], top, conteo_minimo))
+
+        ruta_tsv = os.path.join(output_dir, "kmers_enriquecidos.tsv")
+        with open(ruta_tsv, mode="w", encoding="utf-8") as arch:
+            arch.write("\t".join(COLUMNAS_KMERS) + "\n")
+            arch.writelines("\t".join(map(str, fila)) + "\n"
+                            for fila in filas)
+        archivos.append(ruta_tsv)
+    except OSError as e:
+        msg = f"No se pudieron escribir los k-mers en '{output_dir}': {e}"
+        logger.error(msg)
+        raise RuntimeError(msg)
+
+    logger.info("k-mers: %d TF, k=%s%s, %.2f s", len(acumulados),
+                ",".join(map(str, ks)), " (canónicos)" if canonico else "",
+                time.perf_counter() - inicio)
+    return archivos
@@ -28,6 +28,50 @@ Argumentos:
     --logs: Directorio de salida del log
     -l, --line_lenght: Formato para las secuencias de fasta (opcional)
     --verbose: Activar log DEBUG
+    --parser: Motor de lectura del TSV de picos (auto, c, pyarrow, native)
+    --chunksize: Procesar los picos por bloques de N filas
+    --streaming: Extraer y escribir TF por TF con memoria acotada
+    --max-memory: Presupuesto de memoria que activa el modo streaming
+    --secuencial: Cargar genoma y picos uno tras otro (sin hilos)
+    --procesos: Número de procesos para leer, extraer y escribir en paralelo
+    --window: Exportar ventanas de ancho fijo como matrices .npy por TF
+    --anchor: Ancla de las ventanas (center, start, end)
+    --one-hot: Codificar las ventanas one-hot
+    --circular: Extraer picos que cruzan el origen de un genoma circular
+    --strand: Reverso complementario de los picos de la hebra -
+    --tf: Extraer solo los TF indicados
+    --min-fold-enrichment: Umbral mínimo de Max_Fold_Enrichment
+    --top-n: Conservar los N picos más enriquecidos de cada TF
+    --sample / --sample-frac: Submuestra reproducible de N picos o de una
+        fracción de los picos de cada TF
+    --sample-weighted: Muestrear (--sample) ponderando por enriquecimiento
+    --motifs: Buscar motivos IUPAC/PWM en los picos (sitios en
+        <outdir>/motivos.tsv)
+    --motif-threshold: Puntuación relativa mínima de las PWM
+    --kmers: Contar k-mers por TF (conteos en <outdir>/kmers/ y
+        enriquecidos frente al genoma en <outdir>/kmers_enriquecidos.tsv)
+    --canonical: Contar k-mers canónicos (colapsando hebras)
+    --top-kmers: k-mers enriquecidos por TF y k en el TSV
+    --background: Secuencias de fondo por pico emparejadas por longitud y
+        GC (en <outdir>/fondo/)
+    --gc-bins: Clases de GC del fondo
+    --seed: Semilla del muestreo aleatorio (fondo y --sample)
+    --peak-stats: Estadísticas por pico (longitud, GC, N, CpG) en
+        <outdir>/<TF>.estadisticas.tsv o .parquet
+    --table: Secuencias como tabla Parquet o Arrow IPC particionada por TF
+        (en <outdir>/secuencias/)
+    --resume: Omitir los TF ya terminados de una ejecución interrumpida
+    --progress-interval: Segundos entre reportes de avance (filas/s, MB/s
+        y tiempo restante) fuera de una terminal; 0 lo desactiva
+    --metrics-file: Archivo .prom para el recolector textfile de Prometheus
+    --metrics-interval: Segundos entre actualizaciones de --metrics-file
+
+    Cada FASTA se escribe en un temporal que se renombra al terminar y
+    los TF completos se registran en <outdir>/.tf_completados.tsv.
+
+    El genoma y los picos pueden estar comprimidos con gzip o BGZF; un
+    FASTA BGZF con índices .fai y .gzi se lee por bloques sin
+    descomprimirlo entero.
 
 Uso:
     python3 extract_fasta.py -g ../data/E_coli_K12_MG1655_U00096.3.txt 
@@ -38,12 +82,27 @@ Uso:
 # =============================================================================
 # IMPORTS
 # =============================================================================
+import os
 import sys
 from args_config import configurar_argumentos
 from logging_config import configurar_logging
-from genome import cargar_genoma
-from peaks import lectura_peaks, extraer_secuencias
-from io_utils import escribir_fasta
+from genome import abrir_genoma
+from compresion import tamano_sin_comprimir, GenomaBGZF
+from peaks import (lectura_peaks, iterar_peaks, extraer_secuencias,
+                   crear_filtros)
+from io_utils import (escribir_fasta, iniciar_diario,
+                      registrar_completados)
+from pipeline import (estimar_memoria_completa, estimar_memoria_lectura,
+                      ejecutar_concurrente, memoria_maxima, cronometrar)
+from parallel import PoolExtraccion, lectura_peaks_paralela
+from windows import lectura_anclas, procesar_ventanas
+from motifs import leer_motivos, escanear_motivos, escribir_sitios
+from kmers import acumular_kmers, escribir_kmers
+import progreso
+from metricas import EscritorMetricas
+from fondo import escribir_fondo
+from estadisticas import EstadisticasPicos
+from tabular import abrir_tabla
 
 # =============================================================================
 # MAIN
@@ -70,26 +129,326 @@ def main():
     # Configurar logging
     logger = configurar_logging(args.logs, args.verbose)
 
+    # Estadísticas de lectura y extracción, tiempos y métricas; definidos
+    # antes del try para publicar también las ejecuciones fallidas
+    lectura = {}
+    estadisticas = {}
+    tiempos = {}
+    # Segundos de trabajo de cada etapa, incluidas las posteriores a la
+    # extracción (k-mers, estadísticas, tabla y fondo)
+    duraciones = {}
+    escritor = None
+    # Genoma abierto: un GenomaBGZF se cierra al terminar, aun con error
+    genoma_cargado = {}
+
     try:
         logger.info("Iniciando procesamiento")
+
+        # Contadores de avance, reportados cada --progress-interval y
+        # publicados en --metrics-file
+        reporte = progreso.Progreso(args.progress_interval).iniciar()
+        if args.metrics_file:
+            escritor = EscritorMetricas(args.metrics_file, reporte,
+                                        args.metrics_interval).iniciar()
+
+        # Filtros aplicados dentro de la lectura de picos
+        filtros = crear_filtros(args.tf, args.min_fold_enrichment,
+                                args.top_n, args.sample, args.sample_frac,
+                                args.seed, args.sample_weighted)
         
-        # 1. Cargar genoma
-        genoma = cargar_genoma(args.genome)
-        
-        # 2. Procesar picos
-        coordenadas = lectura_peaks(args.peaks)
-        
-        # 3. Extraer secuencias
-        secuencias = extraer_secuencias(coordenadas, genoma)
-        
-        # 4. Escribir archivos FASTA
-        archivos = escribir_fasta(secuencias, args.outdir, args.line_length)
-        
+        if not os.path.isfile(args.genome):
+            msg = f"Archivo de genoma no encontrado: {args.genome}"
+            logger.error(msg)
+            raise FileNotFoundError(msg)
+
+        # Con presupuesto de memoria, leer por bloques si el TSV no cabe
+        # (el tamaño del FASTA sin comprimir acota la longitud del genoma)
+        tam_genoma = tamano_sin_comprimir(args.genome)
+        if args.window:
+            # Las anclas se leen en una sola tabla y las ventanas se
+            # extraen en el proceso principal
+            ignoradas = [opcion for opcion, activa in (
+                ("--chunksize", args.chunksize),
+                ("--max-memory", args.max_memory),
+                ("--procesos", args.procesos > 1),
+                ("--parser native", args.parser == "native")) if activa]
+            if ignoradas:
+                logger.warning("Con --window se ignoran: %s",
+                               ", ".join(ignoradas))
+        chunksize = None if args.window else args.chunksize
+        if (args.max_memory and not chunksize and not args.window
+                and tam_genoma + estimar_memoria_lectura(args.peaks)
+                > args.max_memory):
+            chunksize = 100_000
+            logger.info("El TSV de picos excede --max-memory; "
+                        "lectura por bloques de %d filas", chunksize)
+
+        # En modo paralelo los lotes no se dividen por TF: cada lote se
+        # reparte entre los procesos de un pool creado con el primer lote
+        # y compartido por toda la ejecución
+        paralelo = args.procesos > 1 and not args.window
+        extraccion = (PoolExtraccion(args.procesos, args.outdir,
+                                     args.line_length, args.circular)
+                      if paralelo else None)
+
+        def _producir_picos():
+            """2. Procesar picos; produce lotes de coordenadas por TF."""
+            if chunksize:
+                # Por bloques y por TF
+                for lote in iterar_peaks(args.peaks, chunksize, args.parser,
+                                         estadisticas=lectura,
+                                         circular=args.circular,
+                                         hebra=args.strand,
+                                         filtros=filtros):
+                    if paralelo:
+                        yield lote
+                    else:
+                        yield from ({tf: r} for tf, r in lote.items())
+                return
+
+            if paralelo:
+                coordenadas = lectura_peaks_paralela(
+                    args.peaks, args.procesos, args.parser,
+                    estadisticas=lectura,
+                    circular=args.circular, hebra=args.strand,
+                    filtros=filtros)
+            else:
+                coordenadas = lectura_peaks(args.peaks, args.parser,
+                                            estadisticas=lectura,
+                                            circular=args.circular,
+                                            hebra=args.strand,
+                                            filtros=filtros)
+            progreso.fijar_total("picos", sum(
+                len(r) for tf, r in coordenadas.items()
+                if tf not in completados))
+            streaming = args.streaming
+            if args.max_memory and not streaming:
+                estimada = estimar_memoria_completa(coordenadas, tam_genoma)
+                streaming = estimada > args.max_memory
+                logger.info(
+                    "Memoria estimada del modo completo: %.1f MB "
+                    "(presupuesto %.1f MB); modo %s",
+                    estimada / 2**20, args.max_memory / 2**20,
+                    "streaming" if streaming else "completo")
+            if streaming and not paralelo:
+                # TF por TF, liberando las secuencias de cada uno
+                yield from ({tf: r} for tf, r in coordenadas.items())
+            else:
+                yield coordenadas
+
+        contadores = {}
+
+        # Diario de TF terminados; con --resume se omiten
+        completados = {}
+        if args.window:
+            if args.resume:
+                logger.warning("--resume no se aplica con --window; "
+                               "se ignora")
+        else:
+            completados = iniciar_diario(args.outdir, args.resume)
+            if completados and (args.motifs or args.kmers
+                                or args.background or args.peak_stats
+                                or args.table):
+                logger.warning(
+                    "Con --resume, motivos, k-mers, fondo, estadísticas "
+                    "y tabla se calculan solo para los TF no terminados")
+
+        # Motivos: los sitios de todos los lotes se añaden a un único TSV
+        motivos = leer_motivos(args.motifs) if args.motifs else None
+        ruta_sitios = os.path.join(args.outdir, "motivos.tsv")
+        sitios_totales = 0
+        if motivos and args.window:
+            logger.warning("--motifs no se aplica con --window; se ignora")
+            motivos = None
+        if motivos:
+            escribir_sitios([], ruta_sitios)
+
+        # k-mers: los conteos de todos los lotes se suman por TF y se
+        # escriben al final, junto con los del genoma
+        kmers = args.kmers
+        if kmers and args.window:
+            logger.warning("--kmers no se aplica con --window; se ignora")
+            kmers = None
+        conteos_kmers = {}
+
+        # Fondo: se genera al final con todos los picos de cada TF, para
+        # emparejar su distribución completa y evitar solaparlos
+        fondo = args.background
+        if fondo and args.window:
+            logger.warning("--background no se aplica con --window; "
+                           "se ignora")
+            fondo = None
+        coordenadas_fondo = {}
+
+        # Estadísticas por pico: las sumas acumuladas del genoma se
+        # calculan con el primer lote
+        if args.peak_stats and args.window:
+            logger.warning("--peak-stats no se aplica con --window; "
+                           "se ignora")
+        composicion = {}
+
+        # Tabla columnar: un archivo por TF, escrito por grupos de filas
+        # a medida que llegan los lotes
+        tabla = None
+        if args.table and args.window:
+            logger.warning("--table no se aplica con --window; se ignora")
+        elif args.table:
+            # Sin bloques, cada TF llega completo en un solo lote y su
+            # archivo se cierra enseguida
+            tabla = abrir_tabla(args.outdir, args.table,
+                                completos=not chunksize)
+
+        # Ventanas de ancho fijo: un único lote con las anclas por TF
+        if args.window and args.window <= 0:
+            raise ValueError(f"--window debe ser positivo: {args.window}")
+
+        def _producir_ventanas():
+            """2. Procesar picos y calcular las anclas por TF."""
+            yield lectura_anclas(args.peaks, args.anchor,
+                                 estadisticas=lectura,
+                                 circular=args.circular,
+                                 hebra=args.strand, filtros=filtros,
+                                 parser=args.parser)
+
+        producir = _producir_ventanas if args.window else _producir_picos
+
+        def consumir(genoma, lote):
+            """3-4. Extraer secuencias, escribir archivos FASTA y, si se
+            pidió, buscar motivos, contar k-mers y reunir las
+            coordenadas del fondo."""
+            nonlocal sitios_totales
+            if args.window:
+                return procesar_ventanas(
+                    lote, genoma, args.outdir, args.window, args.one_hot,
+                    estadisticas, args.circular)
+            if completados:
+                lote = {tf: r for tf, r in lote.items()
+                        if tf not in completados}
+                if not lote:
+                    return []
+            # Picos ya escritos por TF, para numerar los sitios como los
+            # registros FASTA
+            previos = {tf: contadores.get(tf, 0) for tf in lote}
+            if args.peak_stats and not composicion:
+                composicion["picos"] = EstadisticasPicos(genoma)
+            por_pico = composicion.get("picos")
+            if paralelo:
+                # Los trabajadores devuelven las secuencias solo si se
+                # buscan motivos o se cuentan k-mers
+                secuencias = {} if motivos or kmers else None
+                archivos = extraccion.extraer_y_escribir(
+                    lote, genoma, contadores, estadisticas, tabla,
+                    secuencias)
+                if por_pico is not None:
+                    for tf, rangos in lote.items():
+                        por_pico.agregar(tf, rangos, args.circular)
+            else:
+                secuencias = extraer_secuencias(lote, genoma, estadisticas,
+                                                args.circular, por_pico,
+                                                tabla)
+                archivos = escribir_fasta(
+                    secuencias, args.outdir, args.line_length, contadores)
+            if motivos:
+                with cronometrar(duraciones, "motivos"):
+                    sitios_totales += escribir_sitios(
+                        escanear_motivos(secuencias, *motivos,
+                                         args.motif_threshold, previos),
+                        ruta_sitios, anexar=True)
+            if fondo:
+                for tf, rangos in lote.items():
+                    coordenadas_fondo.setdefault(tf, []).extend(rangos)
+            if kmers:
+                with cronometrar(duraciones, "kmers"):
+                    acumular_kmers(conteos_kmers, secuencias, kmers,
+                                   args.canonical)
+            if not chunksize:
+                # Cada TF llega en un solo lote: ya está terminado
+                registrar_completados(args.outdir, lote, contadores)
+            return archivos
+
+        def cargar():
+            """1. Cargar genoma."""
+            genoma_cargado["genoma"] = abrir_genoma(args.genome)
+            return genoma_cargado["genoma"]
+
+        # 1. Cargar genoma en paralelo con la lectura de picos
+        try:
+            archivos, tiempos = ejecutar_concurrente(
+                cargar, producir, consumir,
+                concurrente=not args.secuencial, duraciones=duraciones)
+        finally:
+            if extraccion is not None:
+                extraccion.cerrar()
+            reporte.detener()
+            # Los motivos y k-mers de cada lote se midieron dentro del
+            # consumo: se descuentan para que las etapas no se solapen
+            if "extraccion" in duraciones:
+                duraciones["extraccion"] -= (duraciones.get("motivos", 0.0)
+                                             + duraciones.get("kmers", 0.0))
+
+        if chunksize and not args.window:
+            # Por bloques, un TF solo está terminado al agotar el TSV
+            registrar_completados(args.outdir, contadores, contadores)
+
+        if conteos_kmers:
+            with cronometrar(duraciones, "kmers"):
+                archivos += escribir_kmers(
+                    conteos_kmers, genoma_cargado["genoma"], args.outdir,
+                    args.canonical, args.top_kmers)
+        if composicion:
+            with cronometrar(duraciones, "estadisticas"):
+                archivos += composicion["picos"].escribir(args.outdir,
+                                                          args.peak_stats)
+        if tabla is not None:
+            with cronometrar(duraciones, "tabla"):
+                archivos += tabla.cerrar()
+        if coordenadas_fondo:
+            with cronometrar(duraciones, "fondo"):
+                archivos += escribir_fondo(
+                    coordenadas_fondo, genoma_cargado["genoma"],
+                    args.outdir, args.line_length, fondo, args.gc_bins,
+                    args.seed, args.circular)
+
+        logger.info(
+            "Extracción completada: totales=%d, válidos=%d, inválidos=%d",
+            estadisticas.get('sec_totales', 0),
+            estadisticas.get('sec_validos', 0),
+            estadisticas.get('sec_invalidos', 0))
+        logger.info(
+            "Tiempos (s desde el inicio): genoma=%.2f, picos=%.2f, "
+            "primer archivo=%.2f, total=%.2f",
+            tiempos.get('genoma', 0.0), tiempos.get('picos', 0.0),
+            tiempos.get('primer_archivo', 0.0), tiempos.get('total', 0.0))
+        logger.info("Duración por etapa (s): %s", ", ".join(
+            f"{etapa}={segundos:.2f}"
+            for etapa, segundos in duraciones.items()))
+        if motivos:
+            logger.info("Sitios de motivos: %d (%s)", sitios_totales,
+                        ruta_sitios)
         logger.info(f"Proceso completado. Archivos generados: {len(archivos)}")
+        logger.info("Memoria máxima (RSS): %.1f MB", memoria_maxima() / 2**20)
 
     except Exception as e:
         logger.exception("Error durante la ejecución")
+        if escritor is not None:
+            try:
+                escritor.escribir_final(False, tiempos, lectura,
+                                        estadisticas, duraciones)
+            except RuntimeError:
+                pass
         exit(1)
+    finally:
+        if isinstance(genoma_cargado.get("genoma"), GenomaBGZF):
+            genoma_cargado["genoma"].cerrar()
+
+    # Los archivos ya están escritos: un fallo al publicar las métricas
+    # finales no convierte la ejecución en fallida
+    if escritor is not None:
+        try:
+            escritor.escribir_final(True, tiempos, lectura, estadisticas,
+                                    duraciones)
+        except RuntimeError as e:
+            logger.warning("No se publicaron las métricas finales: %s", e)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
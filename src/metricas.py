@@ -0,0 +1,249 @@
+"""
+Exportación de métricas de la ejecución en el formato de texto de
+Prometheus, para el recolector `textfile` de node_exporter.
+
+El archivo se reescribe de forma atómica (temporal y `os.replace`), de
+modo que el recolector nunca lee un archivo a medias: periódicamente
+durante la ejecución, con los contadores de avance de `progreso`, y al
+terminar, con la duración de cada etapa y el momento en que terminó,
+las filas leídas y rechazadas, los picos extraídos, los bytes escritos
+y el RSS máximo. No requiere red ni dependencias externas.
+
+Contiene:
+
+  - formatear_metricas(metricas) -> str
+    ------------------------------------------------------------
+    Texto de exposición de Prometheus (# HELP, # TYPE y muestras).
+
+  - escribir_metricas(ruta, metricas) -> None
+    ------------------------------------------------------------
+    Escribe el texto de forma atómica.
+
+  - EscritorMetricas(ruta, reporte, intervalo=60.0)
+    ------------------------------------------------------------
+    Escritura periódica en un hilo y final con los resultados:
+    iniciar(), detener(), escribir_final(...).
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import os
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .pipeline import memoria_maxima
+except ImportError:
+    from pipeline import memoria_maxima
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Prefijo común de los nombres de métrica
+PREFIJO = "extraccion_fasta"
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+# (nombre sin prefijo, ayuda, etiquetas, valor); todas son gauges
+Metrica = Tuple[str, str, Dict[str, str], float]
+
+def _escapar(valor: str) -> str:
+    """Escapa un valor de etiqueta según el formato de exposición."""
+    return (valor.replace("\\", "\\\\").replace("\"", "\\\"")
+            .replace("\n", "\\n"))
+
+
+def formatear_metricas(metricas: List[Metrica]) -> str:
+    """
+    Texto de exposición de Prometheus; las muestras de una misma métrica
+    (distintas etiquetas) comparten sus líneas HELP y TYPE.
+
+    Args:
+        metricas (List[Metrica]): (nombre, ayuda, etiquetas, valor).
+
+    Returns:
+        str: Texto terminado en salto de línea.
+    """
+    lineas: List[str] = []
+    vistas = set()
+    for nombre, ayuda, etiquetas, valor in metricas:
+        completo = f"{PREFIJO}_{nombre}"
+        if completo not in vistas:
+            vistas.add(completo)
+            lineas.append(f"# HELP {completo} {ayuda}")
+            lineas.append(f"# TYPE {completo} gauge")
+        if etiquetas:
+            completo += "{" + ",".join(
+                f'{clave}="{_escapar(str(v))}"'
+                for clave, v in etiquetas.items()) + "}"
+        valor = float(valor)
+        texto = str(int(valor)) if valor.is_integer() else repr(valor)
+        lineas.append(f"{completo} {texto}")
+    return "\n".join(lineas) + "\n"
+
+
+def escribir_metricas(ruta: str, metricas: List[Metrica]) -> None:
+    """
+    Escribe las métricas en `ruta` de forma atómica.
+
+    Args:
+        ruta (str): Archivo de salida (p. ej. `<dir_textfile>/extraccion.prom`).
+        metricas (List[Metrica]): Métricas a escribir.
+
+    Raises:
+        RuntimeError: Si no se puede escribir el archivo.
+    """
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with open(temporal, mode="w", encoding="utf-8") as arch:
+            arch.write(formatear_metricas(metricas))
+        os.replace(temporal, ruta)
+    except OSError as e:
+        msg = f"No se pudieron escribir las métricas en '{ruta}': {e}"
+        logger.error(msg)
+        raise RuntimeError(msg)
+
+# =============================================================================
+# CLASES
+# =============================================================================
+
+class EscritorMetricas:
+    """
+    Escribe las métricas cada `intervalo` segundos mientras la ejecución
+    está en curso y una última vez al terminar.
+
+    Args:
+        ruta (str): Archivo .prom de salida.
+        reporte: Reporte de avance (`progreso.Progreso`) cuyos contadores
+            se publican.
+        intervalo (float): Segundos entre escrituras periódicas (0 las
+            desactiva; solo se escribe al final).
+    """
+
+    def __init__(self, ruta: str, reporte, intervalo: float = 60.0):
+        self.ruta = ruta
+        self.reporte = reporte
+        self.intervalo = intervalo
+        self._inicio = time.perf_counter()
+        self._parar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self) -> "EscritorMetricas":
+        """Arranca la escritura periódica."""
+        self._inicio = time.perf_counter()
+        if self.intervalo > 0:
+            self._hilo = threading.Thread(target=self._periodico,
+                                          name="metricas", daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self) -> None:
+        """Detiene la escritura periódica."""
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+
+    def _periodico(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                escribir_metricas(self.ruta, self._comunes(en_curso=True))
+            except RuntimeError:
+                # Ya registrado; la ejecución no se interrumpe por esto
+                pass
+
+    def _comunes(self, en_curso: bool) -> List[Metrica]:
+        """Métricas disponibles en cualquier momento de la ejecución."""
+        contadores = self.reporte.contadores
+        return [
+            ("en_curso", "1 mientras la ejecución está en curso.", {},
+             int(en_curso)),
+            ("transcurrido_segundos", "Segundos desde el inicio.", {},
+             round(time.perf_counter() - self._inicio, 3)),
+            ("filas_leidas", "Filas del TSV de picos leídas.", {},
+             contadores["filas"]),
+            ("picos_procesados", "Picos procesados por la extracción.", {},
+             contadores["picos"]),
+            ("bytes_escritos", "Bytes escritos en los FASTA.", {},
+             contadores["bytes"]),
+            ("rss_maximo_bytes", "RSS máximo del proceso en bytes.", {},
+             memoria_maxima()),
+            ("actualizacion_timestamp_segundos",
+             "Hora Unix de la última escritura del archivo.", {},
+             round(time.time(), 3)),
+        ]
+
+    def escribir_final(
+            self,
+            exito: bool,
+            tiempos: Optional[Dict[str, float]] = None,
+            lectura: Optional[dict] = None,
+            extraccion: Optional[dict] = None,
+            duraciones: Optional[Dict[str, float]] = None
+        ) -> None:
+        """
+        Escribe las métricas finales de la ejecución.
+
+        Args:
+            exito (bool): Si la ejecución terminó sin errores.
+            tiempos (Optional[Dict[str, float]]): Tiempos de
+                `ejecutar_concurrente` ('genoma' es el tiempo de carga
+                del genoma).
+            lectura (Optional[dict]): Estadísticas de la lectura de picos.
+            extraccion (Optional[dict]): Estadísticas de
+                `extraer_secuencias`.
+            duraciones (Optional[Dict[str, float]]): Segundos de trabajo
+                de cada etapa (ver `pipeline.cronometrar`).
+        """
+        self.detener()
+        metricas = self._comunes(en_curso=False)
+        metricas.append(("exito", "1 si la ejecución terminó sin errores.",
+                         {}, int(exito)))
+        for etapa, segundos in (duraciones or {}).items():
+            metricas.append((
+                "etapa_duracion_segundos",
+                "Segundos de trabajo de cada etapa.",
+                {"etapa": etapa}, round(segundos, 3)))
+        for etapa, segundos in (tiempos or {}).items():
+            metricas.append((
+                "etapa_fin_segundos",
+                "Segundos desde el inicio hasta el fin de cada etapa.",
+                {"etapa": etapa}, round(segundos, 3)))
+        lectura = lectura or {}
+        for clave, nombre, ayuda in (
+                ("picos_totales", "filas_totales",
+                 "Filas de picos procesadas."),
+                ("picos_validos", "filas_validas", "Filas de picos válidas."),
+                ("picos_invalidos", "filas_rechazadas",
+                 "Filas de picos rechazadas por la validación."),
+                ("picos_filtrados", "filas_filtradas",
+                 "Filas de picos omitidas por los filtros.")):
+            if clave in lectura:
+                metricas.append((nombre, ayuda, {}, lectura[clave]))
+        extraccion = extraccion or {}
+        if "sec_validos" in extraccion:
+            metricas.append(("picos_extraidos", "Secuencias extraídas.", {},
+                             extraccion["sec_validos"]))
+            metricas.append(("picos_fuera_de_rango",
+                             "Picos con coordenadas fuera del genoma.", {},
+                             extraccion["sec_invalidos"]))
+        escribir_metricas(self.ruta, metricas)
+        logger.info("Métricas escritas en '%s'", self.ruta)
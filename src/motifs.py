@@ -0,0 +1,419 @@
+"""
+Búsqueda de motivos en las secuencias de picos de cada TF.
+
+Escanea, en ambas hebras, las secuencias producidas por
+`extraer_secuencias` con dos tipos de motivos:
+
+  * Consensos IUPAC: todos se buscan a la vez con un autómata
+    multi-patrón Shift-And, cuyo estado es un entero de bits con una
+    posición por base de cada patrón. Las clases IUPAC (R, Y, N, ...) se
+    codifican directamente en las máscaras de cada base, sin expandir el
+    consenso. La secuencia se recorre una sola vez para todos los
+    motivos, pero cada base opera sobre el estado completo, así que su
+    costo crece con la suma de las longitudes de los consensos (dos veces,
+    por los reversos complementarios) en palabras de máquina.
+  * Matrices de posición (PWM): se puntúan con NumPy sumando, columna a
+    columna del motivo, la matriz log-odds indexada por las bases
+    desplazadas, sobre todas las secuencias de un TF concatenadas.
+
+Los sitios encontrados se escriben en un TSV con una fila por sitio.
+
+Contiene:
+
+  - leer_motivos(ruta) -> (consensos, pwms)
+    ------------------------------------------------------------
+    Lee un archivo con líneas `nombre<TAB>CONSENSO` y bloques de PWM en
+    formato JASPAR (`>id nombre` seguido de las filas A, C, G y T).
+
+  - AutomataIUPAC(consensos)
+    ------------------------------------------------------------
+    Autómata Shift-And con los consensos y sus reversos complementarios.
+
+  - escanear_motivos(tf_secuencias, consensos, pwms, umbral=0.8, ...)
+      -> List[tuple]
+    ------------------------------------------------------------
+    Sitios (TF, pico, motivo, hebra, inicio, fin, puntuación, secuencia)
+    de todos los TF.
+
+  - escribir_sitios(sitios, ruta, anexar=False) -> int
+    ------------------------------------------------------------
+    Escribe (o añade) los sitios al TSV de resultados.
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+from __future__ import annotations
+
+import os
+import re
+import logging
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+# numpy se importa dentro de las funciones (arranque rápido)
+if TYPE_CHECKING:
+    import numpy as np
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Bases de la secuencia que acepta cada código IUPAC del motivo; N del
+# motivo acepta también N de la secuencia
+IUPAC = {
+    "A": "A", "C": "C", "G": "G", "T": "T",
+    "R": "AG", "Y": "CT", "S": "CG", "W": "AT", "K": "GT", "M": "AC",
+    "B": "CGT", "D": "AGT", "H": "ACT", "V": "ACG", "N": "ACGTN",
+}
+
+# Complemento de los códigos IUPAC
+_COMPLEMENTO_IUPAC = str.maketrans("ACGTRYSWKMBDHVN", "TGCAYRSWMKVHDBN")
+
+# Orden de las filas de una PWM y código de las bases para NumPy
+BASES_PWM = "ACGT"
+
+# Pseudoconteo añadido a cada probabilidad de la PWM (evita log(0))
+PSEUDOCONTEO = 0.01
+
+# Columnas del TSV de sitios
+COLUMNAS_SITIOS = ["TF", "pico", "motivo", "hebra", "inicio", "fin",
+                   "puntuacion", "secuencia"]
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+Sitio = Tuple[str, int, str, str, int, int, Optional[float], str]
+
+def leer_motivos(ruta: str) -> Tuple[List[Tuple[str, str]],
+                                     List[Tuple[str, np.ndarray]]]:
+    """
+    Lee un archivo de motivos.
+
+    Formato:
+      * `nombre<espacio o TAB>CONSENSO`: motivo de consenso IUPAC.
+      * `>id [nombre]` seguido de cuatro filas A, C, G y T: PWM en
+        formato JASPAR, con conteos o probabilidades (los corchetes y
+        la letra inicial de cada fila son opcionales).
+      * Las líneas vacías y las que empiezan con `#` se ignoran.
+
+    Args:
+        ruta (str): Ruta al archivo de motivos.
+
+    Returns:
+        Tuple: (consensos, pwms), con consensos como lista de
+            (nombre, consenso) y pwms como lista de (nombre, matriz
+            log-odds de forma (longitud, 4) en el orden A, C, G, T).
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe.
+        ValueError: Si un consenso o una PWM no son válidos o no hay
+            motivos.
+    """
+    import numpy as np
+
+    if not os.path.isfile(ruta):
+        msg = f"Archivo de motivos no encontrado: {ruta}"
+        logger.error(msg)
+        raise FileNotFoundError(msg)
+
+    def _error(num_linea: int, detalle: str) -> ValueError:
+        msg = f"Motivo inválido en '{ruta}' (línea {num_linea}): {detalle}"
+        logger.error(msg)
+        return ValueError(msg)
+
+    consensos: List[Tuple[str, str]] = []
+    pwms: List[Tuple[str, np.ndarray]] = []
+    with open(ruta, mode="r", encoding="utf-8") as arch:
+        lineas = [(i, l.strip()) for i, l in enumerate(arch, 1)
+                  if l.strip() and not l.lstrip().startswith("#")]
+
+    i = 0
+    while i < len(lineas):
+        num_linea, linea = lineas[i]
+        if linea.startswith(">"):
+            campos = linea[1:].split()
+            nombre = campos[-1] if campos else f"pwm_{len(pwms) + 1}"
+            filas = lineas[i + 1:i + 5]
+            if len(filas) < 4:
+                raise _error(num_linea, "la PWM necesita 4 filas")
+            try:
+                conteos = np.array(
+                    [[float(v) for v in re.sub(r"^[ACGT]\s*|[\[\]]", "",
+                                               fila).split()]
+                     for _, fila in filas], dtype="float64")
+            except ValueError as e:
+                raise _error(num_linea, str(e))
+            if (conteos.shape[1] == 0 or (conteos < 0).any()
+                    or (conteos.sum(axis=0) <= 0).any()):
+                raise _error(num_linea, "conteos no válidos")
+            pwms.append((nombre, _log_odds(conteos)))
+            i += 5
+            continue
+        campos = linea.split()
+        if len(campos) != 2:
+            raise _error(num_linea, "se esperaba 'nombre CONSENSO'")
+        consenso = campos[1].upper()
+        if not consenso or set(consenso) - set(IUPAC):
+            raise _error(num_linea, f"consenso no IUPAC '{campos[1]}'")
+        consensos.append((campos[0], consenso))
+        i += 1
+
+    if not consensos and not pwms:
+        msg = f"No hay motivos en '{ruta}'"
+        logger.error(msg)
+        raise ValueError(msg)
+    logger.info("Motivos cargados: %d consensos, %d PWM",
+                len(consensos), len(pwms))
+    return consensos, pwms
+
+
+def _log_odds(conteos: np.ndarray) -> np.ndarray:
+    """
+    Convierte conteos (4, longitud) en una matriz log2-odds (longitud, 4)
+    frente a un fondo uniforme.
+    """
+    import numpy as np
+
+    probabilidades = conteos / conteos.sum(axis=0)
+    probabilidades = (probabilidades + PSEUDOCONTEO) / (1 + 4 * PSEUDOCONTEO)
+    return np.log2(probabilidades / 0.25).T.copy()
+
+
+def reverso_complementario_iupac(consenso: str) -> str:
+    """Reverso complementario de un consenso IUPAC."""
+    return consenso.translate(_COMPLEMENTO_IUPAC)[::-1]
+
+
+class AutomataIUPAC:
+    """
+    Autómata Shift-And multi-patrón para consensos IUPAC.
+
+    Cada consenso y su reverso complementario ocupan un tramo de bits
+    del estado. Al leer una base, el estado se desplaza un bit, se
+    activan los inicios de todos los patrones y se conserva solo lo que
+    la máscara de la base permite; un bit final activo indica un sitio
+    que termina en esa base. El estado es un entero de Python de tantos
+    bits como bases suman los patrones: con pocos motivos cabe en una
+    palabra, y con muchos cada paso cuesta proporcional a su tamaño.
+
+    Args:
+        consensos (List[Tuple[str, str]]): (nombre, consenso IUPAC).
+    """
+
+    def __init__(self, consensos: List[Tuple[str, str]]):
+        # Patrones: (nombre, hebra, longitud)
+        self.patrones: List[Tuple[str, str, int]] = []
+        self.mascaras: Dict[str, int] = {b: 0 for b in "ACGTN"}
+        self.inicios = 0
+        self.finales = 0
+        self._final_a_patron: Dict[int, int] = {}
+
+        bit = 0
+        for nombre, consenso in consensos:
+            for hebra, patron in (("+", consenso),
+                                  ("-", reverso_complementario_iupac(
+                                      consenso))):
+                for j, codigo in enumerate(patron):
+                    for base in IUPAC[codigo]:
+                        self.mascaras[base] |= 1 << (bit + j)
+                self.inicios |= 1 << bit
+                final = bit + len(patron) - 1
+                self.finales |= 1 << final
+                self._final_a_patron[final] = len(self.patrones)
+                self.patrones.append((nombre, hebra, len(patron)))
+                bit += len(patron)
+
+    def buscar(self, secuencia: str) -> Iterator[Tuple[int, int]]:
+        """
+        Recorre la secuencia una vez y produce (índice de patrón, inicio)
+        de cada sitio, en orden de posición final.
+        """
+        mascaras = self.mascaras
+        inicios, finales = self.inicios, self.finales
+        estado = 0
+        for i, base in enumerate(secuencia):
+            estado = ((estado << 1) | inicios) & mascaras.get(base, 0)
+            if estado & finales:
+                coincidencias = estado & finales
+                while coincidencias:
+                    bajo = coincidencias & -coincidencias
+                    patron = self._final_a_patron[bajo.bit_length() - 1]
+                    yield patron, i - self.patrones[patron][2] + 1
+                    coincidencias ^= bajo
+
+
+def _codificar(secuencias: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Concatena las secuencias separadas por una N y las codifica como
+    A=0, C=1, G=2, T=3 y 4 para cualquier otra base. Devuelve los códigos
+    y el inicio de cada secuencia en ellos.
+    """
+    import numpy as np
+
+    tabla = np.full(256, 4, dtype=np.uint8)
+    for codigo, base in enumerate(BASES_PWM):
+        tabla[ord(base)] = tabla[ord(base.lower())] = codigo
+    texto = "N".join(secuencias).encode("ascii")
+    codigos = tabla[np.frombuffer(texto, dtype=np.uint8)]
+    longitudes = np.fromiter((len(s) + 1 for s in secuencias),
+                             dtype=np.int64, count=len(secuencias))
+    inicios = np.concatenate(([0], np.cumsum(longitudes)[:-1]))
+    return codigos, inicios
+
+
+def _puntuar_pwm(codigos: np.ndarray, matriz: np.ndarray) -> np.ndarray:
+    """
+    Puntuación de la PWM en cada posición inicial de `codigos`. Las
+    ventanas con una base distinta de A, C, G o T (incluido el separador
+    entre secuencias) reciben -inf.
+    """
+    import numpy as np
+
+    longitud = len(matriz)
+    n = len(codigos) - longitud + 1
+    if n <= 0:
+        return np.empty(0)
+    extendida = np.hstack([matriz, np.full((longitud, 1), -np.inf)])
+    puntos = np.zeros(n)
+    for j in range(longitud):
+        puntos += extendida[j][codigos[j:j + n]]
+    return puntos
+
+
+def escanear_motivos(
+        tf_secuencias: Dict[str, List[str]],
+        consensos: List[Tuple[str, str]],
+        pwms: List[Tuple[str, np.ndarray]],
+        umbral: float = 0.8,
+        desplazamientos: Optional[Dict[str, int]] = None
+    ) -> List[Sitio]:
+    """
+    Busca los motivos en ambas hebras de las secuencias de cada TF.
+
+    Args:
+        tf_secuencias (Dict[str, List[str]]): Secuencias por TF, como las
+            devuelve `extraer_secuencias`.
+        consensos (List[Tuple[str, str]]): Consensos IUPAC.
+        pwms (List[Tuple[str, np.ndarray]]): PWM log-odds (longitud, 4).
+        umbral (float): Puntuación relativa mínima de una PWM, entre 0
+            (mínima posible) y 1 (máxima posible).
+        desplazamientos (Optional[Dict[str, int]]): Picos ya escritos por
+            TF, para numerar los picos igual que en los FASTA cuando se
+            procesa por lotes.
+
+    Returns:
+        List[Sitio]: (TF, pico, motivo, hebra, inicio, fin, puntuación,
+            secuencia); `pico` empieza en 1 como en `>TF_pico_<n>`,
+            inicio y fin son 0-based y relativos al pico, la puntuación
+            es None en los consensos y la secuencia es la del sitio en
+            la hebra del motivo.
+
+    Raises:
+        ValueError: Si `umbral` no está entre 0 y 1.
+    """
+    import numpy as np
+
+    if not 0 <= umbral <= 1:
+        msg = f"El umbral de las PWM debe estar entre 0 y 1: {umbral}"
+        logger.error(msg)
+        raise ValueError(msg)
+    desplazamientos = desplazamientos or {}
+    automata = AutomataIUPAC(consensos) if consensos else None
+    minimos = [float(m.min(axis=1).sum()) for _, m in pwms]
+    maximos = [float(m.max(axis=1).sum()) for _, m in pwms]
+
+    sitios: List[Sitio] = []
+    for tf, secuencias in tf_secuencias.items():
+        if not secuencias:
+            continue
+        previos = desplazamientos.get(tf, 0)
+        encontrados: List[Sitio] = []
+
+        if automata is not None:
+            for numero, secuencia in enumerate(secuencias, start=1):
+                for patron, inicio in automata.buscar(secuencia):
+                    nombre, hebra, longitud = automata.patrones[patron]
+                    sitio = secuencia[inicio:inicio + longitud]
+                    if hebra == "-":
+                        sitio = reverso_complementario_iupac(sitio)
+                    encontrados.append((
+                        tf, previos + numero, nombre, hebra, inicio,
+                        inicio + longitud, None, sitio))
+
+        if pwms:
+            codigos, inicios = _codificar(secuencias)
+            for (nombre, matriz), minimo, maximo in zip(pwms, minimos,
+                                                        maximos):
+                corte = minimo + umbral * (maximo - minimo)
+                longitud = len(matriz)
+                # La matriz de la hebra - invierte posiciones y bases
+                for hebra, m in (("+", matriz), ("-", matriz[::-1, ::-1])):
+                    puntos = _puntuar_pwm(codigos, m)
+                    posiciones = np.flatnonzero(puntos >= corte - 1e-9)
+                    indices = np.searchsorted(inicios, posiciones,
+                                              side="right") - 1
+                    for pos, idx in zip(posiciones.tolist(),
+                                        indices.tolist()):
+                        inicio = pos - int(inicios[idx])
+                        sitio = secuencias[idx][inicio:inicio + longitud]
+                        if hebra == "-":
+                            sitio = reverso_complementario_iupac(sitio)
+                        encontrados.append((
+                            tf, previos + idx + 1, nombre, hebra, inicio,
+                            inicio + longitud, round(float(puntos[pos]), 3),
+                            sitio))
+
+        encontrados.sort(key=lambda s: (s[1], s[4], s[2], s[3]))
+        logger.debug("%s: %d sitios de motivos", tf, len(encontrados))
+        sitios.extend(encontrados)
+    return sitios
+
+
+def escribir_sitios(
+        sitios: List[Sitio],
+        ruta: str,
+        anexar: bool = False
+    ) -> int:
+    """
+    Escribe los sitios en un TSV con las columnas `COLUMNAS_SITIOS`.
+
+    Args:
+        sitios (List[Sitio]): Resultado de `escanear_motivos`.
+        ruta (str): TSV de salida; su directorio se crea si no existe.
+        anexar (bool): Añadir al final de un TSV ya iniciado en lugar de
+            crearlo con cabecera (procesamiento por lotes).
+
+    Returns:
+        int: Número de sitios escritos.
+
+    Raises:
+        RuntimeError: Si no se puede escribir el archivo.
+    """
+    lineas = [] if anexar else ["\t".join(COLUMNAS_SITIOS)]
+    lineas.extend(
+        "\t".join("" if v is None else str(v) for v in sitio)
+        for sitio in sitios)
+    try:
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with open(ruta, mode="a" if anexar else "w",
+                  encoding="utf-8") as arch:
+            if lineas:
+                arch.write("\n".join(lineas) + "\n")
+    except OSError as e:
+        msg = f"No se pudo escribir '{ruta}': {e}"
+        logger.error(msg)
+        raise RuntimeError(msg)
+    return len(sitios)
@@ -0,0 +1,645 @@
+"""
+Extracción y escritura en paralelo con un pool de procesos.
+
+El genoma se publica una sola vez como un archivo mapeado en memoria
+(en /dev/shm cuando existe), de modo que los trabajadores lo leen desde
+páginas compartidas del sistema operativo en lugar de recibir una copia
+serializada de la cadena. Los TF se reparten entre los trabajadores
+equilibrando el total de bases a extraer y cada trabajador escribe sus
+FASTA directamente en disco.
+
+Contiene:
+
+  - particionar_tfs(tf_coordenadas, partes) -> List[List[str]]
+    ------------------------------------------------------------
+    Reparte los TF en `partes` grupos con un total de bases similar
+    (heurística LPT: el TF más grande va al grupo más ligero).
+
+  - lectura_peaks_paralela(peaks_path, procesos, parser, estadisticas)
+    ------------------------------------------------------------
+    Equivalente a `lectura_peaks`: divide el TSV en rangos de bytes
+    alineados a fin de línea, cada trabajador lee y valida su rango y
+    los resultados se combinan en orden, con números de fila y
+    estadísticas idénticos a la lectura secuencial.
+
+  - PoolExtraccion(procesos, output_dir, chars_por_linea, circular)
+    ------------------------------------------------------------
+    Pool de trabajadores y genoma publicado que se crean con el primer
+    lote y se reutilizan en toda la ejecución:
+      * extraer_y_escribir(tf_coordenadas, genoma, ...) -> List[str]
+      * cerrar() -> None
+
+  - extraer_y_escribir_paralelo(tf_coordenadas, genoma, output_dir,
+                                chars_por_linea, procesos, ...)
+    ------------------------------------------------------------
+    Equivalente a `escribir_fasta(extraer_secuencias(...))` usando
+    `procesos` trabajadores, para un solo lote.
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import io
+import os
+import re
+import mmap
+import heapq
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from . import peaks
+    from . import progreso
+    from .peaks import extraer_secuencias
+    from .io_utils import escribir_fasta
+    from .compresion import es_gzip
+except ImportError:
+    import peaks
+    import progreso
+    from peaks import extraer_secuencias
+    from io_utils import escribir_fasta
+    from compresion import es_gzip
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+# Genoma mapeado en cada proceso trabajador
+_genoma_trabajador = None
+
+# Líneas formadas solo por espacios (líneas vacías del TSV)
+_LINEA_VACIA = re.compile(rb"^[ \t\r\f\v]*$", re.MULTILINE)
+
+
+class GenomaMapeado:
+    """
+    Vista de solo lectura de un genoma ASCII mapeado en memoria.
+
+    Expone `len()` y recorte por `slice`, que es todo lo que necesita
+    `extraer_secuencias`; cada recorte decodifica solo las bases pedidas.
+    """
+
+    def __init__(self, ruta: str):
+        with open(ruta, mode="rb") as arch:
+            if os.fstat(arch.fileno()).st_size == 0:
+                # mmap no admite archivos vacíos
+                self._mapa = b""
+                return
+            self._mapa = mmap.mmap(arch.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self._mapa)
+
+    def __getitem__(self, rango: slice) -> str:
+        return self._mapa[rango].decode("ascii")
+
+    def cerrar(self) -> None:
+        """Libera el mapeo."""
+        if isinstance(self._mapa, mmap.mmap):
+            self._mapa.close()
+
+
+def _publicar_genoma(genoma: str) -> str:
+    """
+    Escribe el genoma como bytes ASCII en un archivo temporal (en
+    /dev/shm si existe) y devuelve su ruta. Una vista indexada
+    (`GenomaBGZF`) se descomprime entera.
+    """
+    if not isinstance(genoma, str):
+        genoma = genoma[:]
+    datos = genoma.encode("ascii")
+    directorio = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    descriptor, ruta = tempfile.mkstemp(prefix="genoma_", suffix=".seq",
+                                        dir=directorio)
+    with os.fdopen(descriptor, mode="wb") as arch:
+        arch.write(datos)
+    return ruta
+
+
+def _inicializar_trabajador(ruta_genoma: str) -> None:
+    """Mapea el genoma publicado una vez por proceso trabajador."""
+    global _genoma_trabajador
+    _genoma_trabajador = GenomaMapeado(ruta_genoma)
+
+
+class _Extraidas(dict):
+    """
+    Rangos válidos y secuencias por TF; recibe los registros de
+    `extraer_secuencias` con la interfaz de `EscritorTabular.agregar`.
+    """
+
+    def agregar(self, tf: str, rangos: List[Tuple[int, int]],
+                secuencias: List[str]) -> None:
+        self[tf] = (rangos, secuencias)
+
+
+def _procesar_particion(
+        tf_coordenadas: Dict[str, List[Tuple[int, int]]],
+        output_dir: str,
+        chars_por_linea: int,
+        contadores: Dict[str, int],
+        circular: bool = False,
+        devolver: bool = False
+    ) -> Tuple[List[str], Dict[str, int], dict, int, Optional[dict]]:
+    """
+    Extrae y escribe, TF por TF, la partición asignada a un trabajador.
+    Devuelve también los bytes escritos, para el reporte de avance del
+    proceso principal, y, si `devolver`, los rangos válidos y las
+    secuencias de cada TF.
+    """
+    archivos: List[str] = []
+    estadisticas: dict = {}
+    escritos = 0
+    extraidas = _Extraidas() if devolver else None
+    for tf, rangos in tf_coordenadas.items():
+        ruta = os.path.join(output_dir, f"{tf}.fa")
+        antes = os.path.getsize(ruta) if contadores.get(tf) else 0
+        secuencias = extraer_secuencias({tf: rangos}, _genoma_trabajador,
+                                        estadisticas, circular,
+                                        tabla=extraidas)
+        if escribir_fasta(secuencias, output_dir, chars_por_linea,
+                          contadores):
+            archivos.append(ruta)
+            escritos += os.path.getsize(ruta) - antes
+        del secuencias
+    return (archivos, contadores, estadisticas, escritos,
+            dict(extraidas) if devolver else None)
+
+
+def particionar_tfs(
+        tf_coordenadas: Dict[str, List[Tuple[int, int]]],
+        partes: int
+    ) -> List[List[str]]:
+    """
+    Reparte los TF en grupos con un total de bases equilibrado.
+
+    Args:
+        tf_coordenadas (Dict[str, List[Tuple[int, int]]]):
+            Coordenadas agrupadas por TF.
+        partes (int): Número de grupos.
+
+    Returns:
+        List[List[str]]: Nombres de TF de cada grupo; se omiten los
+            grupos vacíos.
+    """
+    pesos = sorted(
+        ((sum(rango[1] - rango[0] for rango in rangos), tf)
+         for tf, rangos in tf_coordenadas.items()),
+        reverse=True)
+    grupos: List[List[str]] = [[] for _ in range(max(partes, 1))]
+    monticulo = [(0, i) for i in range(len(grupos))]
+    for peso, tf in pesos:
+        carga, i = heapq.heappop(monticulo)
+        grupos[i].append(tf)
+        heapq.heappush(monticulo, (carga + peso, i))
+    return [g for g in grupos if g]
+
+
+class PoolExtraccion:
+    """
+    Pool de procesos y genoma publicado compartidos por todos los lotes
+    de una ejecución.
+
+    El genoma se publica y el pool se crea con el primer lote (el genoma
+    puede cargarse mientras se leen los picos) y ambos se reutilizan en
+    los lotes siguientes; `cerrar` termina los trabajadores y borra el
+    genoma publicado. Admite el uso como gestor de contexto.
+
+    Args:
+        procesos (Optional[int]): Número de trabajadores; por defecto,
+            el número de CPUs.
+        output_dir (str): Directorio de salida de los FASTA.
+        chars_por_linea (int): Caracteres por línea en los FASTA.
+        circular (bool): Extraer los rangos que cruzan el origen de un
+            genoma circular (ver `extraer_secuencias`).
+    """
+
+    def __init__(self, procesos: Optional[int] = None,
+                 output_dir: str = "TF_picos_fasta",
+                 chars_por_linea: int = 80, circular: bool = False):
+        self.procesos = procesos or os.cpu_count() or 1
+        self.output_dir = output_dir
+        self.chars_por_linea = chars_por_linea
+        self.circular = circular
+        self._genoma = None
+        self._ruta_genoma: Optional[str] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _iniciar(self, genoma: str) -> ProcessPoolExecutor:
+        """Publica el genoma y crea el pool si aún no existen."""
+        if self._pool is not None and genoma is self._genoma:
+            return self._pool
+        self.cerrar()
+        try:
+            self._ruta_genoma = _publicar_genoma(genoma)
+        except UnicodeEncodeError as e:
+            msg = f"El genoma contiene caracteres no ASCII: {e}"
+            logger.error(msg)
+            raise ValueError(msg)
+        self._genoma = genoma
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.procesos,
+            initializer=_inicializar_trabajador,
+            initargs=(self._ruta_genoma,))
+        logger.debug("Genoma publicado en '%s' para %d procesos",
+                     self._ruta_genoma, self.procesos)
+        return self._pool
+
+    def extraer_y_escribir(
+            self,
+            tf_coordenadas: Dict[str, List[Tuple[int, int]]],
+            genoma: str,
+            contadores: Optional[Dict[str, int]] = None,
+            estadisticas: Optional[dict] = None,
+            tabla=None,
+            secuencias: Optional[Dict[str, List[str]]] = None
+        ) -> List[str]:
+        """
+        Extrae las secuencias de un lote y escribe un FASTA por TF,
+        repartiendo los TF entre los trabajadores del pool.
+
+        Con `tabla` o `secuencias`, los trabajadores devuelven además las
+        secuencias extraídas, que se pasan a la tabla y se reúnen en el
+        orden de los TF del lote, sin volver a extraerlas.
+
+        Args:
+            tf_coordenadas (Dict[str, List[Tuple[int, int]]]):
+                Coordenadas agrupadas por TF.
+            genoma (str): Secuencia completa del genoma; se publica solo
+                la primera vez.
+            contadores (Optional[Dict[str, int]]): Picos ya escritos por
+                TF, como en `escribir_fasta`; se actualiza en sitio.
+            estadisticas (Optional[dict]): Contadores de extracción que
+                se acumulan en sitio.
+            tabla (Optional[EscritorTabular]): Si se proporciona, recibe
+                los registros de los picos válidos, como en
+                `extraer_secuencias`.
+            secuencias (Optional[Dict[str, List[str]]]): Si se
+                proporciona, se rellena en sitio con las secuencias de
+                cada TF, como las devuelve `extraer_secuencias`.
+
+        Returns:
+            List[str]: Rutas de los archivos FASTA generados.
+
+        Raises:
+            RuntimeError: Si no se puede crear el directorio de salida.
+            ValueError: Si el genoma contiene caracteres no ASCII.
+        """
+        if not tf_coordenadas:
+            return []
+        devolver = tabla is not None or secuencias is not None
+        if contadores is None:
+            contadores = {}
+        if estadisticas is None:
+            estadisticas = {}
+
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+        except OSError as e:
+            msg = f"No se pudo crear el directorio '{self.output_dir}': {e}"
+            logger.error(msg)
+            raise RuntimeError(msg)
+
+        pool = self._iniciar(genoma)
+        grupos = particionar_tfs(tf_coordenadas, self.procesos)
+        futuros = [
+            pool.submit(
+                _procesar_particion,
+                {tf: tf_coordenadas[tf] for tf in grupo},
+                self.output_dir,
+                self.chars_por_linea,
+                {tf: contadores[tf] for tf in grupo if tf in contadores},
+                self.circular,
+                devolver)
+            for grupo in grupos
+        ]
+        archivos: List[str] = []
+        extraidas: dict = {}
+        # Recoger en orden de envío para un resultado determinista
+        for futuro in futuros:
+            rutas, cuentas, parciales, escritos, devueltas = futuro.result()
+            progreso.avanzar("picos", parciales.get("sec_totales", 0))
+            progreso.avanzar("bytes", escritos)
+            archivos.extend(rutas)
+            contadores.update(cuentas)
+            for clave, valor in parciales.items():
+                estadisticas[clave] = estadisticas.get(clave, 0) + valor
+            if devueltas:
+                extraidas.update(devueltas)
+
+        for tf in tf_coordenadas:
+            if tf not in extraidas:
+                continue
+            rangos, secuencias_tf = extraidas.pop(tf)
+            if tabla is not None:
+                tabla.agregar(tf, rangos, secuencias_tf)
+            if secuencias is not None:
+                secuencias[tf] = secuencias_tf
+        return archivos
+
+    def cerrar(self) -> None:
+        """Termina los trabajadores y borra el genoma publicado."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        if self._ruta_genoma is not None:
+            os.remove(self._ruta_genoma)
+            self._ruta_genoma = None
+        self._genoma = None
+
+    def __enter__(self) -> "PoolExtraccion":
+        return self
+
+    def __exit__(self, *excepcion) -> None:
+        self.cerrar()
+
+
+def extraer_y_escribir_paralelo(
+        tf_coordenadas: Dict[str, List[Tuple[int, int]]],
+        genoma: str,
+        output_dir: str = "TF_picos_fasta",
+        chars_por_linea: int = 80,
+        procesos: Optional[int] = None,
+        contadores: Optional[Dict[str, int]] = None,
+        estadisticas: Optional[dict] = None,
+        circular: bool = False
+    ) -> List[str]:
+    """
+    Extrae las secuencias y escribe un FASTA por TF usando un pool de
+    procesos que comparten el genoma mapeado en memoria.
+
+    Crea un `PoolExtraccion` para un solo lote; para varios lotes de una
+    misma ejecución conviene reutilizar uno.
+
+    Args:
+        tf_coordenadas (Dict[str, List[Tuple[int, int]]]):
+            Coordenadas agrupadas por TF.
+        genoma (str): Secuencia completa del genoma.
+        output_dir (str): Directorio de salida de los FASTA.
+        chars_por_linea (int): Caracteres por línea en los FASTA.
+        procesos (Optional[int]): Número de trabajadores; por defecto,
+            el número de CPUs.
+        contadores (Optional[Dict[str, int]]): Picos ya escritos por TF,
+            como en `escribir_fasta`; se actualiza en sitio.
+        estadisticas (Optional[dict]): Contadores de extracción que se
+            acumulan en sitio.
+        circular (bool): Extraer los rangos que cruzan el origen de un
+            genoma circular (ver `extraer_secuencias`).
+
+    Returns:
+        List[str]: Rutas de los archivos FASTA generados.
+
+    Raises:
+        RuntimeError: Si no se puede crear el directorio de salida.
+        ValueError: Si el genoma contiene caracteres no ASCII.
+    """
+    if not tf_coordenadas:
+        return []
+    procesos = min(procesos or os.cpu_count() or 1, len(tf_coordenadas))
+    with PoolExtraccion(procesos, output_dir, chars_por_linea,
+                        circular) as pool:
+        return pool.extraer_y_escribir(tf_coordenadas, genoma, contadores,
+                                       estadisticas)
+
+
+def _dividir_en_rangos(
+        peaks_path: str,
+        partes: int
+    ) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Devuelve la cabecera del TSV y `partes` rangos de bytes [inicio, fin)
+    de los datos, con cada límite desplazado al siguiente fin de línea.
+    """
+    tamano = os.path.getsize(peaks_path)
+    with open(peaks_path, mode="rb") as arch:
+        cabecera = arch.readline()
+        inicio_datos = arch.tell()
+        limites = [inicio_datos]
+        paso = max((tamano - inicio_datos) // max(partes, 1), 1)
+        for i in range(1, partes):
+            objetivo = inicio_datos + i * paso
+            if objetivo <= limites[-1] or objetivo >= tamano:
+                continue
+            arch.seek(objetivo - 1)
+            arch.readline()
+            if limites[-1] < arch.tell() < tamano:
+                limites.append(arch.tell())
+        limites.append(tamano)
+    rangos = [(a, b) for a, b in zip(limites, limites[1:]) if b > a]
+    return cabecera, rangos
+
+
+def _leer_rango(
+        peaks_path: str,
+        cabecera: bytes,
+        inicio: int,
+        fin: int,
+        parser: str,
+        circular: bool = False,
+        hebra: bool = False,
+        filtros: Optional[dict] = None
+    ) -> dict:
+    """
+    Lee, cuenta, filtra y valida las líneas de un rango de bytes del TSV.
+
+    Devuelve un diccionario con las líneas físicas del rango, los
+    índices locales de las líneas vacías, el número de filas de datos,
+    las estadísticas parciales, los rechazos con índice local y la tabla
+    de filas válidas.
+    """
+    with open(peaks_path, mode="rb") as arch:
+        arch.seek(inicio)
+        datos = arch.read(fin - inicio)
+
+    # Validar codificación antes de parsear
+    try:
+        datos.decode("utf-8")
+    except UnicodeDecodeError as e:
+        return {"error": f"Error de codificación al leer '{peaks_path}' "
+                         f"(bytes {inicio}-{fin}): {e}"}
+
+    lineas = datos.count(b"\n")
+    if datos and not datos.endswith(b"\n"):
+        lineas += 1
+    vacias: List[int] = []
+    linea_actual, posicion = 0, 0
+    for coincidencia in _LINEA_VACIA.finditer(datos):
+        linea_actual += datos.count(b"\n", posicion, coincidencia.start())
+        posicion = coincidencia.start()
+        if linea_actual < lineas:
+            vacias.append(linea_actual)
+
+    enriquecimiento = peaks._usa_enriquecimiento(filtros)
+    fuente = io.BytesIO(cabecera + datos)
+    if parser == "native":
+        fuente = io.TextIOWrapper(fuente, encoding="utf-8", newline="")
+        tabla = next(peaks._iterar_tabla_native(
+            fuente, hebra=hebra, enriquecimiento=enriquecimiento))
+    else:
+        tabla = peaks._leer_tabla(fuente, parser, hebra, enriquecimiento)
+    filas = len(tabla)
+
+    estadisticas = peaks._nuevas_estadisticas()
+    rechazos: list = []
+    tabla = peaks._filtrar_tabla(tabla, estadisticas, filtros)
+    validos = peaks._validar_tabla(tabla, estadisticas, rechazos=rechazos,
+                                   circular=circular)
+    return {
+        "lineas": lineas,
+        "vacias": vacias,
+        "filas": filas,
+        "estadisticas": estadisticas,
+        "rechazos": rechazos,
+        "validos": validos,
+    }
+
+
+def _sumar_estadisticas(destino: dict, origen: dict) -> None:
+    """Suma en sitio contadores (posiblemente anidados) de `origen`."""
+    for clave, valor in origen.items():
+        if isinstance(valor, dict):
+            _sumar_estadisticas(destino.setdefault(clave, {}), valor)
+        else:
+            destino[clave] = destino.get(clave, 0) + valor
+
+
+def lectura_peaks_paralela(
+        peaks_path: str,
+        procesos: Optional[int] = None,
+        parser: str = "auto",
+        estadisticas: Optional[dict] = None,
+        circular: bool = False,
+        hebra: bool = False,
+        filtros: Optional[dict] = None
+    ) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Lee y valida el TSV de picos repartiendo rangos de bytes entre un
+    pool de procesos.
+
+    El archivo se divide en rangos alineados a fin de línea; cada
+    trabajador parsea y valida el suyo y devuelve sus filas válidas y
+    sus rechazos con índices locales. La combinación se hace en el orden
+    de los rangos, de modo que el orden de los TF y de sus picos, los
+    números de fila de las advertencias y las estadísticas coinciden con
+    `lectura_peaks`. Un TSV comprimido no se puede dividir por rangos de
+    bytes y se lee con `lectura_peaks`.
+
+    Args:
+        peaks_path (str): Ruta al archivo TSV de picos.
+        procesos (Optional[int]): Número de trabajadores; por defecto,
+            el número de CPUs.
+        parser (str): Motor de lectura ("auto" equivale a "c", "pyarrow"
+            o "native").
+        estadisticas (Optional[dict]): Si se proporciona, se rellena con
+            los contadores de la lectura.
+        circular (bool): Aceptar picos con start > end (genoma circular).
+        hebra (bool): Incluir la hebra en las tuplas, como en
+            `lectura_peaks`.
+        filtros (Optional[dict]): Filtros de `crear_filtros`; cada
+            trabajador aplica los de TF y enriquecimiento a su rango y el
+            top-N y el muestreo se aplican al combinar.
+
+    Returns:
+        Dict[str, List[Tuple[int, int]]]:
+            Mapa de cada TF a su lista de tuplas (start, end).
+
+    Raises:
+        FileNotFoundError: Si `peaks_path` no existe.
+        ValueError: Si faltan columnas requeridas, hay errores de
+            codificación o el archivo no se puede leer.
+    """
+    if os.path.isfile(peaks_path) and es_gzip(peaks_path):
+        logger.info("'%s' está comprimido; se lee de forma secuencial",
+                    peaks_path)
+        return peaks.lectura_peaks(peaks_path, parser, estadisticas,
+                                   circular, hebra, filtros)
+
+    import pandas as pd
+
+    procesos = procesos or os.cpu_count() or 1
+    parser = peaks._resolver_parser(parser)
+    if estadisticas is None:
+        estadisticas = {}
+    estadisticas.update(peaks._nuevas_estadisticas())
+    try:
+        peaks._verificar_archivo(peaks_path, estadisticas,
+                                 contar_lineas=False)
+    except UnicodeDecodeError as e:
+        msg = f"Error de codificación al leer '{peaks_path}': {e}"
+        logger.error(msg)
+        raise ValueError(msg)
+    hebra = peaks._comprobar_hebra(peaks_path, hebra)
+    peaks._comprobar_filtros(peaks_path, filtros)
+
+    cabecera, rangos = _dividir_en_rangos(peaks_path, procesos)
+    logger.debug("Lectura en paralelo: %d rangos para %d procesos",
+                 len(rangos), procesos)
+
+    resultados = []
+    if rangos:
+        with ProcessPoolExecutor(
+                max_workers=min(procesos, len(rangos))) as pool:
+            futuros = [pool.submit(_leer_rango, peaks_path, cabecera,
+                                   inicio, fin, parser, circular, hebra,
+                                   filtros)
+                       for inicio, fin in rangos]
+            try:
+                for futuro in futuros:
+                    resultados.append(futuro.result())
+                    progreso.avanzar("filas",
+                                     resultados[-1].get("lineas", 0))
+            except Exception as e:
+                msg = f"No se pudo leer '{peaks_path}': {e}"
+                logger.error(msg)
+                raise ValueError(msg)
+
+    # Combinar en el orden de los rangos; como en la lectura secuencial,
+    # primero las líneas vacías y después los rechazos de validación
+    estadisticas['lineas_totales'] += 1  # cabecera
+    for resultado in resultados:
+        if "error" in resultado:
+            logger.error(resultado["error"])
+            raise ValueError(resultado["error"])
+    lineas_previas = 0
+    for resultado in resultados:
+        for local in resultado["vacias"]:
+            logger.debug(f"Linea {lineas_previas + local + 3}: "
+                         f"Vacía - omitiendo")
+        lineas_previas += resultado["lineas"]
+
+    filas_previas = 0
+    validos = []
+    for resultado in resultados:
+        for rechazo in resultado["rechazos"]:
+            peaks._registrar_rechazo(rechazo, filas_previas + 2)
+        estadisticas['lineas_totales'] += resultado["lineas"]
+        estadisticas['advertencias']['lineas_vacias'] += \
+            len(resultado["vacias"])
+        _sumar_estadisticas(estadisticas, resultado["estadisticas"])
+        validos.append(resultado["validos"])
+        filas_previas += resultado["filas"]
+
+    tabla = (pd.concat(validos, ignore_index=True) if validos
+             else pd.DataFrame(columns=peaks.COLUMNAS_REQUERIDAS))
+    if filtros and "top_n" in filtros:
+        tabla = peaks._seleccionar_top_n(tabla, estadisticas,
+                                         filtros["top_n"])
+    tabla = peaks._muestrear_tabla(tabla, estadisticas, filtros)
+    tf_coordenadas = peaks._agrupar_por_tf(tabla)
+
+    for tf, listas in tf_coordenadas.items():
+        logger.debug(f"{tf}: {len(listas)} picos válidos")
+    peaks._registrar_resumen(estadisticas)
+    return tf_coordenadas
@@ -2,17 +2,36 @@
 Módulo de procesamiento de archivos de picos de ChIP-Seq para la extracción
 y validación de regiones genómicas asociadas a factores de transcripción (TF).
 
-Contiene dos funciones principales:
+Contiene tres funciones principales:
 
-  1. lectura_peaks(peaks_path: str) -> Dict[str, List[Tuple[int, int]]]
+  1. lectura_peaks(peaks_path: str, parser: str = "auto")
+       -> Dict[str, List[Tuple[int, int]]]
      -----------------------------------------------------------------
      - Lee un TSV de picos asegurando que existan las columnas mínimas:
        "TF_name", "Peak_start", "Peak_end".
+     - Proyecta solo esas columnas con tipos explícitos, usando el motor
+       "c" de pandas, "pyarrow" (si está instalado) o "native" (`csv`).
+       Con "auto" (por defecto), los archivos pequeños se leen con `csv`
+       sin importar pandas, que solo se carga cuando hace falta.
      - Filtra filas vacías, formateo incorrecto y coordenadas inválidas.
      - Agrupa los pares (start, end) por cada TF y devuelve un diccionario.
      - Registra estadísticas y advertencias/errores en el logger.
+     - Acepta TSV comprimidos con gzip o BGZF (detectados por sus bytes
+       mágicos), que se descomprimen en streaming.
+     - Con `filtros` (ver `crear_filtros`) descarta, antes de validar,
+       los TF no solicitados y los picos con Max_Fold_Enrichment bajo el
+       umbral, y conserva solo los N picos más enriquecidos de cada TF.
+     - Con `filtros` de muestreo, conserva una submuestra reproducible de
+       los picos válidos de cada TF (N por TF o una fracción), opcionalmente
+       ponderada por enriquecimiento.
 
-  2. extraer_secuencias(
+  2. iterar_peaks(peaks_path: str, chunksize: int = 100_000, ...)
+       -> Iterator[Dict[str, List[Tuple[int, int]]]]
+     -----------------------------------------------------------------
+     - Variante por bloques de `lectura_peaks` para archivos mayores que
+       la memoria: produce lotes de coordenadas válidas por TF.
+
+  3. extraer_secuencias(
        tf_coordenadas: Dict[str, List[Tuple[int, int]]],
        secuenciagenoma: str
      ) -> Dict[str, List[str]]
@@ -20,6 +39,12 @@ Contiene dos funciones principales:
      - Recorta fragmentos de ADN de la cadena completa del genoma usando
        las coordenadas (0-based) de cada TF.
      - Omite rangos fuera de los límites y registra advertencias.
+     - Con tuplas (start, end, hebra), devuelve las de la hebra "-" como
+       reverso complementario, calculado por lotes con
+       `reverso_complementario`.
+     - Opcionalmente entrega las coordenadas a un `EstadisticasPicos`
+       (longitud, GC, N y CpG por pico en la misma pasada) y los picos
+       válidos con sus secuencias a un `EscritorTabular` (Parquet/Arrow).
      - Devuelve un diccionario TF → lista de secuencias extraídas.
 
 Autor:
@@ -34,12 +59,72 @@ Versión:
 # =============================================================================
 # IMPORTS
 # =============================================================================
+from __future__ import annotations
 
 import os
+import csv
+import gzip
+import math
+import zlib
+import time
 import logging
-from typing import Dict, List, Tuple
+import contextlib
+from typing import (IO, TYPE_CHECKING, Dict, Iterable, Iterator, List,
+                    Optional, Tuple, Union)
+
+# pandas y numpy se importan dentro de las funciones que los usan: así
+# `main.py --help` y la ruta rápida de archivos pequeños no pagan su
+# tiempo de importación.
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
 
-import pandas as pd
+try:
+    from . import progreso
+    from .compresion import abrir_texto, es_gzip, tamano_sin_comprimir
+except ImportError:
+    import progreso
+    from compresion import abrir_texto, es_gzip, tamano_sin_comprimir
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Columnas mínimas que se proyectan desde el TSV de picos
+COLUMNAS_REQUERIDAS = ["TF_name", "Peak_start", "Peak_end"]
+
+# Motores de lectura disponibles para el TSV
+PARSERS = ("auto", "c", "pyarrow", "native")
+
+# Con parser "auto", los archivos de hasta este tamaño (bytes, sin
+# comprimir) se leen y validan con el módulo `csv`, sin importar pandas
+LIMITE_LECTURA_RAPIDA = 4 << 20
+
+# Tipos explícitos para las columnas proyectadas
+DTYPES_PICOS = {
+    "TF_name": "category",
+    "Peak_start": "float64",
+    "Peak_end": "float64",
+}
+
+# Solo los campos vacíos son nulos, como en las rutas con `csv`: sin
+# esto pandas también trata "NA", "null", "nan", ... como ausentes (con
+# pyarrow "nan" aún se lee como NaN; ver `_leer_tabla`)
+OPCIONES_NULOS = {"keep_default_na": False, "na_values": [""]}
+
+# Columna opcional con la hebra del pico ("+" o "-"); cualquier valor
+# distinto de "-" se trata como hebra +
+COLUMNA_HEBRA = "Strand"
+
+# Columna de enriquecimiento usada por los filtros de umbral y top-N
+COLUMNA_ENRIQUECIMIENTO = "Max_Fold_Enrichment"
+
+# Aritmética de 64 bits de las claves de muestreo
+_MASCARA_64 = (1 << 64) - 1
+
+# Complemento de bases (incluye códigos IUPAC y minúsculas)
+_COMPLEMENTO = bytes.maketrans(b"ACGTRYKMBVDHNacgtrykmbvdhn",
+                               b"TGCAYRMKVBHDNtgcayrmkvbhdn")
 
 # =============================================================================
 # FUNCIONES
@@ -48,53 +133,840 @@ import pandas as pd
 #Configurar el logger para el módulo
 logger = logging.getLogger(__name__)
 
-def lectura_peaks(peaks_path: str) -> Dict[str, List[Tuple[int, int]]]:
-    """
-    Lee y valida un archivo TSV de picos, devolviendo coordenadas agrupadas
-    por TF.
+def _nuevas_estadisticas() -> dict:
+    """Crea el diccionario de estadísticas de lectura de picos."""
+    return {
+        'lineas_totales': 0,
+        'picos_totales': 0,
+        'picos_invalidos': 0,
+        'picos_validos': 0,
+        'picos_filtrados': 0,
+        'errores': {'coordenadas': 0, 'estructura': 0, 'formato': 0},
+        'advertencias': {'lineas_vacias': 0, 'campos_vacios': 0},
+        'filtrados': {'tf': 0, 'enriquecimiento': 0, 'top_n': 0,
+                      'muestra': 0}
+    }
 
-    El archivo debe contener, al menos, las columnas:
-    - "TF_name"
-    - "Peak_start"
-    - "Peak_end"
+
+def crear_filtros(
+        tfs: Optional[Iterable[str]] = None,
+        min_enriquecimiento: Optional[float] = None,
+        top_n: Optional[int] = None,
+        muestra: Optional[int] = None,
+        fraccion: Optional[float] = None,
+        semilla: int = 0,
+        ponderar: bool = False
+    ) -> Optional[dict]:
+    """
+    Valida y agrupa los filtros de lectura de picos.
 
     Args:
-        peaks_path (str): Ruta al archivo TSV de picos.
+        tfs (Optional[Iterable[str]]): TF que se conservan.
+        min_enriquecimiento (Optional[float]): Valor mínimo de
+            Max_Fold_Enrichment.
+        top_n (Optional[int]): Picos más enriquecidos que se conservan
+            por TF.
+        muestra (Optional[int]): Picos válidos al azar que se conservan
+            por TF (ver `_muestrear_tabla`).
+        fraccion (Optional[float]): Fracción (0, 1] de los picos válidos
+            de cada TF que se conserva al azar.
+        semilla (int): Semilla del muestreo.
+        ponderar (bool): Muestrear con probabilidad proporcional a
+            Max_Fold_Enrichment (solo con `muestra`).
 
     Returns:
-        Dict[str, List[Tuple[int, int]]]: 
-            Mapa de cada TF a su lista de tuplas (start, end).
+        Optional[dict]: Filtros activos con las claves "tfs",
+            "min_enriquecimiento", "top_n", "muestra" o "fraccion" (con
+            "semilla" y "ponderar"), o None si no hay ninguno.
 
     Raises:
-        FileNotFoundError: Si `peaks_path` no existe.
-        ValueError: Si faltan columnas requeridas o los datos no son válidos.
+        ValueError: Si `top_n` o `muestra` no son positivos, `fraccion`
+            no está en (0, 1], se piden `muestra` y `fraccion` a la vez o
+            se pide `ponderar` sin `muestra`.
     """
-    
-    #Verificar existencia y no vacío
-    if not os.path.isfile(peaks_path):
-        msg = f"Archivo de picos no encontrado: {peaks_path}"
+    errores = []
+    if top_n is not None and top_n <= 0:
+        errores.append(f"top_n debe ser positivo: {top_n}")
+    if muestra is not None and muestra <= 0:
+        errores.append(f"muestra debe ser positivo: {muestra}")
+    if fraccion is not None and not 0 < fraccion <= 1:
+        errores.append(f"fraccion debe estar en (0, 1]: {fraccion}")
+    if muestra is not None and fraccion is not None:
+        errores.append("muestra y fraccion son excluyentes")
+    if ponderar and muestra is None:
+        errores.append("ponderar requiere muestra")
+    if errores:
+        msg = errores[0]
         logger.error(msg)
-        raise FileNotFoundError(msg)
-    if os.path.getsize(peaks_path) == 0:
-        msg = "Archivo vacío"
+        raise ValueError(msg)
+    filtros = {}
+    if tfs:
+        filtros["tfs"] = frozenset(tf.strip() for tf in tfs)
+    if min_enriquecimiento is not None:
+        filtros["min_enriquecimiento"] = float(min_enriquecimiento)
+    if top_n is not None:
+        filtros["top_n"] = int(top_n)
+    if muestra is not None or fraccion is not None:
+        if muestra is not None:
+            filtros["muestra"] = int(muestra)
+        else:
+            filtros["fraccion"] = float(fraccion)
+        filtros["semilla"] = int(semilla)
+        filtros["ponderar"] = bool(ponderar)
+    return filtros or None
+
+
+def _usa_enriquecimiento(filtros: Optional[dict]) -> bool:
+    """Indica si los filtros necesitan la columna de enriquecimiento."""
+    return bool(filtros) and (
+        "min_enriquecimiento" in filtros or "top_n" in filtros
+        or bool(filtros.get("ponderar")))
+
+
+def _usa_muestreo(filtros: Optional[dict]) -> bool:
+    """Indica si los filtros incluyen un muestreo."""
+    return bool(filtros) and ("muestra" in filtros or "fraccion" in filtros)
+
+
+def _comprobar_filtros(peaks_path: str, filtros: Optional[dict]) -> bool:
+    """
+    Comprueba que exista la columna de enriquecimiento si los filtros la
+    usan y devuelve si debe leerse.
+
+    Raises:
+        ValueError: Si los filtros la usan y el TSV no la tiene.
+    """
+    if not _usa_enriquecimiento(filtros):
+        return False
+    if COLUMNA_ENRIQUECIMIENTO not in _leer_cabecera(peaks_path):
+        msg = (f"Columna '{COLUMNA_ENRIQUECIMIENTO}' ausente en "
+               f"{peaks_path}; es necesaria para filtrar o muestrear "
+               f"por enriquecimiento")
         logger.error(msg)
         raise ValueError(msg)
-    
+    return True
 
-    #Inicializar estructuras 
+
+def _contar_filtrados(estadisticas: dict, filtro: str, n: int) -> None:
+    """Suma `n` picos descartados por `filtro` a las estadísticas."""
+    estadisticas['filtrados'][filtro] += n
+    estadisticas['picos_filtrados'] += n
+
+
+def _resolver_parser(parser: str) -> str:
+    """
+    Valida el motor de lectura solicitado y degrada "pyarrow" a "c" si
+    no está instalado.
+    """
+    if parser not in PARSERS:
+        msg = f"Parser desconocido '{parser}'; opciones: {', '.join(PARSERS)}"
+        logger.error(msg)
+        raise ValueError(msg)
+    if parser == "pyarrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logger.warning(
+                "pyarrow no está instalado; se usa el parser 'c'")
+            return "c"
+    return parser
+
+
+def _compresion(peaks_path: Union[str, IO]) -> Optional[str]:
+    """
+    Compresión que se indica a `pd.read_csv`: "gzip" si el archivo lo
+    está aunque su extensión no lo diga (pandas solo la infiere del
+    nombre); None para objetos de archivo y archivos sin comprimir.
+    """
+    if isinstance(peaks_path, str) and es_gzip(peaks_path):
+        return "gzip"
+    return None
+
+
+def _leer_cabecera(peaks_path: str) -> List[str]:
+    """Devuelve los nombres de columna de la primera línea del TSV."""
+    with abrir_texto(peaks_path, newline="") as arch:
+        return arch.readline().rstrip("\r\n").split("\t")
+
+
+def _iterar_tabla_native(
+        peaks_path: Union[str, IO[str]],
+        chunksize: Optional[int] = None,
+        hebra: bool = False,
+        enriquecimiento: bool = False
+    ) -> Iterator[pd.DataFrame]:
+    """
+    Lee las columnas requeridas (y las de hebra y enriquecimiento si se
+    piden) con el módulo `csv` de la biblioteca estándar, sin pasar por
+    el parser de pandas.
+    Si se indica `chunksize`, produce bloques de a lo sumo ese número de
+    filas; el índice de cada bloque continúa la numeración del anterior.
+    """
+    import numpy as np
+    import pandas as pd
+
+    nan = float("nan")
+
+    def _a_numero(valor: str) -> float:
+        try:
+            return float(valor) if valor.strip() else nan
+        except ValueError:
+            return nan
+
+    def _bloque(tfs, starts, ends, crudos_start, crudos_end, hebras,
+                enriquecimientos, inicio):
+        df = pd.DataFrame({
+            "TF_name": pd.Categorical(tfs),
+            "Peak_start": np.asarray(starts, dtype="float64"),
+            "Peak_end": np.asarray(ends, dtype="float64"),
+        }, index=pd.RangeIndex(inicio, inicio + len(tfs)))
+        if hebra:
+            df[COLUMNA_HEBRA] = pd.Categorical(hebras)
+        if enriquecimiento:
+            df[COLUMNA_ENRIQUECIMIENTO] = np.asarray(enriquecimientos,
+                                                     dtype="float64")
+        # Conservar el texto original solo si hay valores no numéricos,
+        # para distinguir campos vacíos de errores de formato
+        if df["Peak_start"].isna().any() or df["Peak_end"].isna().any():
+            df["Peak_start"] = pd.Series(
+                crudos_start, dtype=object, index=df.index
+            ).where(df["Peak_start"].isna(), df["Peak_start"])
+            df["Peak_end"] = pd.Series(
+                crudos_end, dtype=object, index=df.index
+            ).where(df["Peak_end"].isna(), df["Peak_end"])
+        return df
+
+    if isinstance(peaks_path, str):
+        arch = abrir_texto(peaks_path, newline="")
+    else:
+        arch = contextlib.nullcontext(peaks_path)
+    with arch as arch:
+        lector = csv.reader(arch, delimiter="\t")
+        cabecera = next(lector)
+        i_tf, i_start, i_end = (cabecera.index(c) for c in COLUMNAS_REQUERIDAS)
+        i_hebra = cabecera.index(COLUMNA_HEBRA) if hebra else i_tf
+        i_enr = (cabecera.index(COLUMNA_ENRIQUECIMIENTO) if enriquecimiento
+                 else i_tf)
+        ultimo = max(i_tf, i_start, i_end, i_hebra, i_enr)
+        listas = ([], [], [], [], [], [], [])
+        inicio = 0
+        for campos in lector:
+            if not campos:
+                continue
+            if len(campos) <= ultimo:
+                campos = campos + [""] * (ultimo + 1 - len(campos))
+            tf, start, end = campos[i_tf], campos[i_start], campos[i_end]
+            listas[0].append(tf if tf else None)
+            listas[1].append(_a_numero(start))
+            listas[2].append(_a_numero(end))
+            listas[3].append(start if start.strip() else None)
+            listas[4].append(end if end.strip() else None)
+            if hebra:
+                listas[5].append(campos[i_hebra])
+            if enriquecimiento:
+                listas[6].append(_a_numero(campos[i_enr]))
+            if chunksize and len(listas[0]) >= chunksize:
+                yield _bloque(*listas, inicio)
+                inicio += len(listas[0])
+                listas = ([], [], [], [], [], [], [])
+        if listas[0] or not inicio:
+            yield _bloque(*listas, inicio)
+
+
+def _proyeccion(
+        hebra: bool,
+        enriquecimiento: bool = False
+    ) -> Tuple[List[str], dict, dict]:
+    """
+    Columnas a proyectar, tipos de la primera lectura y tipos de la
+    relectura con coordenadas como texto.
+    """
+    columnas = COLUMNAS_REQUERIDAS + ([COLUMNA_HEBRA] if hebra else [])
+    tipos = dict(DTYPES_PICOS)
+    texto = {"TF_name": "category", "Peak_start": str, "Peak_end": str}
+    if hebra:
+        tipos[COLUMNA_HEBRA] = texto[COLUMNA_HEBRA] = "category"
+    if enriquecimiento:
+        columnas.append(COLUMNA_ENRIQUECIMIENTO)
+        tipos[COLUMNA_ENRIQUECIMIENTO] = "float64"
+        texto[COLUMNA_ENRIQUECIMIENTO] = str
+    return columnas, tipos, texto
+
+
+def _leer_tabla(
+        peaks_path: Union[str, IO],
+        parser: str = "c",
+        hebra: bool = False,
+        enriquecimiento: bool = False
+    ) -> pd.DataFrame:
+    """
+    Lee solo las columnas requeridas (y las de hebra y enriquecimiento
+    si se piden) del TSV con el motor indicado.
+
+    Las coordenadas se leen como float64; si el archivo contiene valores
+    no numéricos se relee esa proyección como texto para que la
+    validación pueda clasificar cada fila. pyarrow convierte "nan" en
+    NaN sin error, lo que lo confundiría con un campo vacío, así que con
+    ese motor también se relee si alguna coordenada queda nula; la
+    relectura usa siempre el motor "c", porque pyarrow infiere el tipo de
+    la columna antes de pasarla a texto. "auto" equivale a "c".
+    """
+    if parser == "native":
+        return next(_iterar_tabla_native(peaks_path, hebra=hebra,
+                                         enriquecimiento=enriquecimiento))
+    import pandas as pd
+
+    if parser == "auto":
+        parser = "c"
+    columnas, tipos, texto = _proyeccion(hebra, enriquecimiento)
+    opciones = dict(sep="\t", usecols=columnas, engine=parser,
+                    compression=_compresion(peaks_path), **OPCIONES_NULOS)
+    try:
+        df = pd.read_csv(peaks_path, dtype=tipos, **opciones)
+        if parser != "pyarrow" or not (
+                df["Peak_start"].isna().any() or df["Peak_end"].isna().any()):
+            return df
+        logger.debug("Coordenadas nulas con pyarrow en '%s'; se releen "
+                     "como texto", peaks_path)
+    except (ValueError, TypeError) as e:
+        logger.debug(
+            "Coordenadas no numéricas en '%s' (%s); se releen como texto",
+            peaks_path, e)
+    except Exception as e:
+        # pyarrow reporta los errores de conversión con sus propios tipos
+        if parser != "pyarrow":
+            raise
+        logger.debug("Conversión fallida con pyarrow: %s", e)
+    if hasattr(peaks_path, "seek"):
+        peaks_path.seek(0)
+    opciones["engine"] = "c"
+    return pd.read_csv(peaks_path, dtype=texto, **opciones)
+
+
+def _iterar_tabla(
+        peaks_path: str,
+        parser: str,
+        chunksize: int,
+        hebra: bool = False,
+        enriquecimiento: bool = False
+    ) -> Iterator[pd.DataFrame]:
+    """
+    Lee las columnas requeridas por bloques de `chunksize` filas.
+
+    Igual que `_leer_tabla`, intenta primero con coordenadas float64; si
+    un bloque contiene valores no numéricos se reabre el archivo leyendo
+    las coordenadas como texto y se descartan los bloques ya entregados.
+    pyarrow no admite lectura por bloques, así que se usa el motor "c".
+    """
+    if parser == "native":
+        yield from _iterar_tabla_native(peaks_path, chunksize, hebra,
+                                        enriquecimiento)
+        return
+    import pandas as pd
+
+    if parser == "pyarrow":
+        logger.debug("pyarrow no admite chunksize; se usa el parser 'c'")
+
+    columnas, tipos, texto = _proyeccion(hebra, enriquecimiento)
+    opciones = dict(sep="\t", usecols=columnas, chunksize=chunksize,
+                    compression=_compresion(peaks_path), **OPCIONES_NULOS)
+    entregados = 0
+    try:
+        with pd.read_csv(peaks_path, dtype=tipos, **opciones) as lector:
+            for bloque in lector:
+                yield bloque
+                entregados += 1
+        return
+    except (ValueError, TypeError) as e:
+        logger.debug(
+            "Coordenadas no numéricas en '%s' (%s); se releen como texto",
+            peaks_path, e)
+
+    with pd.read_csv(peaks_path, dtype=texto, **opciones) as lector:
+        for i, bloque in enumerate(lector):
+            if i >= entregados:
+                yield bloque
+
+
+def _registrar_rechazo(rechazo: tuple, desplazamiento: int = 2) -> None:
+    """Registra la advertencia de una fila descartada en la validación."""
+    indice, motivo, start, end = rechazo
+    fila = indice + desplazamiento
+    if motivo == "vacios":
+        logger.warning("Fila %d: campos vacíos, omitiendo", fila)
+    elif motivo == "formato":
+        logger.warning("Fila %d: error de formato en coordenadas", fila)
+    elif motivo == "no_positivos":
+        logger.warning("Fila %d: coordenada ≤ 0 (%d, %d)", fila, start, end)
+    else:
+        logger.warning("Fila %d: start ≥ end (%d ≥ %d)", fila, start, end)
+
+
+def _validar_tabla(
+        df: pd.DataFrame,
+        estadisticas: dict,
+        desplazamiento: int = 2,
+        rechazos: Optional[list] = None,
+        circular: bool = False
+    ) -> pd.DataFrame:
+    """
+    Valida de forma vectorizada las filas de picos y devuelve solo las
+    válidas, con coordenadas enteras.
+
+    Args:
+        df (pd.DataFrame): Tabla con las columnas requeridas.
+        estadisticas (dict): Contadores que se actualizan en sitio.
+        desplazamiento (int): Diferencia entre el índice de `df` y el
+            número de línea (2 por la cabecera), usada en las advertencias.
+        rechazos (Optional[list]): Si se proporciona, las filas
+            descartadas se acumulan aquí como tuplas (índice, motivo,
+            start, end) en lugar de registrarse, para que el llamador
+            ajuste su número de fila (lectura en paralelo).
+        circular (bool): Aceptar start > end como pico que cruza el
+            origen de un genoma circular; solo start == end es inválido.
+
+    Returns:
+        pd.DataFrame: Filas válidas con columnas TF_name, Peak_start y
+            Peak_end (int64), más la columna de hebra normalizada a "+"
+            o "-" y la de enriquecimiento (float64) si `df` las incluye.
+    """
+    import numpy as np
+    import pandas as pd
+
+    n = len(df)
+    estadisticas['picos_totales'] += n
+    progreso.avanzar("filas", n)
+    if n == 0:
+        return df.assign(Peak_start=pd.Series(dtype="int64"),
+                         Peak_end=pd.Series(dtype="int64"))
+
+    tf = df["TF_name"]
+    if not isinstance(tf.dtype, pd.CategoricalDtype):
+        tf = tf.astype("category")
+    categorias = tf.cat.categories.astype(str)
+    limpias = categorias.str.strip()
+    if not limpias.equals(categorias):
+        tf = tf.astype("string").str.strip().astype("category")
+
+    def _numerico(columna: pd.Series) -> pd.Series:
+        if columna.dtype.kind == "f":
+            return columna
+        return pd.to_numeric(columna, errors="coerce").astype("float64")
+
+    def _vacio(columna: pd.Series) -> np.ndarray:
+        # Como en la lectura con `csv`, un campo solo con espacios está
+        # vacío
+        if columna.dtype.kind == "f":
+            return columna.isna().to_numpy()
+        return (columna.astype("string").str.strip().fillna("")
+                == "").to_numpy()
+
+    start_crudo, end_crudo = df["Peak_start"], df["Peak_end"]
+    start = _numerico(start_crudo)
+    end = _numerico(end_crudo)
+
+    # Clasificación de errores, en el mismo orden de prioridad que antes
+    vacios = (
+        tf.isna().to_numpy()
+        | (tf.astype("string").fillna("") == "").to_numpy()
+        | _vacio(start_crudo)
+        | _vacio(end_crudo)
+    )
+    start_np = start.to_numpy()
+    end_np = end.to_numpy()
+    formato = ~vacios & ~(np.isfinite(start_np) & np.isfinite(end_np))
+    revisables = ~(vacios | formato)
+    start_int = np.where(revisables, start_np, 0).astype("int64")
+    end_int = np.where(revisables, end_np, 0).astype("int64")
+    no_positivos = revisables & ((start_int <= 0) | (end_int <= 0))
+    if circular:
+        invertidos = revisables & ~no_positivos & (start_int == end_int)
+    else:
+        invertidos = revisables & ~no_positivos & (start_int >= end_int)
+    validos = revisables & ~no_positivos & ~invertidos
+
+    estadisticas['advertencias']['campos_vacios'] += int(vacios.sum())
+    estadisticas['errores']['formato'] += int(formato.sum())
+    estadisticas['errores']['coordenadas'] += int(
+        no_positivos.sum() + invertidos.sum())
+    n_validos = int(validos.sum())
+    estadisticas['picos_validos'] += n_validos
+    estadisticas['picos_invalidos'] += n - n_validos
+
+    # Advertencias solo para las filas descartadas
+    if n_validos < n:
+        for i in np.flatnonzero(~validos):
+            if vacios[i]:
+                motivo = "vacios"
+            elif formato[i]:
+                motivo = "formato"
+            elif no_positivos[i]:
+                motivo = "no_positivos"
+            else:
+                motivo = "invertidos"
+            rechazo = (int(df.index[i]), motivo,
+                       int(start_int[i]), int(end_int[i]))
+            if rechazos is None:
+                _registrar_rechazo(rechazo, desplazamiento)
+            else:
+                rechazos.append(rechazo)
+
+    salida = pd.DataFrame({
+        "TF_name": tf[validos].cat.remove_unused_categories(),
+        "Peak_start": start_int[validos],
+        "Peak_end": end_int[validos],
+    }, index=df.index[validos])
+    if COLUMNA_HEBRA in df.columns:
+        menos = (df[COLUMNA_HEBRA].astype("string").str.strip() == "-")
+        salida[COLUMNA_HEBRA] = np.where(
+            menos.fillna(False).to_numpy(dtype=bool)[validos], "-", "+")
+    if COLUMNA_ENRIQUECIMIENTO in df.columns:
+        salida[COLUMNA_ENRIQUECIMIENTO] = _numerico(
+            df[COLUMNA_ENRIQUECIMIENTO]).to_numpy()[validos]
+    return salida
+
+
+def _filtrar_tabla(
+        df: pd.DataFrame,
+        estadisticas: dict,
+        filtros: Optional[dict] = None
+    ) -> pd.DataFrame:
+    """
+    Descarta con máscaras vectorizadas, antes de validar, las filas de
+    TF no solicitados y las de enriquecimiento menor que el umbral (o no
+    numérico). Las filas descartadas se cuentan como picos totales y
+    filtrados; el índice de las restantes se conserva para que los
+    números de fila de las advertencias sigan siendo exactos.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if not filtros or df.empty:
+        return df
+    conservar = np.ones(len(df), dtype=bool)
+    if "tfs" in filtros:
+        tf = df["TF_name"]
+        if not isinstance(tf.dtype, pd.CategoricalDtype):
+            tf = tf.astype("category")
+        # Una comparación por categoría; el código -1 (vacío) no coincide
+        solicitadas = tf.cat.categories.astype(str).str.strip().isin(
+            filtros["tfs"])
+        mascara = np.append(solicitadas, False)[tf.cat.codes.to_numpy()]
+        _contar_filtrados(estadisticas, "tf",
+                          int((conservar & ~mascara).sum()))
+        conservar &= mascara
+    if "min_enriquecimiento" in filtros:
+        enriquecimiento = pd.to_numeric(
+            df[COLUMNA_ENRIQUECIMIENTO], errors="coerce").to_numpy("float64")
+        mascara = enriquecimiento >= filtros["min_enriquecimiento"]
+        _contar_filtrados(estadisticas, "enriquecimiento",
+                          int((conservar & ~mascara).sum()))
+        conservar &= mascara
+    estadisticas['picos_totales'] += len(df) - int(conservar.sum())
+    progreso.avanzar("filas", len(df) - int(conservar.sum()))
+    return df[conservar]
+
+
+def _seleccionar_top_n(
+        validos: pd.DataFrame,
+        estadisticas: dict,
+        top_n: int
+    ) -> pd.DataFrame:
+    """
+    Conserva los `top_n` picos válidos de mayor enriquecimiento de cada
+    TF (los empates, en orden de aparición; los valores no numéricos, al
+    final), en el orden original de las filas. Los descartados dejan de
+    contar como válidos y pasan a filtrados.
+    """
+    if len(validos) <= top_n:
+        return validos
+    seleccion = (validos
+                 .sort_values(COLUMNA_ENRIQUECIMIENTO, ascending=False,
+                              kind="stable", na_position="last")
+                 .groupby("TF_name", sort=False, observed=True)
+                 .head(top_n)
+                 .sort_index())
+    descartados = len(validos) - len(seleccion)
+    estadisticas['picos_validos'] -= descartados
+    _contar_filtrados(estadisticas, "top_n", descartados)
+    return seleccion
+
+
+def _mezclar(x: int) -> int:
+    """Función de mezcla de splitmix64 sobre un entero de 64 bits."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASCARA_64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASCARA_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASCARA_64
+    return x ^ (x >> 31)
+
+
+def _clave_muestreo(tf: str, start: int, end: int, semilla: int) -> float:
+    """
+    Número pseudoaleatorio en (0, 1) derivado solo de la semilla, el TF
+    y las coordenadas del pico, no de su posición en el archivo: el
+    muestreo es el mismo en todas las rutas de lectura (por bloques, en
+    paralelo o con `csv`). Versión escalar de `_claves_muestreo`.
+    """
+    x = _mezclar((semilla & _MASCARA_64)
+                 ^ (zlib.crc32(tf.encode("utf-8")) << 32))
+    x = _mezclar(x ^ (start & _MASCARA_64))
+    x = _mezclar(x ^ (end & _MASCARA_64))
+    return ((x >> 11) + 0.5) * 2.0 ** -53
+
+
+def _claves_muestreo(validos: pd.DataFrame, semilla: int) -> np.ndarray:
+    """Claves de `_clave_muestreo` de todas las filas, vectorizadas."""
+    import numpy as np
+    import pandas as pd
+
+    def mezclar(x):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+    tf = validos["TF_name"]
+    if not isinstance(tf.dtype, pd.CategoricalDtype):
+        tf = tf.astype("category")
+    # Un CRC32 por categoría
+    crc = np.array([zlib.crc32(str(c).encode("utf-8"))
+                    for c in tf.cat.categories], dtype=np.uint64)
+    x = mezclar(np.uint64(semilla & _MASCARA_64)
+                ^ (crc[tf.cat.codes.to_numpy()] << np.uint64(32)))
+    for columna in ("Peak_start", "Peak_end"):
+        x = mezclar(x ^ validos[columna].to_numpy(np.int64).view(np.uint64))
+    return ((x >> np.uint64(11)).astype(np.float64) + 0.5) * 2.0 ** -53
+
+
+def _muestrear_tabla(
+        validos: pd.DataFrame,
+        estadisticas: dict,
+        filtros: Optional[dict] = None
+    ) -> pd.DataFrame:
+    """
+    Submuestra reproducible de los picos válidos de cada TF, en el orden
+    original de las filas; los descartados dejan de contar como válidos y
+    pasan a filtrados.
+
+    Cada pico recibe una clave uniforme de `_claves_muestreo`. Con
+    "fraccion" se conservan los de clave menor que la fracción (cada pico
+    con esa probabilidad, de forma independiente); con "muestra", los N
+    de menor clave exponencial -ln(u) de cada TF, dividida por el
+    enriquecimiento si se pondera (muestreo ponderado sin reemplazo de
+    Efraimidis-Spirakis; los enriquecimientos no positivos o no
+    numéricos, al final). Como la selección de N es la de los N menores,
+    puede aplicarse por bloques sobre los candidatos acumulados.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if not _usa_muestreo(filtros) or validos.empty:
+        return validos
+    muestra = filtros.get("muestra")
+    if muestra is not None and len(validos) <= muestra:
+        return validos
+    claves = _claves_muestreo(validos, filtros["semilla"])
+    if muestra is None:
+        seleccion = validos[claves < filtros["fraccion"]]
+    else:
+        claves = -np.log(claves)
+        if filtros.get("ponderar"):
+            pesos = pd.to_numeric(validos[COLUMNA_ENRIQUECIMIENTO],
+                                  errors="coerce").to_numpy("float64")
+            with np.errstate(divide="ignore", invalid="ignore"):
+                claves = np.where(pesos > 0, claves / pesos, np.inf)
+        seleccion = (validos.iloc[np.argsort(claves, kind="stable")]
+                     .groupby("TF_name", sort=False, observed=True)
+                     .head(muestra)
+                     .sort_index())
+    descartados = len(validos) - len(seleccion)
+    estadisticas['picos_validos'] -= descartados
+    _contar_filtrados(estadisticas, "muestra", descartados)
+    return seleccion
+
+
+def _agrupar_por_tf(
+        df: pd.DataFrame,
+        tf_coordenadas: Optional[Dict[str, List[Tuple[int, int]]]] = None
+    ) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Agrupa las coordenadas válidas por TF conservando el orden de
+    aparición de los TF y de las filas dentro de cada uno. Si la tabla
+    tiene columna de hebra, las tuplas son (start, end, hebra).
+    """
+    if tf_coordenadas is None:
+        tf_coordenadas = {}
+    if df.empty:
+        return tf_coordenadas
+    columnas = ["Peak_start", "Peak_end"] + (
+        [COLUMNA_HEBRA] if COLUMNA_HEBRA in df.columns else [])
+    for tf, grupo in df.groupby("TF_name", sort=False, observed=True):
+        pares = list(zip(*(grupo[c].tolist() for c in columnas)))
+        tf_coordenadas.setdefault(str(tf), []).extend(pares)
+    return tf_coordenadas
+
+
+def _lectura_rapida(
+        peaks_path: str,
+        estadisticas: dict,
+        circular: bool = False,
+        hebra: bool = False,
+        filtros: Optional[dict] = None
+    ) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Lee, valida y agrupa un TSV pequeño fila por fila con el módulo
+    `csv`, sin pandas ni numpy.
+
+    Aplica las mismas reglas, filtros, contadores y advertencias que
+    `_leer_tabla(parser="native")` seguido de `_filtrar_tabla`,
+    `_validar_tabla`, `_seleccionar_top_n`, `_muestrear_tabla` y
+    `_agrupar_por_tf`; para archivos de pocos megabytes es más rápido que
+    importar pandas.
+    """
+    filtros = filtros or {}
+    tfs = filtros.get("tfs")
+    umbral = filtros.get("min_enriquecimiento")
+    top_n = filtros.get("top_n")
+    ponderar = filtros.get("ponderar", False)
     tf_coordenadas: Dict[str, List[Tuple[int, int]]] = {}
-    estadisticas = {
-        'lineas_totales': 0,
-        'picos_totales': 0,
-        'picos_invalidos': 0,
-        'picos_validos': 0,
-        'errores': {'coordenadas': 0, 'estructura': 0, 'formato': 0},
-        'advertencias': {'lineas_vacias': 0, 'campos_vacios': 0}
-    }
+    enriquecimientos: Dict[str, List[float]] = {}
+    contadores = {"vacios": 0, "formato": 0, "no_positivos": 0,
+                  "invertidos": 0}
+    filtrados = {"tf": 0, "enriquecimiento": 0, "top_n": 0, "muestra": 0}
+    n = 0
+    with abrir_texto(peaks_path, newline="") as arch:
+        lector = csv.reader(arch, delimiter="\t")
+        cabecera = next(lector)
+        i_tf, i_start, i_end = (cabecera.index(c) for c in COLUMNAS_REQUERIDAS)
+        i_hebra = cabecera.index(COLUMNA_HEBRA) if hebra else None
+        i_enr = (cabecera.index(COLUMNA_ENRIQUECIMIENTO)
+                 if _usa_enriquecimiento(filtros) else None)
+        ultimo = max(i_tf, i_start, i_end,
+                     -1 if i_hebra is None else i_hebra,
+                     -1 if i_enr is None else i_enr)
+        for campos in lector:
+            if not campos:
+                continue
+            indice = n
+            n += 1
+            if len(campos) <= ultimo:
+                campos = campos + [""] * (ultimo + 1 - len(campos))
+            tf = campos[i_tf].strip()
+            if tfs is not None and tf not in tfs:
+                filtrados["tf"] += 1
+                continue
+            if i_enr is not None:
+                try:
+                    enriquecimiento = float(campos[i_enr])
+                except ValueError:
+                    enriquecimiento = float("nan")
+                if umbral is not None and not enriquecimiento >= umbral:
+                    filtrados["enriquecimiento"] += 1
+                    continue
+            crudo_start, crudo_end = campos[i_start], campos[i_end]
+            start = end = 0
+            if not tf or not crudo_start.strip() or not crudo_end.strip():
+                motivo = "vacios"
+            else:
+                try:
+                    start, end = int(float(crudo_start)), int(float(crudo_end))
+                    if start <= 0 or end <= 0:
+                        motivo = "no_positivos"
+                    elif start == end or (start > end and not circular):
+                        motivo = "invertidos"
+                    else:
+                        rango = (start, end) if i_hebra is None else (
+                            start, end,
+                            "-" if campos[i_hebra].strip() == "-" else "+")
+                        tf_coordenadas.setdefault(tf, []).append(rango)
+                        if top_n is not None or ponderar:
+                            enriquecimientos.setdefault(tf, []).append(
+                                enriquecimiento)
+                        continue
+                except (ValueError, OverflowError):
+                    start = end = 0
+                    motivo = "formato"
+            contadores[motivo] += 1
+            _registrar_rechazo((indice, motivo, start, end))
 
+    # Top-N por TF: mayor enriquecimiento primero, NaN al final y empates
+    # en orden de aparición; se conserva el orden original
+    if top_n is not None:
+        for tf, rangos in tf_coordenadas.items():
+            if len(rangos) <= top_n:
+                continue
+            valores = enriquecimientos[tf]
+            elegidos = sorted(range(len(rangos)), key=lambda i: (
+                valores[i] != valores[i],
+                0.0 if valores[i] != valores[i] else -valores[i]))[:top_n]
+            elegidos = sorted(elegidos)
+            tf_coordenadas[tf] = [rangos[i] for i in elegidos]
+            if ponderar:
+                enriquecimientos[tf] = [valores[i] for i in elegidos]
+            filtrados["top_n"] += len(rangos) - top_n
+
+    # Muestreo por TF con las mismas claves que `_muestrear_tabla`
+    if _usa_muestreo(filtros):
+        muestra = filtros.get("muestra")
+        muestreadas: Dict[str, List[Tuple[int, int]]] = {}
+        for tf, rangos in tf_coordenadas.items():
+            if muestra is not None and len(rangos) <= muestra:
+                muestreadas[tf] = rangos
+                continue
+            claves = [_clave_muestreo(tf, r[0], r[1], filtros["semilla"])
+                      for r in rangos]
+            if muestra is None:
+                elegidos = [i for i, u in enumerate(claves)
+                            if u < filtros["fraccion"]]
+            else:
+                claves = [-math.log(u) for u in claves]
+                if ponderar:
+                    claves = [c / w if w > 0 else math.inf
+                              for c, w in zip(claves, enriquecimientos[tf])]
+                elegidos = sorted(sorted(range(len(rangos)),
+                                         key=claves.__getitem__)[:muestra])
+            filtrados["muestra"] += len(rangos) - len(elegidos)
+            if elegidos:
+                muestreadas[tf] = [rangos[i] for i in elegidos]
+        tf_coordenadas = muestreadas
+
+    invalidos = sum(contadores.values())
+    descartados = sum(filtrados.values())
+    estadisticas['picos_totales'] += n
+    progreso.avanzar("filas", n)
+    estadisticas['picos_validos'] += n - invalidos - descartados
+    estadisticas['picos_invalidos'] += invalidos
+    for filtro, cuenta in filtrados.items():
+        _contar_filtrados(estadisticas, filtro, cuenta)
+    estadisticas['advertencias']['campos_vacios'] += contadores["vacios"]
+    estadisticas['errores']['formato'] += contadores["formato"]
+    estadisticas['errores']['coordenadas'] += (
+        contadores["no_positivos"] + contadores["invertidos"])
+    return tf_coordenadas
+
+
+def _registrar_resumen(estadisticas: dict) -> None:
+    """Escribe en el log el resumen de lectura de picos."""
+    logger.info(
+        f"Resumen de procesamiento:\n"
+        f"  Líneas totales: {estadisticas['lineas_totales']}\n"
+        f"  Picos válidos: {estadisticas['picos_validos']}\n"
+        f"  Picos inválidos: {estadisticas['picos_invalidos']}"
+    )
+    if estadisticas.get('picos_filtrados'):
+        filtrados = estadisticas['filtrados']
+        logger.info(
+            "Picos omitidos por filtros: %d (TF=%d, enriquecimiento=%d, "
+            "top-N=%d, muestreo=%d)", estadisticas['picos_filtrados'],
+            filtrados['tf'], filtrados['enriquecimiento'],
+            filtrados['top_n'], filtrados['muestra'])
+
+
+def _contar_lineas(peaks_path: str, estadisticas: dict) -> None:
+    """Cuenta líneas totales y vacías; valida la codificación UTF-8."""
     try:
         # Leer líneas crudas para contar vacías
-        with open(peaks_path, mode="r", encoding="utf-8") as arch_picos:
+        with abrir_texto(peaks_path) as arch_picos:
         # Excluimos la cabecera
             for num_linea, linea in enumerate(arch_picos, 2):
                 estadisticas['lineas_totales'] += 1
@@ -107,20 +979,45 @@ def lectura_peaks(peaks_path: str) -> Dict[str, List[Tuple[int, int]]]:
         msg = f"Error de codificación al leer '{peaks_path}': {e}"
         logger.error(msg)
         raise ValueError(msg)
+    except (gzip.BadGzipFile, EOFError, zlib.error) as e:
+        msg = f"Archivo comprimido dañado '{peaks_path}': {e}"
+        logger.error(msg)
+        raise ValueError(msg)
 
-        # Leer con pandas
-    try:
-        df = pd.read_csv(peaks_path, sep="\t", 
-                         dtype={"TF_name": str}, comment=None)
-    except Exception as e:
-            msg = f"No se pudo leer '{peaks_path}': {e}"
-            logger.error(msg)
-            raise ValueError(msg)
 
-    # Validar columnas
-    columnas_requeridas = ["TF_name", "Peak_start", "Peak_end"]
-    columnas_faltantes = [c for c in columnas_requeridas 
-                          if c not in df.columns]
+def _verificar_archivo(
+        peaks_path: str,
+        estadisticas: dict,
+        contar_lineas: bool = True
+    ) -> None:
+    """
+    Comprueba que el TSV exista, no esté vacío, sea UTF-8 válido y tenga
+    las columnas requeridas. Cuenta las líneas totales y vacías, salvo
+    que `contar_lineas` sea False (el llamador las cuenta por su cuenta y
+    también valida la codificación).
+
+    Raises:
+        FileNotFoundError: Si `peaks_path` no existe.
+        ValueError: Si el archivo está vacío, tiene errores de codificación
+            o le faltan columnas requeridas.
+    """
+    #Verificar existencia y no vacío
+    if not os.path.isfile(peaks_path):
+        msg = f"Archivo de picos no encontrado: {peaks_path}"
+        logger.error(msg)
+        raise FileNotFoundError(msg)
+    if os.path.getsize(peaks_path) == 0:
+        msg = "Archivo vacío"
+        logger.error(msg)
+        raise ValueError(msg)
+    
+    if contar_lineas:
+        _contar_lineas(peaks_path, estadisticas)
+
+    # Validar columnas antes de proyectar
+    cabecera = _leer_cabecera(peaks_path)
+    columnas_faltantes = [c for c in COLUMNAS_REQUERIDAS 
+                          if c not in cabecera]
     if columnas_faltantes:
         estadisticas['errores']['formato'] += 1
         msg = f"Columnas faltantes en {peaks_path}: {columnas_faltantes}"
@@ -128,69 +1025,294 @@ def lectura_peaks(peaks_path: str) -> Dict[str, List[Tuple[int, int]]]:
         raise ValueError(msg)
 
 
-    # Procesar filas
-    for fila, valores in df.iterrows():
-        estadisticas['picos_totales'] += 1
-        
-        tf = str(valores["TF_name"] or "").strip()
-        start = (valores["Peak_start"] or "")
-        end = (valores["Peak_end"] or "")
-            
-        if not (tf and start and end):
-            estadisticas['advertencias']['campos_vacios'] += 1
-            estadisticas['picos_invalidos'] += 1
-            logger.warning("Fila %d: campos vacíos, omitiendo", fila + 2)
-            continue
+def _comprobar_hebra(peaks_path: str, hebra: bool) -> bool:
+    """
+    Indica si debe leerse la columna de hebra: se solicitó y existe. Si
+    falta, lo advierte y los picos se tratan como hebra +.
+    """
+    if hebra and COLUMNA_HEBRA not in _leer_cabecera(peaks_path):
+        logger.warning("Columna '%s' ausente en %s; todos los picos se "
+                       "tratan como hebra +", COLUMNA_HEBRA, peaks_path)
+        return False
+    return hebra
+
+
+def lectura_peaks(
+        peaks_path: str,
+        parser: str = "auto",
+        estadisticas: Optional[dict] = None,
+        circular: bool = False,
+        hebra: bool = False,
+        filtros: Optional[dict] = None
+    ) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Lee y valida un archivo TSV de picos, devolviendo coordenadas agrupadas
+    por TF.
+
+    El archivo debe contener, al menos, las columnas:
+    - "TF_name"
+    - "Peak_start"
+    - "Peak_end"
+
+    Solo se leen esas tres columnas, con tipos explícitos (TF_name como
+    categoría y coordenadas numéricas); el resto del archivo no se
+    materializa.
+
+    Args:
+        peaks_path (str): Ruta al archivo TSV de picos.
+        parser (str): Motor de lectura: "auto" (módulo `csv` sin pandas
+            para archivos de hasta `LIMITE_LECTURA_RAPIDA` bytes; "c" para
+            los demás), "c" (pandas), "pyarrow" (si está instalado; si
+            no, se usa "c") o "native" (módulo `csv`).
+        estadisticas (Optional[dict]): Si se proporciona, se rellena con
+            los contadores de la lectura.
+        circular (bool): Aceptar picos con start > end, que cruzan el
+            origen de un genoma circular.
+        hebra (bool): Leer también la columna `Strand`; las tuplas pasan
+            a ser (start, end, hebra) con hebra "+" o "-". Si la columna
+            no existe se ignora con una advertencia.
+        filtros (Optional[dict]): Resultado de `crear_filtros`. Los
+            filtros de TF y de enriquecimiento se aplican con máscaras
+            antes de validar; el top-N y después el muestreo, por TF
+            sobre los picos válidos. Los picos omitidos se cuentan en
+            `picos_filtrados` y, por filtro, en `filtrados`.
+
+    Returns:
+        Dict[str, List[Tuple[int, int]]]: 
+            Mapa de cada TF a su lista de tuplas (start, end).
+
+    Raises:
+        FileNotFoundError: Si `peaks_path` no existe.
+        ValueError: Si faltan columnas requeridas o los datos no son válidos.
+    """
     
-        # Intentar parsear coordenadas
-        try:
-            start = int(float(start))
-            end = int(float(end))
-        except ValueError:
-            estadisticas['errores']['formato'] += 1
-            estadisticas['picos_invalidos'] += 1
-            logger.warning(
-                "Fila %d: error de formato en coordenadas", fila + 2)
-            continue
+    parser = _resolver_parser(parser)
 
-        # Validar orden y valor
-        if start <= 0 or end <= 0:
-            estadisticas['errores']['coordenadas'] += 1
-            estadisticas['picos_invalidos'] += 1
-            logger.warning(
-                "Fila %d: coordenada ≤ 0 (%d, %d)", fila + 2, start, end)
-            continue
-            
-        if start >= end:
-            estadisticas['errores']['coordenadas'] += 1
-            estadisticas['picos_invalidos'] += 1
-            logger.warning(
-                "Fila %d: start ≥ end (%d ≥ %d)", fila + 2, start, end)
-            continue
-        
-        if tf in tf_coordenadas:
-            tf_coordenadas[tf].append((start, end))
-        else:
-            tf_coordenadas[tf] = [(start, end)]
-            estadisticas['picos_validos'] += 1
+    #Inicializar estructuras 
+    if estadisticas is None:
+        estadisticas = {}
+    estadisticas.update(_nuevas_estadisticas())
+    _verificar_archivo(peaks_path, estadisticas)
+    hebra = _comprobar_hebra(peaks_path, hebra)
+    enriquecimiento = _comprobar_filtros(peaks_path, filtros)
 
-        for tf, listas in tf_coordenadas.items():
-            logger.debug(f"{tf}: {len(listas)} secuencias extraídas")
+    # Archivos pequeños: ruta rápida sin pandas
+    inicio = time.perf_counter()
+    if (parser == "auto"
+            and tamano_sin_comprimir(peaks_path) <= LIMITE_LECTURA_RAPIDA):
+        try:
+            tf_coordenadas = _lectura_rapida(peaks_path, estadisticas,
+                                             circular, hebra, filtros)
+        except (csv.Error, UnicodeDecodeError) as e:
+            msg = f"No se pudo leer '{peaks_path}': {e}"
+            logger.error(msg)
+            raise ValueError(msg)
+        logger.debug("Lectura rápida (csv): %d filas en %.3f s",
+                     estadisticas['picos_totales'],
+                     time.perf_counter() - inicio)
+    else:
+        # Leer solo las columnas requeridas
+        try:
+            df = _leer_tabla(peaks_path, parser, hebra, enriquecimiento)
+        except Exception as e:
+                msg = f"No se pudo leer '{peaks_path}': {e}"
+                logger.error(msg)
+                raise ValueError(msg)
+        logger.debug("Lectura con parser '%s': %d filas en %.3f s",
+                     parser, len(df), time.perf_counter() - inicio)
 
+        # Filtrar, validar y agrupar filas
+        df = _filtrar_tabla(df, estadisticas, filtros)
+        validos = _validar_tabla(df, estadisticas, circular=circular)
+        if filtros and "top_n" in filtros:
+            validos = _seleccionar_top_n(validos, estadisticas,
+                                         filtros["top_n"])
+        validos = _muestrear_tabla(validos, estadisticas, filtros)
+        tf_coordenadas = _agrupar_por_tf(validos)
+
+    for tf, listas in tf_coordenadas.items():
+        logger.debug(f"{tf}: {len(listas)} picos válidos")
 
     # Resumen de estadísticas
-    logger.info(
-        f"Resumen de procesamiento:\n"
-        f"  Líneas totales: {estadisticas['lineas_totales']}\n"
-        f"  Picos válidos: {estadisticas['picos_validos']}\n"
-        f"  Picos inválidos: {estadisticas['picos_invalidos']}"
-    )
+    _registrar_resumen(estadisticas)
 
     return tf_coordenadas
 
+def iterar_peaks(
+        peaks_path: str,
+        chunksize: int = 100_000,
+        parser: str = "auto",
+        estadisticas: Optional[dict] = None,
+        circular: bool = False,
+        hebra: bool = False,
+        filtros: Optional[dict] = None
+    ) -> Iterator[Dict[str, List[Tuple[int, int]]]]:
+    """
+    Lee el TSV de picos por bloques y produce, para cada bloque, sus
+    coordenadas válidas agrupadas por TF.
+
+    La memoria queda acotada por `chunksize` y no por el tamaño del
+    archivo. Un mismo TF puede aparecer en varios lotes. Las estadísticas
+    se acumulan entre bloques, de modo que al agotar el generador son
+    idénticas a las de `lectura_peaks`.
+
+    Args:
+        peaks_path (str): Ruta al archivo TSV de picos.
+        chunksize (int): Número máximo de filas por bloque.
+        parser (str): Motor de lectura ("auto" equivale a "c", "pyarrow"
+            o "native").
+        estadisticas (Optional[dict]): Si se proporciona, se rellena con
+            los contadores acumulados de la lectura.
+        circular (bool): Aceptar picos con start > end (genoma circular).
+        hebra (bool): Incluir la hebra en las tuplas, como en
+            `lectura_peaks`.
+        filtros (Optional[dict]): Filtros de `crear_filtros`. Con top-N
+            o con una muestra de N picos, solo se conservan entre bloques
+            los N candidatos de cada TF y se producen en un único lote al
+            final; una fracción se muestrea en cada bloque.
+
+    Yields:
+        Dict[str, List[Tuple[int, int]]]: Coordenadas válidas del bloque.
+
+    Raises:
+        FileNotFoundError: Si `peaks_path` no existe.
+        ValueError: Si faltan columnas requeridas o `chunksize` no es
+            positivo.
+    """
+    import pandas as pd
+
+    if chunksize <= 0:
+        msg = f"chunksize debe ser positivo: {chunksize}"
+        logger.error(msg)
+        raise ValueError(msg)
+    parser = _resolver_parser(parser)
+
+    if estadisticas is None:
+        estadisticas = {}
+    estadisticas.update(_nuevas_estadisticas())
+    _verificar_archivo(peaks_path, estadisticas)
+    hebra = _comprobar_hebra(peaks_path, hebra)
+    enriquecimiento = _comprobar_filtros(peaks_path, filtros)
+    top_n = filtros.get("top_n") if filtros else None
+    muestra = filtros.get("muestra") if filtros else None
+
+    mejores = None
+    try:
+        for num_bloque, bloque in enumerate(
+                _iterar_tabla(peaks_path, parser, chunksize, hebra,
+                              enriquecimiento), 1):
+            filas = len(bloque)
+            bloque = _filtrar_tabla(bloque, estadisticas, filtros)
+            validos = _validar_tabla(bloque, estadisticas,
+                                     circular=circular)
+            logger.debug("Bloque %d: %d filas, %d válidas",
+                         num_bloque, filas, len(validos))
+            if top_n is not None:
+                # Memoria acotada por N picos por TF, no por el archivo
+                mejores = _seleccionar_top_n(
+                    validos if mejores is None
+                    else pd.concat([mejores, validos]),
+                    estadisticas, top_n)
+                continue
+            if muestra is not None:
+                mejores = _muestrear_tabla(
+                    validos if mejores is None
+                    else pd.concat([mejores, validos]),
+                    estadisticas, filtros)
+                continue
+            lote = _agrupar_por_tf(
+                _muestrear_tabla(validos, estadisticas, filtros))
+            if lote:
+                yield lote
+    except (pd.errors.ParserError, UnicodeDecodeError) as e:
+        msg = f"No se pudo leer '{peaks_path}': {e}"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    if mejores is not None:
+        if top_n is not None:
+            mejores = _muestrear_tabla(mejores, estadisticas, filtros)
+        lote = _agrupar_por_tf(mejores)
+        if lote:
+            yield lote
+
+    _registrar_resumen(estadisticas)
+
+
+def _longitud_circular(start: int, end: int, longitud: int) -> int:
+    """
+    Longitud del rango (start, end) en un genoma circular, o 0 si no es
+    válido (coordenadas negativas, vacío o más largo que el genoma).
+    """
+    if start < 0 or end < 0 or start == end or longitud == 0:
+        return 0
+    tamano = end - start if end > start else end + longitud - start
+    return tamano if 0 < tamano <= longitud else 0
+
+
+def _recorte_circular(
+        secuenciagenoma: str,
+        start: int,
+        end: int,
+        longitud: int
+    ) -> str:
+    """
+    Recorta un rango válido de un genoma circular; si cruza el origen,
+    concatena el final y el principio del genoma.
+    """
+    inicio = start % longitud
+    fin = inicio + _longitud_circular(start, end, longitud)
+    if fin <= longitud:
+        return secuenciagenoma[inicio:fin]
+    return secuenciagenoma[inicio:longitud] + secuenciagenoma[:fin - longitud]
+
+
+def reverso_complementario(secuencias: List[str]) -> List[str]:
+    """
+    Reverso complementario de un lote de secuencias.
+
+    Las secuencias se unen en un único búfer que se complementa con
+    `bytes.translate` y se invierte con un solo recorte, de modo que el
+    costo no depende de llamadas por secuencia. Conserva mayúsculas y
+    minúsculas y los códigos IUPAC.
+
+    Args:
+        secuencias (List[str]): Secuencias ASCII.
+
+    Returns:
+        List[str]: Reversos complementarios, en el mismo orden.
+    """
+    if not secuencias:
+        return []
+    bufer = "\n".join(secuencias).encode("ascii")
+    invertido = bufer.translate(_COMPLEMENTO)[::-1].decode("ascii")
+    return invertido.split("\n")[::-1]
+
+
+def _aplicar_hebras(
+        secuencias: List[Optional[str]],
+        hebras: List[str]
+    ) -> List[str]:
+    """
+    Sustituye las secuencias de la hebra "-" por su reverso complementario
+    y descarta las posiciones None (rangos inválidos).
+    """
+    menos = [i for i, h in enumerate(hebras)
+             if h == "-" and secuencias[i] is not None]
+    if menos:
+        invertidas = reverso_complementario([secuencias[i] for i in menos])
+        for i, secuencia in zip(menos, invertidas):
+            secuencias[i] = secuencia
+    return [s for s in secuencias if s is not None]
+
+
 def extraer_secuencias(
     tf_coordenadas: Dict[str, List[Tuple[int, int]]],
-    secuenciagenoma: str
+    secuenciagenoma: str,
+    estadisticas: Optional[dict] = None,
+    circular: bool = False,
+    composicion=None,
+    tabla=None
 ) -> Dict[str, List[str]]:
     """
     Extrae fragmentos de ADN de la secuencia genómica según coordenadas 
@@ -201,11 +1323,28 @@ def extraer_secuencias(
     totales, válidos e inválidos, y registra advertencias cuando las 
     coordenadas estén fuera de rango.
 
+    Si las tuplas incluyen la hebra (start, end, hebra), las secuencias
+    de la hebra "-" se devuelven como reverso complementario, calculado
+    para todas las del TF a la vez (ver `reverso_complementario`).
+
     Args:
         tf_coordenadas (Dict[str, List[Tuple[int, int]]]):
             Mapa de cada TF a la lista de tuplas (start, end), 
-            índices 0-based.
+            índices 0-based, o (start, end, hebra).
         secuenciagenoma (str): Cadena con la secuencia completa del genoma.
+        estadisticas (Optional[dict]): Contadores acumulados entre
+            llamadas (extracción por lotes). Si se proporciona, el
+            resumen se registra en DEBUG y queda a cargo del llamador.
+        circular (bool): Tratar el genoma como circular: los rangos con
+            start > end o end > longitud se extraen uniendo el final y el
+            principio del genoma, sin duplicarlo en memoria.
+        composicion (Optional[EstadisticasPicos]): Si se proporciona,
+            recibe las coordenadas de cada TF para calcular en la misma
+            pasada la longitud, GC, N y CpG de cada pico válido (ver
+            `estadisticas.EstadisticasPicos`).
+        tabla (Optional[EscritorTabular]): Si se proporciona, recibe los
+            rangos válidos de cada TF y sus secuencias (ver
+            `tabular.EscritorTabular`).
 
     Returns:
         Dict[str, List[str]]: Mapa de cada TF a la lista de secuencias 
@@ -214,11 +1353,11 @@ def extraer_secuencias(
 
     #Inicializar estructuras
     tf_secuencias: Dict[str, List[str]] = {}
-    estadisticas = {
-        'sec_totales': 0,
-        'sec_validos': 0,
-        'sec_invalidos': 0
-    }
+    por_lotes = estadisticas is not None
+    if estadisticas is None:
+        estadisticas = {}
+    for clave in ('sec_totales', 'sec_validos', 'sec_invalidos'):
+        estadisticas.setdefault(clave, 0)
 
     #Longitud del genoma 
     longitud = len(secuenciagenoma)
@@ -226,21 +1365,44 @@ def extraer_secuencias(
     #Extracción de las coordenadas genómicas
     for tf, rangos in tf_coordenadas.items():
         secuencias_tf: List[str] = []
+        validos: List[Tuple[int, int]] = []
+        hebras = None
+        if rangos and len(rangos[0]) > 2:
+            hebras = [rango[2] for rango in rangos]
+            rangos = [(rango[0], rango[1]) for rango in rangos]
         for start, end in rangos:
             #Validación del rango
             estadisticas['sec_totales'] += 1
             if 0 <= start < end <= longitud:
                 secuencias_tf.append(secuenciagenoma[start:end])
                 estadisticas['sec_validos'] += 1
+            elif circular and _longitud_circular(start, end, longitud):
+                secuencias_tf.append(_recorte_circular(
+                    secuenciagenoma, start, end, longitud))
+                estadisticas['sec_validos'] += 1
             else:
                 estadisticas['sec_invalidos'] += 1
                 logger.warning(
                     "%s: coordenadas inválidas (%d, %d)", tf, start, end
                 )
+                if hebras is not None:
+                    # Conservar la posición para alinear con `hebras`
+                    secuencias_tf.append(None)
+                continue
+            if tabla is not None:
+                validos.append((start, end))
+        if hebras is not None:
+            secuencias_tf = _aplicar_hebras(secuencias_tf, hebras)
+        if composicion is not None:
+            composicion.agregar(tf, rangos, circular)
+        if tabla is not None:
+            tabla.agregar(tf, validos, secuencias_tf)
+        progreso.avanzar("picos", len(rangos))
         tf_secuencias[tf] = secuencias_tf
     
     #Resumen de estadpsiticas 
-    logger.info(
+    logger.log(
+        logging.DEBUG if por_lotes else logging.INFO,
         "Extracción completada: totales=%d, válidos=%d, inválidos=%d",
         estadisticas['sec_totales'],
         estadisticas['sec_validos'],
@@ -0,0 +1,293 @@
+"""
+Modo de ejecución en streaming con memoria acotada.
+
+En lugar de materializar todas las secuencias antes de escribir, los
+lotes de coordenadas (un TF, o un bloque del TSV) se extraen y escriben
+conforme se producen y sus secuencias se liberan de inmediato, de modo
+que el pico de memoria es aproximadamente el genoma más un solo lote.
+
+Contiene:
+
+  - estimar_memoria_completa(tf_coordenadas, longitud_genoma) -> int
+    ------------------------------------------------------------
+    Estima los bytes que ocuparía el modo completo (genoma más todas las
+    secuencias extraídas en memoria).
+
+  - estimar_memoria_lectura(peaks_path) -> int
+    ------------------------------------------------------------
+    Estima los bytes del diccionario de coordenadas a partir del tamaño
+    del TSV, sin leerlo completo.
+
+  - ejecutar_concurrente(cargar, producir, consumir, ...)
+    ------------------------------------------------------------
+    Carga el genoma y lee los picos en paralelo (hilos) y consume los
+    lotes de coordenadas conforme llegan, sin esperar a la lectura
+    completa. Devuelve los archivos generados y los tiempos de cada
+    etapa, incluida la latencia hasta el primer archivo, y acumula la
+    duración de cada etapa.
+
+  - cronometrar(duraciones, etapa)
+    ------------------------------------------------------------
+    Contexto que suma a `duraciones[etapa]` los segundos de su bloque.
+
+  - memoria_maxima() -> int
+    ------------------------------------------------------------
+    Devuelve el RSS máximo del proceso en bytes.
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import sys
+import gzip
+import time
+import queue
+import logging
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from .compresion import es_gzip, tamano_sin_comprimir
+except ImportError:
+    from compresion import es_gzip, tamano_sin_comprimir
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Sobrecarga aproximada de CPython por secuencia extraída (objeto str
+# ASCII más su referencia en la lista)
+SOBRECARGA_SECUENCIA = 57
+
+# Bytes aproximados por pico en el diccionario de coordenadas (tupla de
+# dos enteros y su referencia)
+BYTES_POR_COORDENADA = 120
+
+# Marca de fin de la cola productor/consumidor
+_FIN = object()
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+def estimar_memoria_completa(
+        tf_coordenadas: Dict[str, List[Tuple[int, int]]],
+        longitud_genoma: int
+    ) -> int:
+    """
+    Estima la memoria del modo completo: genoma, coordenadas y todas las
+    secuencias extraídas a la vez.
+
+    Args:
+        tf_coordenadas (Dict[str, List[Tuple[int, int]]]):
+            Coordenadas agrupadas por TF.
+        longitud_genoma (int): Longitud del genoma en bases.
+
+    Returns:
+        int: Bytes estimados.
+    """
+    picos = 0
+    bases = 0
+    for rangos in tf_coordenadas.values():
+        picos += len(rangos)
+        # Los picos con start > end cruzan el origen (genoma circular)
+        bases += sum(end - start if end > start
+                     else end + longitud_genoma - start
+                     for start, end, *_ in rangos)
+    return (longitud_genoma + bases + picos * SOBRECARGA_SECUENCIA
+            + picos * BYTES_POR_COORDENADA)
+
+
+def estimar_memoria_lectura(peaks_path: str, muestra: int = 1 << 16) -> int:
+    """
+    Estima la memoria de leer todo el TSV de picos a partir de la
+    longitud media de las primeras líneas (descomprimidas, si el archivo
+    está comprimido).
+
+    Args:
+        peaks_path (str): Ruta al archivo TSV de picos.
+        muestra (int): Bytes iniciales usados para la estimación.
+
+    Returns:
+        int: Bytes estimados para el diccionario de coordenadas.
+    """
+    tamano = tamano_sin_comprimir(peaks_path)
+    abrir = gzip.open if es_gzip(peaks_path) else open
+    with abrir(peaks_path, mode="rb") as arch:
+        bloque = arch.read(muestra)
+    lineas = max(bloque.count(b"\n"), 1)
+    filas = tamano * lineas // max(len(bloque), 1)
+    return filas * BYTES_POR_COORDENADA
+
+
+def memoria_maxima() -> int:
+    """
+    Devuelve el RSS máximo del proceso en bytes, o 0 si la plataforma no
+    dispone del módulo `resource`.
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KiB; macOS, bytes
+    return maximo if sys.platform == "darwin" else maximo * 1024
+
+
+@contextlib.contextmanager
+def cronometrar(duraciones: Dict[str, float], etapa: str) -> Iterator[None]:
+    """
+    Suma a `duraciones[etapa]` los segundos que tarda el bloque, aunque
+    termine con error.
+
+    Args:
+        duraciones (Dict[str, float]): Segundos acumulados por etapa.
+        etapa (str): Nombre de la etapa.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        duraciones[etapa] = (duraciones.get(etapa, 0.0)
+                             + time.perf_counter() - inicio)
+
+
+def ejecutar_concurrente(
+        cargar: Callable[[], str],
+        producir: Callable[[], Iterable[Dict[str, List[Tuple[int, int]]]]],
+        consumir: Callable[[str, Dict[str, List[Tuple[int, int]]]],
+                           List[str]],
+        max_lotes: int = 4,
+        concurrente: bool = True,
+        duraciones: Optional[Dict[str, float]] = None
+    ) -> Tuple[List[str], Dict[str, float]]:
+    """
+    Orquesta carga del genoma, lectura de picos y extracción/escritura.
+
+    `cargar` se ejecuta en un hilo y `producir` en otro; ambos son
+    mayormente E/S y parseo en C, así que se solapan. Los lotes de
+    coordenadas pasan por una cola acotada a `max_lotes` al hilo
+    principal, que los consume en cuanto el genoma está disponible,
+    mientras la lectura de los lotes siguientes continúa.
+
+    Args:
+        cargar (Callable[[], str]): Devuelve la secuencia del genoma.
+        producir (Callable[[], Iterable[Dict]]): Produce lotes de
+            coordenadas por TF.
+        consumir (Callable[[str, Dict], List[str]]): Extrae y escribe un
+            lote; devuelve las rutas generadas.
+        max_lotes (int): Tamaño máximo de la cola de lotes pendientes.
+        concurrente (bool): Si es False, carga el genoma y después
+            consume cada lote en cuanto se produce, en el mismo hilo.
+        duraciones (Optional[Dict[str, float]]): Si se proporciona, se
+            le suman los segundos que cada etapa pasa trabajando, sin
+            las esperas entre hilos: 'genoma' (carga), 'picos' (producir
+            los lotes) y 'extraccion' (consumirlos).
+
+    Returns:
+        Tuple[List[str], Dict[str, float]]: Rutas generadas sin repetir
+            y tiempos en segundos desde el inicio: 'genoma', 'picos',
+            'primer_archivo' y 'total'.
+
+    Raises:
+        Exception: Cualquier error de la carga, la lectura o el consumo
+            se propaga al llamador.
+    """
+    inicio = time.perf_counter()
+    tiempos: Dict[str, float] = {}
+    archivos: Dict[str, None] = {}
+    if duraciones is None:
+        duraciones = {}
+
+    def _marcar(etapa: str) -> None:
+        tiempos.setdefault(etapa, time.perf_counter() - inicio)
+
+    def _cargar():
+        with cronometrar(duraciones, 'genoma'):
+            return cargar()
+
+    def _producir():
+        # Solo cuenta el trabajo de producir cada lote, no la espera a
+        # que el consumidor libere la cola
+        lotes = iter(producir())
+        while True:
+            with cronometrar(duraciones, 'picos'):
+                lote = next(lotes, _FIN)
+            if lote is _FIN:
+                return
+            yield lote
+
+    def _consumir(genoma, lote) -> None:
+        with cronometrar(duraciones, 'extraccion'):
+            rutas = consumir(genoma, lote)
+        if rutas:
+            _marcar('primer_archivo')
+        for ruta in rutas:
+            archivos[ruta] = None
+
+    if not concurrente:
+        genoma = _cargar()
+        _marcar('genoma')
+        # Un lote a la vez, para conservar la memoria acotada de la
+        # lectura por bloques y del modo streaming
+        for lote in _producir():
+            _consumir(genoma, lote)
+        _marcar('picos')
+        _marcar('total')
+        return list(archivos), tiempos
+
+    cola: "queue.Queue" = queue.Queue(maxsize=max_lotes)
+    cancelar = threading.Event()
+
+    def _poner(elemento) -> bool:
+        """Encola sin bloquear indefinidamente si se canceló el consumo."""
+        while not cancelar.is_set():
+            try:
+                cola.put(elemento, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _productor() -> None:
+        try:
+            for lote in _producir():
+                if not _poner(lote):
+                    return
+            _marcar('picos')
+            _poner(_FIN)
+        except BaseException as e:
+            _poner(e)
+
+    with ThreadPoolExecutor(max_workers=2,
+                            thread_name_prefix="pipeline") as ejecutor:
+        fut_genoma = ejecutor.submit(_cargar)
+        fut_genoma.add_done_callback(lambda _: _marcar('genoma'))
+        ejecutor.submit(_productor)
+        try:
+            genoma = fut_genoma.result()
+            while True:
+                lote = cola.get()
+                if lote is _FIN:
+                    break
+                if isinstance(lote, BaseException):
+                    raise lote
+                _consumir(genoma, lote)
+        finally:
+            # Desbloquear al productor si el consumo terminó con error
+            cancelar.set()
+
+    _marcar('total')
+    return list(archivos), tiempos
@@ -0,0 +1,222 @@
+"""
+Reporte periódico del avance y del rendimiento de una ejecución.
+
+Las etapas solo suman a contadores globales con `avanzar` (una suma a un
+diccionario por bloque de filas, por TF o por archivo, nunca por
+elemento), y un hilo en segundo plano los muestrea con un temporizador,
+de modo que el costo del reporte no depende del número de picos.
+
+Contadores:
+  - filas: filas del TSV de picos leídas (`lectura_peaks`,
+    `iterar_peaks`, lectura en paralelo).
+  - picos: picos procesados por `extraer_secuencias`.
+  - bytes: bytes escritos por `escribir_fasta`.
+
+En una terminal se reescribe una línea con filas/s, MB/s y el tiempo
+restante estimado (si se conoce el total de picos); fuera de una
+terminal se emite cada `intervalo` segundos una línea de log estructurada
+`clave=valor`.
+
+Contiene:
+
+  - avanzar(clave, cantidad) -> None
+    ------------------------------------------------------------
+    Suma al contador del reporte activo (no hace nada si no hay uno).
+
+  - fijar_total(clave, total) -> None
+
+  - Progreso(intervalo=30.0, flujo=None, terminal=None)
+    ------------------------------------------------------------
+    Reporte con hilo muestreador: iniciar(), detener(), linea().
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import sys
+import time
+import logging
+import threading
+from typing import IO, Dict, Optional
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Contadores del reporte
+CLAVES = ("filas", "picos", "bytes")
+
+# Segundos entre actualizaciones de la línea en una terminal
+INTERVALO_TERMINAL = 0.5
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+# Reporte activo del proceso (None si no hay ninguno)
+_activo: Optional["Progreso"] = None
+
+def avanzar(clave: str, cantidad: int) -> None:
+    """
+    Suma `cantidad` al contador `clave` del reporte activo.
+
+    Args:
+        clave (str): "filas", "picos" o "bytes".
+        cantidad (int): Incremento.
+    """
+    if _activo is not None:
+        _activo.contadores[clave] += cantidad
+
+
+def fijar_total(clave: str, total: int) -> None:
+    """Total esperado de `clave`, usado para estimar el tiempo restante."""
+    if _activo is not None:
+        _activo.totales[clave] = total
+
+
+def _formatear_cantidad(valor: float) -> str:
+    """1234567 -> '1.2M'."""
+    for divisor, sufijo in ((1e9, "G"), (1e6, "M"), (1e3, "k")):
+        if valor >= divisor:
+            return f"{valor / divisor:.1f}{sufijo}"
+    return f"{valor:.0f}"
+
+
+def _formatear_tiempo(segundos: float) -> str:
+    """3725 -> '1:02:05'."""
+    segundos = int(segundos)
+    return f"{segundos // 3600}:{segundos // 60 % 60:02d}:{segundos % 60:02d}"
+
+# =============================================================================
+# CLASES
+# =============================================================================
+
+class Progreso:
+    """
+    Reporte de avance muestreado por un hilo.
+
+    Args:
+        intervalo (float): Segundos entre líneas de log fuera de una
+            terminal; con 0 solo se acumulan los contadores (p. ej. para
+            `metricas`), sin reportar.
+        flujo (Optional[IO]): Destino de la línea en terminal (default:
+            sys.stderr).
+        terminal (Optional[bool]): Forzar o desactivar el modo terminal;
+            por defecto se detecta con `flujo.isatty()`.
+    """
+
+    def __init__(self, intervalo: float = 30.0, flujo: Optional[IO] = None,
+                 terminal: Optional[bool] = None):
+        self.flujo = flujo if flujo is not None else sys.stderr
+        if terminal is None:
+            terminal = hasattr(self.flujo, "isatty") and self.flujo.isatty()
+        self.terminal = terminal and intervalo > 0
+        self.intervalo = INTERVALO_TERMINAL if self.terminal else intervalo
+        self.contadores: Dict[str, int] = {clave: 0 for clave in CLAVES}
+        self.totales: Dict[str, int] = {}
+        self._inicio = time.perf_counter()
+        self._anterior = (self._inicio, dict(self.contadores))
+        self._parar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def iniciar(self) -> "Progreso":
+        """Activa los contadores globales y arranca el hilo muestreador."""
+        global _activo
+        _activo = self
+        self._inicio = time.perf_counter()
+        self._anterior = (self._inicio, dict(self.contadores))
+        if self.intervalo > 0:
+            self._hilo = threading.Thread(target=self._muestrear,
+                                          name="progreso", daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self) -> None:
+        """Detiene el hilo, emite la línea final y desactiva el reporte."""
+        global _activo
+        self._parar.set()
+        if self._hilo is not None:
+            self._hilo.join()
+        self._reportar(final=True)
+        if _activo is self:
+            _activo = None
+
+    def __enter__(self) -> "Progreso":
+        return self.iniciar()
+
+    def __exit__(self, *excepcion) -> None:
+        self.detener()
+
+    def _muestrear(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self._reportar()
+
+    def metricas(self, promedio: bool = False) -> Dict[str, float]:
+        """
+        Contadores, tasas desde la muestra anterior (o desde el inicio,
+        con `promedio`) y tiempo restante estimado (eta_s, -1 si no se
+        conoce el total de picos).
+        """
+        ahora = time.perf_counter()
+        actuales = dict(self.contadores)
+        momento, previos = self._anterior
+        if promedio:
+            momento, previos = self._inicio, {clave: 0 for clave in CLAVES}
+        self._anterior = (ahora, actuales)
+        lapso = max(ahora - momento, 1e-9)
+        transcurrido = ahora - self._inicio
+
+        metricas: Dict[str, float] = dict(actuales)
+        metricas["transcurrido_s"] = transcurrido
+        metricas["filas_s"] = (actuales["filas"] - previos["filas"]) / lapso
+        metricas["picos_s"] = (actuales["picos"] - previos["picos"]) / lapso
+        metricas["mb_s"] = ((actuales["bytes"] - previos["bytes"])
+                            / lapso / 2**20)
+
+        # Tiempo restante al ritmo medio de extracción de la ejecución
+        total = self.totales.get("picos")
+        metricas["eta_s"] = -1.0
+        if total and actuales["picos"]:
+            ritmo = actuales["picos"] / max(transcurrido, 1e-9)
+            metricas["eta_s"] = max(total - actuales["picos"], 0) / ritmo
+        return metricas
+
+    def linea(self, metricas: Dict[str, float]) -> str:
+        """Texto de la línea de terminal."""
+        total = self.totales.get("picos")
+        picos = _formatear_cantidad(metricas["picos"])
+        if total:
+            picos += f"/{_formatear_cantidad(total)}"
+        eta = (_formatear_tiempo(metricas["eta_s"])
+               if metricas["eta_s"] >= 0 else "?")
+        return (f"filas {_formatear_cantidad(metricas['filas'])} "
+                f"({_formatear_cantidad(metricas['filas_s'])}/s) | "
+                f"picos {picos} | "
+                f"{metricas['bytes'] / 2**20:.1f} MB "
+                f"({metricas['mb_s']:.1f} MB/s) | "
+                f"{_formatear_tiempo(metricas['transcurrido_s'])} "
+                f"ETA {eta}")
+
+    def _reportar(self, final: bool = False) -> None:
+        metricas = self.metricas(promedio=final)
+        if self.terminal:
+            self.flujo.write("\r\033[K" + self.linea(metricas)
+                             + ("\n" if final else ""))
+            self.flujo.flush()
+        elif not final:
+            logger.info(
+                "progreso filas=%d filas_s=%.0f picos=%d picos_s=%.0f "
+                "bytes=%d mb_s=%.2f transcurrido_s=%.1f eta_s=%.0f",
+                metricas["filas"], metricas["filas_s"], metricas["picos"],
+                metricas["picos_s"], metricas["bytes"], metricas["mb_s"],
+                metricas["transcurrido_s"], metricas["eta_s"])
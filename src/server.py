@@ -0,0 +1,303 @@
+"""
+Servidor residente de extracción de secuencias.
+
+Mantiene el genoma (y opcionalmente el índice de picos por TF) cargado
+en memoria y responde solicitudes de extracción por lotes sobre un
+socket de dominio Unix o, si se indica un puerto, sobre TCP en
+localhost. Evita lanzar un `main.py` por consulta y recargar el genoma.
+
+Protocolo (JSON por líneas, una solicitud y una respuesta por línea):
+
+  {"op": "extraer", "regiones": [[start, end], ...]}
+      -> {"ok": true, "secuencias": [...], "invalidas": [i, ...]}
+         Las regiones inválidas devuelven null en su posición.
+  {"op": "tf", "tf": "lexA"}
+      -> {"ok": true, "tf": "lexA", "regiones": [...], "secuencias": [...]}
+  {"op": "estadisticas"}
+      -> {"ok": true, "solicitudes": ..., "latencia_media_ms": ..., ...}
+
+Uso:
+    python server.py -g genoma.fa [-p picos.tsv] --socket /tmp/picos.sock
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import os
+import sys
+import json
+import stat
+import time
+import signal
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .genome import abrir_genoma
+    from .peaks import lectura_peaks, extraer_secuencias
+    from .compresion import GenomaBGZF
+except ImportError:
+    from genome import abrir_genoma
+    from peaks import lectura_peaks, extraer_secuencias
+    from compresion import GenomaBGZF
+
+# =============================================================================
+# CLASES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+# Tamaño máximo de una línea de solicitud (bytes)
+LIMITE_SOLICITUD = 64 * 1024 * 1024
+
+class ServidorExtraccion:
+    """
+    Estado del servidor: genoma, índice opcional de picos y contadores
+    de latencia y rendimiento.
+
+    Args:
+        genoma (str): Secuencia completa del genoma.
+        tf_coordenadas (Optional[Dict[str, List[Tuple[int, int]]]]):
+            Índice de picos por TF para la operación "tf".
+    """
+
+    def __init__(
+            self,
+            genoma: str,
+            tf_coordenadas: Optional[Dict[str, List[Tuple[int, int]]]] = None
+        ):
+        self.genoma = genoma
+        self.tf_coordenadas = tf_coordenadas or {}
+        self.inicio = time.monotonic()
+        self.contadores = {
+            'solicitudes': 0,
+            'errores': 0,
+            'regiones': 0,
+            'bases': 0,
+            'latencia_total_s': 0.0,
+            'latencia_max_s': 0.0,
+        }
+
+    def _extraer(self, regiones: List[Tuple[int, int]]) -> dict:
+        """Extrae las regiones válidas y marca las inválidas con None."""
+        longitud = len(self.genoma)
+        validas = []
+        invalidas = []
+        for i, (start, end) in enumerate(regiones):
+            if 0 <= start < end <= longitud:
+                validas.append((start, end))
+            else:
+                invalidas.append(i)
+        extraidas = iter(
+            extraer_secuencias({"solicitud": validas}, self.genoma, {})
+            ["solicitud"])
+        invalidas_set = set(invalidas)
+        secuencias = [None if i in invalidas_set else next(extraidas)
+                      for i in range(len(regiones))]
+        self.contadores['regiones'] += len(validas)
+        self.contadores['bases'] += sum(e - s for s, e in validas)
+        return {"secuencias": secuencias, "invalidas": invalidas}
+
+    def estadisticas(self) -> dict:
+        """Contadores acumulados con latencia media y rendimiento."""
+        c = self.contadores
+        activo = max(time.monotonic() - self.inicio, 1e-9)
+        atendidas = max(c['solicitudes'], 1)
+        return {
+            'solicitudes': c['solicitudes'],
+            'errores': c['errores'],
+            'regiones': c['regiones'],
+            'bases': c['bases'],
+            'latencia_media_ms': round(
+                1000 * c['latencia_total_s'] / atendidas, 3),
+            'latencia_max_ms': round(1000 * c['latencia_max_s'], 3),
+            'solicitudes_por_s': round(c['solicitudes'] / activo, 3),
+            'regiones_por_s': round(c['regiones'] / activo, 3),
+            'segundos_activo': round(activo, 3),
+        }
+
+    def procesar(self, solicitud: dict) -> dict:
+        """
+        Atiende una solicitud ya decodificada y actualiza los contadores.
+
+        Args:
+            solicitud (dict): Solicitud con la clave "op".
+
+        Returns:
+            dict: Respuesta con "ok" y los datos de la operación, o
+                "ok": False y "error".
+        """
+        inicio = time.perf_counter()
+        try:
+            op = solicitud.get("op", "extraer")
+            if op == "extraer":
+                regiones = [(int(s), int(e))
+                            for s, e in solicitud["regiones"]]
+                respuesta = self._extraer(regiones)
+            elif op == "tf":
+                tf = solicitud["tf"]
+                if tf not in self.tf_coordenadas:
+                    raise KeyError(f"TF desconocido: {tf}")
+                regiones = self.tf_coordenadas[tf]
+                respuesta = self._extraer(regiones)
+                respuesta.update(tf=tf, regiones=regiones)
+            elif op == "estadisticas":
+                return {"ok": True, **self.estadisticas()}
+            else:
+                raise ValueError(f"Operación desconocida: {op}")
+            respuesta["ok"] = True
+        except (KeyError, TypeError, ValueError, OverflowError) as e:
+            self.contadores['errores'] += 1
+            respuesta = {"ok": False, "error": str(e).strip("'\"")}
+
+        latencia = time.perf_counter() - inicio
+        self.contadores['solicitudes'] += 1
+        self.contadores['latencia_total_s'] += latencia
+        self.contadores['latencia_max_s'] = max(
+            self.contadores['latencia_max_s'], latencia)
+        return respuesta
+
+    async def manejar_conexion(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter
+        ) -> None:
+        """Atiende solicitudes JSON por líneas hasta que el cliente cierra."""
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                try:
+                    solicitud = json.loads(linea)
+                    if not isinstance(solicitud, dict):
+                        raise ValueError("La solicitud debe ser un objeto")
+                except ValueError as e:
+                    self.contadores['errores'] += 1
+                    respuesta = {"ok": False,
+                                 "error": f"JSON inválido: {e}"}
+                else:
+                    respuesta = self.procesar(solicitud)
+                writer.write(json.dumps(respuesta).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionResetError, asyncio.LimitOverrunError,
+                ValueError) as e:
+            logger.warning("Conexión cerrada con error: %s", e)
+        finally:
+            writer.close()
+
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+def _es_socket(ruta: str) -> bool:
+    """Indica si `ruta` existe y es un socket."""
+    try:
+        return stat.S_ISSOCK(os.stat(ruta).st_mode)
+    except FileNotFoundError:
+        return False
+
+
+async def servir(
+        servidor: ServidorExtraccion,
+        socket_path: Optional[str] = None,
+        port: Optional[int] = None,
+        listo: Optional[asyncio.Event] = None,
+        detener: Optional[asyncio.Event] = None
+    ) -> None:
+    """
+    Sirve solicitudes hasta que se activa `detener` (o SIGINT/SIGTERM).
+
+    Args:
+        servidor (ServidorExtraccion): Estado del servidor.
+        socket_path (Optional[str]): Ruta del socket Unix.
+        port (Optional[int]): Puerto TCP en 127.0.0.1 (si no hay socket).
+        listo (Optional[asyncio.Event]): Se activa al empezar a escuchar.
+        detener (Optional[asyncio.Event]): Evento de parada.
+
+    Raises:
+        ValueError: Si no se indica ni socket ni puerto.
+        FileExistsError: Si `socket_path` existe y no es un socket.
+    """
+    if detener is None:
+        detener = asyncio.Event()
+        bucle = asyncio.get_running_loop()
+        for senal in (signal.SIGINT, signal.SIGTERM):
+            try:
+                bucle.add_signal_handler(senal, detener.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+    if socket_path:
+        if _es_socket(socket_path):
+            os.remove(socket_path)
+        elif os.path.lexists(socket_path):
+            msg = f"La ruta del socket existe y no es un socket: {socket_path}"
+            logger.error(msg)
+            raise FileExistsError(msg)
+        srv = await asyncio.start_unix_server(
+            servidor.manejar_conexion, path=socket_path,
+            limit=LIMITE_SOLICITUD)
+        destino = socket_path
+    elif port is not None:
+        srv = await asyncio.start_server(
+            servidor.manejar_conexion, host="127.0.0.1", port=port,
+            limit=LIMITE_SOLICITUD)
+        destino = f"127.0.0.1:{port}"
+    else:
+        raise ValueError("Se requiere --socket o --port")
+
+    logger.info("Servidor escuchando en %s", destino)
+    if listo is not None:
+        listo.set()
+    try:
+        async with srv:
+            await detener.wait()
+    finally:
+        if socket_path and _es_socket(socket_path):
+            os.remove(socket_path)
+        logger.info("Servidor detenido: %s", servidor.estadisticas())
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+def main(argv: Optional[List[str]] = None) -> int:
+    try:
+        from .args_config import configurar_argumentos_servidor
+        from .logging_config import configurar_logging
+    except ImportError:
+        from args_config import configurar_argumentos_servidor
+        from logging_config import configurar_logging
+
+    args = configurar_argumentos_servidor().parse_args(argv)
+    logger_raiz = configurar_logging(args.logs, args.verbose)
+
+    genoma = None
+    try:
+        genoma = abrir_genoma(args.genome)
+        coordenadas = lectura_peaks(args.peaks) if args.peaks else None
+        servidor = ServidorExtraccion(genoma, coordenadas)
+        asyncio.run(servir(servidor, args.socket, args.port))
+    except Exception:
+        logger_raiz.exception("Error durante la ejecución del servidor")
+        return 1
+    finally:
+        # Un genoma BGZF mantiene su archivo abierto mientras se sirve
+        if isinstance(genoma, GenomaBGZF):
+            genoma.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
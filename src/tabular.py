@@ -0,0 +1,317 @@
+"""
+Salida columnar (Parquet o Arrow IPC) de las secuencias extraídas.
+
+Alternativa a releer los FASTA para analizarlos con herramientas
+columnares: cada pico válido se escribe como un registro (tf, pico,
+start, end, longitud, secuencia), con `pico` numerado como los registros
+`>TF_pico_<n>` de los FASTA y la secuencia ya orientada según la hebra.
+
+Los registros se acumulan por TF y se escriben en grupos de filas de
+`FILAS_POR_GRUPO` a medida que llegan, sin reunir la tabla completa en
+memoria; si las secuencias pendientes de todos los TF superan
+`BYTES_PENDIENTES`, se vacían todas, de modo que la memoria queda
+acotada aunque ningún TF llegue a un grupo completo (lectura por bloques
+o --max-memory). El conjunto de datos se particiona por TF, un archivo
+por TF en `<outdir>/secuencias/`, de modo que un consumidor lee solo los
+TF y las columnas que necesita (p. ej. `pyarrow.dataset.dataset(ruta,
+format="parquet")` o `pyarrow.memory_map` sobre un `.arrow`). La columna
+`tf` se codifica como diccionario.
+
+Cada archivo se escribe como `<TF>.<ext>.tmp` y se renombra al cerrar el
+escritor, como los FASTA nuevos de `escribir_fasta`. Si cada TF llega
+completo en una sola llamada (lectura sin bloques), su archivo se cierra
+y renombra en cuanto se escribe, de modo que solo hay un archivo abierto
+a la vez aunque haya más TF que descriptores disponibles.
+
+Contiene:
+
+  - abrir_tabla(output_dir, formato="parquet", filas_por_grupo=...,
+                bytes_pendientes=..., completos=False)
+      -> Optional[EscritorTabular]
+    ------------------------------------------------------------
+    Escritor, o None (con una advertencia) si pyarrow no está instalado.
+
+  - EscritorTabular(output_dir, formato="parquet", filas_por_grupo=...,
+                    bytes_pendientes=..., completos=False)
+    ------------------------------------------------------------
+    Escritura en flujo por TF:
+      * agregar(tf, rangos, secuencias) -> None
+      * terminar(tf) -> Optional[str]
+      * cerrar() -> List[str]
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import os
+import logging
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .io_utils import SUFIJO_TEMPORAL
+except ImportError:
+    from io_utils import SUFIJO_TEMPORAL
+
+# pyarrow es opcional y se importa dentro de las funciones
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Columnas de cada registro
+COLUMNAS_TABLA = ["tf", "pico", "start", "end", "longitud", "secuencia"]
+
+# Formatos admitidos y extensión de sus archivos
+EXTENSIONES = {"parquet": "parquet", "arrow": "arrow"}
+
+# Filas por grupo de filas (Parquet) o por lote (Arrow IPC)
+FILAS_POR_GRUPO = 1 << 16
+
+# Bytes de secuencia pendientes (todos los TF) a partir de los cuales se
+# escriben todos los grupos incompletos
+BYTES_PENDIENTES = 8 << 20
+
+# Subdirectorio del conjunto de datos dentro de --outdir
+DIRECTORIO_TABLA = "secuencias"
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+def abrir_tabla(
+        output_dir: str,
+        formato: str = "parquet",
+        filas_por_grupo: int = FILAS_POR_GRUPO,
+        bytes_pendientes: int = BYTES_PENDIENTES,
+        completos: bool = False
+    ) -> Optional["EscritorTabular"]:
+    """
+    Crea el escritor columnar si pyarrow está disponible.
+
+    Args:
+        output_dir (str): Directorio de salida de los FASTA.
+        formato (str): "parquet" o "arrow" (Arrow IPC).
+        filas_por_grupo (int): Filas por grupo de filas.
+        bytes_pendientes (int): Bytes de secuencia pendientes que
+            fuerzan la escritura de todos los grupos incompletos.
+        completos (bool): Cada llamada a `agregar` trae todos los picos
+            de su TF; el archivo del TF se termina al agregarlo.
+
+    Returns:
+        Optional[EscritorTabular]: Escritor, o None si pyarrow no está
+        instalado.
+
+    Raises:
+        ValueError: Si el formato, `filas_por_grupo` o
+            `bytes_pendientes` no son válidos.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.warning("pyarrow no está instalado; se omite la tabla de "
+                       "secuencias")
+        return None
+    return EscritorTabular(output_dir, formato, filas_por_grupo,
+                           bytes_pendientes, completos)
+
+# =============================================================================
+# CLASES
+# =============================================================================
+
+class EscritorTabular:
+    """
+    Escribe los registros de cada TF en su archivo del conjunto de datos
+    por grupos de filas.
+
+    Args:
+        output_dir (str): Directorio de salida de los FASTA; la tabla va
+            en su subdirectorio `secuencias/`.
+        formato (str): "parquet" o "arrow" (Arrow IPC).
+        filas_por_grupo (int): Filas por grupo de filas.
+        bytes_pendientes (int): Bytes de secuencia pendientes, sumando
+            todos los TF, que fuerzan la escritura de todos los grupos
+            incompletos.
+        completos (bool): Cada llamada a `agregar` trae todos los picos
+            de su TF, así que su archivo se cierra y renombra enseguida
+            en lugar de quedar abierto hasta `cerrar`.
+
+    Raises:
+        ValueError: Si el formato, `filas_por_grupo` o
+            `bytes_pendientes` no son válidos.
+    """
+
+    def __init__(self, output_dir: str, formato: str = "parquet",
+                 filas_por_grupo: int = FILAS_POR_GRUPO,
+                 bytes_pendientes: int = BYTES_PENDIENTES,
+                 completos: bool = False):
+        import pyarrow as pa
+
+        if formato not in EXTENSIONES:
+            msg = (f"Formato de tabla inválido '{formato}'; opciones: "
+                   f"{', '.join(EXTENSIONES)}")
+            logger.error(msg)
+            raise ValueError(msg)
+        if filas_por_grupo <= 0 or bytes_pendientes <= 0:
+            msg = (f"filas_por_grupo y bytes_pendientes deben ser "
+                   f"positivos: filas_por_grupo={filas_por_grupo}, "
+                   f"bytes_pendientes={bytes_pendientes}")
+            logger.error(msg)
+            raise ValueError(msg)
+        self.directorio = os.path.join(output_dir, DIRECTORIO_TABLA)
+        self.formato = formato
+        self.filas_por_grupo = filas_por_grupo
+        self.bytes_pendientes = bytes_pendientes
+        self.completos = completos
+        self.esquema = pa.schema([
+            ("tf", pa.dictionary(pa.int32(), pa.string())),
+            ("pico", pa.int64()),
+            ("start", pa.int64()),
+            ("end", pa.int64()),
+            ("longitud", pa.int64()),
+            ("secuencia", pa.string()),
+        ])
+        # Por TF: registros pendientes, escritor abierto y picos escritos
+        self._pendientes: Dict[str, List[Tuple[int, int, str]]] = {}
+        self._bytes = 0
+        self._escritores: Dict[str, tuple] = {}
+        self._archivos: List[str] = []
+        self.contadores: Dict[str, int] = {}
+
+    def _ruta(self, tf: str) -> str:
+        return os.path.join(self.directorio,
+                            f"{tf}.{EXTENSIONES[self.formato]}")
+
+    def _abrir(self, tf: str) -> tuple:
+        """Abre el archivo temporal de un TF; devuelve (escritor, flujo)."""
+        import pyarrow as pa
+
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = self._ruta(tf) + SUFIJO_TEMPORAL
+        if self.formato == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetWriter(temporal, self.esquema), None
+        flujo = pa.OSFile(temporal, "wb")
+        return pa.ipc.new_file(flujo, self.esquema), flujo
+
+    def _vaciar(self, tf: str) -> None:
+        """Escribe los registros pendientes de un TF como un grupo."""
+        import pyarrow as pa
+
+        pendientes = self._pendientes.pop(tf, [])
+        if not pendientes:
+            return
+        previos = self.contadores.get(tf, 0)
+        starts, ends, secuencias = zip(*pendientes)
+        cantidad = len(secuencias)
+        self._bytes -= sum(map(len, secuencias))
+        lote = pa.record_batch([
+            pa.DictionaryArray.from_arrays(
+                pa.array([0] * cantidad, pa.int32()), pa.array([tf])),
+            pa.array(range(previos + 1, previos + cantidad + 1), pa.int64()),
+            pa.array(starts, pa.int64()),
+            pa.array(ends, pa.int64()),
+            pa.array([len(s) for s in secuencias], pa.int64()),
+            pa.array(secuencias, pa.string()),
+        ], schema=self.esquema)
+        try:
+            if tf not in self._escritores:
+                self._escritores[tf] = self._abrir(tf)
+            escritor, _ = self._escritores[tf]
+            if self.formato == "parquet":
+                escritor.write_batch(lote, row_group_size=cantidad)
+            else:
+                escritor.write_batch(lote)
+        except (OSError, pa.ArrowException) as e:
+            msg = f"No se pudo escribir la tabla de '{tf}': {e}"
+            logger.error(msg)
+            raise RuntimeError(msg)
+        self.contadores[tf] = previos + cantidad
+
+    def agregar(self, tf: str, rangos: List[Tuple[int, int]],
+                secuencias: List[str]) -> None:
+        """
+        Acumula los registros de un lote de un TF y escribe los grupos de
+        filas completos; si lo pendiente de todos los TF supera
+        `bytes_pendientes`, escribe también los incompletos.
+
+        Args:
+            tf (str): Nombre del TF.
+            rangos (List[Tuple[int, int]]): (start, end) de los picos
+                válidos, alineados con `secuencias`.
+            secuencias (List[str]): Secuencias extraídas.
+        """
+        pendientes = self._pendientes.setdefault(tf, [])
+        for (start, end, *_), secuencia in zip(rangos, secuencias):
+            pendientes.append((start, end, secuencia))
+            self._bytes += len(secuencia)
+            if len(pendientes) >= self.filas_por_grupo:
+                self._vaciar(tf)
+                pendientes = self._pendientes.setdefault(tf, [])
+        if self.completos:
+            self.terminar(tf)
+        elif self._bytes > self.bytes_pendientes:
+            for otro in list(self._pendientes):
+                self._vaciar(otro)
+
+    def terminar(self, tf: str) -> Optional[str]:
+        """
+        Escribe los registros pendientes de un TF, cierra su archivo y lo
+        renombra a su nombre final. El TF no debe recibir más registros.
+
+        Args:
+            tf (str): Nombre del TF.
+
+        Returns:
+            Optional[str]: Ruta del archivo, o None si el TF no tiene
+                registros.
+
+        Raises:
+            RuntimeError: Si no se puede escribir el archivo.
+        """
+        self._vaciar(tf)
+        if tf not in self._escritores:
+            return None
+        escritor, flujo = self._escritores.pop(tf)
+        ruta = self._ruta(tf)
+        try:
+            escritor.close()
+            if flujo is not None:
+                flujo.close()
+            os.replace(ruta + SUFIJO_TEMPORAL, ruta)
+        except OSError as e:
+            msg = f"No se pudo cerrar la tabla '{ruta}': {e}"
+            logger.error(msg)
+            raise RuntimeError(msg)
+        self._archivos.append(ruta)
+        return ruta
+
+    def cerrar(self) -> List[str]:
+        """
+        Escribe los registros pendientes, cierra los archivos y los
+        renombra a su nombre final.
+
+        Returns:
+            List[str]: Rutas de todos los archivos escritos, incluidos
+                los ya terminados con `terminar`.
+
+        Raises:
+            RuntimeError: Si no se puede escribir un archivo.
+        """
+        for tf in dict.fromkeys([*self._pendientes, *self._escritores]):
+            self.terminar(tf)
+        archivos, self._archivos = self._archivos, []
+        logger.info("Tabla de secuencias: %d picos de %d TF en '%s'",
+                    sum(self.contadores.values()), len(archivos),
+                    self.directorio)
+        return archivos
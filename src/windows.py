@@ -0,0 +1,381 @@
+"""
+Ventanas de ancho fijo centradas en los picos, exportadas como matrices
+de NumPy.
+
+Las herramientas de motivos y los modelos de aprendizaje requieren
+secuencias de la misma longitud. En lugar de escribir FASTA de longitud
+variable, este módulo calcula de forma vectorizada el inicio de la
+ventana de cada pico a partir de un ancla (`Peak_center`, `Peak_start` o
+`Peak_end`) y reúne todas las ventanas de un TF en una matriz contigua
+`(n_picos, ancho)` de uint8 (bytes ASCII), opcionalmente codificada
+one-hot como `(n_picos, ancho, 4)` en el orden A, C, G, T.
+
+Cada TF produce:
+  - `<TF>.npy`: la matriz, que puede abrirse sin copiarla con
+    `numpy.load(ruta, mmap_mode="r")`.
+  - `<TF>.tsv`: metadatos por fila de la matriz (coordenadas del pico,
+    ancla y ventana).
+
+Contiene:
+
+  - lectura_anclas(peaks_path, anchor="center", estadisticas=None,
+                   ..., parser="auto") -> Dict[str, pd.DataFrame]
+    ------------------------------------------------------------
+    Lee y valida el TSV de picos (mismas reglas que `lectura_peaks`) y
+    devuelve, por TF, las coordenadas y el ancla de cada pico válido.
+
+  - extraer_ventanas(genoma, anclas, ancho, circular=False)
+      -> (matriz, validas)
+    ------------------------------------------------------------
+    Reúne las ventanas de ancho fijo de un conjunto de anclas; en un
+    genoma circular, las que cruzan el origen se completan con el
+    principio del genoma.
+
+  - codificar_one_hot(matriz) -> np.ndarray
+
+  - procesar_ventanas(tf_anclas, genoma, output_dir, ancho, ...)
+      -> List[str]
+    ------------------------------------------------------------
+    Extrae y guarda las ventanas y metadatos de cada TF.
+
+Autor:
+    Ashley Yael Montiel Vargas <yaelmont@lcg.unam.mx>
+
+Fecha:
+    29 de mayo de 2025
+
+Versión:
+    1.0
+"""
+# =============================================================================
+# IMPORTS
+# =============================================================================
+from __future__ import annotations
+
+import os
+import time
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+try:
+    from . import peaks
+except ImportError:
+    import peaks
+
+# numpy y pandas se importan dentro de las funciones (arranque rápido)
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# =============================================================================
+# CONSTANTES
+# =============================================================================
+
+# Anclas disponibles y columna del TSV de la que se toman
+ANCLAS = {"center": "Peak_center", "start": "Peak_start", "end": "Peak_end"}
+
+# Orden de las bases en la codificación one-hot
+BASES_ONE_HOT = "ACGT"
+
+# Columnas del archivo de metadatos de cada TF
+COLUMNAS_METADATOS = ["fila", "TF_name", "Peak_start", "Peak_end", "ancla",
+                      "ventana_start", "ventana_end"]
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+logger = logging.getLogger(__name__)
+
+def lectura_anclas(
+        peaks_path: str,
+        anchor: str = "center",
+        estadisticas: Optional[dict] = None,
+        circular: bool = False,
+        hebra: bool = False,
+        filtros: Optional[dict] = None,
+        parser: str = "auto"
+    ) -> Dict[str, pd.DataFrame]:
+    """
+    Lee el TSV de picos y calcula el ancla de cada pico válido.
+
+    Las filas se validan igual que en `lectura_peaks`. Con el ancla
+    "center" se usa `Peak_center`; si la columna no existe o el valor no
+    es numérico, se usa el punto medio entero de `Peak_start` y
+    `Peak_end`.
+
+    Args:
+        peaks_path (str): Ruta al archivo TSV de picos.
+        anchor (str): "center", "start" o "end".
+        estadisticas (Optional[dict]): Si se proporciona, se rellena con
+            los contadores de la lectura.
+        circular (bool): Aceptar picos con start > end (genoma circular);
+            su punto medio se corrige en `procesar_ventanas`, que conoce
+            la longitud del genoma.
+        hebra (bool): Incluir la columna `Strand` ("+" o "-").
+        filtros (Optional[dict]): Filtros de `peaks.crear_filtros`,
+            aplicados como en `lectura_peaks`.
+        parser (str): Motor de `pd.read_csv`: "pyarrow" o "c"; "auto" y
+            "native" usan "c", porque la tabla se lee completa con pandas.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Por TF, en orden de aparición, una tabla
+            con columnas Peak_start, Peak_end y ancla (int64), más Strand
+            si se solicitó y existe.
+
+    Raises:
+        FileNotFoundError: Si `peaks_path` no existe.
+        ValueError: Si el ancla o el parser no son válidos, faltan
+            columnas requeridas o el archivo no se puede leer.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if anchor not in ANCLAS:
+        msg = f"Ancla desconocida '{anchor}'; opciones: {', '.join(ANCLAS)}"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    motor = "pyarrow" if peaks._resolver_parser(parser) == "pyarrow" else "c"
+
+    if estadisticas is None:
+        estadisticas = {}
+    estadisticas.update(peaks._nuevas_estadisticas())
+    peaks._verificar_archivo(peaks_path, estadisticas)
+
+    con_centro = "Peak_center" in peaks._leer_cabecera(peaks_path)
+    hebra = peaks._comprobar_hebra(peaks_path, hebra)
+    enriquecimiento = peaks._comprobar_filtros(peaks_path, filtros)
+    validar = peaks.COLUMNAS_REQUERIDAS + (
+        [peaks.COLUMNA_HEBRA] if hebra else []) + (
+        [peaks.COLUMNA_ENRIQUECIMIENTO] if enriquecimiento else [])
+    columnas = validar + (["Peak_center"] if con_centro else [])
+    try:
+        df = pd.read_csv(peaks_path, sep="\t", usecols=columnas,
+                         dtype={"TF_name": "category"}, engine=motor,
+                         compression=peaks._compresion(peaks_path),
+                         **peaks.OPCIONES_NULOS)
+    except Exception as e:
+        msg = f"No se pudo leer '{peaks_path}': {e}"
+        logger.error(msg)
+        raise ValueError(msg)
+
+    df = peaks._filtrar_tabla(df, estadisticas, filtros)
+    validos = peaks._validar_tabla(df[validar], estadisticas,
+                                   circular=circular)
+    if filtros and "top_n" in filtros:
+        validos = peaks._seleccionar_top_n(validos, estadisticas,
+                                           filtros["top_n"])
+    validos = peaks._muestrear_tabla(validos, estadisticas, filtros)
+    start = validos["Peak_start"].to_numpy()
+    end = validos["Peak_end"].to_numpy()
+    if anchor == "start":
+        ancla = start.copy()
+    elif anchor == "end":
+        ancla = end.copy()
+    else:
+        ancla = (start + end) // 2
+        if con_centro:
+            centro = pd.to_numeric(df.loc[validos.index, "Peak_center"],
+                                   errors="coerce").to_numpy("float64")
+            definidos = np.isfinite(centro)
+            ancla[definidos] = centro[definidos].astype("int64")
+    validos = validos.assign(ancla=ancla)
+
+    tf_anclas: Dict[str, pd.DataFrame] = {}
+    for tf, grupo in validos.groupby("TF_name", sort=False, observed=True):
+        tf_anclas[str(tf)] = grupo.drop(columns="TF_name")
+        logger.debug(f"{tf}: {len(grupo)} picos válidos")
+
+    peaks._registrar_resumen(estadisticas)
+    return tf_anclas
+
+
+def genoma_como_arreglo(genoma: str) -> np.ndarray:
+    """
+    Vista uint8 (bytes ASCII) de la secuencia del genoma. Una vista
+    indexada (`GenomaBGZF`) se descomprime entera.
+    """
+    import numpy as np
+
+    if not isinstance(genoma, str):
+        genoma = genoma[:]
+    return np.frombuffer(genoma.encode("ascii"), dtype=np.uint8)
+
+
+def extraer_ventanas(
+        genoma: np.ndarray,
+        anclas: np.ndarray,
+        ancho: int,
+        circular: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reúne en una matriz las ventanas de ancho fijo alrededor de las anclas.
+
+    La ventana de cada ancla `a` es [a - ancho // 2, a - ancho // 2 +
+    ancho). Las filas se copian de una vista deslizante del genoma, sin
+    construir la matriz de desplazamientos. En modo circular los
+    inicios se toman módulo la longitud del genoma y solo las ventanas
+    que cruzan el origen se reúnen con índices explícitos.
+
+    Args:
+        genoma (np.ndarray): Genoma como arreglo uint8.
+        anclas (np.ndarray): Posiciones (0-based) de las anclas.
+        ancho (int): Ancho de la ventana.
+        circular (bool): Tratar el genoma como circular.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: La matriz `(n_validas, ancho)`
+            uint8 contigua y la máscara booleana de las anclas cuya
+            ventana cabe en el genoma.
+
+    Raises:
+        ValueError: Si `ancho` no es positivo.
+    """
+    import numpy as np
+
+    if ancho <= 0:
+        raise ValueError(f"El ancho de ventana debe ser positivo: {ancho}")
+    longitud = len(genoma)
+    inicios = np.asarray(anclas, dtype="int64") - ancho // 2
+    if circular and ancho <= longitud:
+        inicios = inicios % longitud
+        validas = np.ones(len(inicios), dtype=bool)
+    else:
+        validas = (inicios >= 0) & (inicios + ancho <= longitud)
+    if ancho > longitud or not validas.any():
+        return np.empty((0, ancho), dtype=np.uint8), validas
+    vista = np.lib.stride_tricks.sliding_window_view(genoma, ancho)
+    if not circular:
+        return np.ascontiguousarray(vista[inicios[validas]]), validas
+
+    matriz = np.empty((len(inicios), ancho), dtype=np.uint8)
+    dentro = inicios + ancho <= longitud
+    matriz[dentro] = vista[inicios[dentro]]
+    cruzan = ~dentro
+    if cruzan.any():
+        posiciones = inicios[cruzan, None] + np.arange(ancho)
+        matriz[cruzan] = genoma[posiciones % longitud]
+    return matriz, validas
+
+
+def _anclas_circulares(tabla: pd.DataFrame, longitud: int) -> np.ndarray:
+    """
+    Anclas módulo `longitud`; en los picos con start > end, las anclas
+    fuera del pico se sustituyen por su punto medio circular.
+    """
+    start = tabla["Peak_start"].to_numpy()
+    end = tabla["Peak_end"].to_numpy()
+    ancla = tabla["ancla"].to_numpy().copy()
+    fuera = (start > end) & (ancla < start) & (ancla > end)
+    ancla[fuera] = (start[fuera] + end[fuera] + longitud) // 2
+    return ancla % longitud
+
+
+def codificar_one_hot(matriz: np.ndarray) -> np.ndarray:
+    """
+    Codifica una matriz de bases `(n, ancho)` como `(n, ancho, 4)` uint8
+    en el orden A, C, G, T; cualquier otra base (p. ej. N) queda en cero.
+    """
+    import numpy as np
+
+    tabla = np.zeros((256, len(BASES_ONE_HOT)), dtype=np.uint8)
+    for i, base in enumerate(BASES_ONE_HOT):
+        tabla[ord(base), i] = 1
+        tabla[ord(base.lower()), i] = 1
+    return tabla[matriz]
+
+
+def procesar_ventanas(
+        tf_anclas: Dict[str, pd.DataFrame],
+        genoma: str,
+        output_dir: str = "TF_ventanas",
+        ancho: int = 100,
+        one_hot: bool = False,
+        estadisticas: Optional[dict] = None,
+        circular: bool = False
+    ) -> List[str]:
+    """
+    Extrae las ventanas de cada TF y guarda `<TF>.npy` y `<TF>.tsv`.
+
+    Las ventanas de los picos de la hebra "-" se guardan como reverso
+    complementario, invirtiendo y complementando sus filas de la matriz
+    en un solo paso. Las ventanas que exceden los límites del genoma se
+    omiten con una
+    advertencia; la columna `fila` de los metadatos indica la fila de la
+    matriz que corresponde a cada pico conservado. En modo circular no se
+    omite ninguna: las anclas se toman módulo la longitud del genoma y,
+    en los picos que cruzan el origen, un ancla fuera del pico (el punto
+    medio lineal de start > end) se sustituye por el punto medio
+    circular. `ventana_end` puede entonces exceder la longitud del
+    genoma, como el `end` de un pico que cruza el origen.
+
+    Args:
+        tf_anclas (Dict[str, pd.DataFrame]): Resultado de `lectura_anclas`.
+        genoma (str): Secuencia completa del genoma.
+        output_dir (str): Directorio de salida.
+        ancho (int): Ancho de la ventana.
+        one_hot (bool): Guardar la codificación one-hot en lugar de los
+            bytes ASCII.
+        estadisticas (Optional[dict]): Contadores sec_totales,
+            sec_validos y sec_invalidos, acumulados en sitio.
+        circular (bool): Tratar el genoma como circular.
+
+    Returns:
+        List[str]: Rutas de las matrices `.npy` generadas.
+    """
+    import numpy as np
+
+    if estadisticas is None:
+        estadisticas = {}
+    for clave in ('sec_totales', 'sec_validos', 'sec_invalidos'):
+        estadisticas.setdefault(clave, 0)
+
+    os.makedirs(output_dir, exist_ok=True)
+    arreglo = genoma_como_arreglo(genoma)
+    complemento = np.frombuffer(peaks._COMPLEMENTO, dtype=np.uint8)
+    archivos: List[str] = []
+    inicio = time.perf_counter()
+    for tf, tabla in tf_anclas.items():
+        if circular and len(arreglo):
+            tabla = tabla.assign(
+                ancla=_anclas_circulares(tabla, len(arreglo)))
+        anclas = tabla["ancla"].to_numpy()
+        matriz, validas = extraer_ventanas(arreglo, anclas, ancho, circular)
+        estadisticas['sec_totales'] += len(anclas)
+        estadisticas['sec_validos'] += len(matriz)
+        estadisticas['sec_invalidos'] += len(anclas) - len(matriz)
+        for ancla in anclas[~validas]:
+            inicio_ventana = int(ancla) - ancho // 2
+            logger.warning("%s: ventana fuera del genoma (%d, %d)", tf,
+                           inicio_ventana, inicio_ventana + ancho)
+        if not len(matriz):
+            logger.debug("No hay ventanas válidas para '%s'; se omite.", tf)
+            continue
+
+        if peaks.COLUMNA_HEBRA in tabla.columns:
+            menos = (tabla[peaks.COLUMNA_HEBRA] == "-").to_numpy()[validas]
+            if menos.any():
+                matriz[menos] = complemento[matriz[menos, ::-1]]
+
+        ruta = os.path.join(output_dir, f"{tf}.npy")
+        np.save(ruta, codificar_one_hot(matriz) if one_hot else matriz)
+        conservados = tabla[validas]
+        inicios = conservados["ancla"] - ancho // 2
+        if circular:
+            inicios = inicios % len(arreglo)
+        metadatos = conservados.assign(
+            fila=np.arange(len(conservados)),
+            TF_name=tf,
+            ventana_start=inicios,
+            ventana_end=inicios + ancho)
+        columnas = COLUMNAS_METADATOS + [
+            c for c in (peaks.COLUMNA_HEBRA,) if c in metadatos.columns]
+        metadatos[columnas].to_csv(
+            os.path.join(output_dir, f"{tf}.tsv"), sep="\t", index=False)
+        archivos.append(ruta)
+        logger.debug(f"Archivo creado: {ruta} ({len(matriz)} ventanas)")
+
+    logger.debug("Ventanas de %d bp para %d TF en %.3f s", ancho,
+                 len(tf_anclas), time.perf_counter() - inicio)
+    return archivos
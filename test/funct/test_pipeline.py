@@ -60,6 +60,7 @@ def test_line_length_config(test_data_dir, tmp_path, line_len, expected):
          "--genome", str(genome),
          "--peaks", str(peaks),
          "--outdir", str(tmp_path / "output"),
+         "--logs", str(tmp_path / "logs"),
          "--line_length", str(line_len)],
         capture_output=True,
         text=True
@@ -72,3 +73,77 @@ def test_line_length_config(test_data_dir, tmp_path, line_len, expected):
              if ln and not ln.startswith(">")]
     assert all(len(ln) <= expected for ln in lines)
 
+def test_genoma_inexistente(test_data_dir, tmp_path):
+    """Un genoma que no existe se informa antes de leer los picos."""
+    result = subprocess.run(
+        [sys.executable, str(CLI_SCRIPT),
+         "--genome", str(tmp_path / "no_existe.fa"),
+         "--peaks", str(test_data_dir / "test_peaks.tsv"),
+         "--outdir", str(tmp_path / "output"),
+         "--logs", str(tmp_path / "logs")],
+        capture_output=True,
+        text=True
+    )
+
+    assert result.returncode == 1
+    assert "Archivo de genoma no encontrado" in result.stderr
+    assert not (tmp_path / "output" / "TF1.fa").exists()
+
+
+# Presupuesto de importaciones de un arranque en frío (microsegundos);
+# holgado para máquinas lentas: solo pandas ya suele superar los 250 ms
+PRESUPUESTO_IMPORTS_US = 400_000
+
+def _importaciones(stderr):
+    """Módulos de primer nivel y tiempo acumulado según -X importtime."""
+    modulos, total = set(), 0
+    for linea in stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        # Los módulos de primer nivel llevan un solo espacio de sangría
+        if len(nombre) - len(nombre.lstrip()) == 1:
+            total += int(acumulado)
+        modulos.add(nombre.strip().split(".")[0])
+    return modulos, total
+
+@pytest.mark.parametrize("opciones", [["--help"], []])
+def test_arranque_sin_pandas(test_data_dir, tmp_path, opciones):
+    """--help y una ejecución con un TSV pequeño no importan pandas ni
+    numpy y se mantienen dentro del presupuesto de importaciones."""
+    if not opciones:
+        opciones = ["--genome", str(test_data_dir / "test_genome.fa"),
+                    "--peaks", str(test_data_dir / "test_peaks.tsv"),
+                    "--outdir", str(tmp_path / "output"),
+                    "--logs", str(tmp_path / "logs")]
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", str(CLI_SCRIPT)] + opciones,
+        capture_output=True,
+        text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+    modulos, total = _importaciones(result.stderr)
+    assert "pandas" not in modulos
+    assert "numpy" not in modulos
+    assert total < PRESUPUESTO_IMPORTS_US
+
+def test_metricas_no_escribibles(test_data_dir, tmp_path):
+    """Si las métricas finales no se pueden escribir, la ejecución sigue
+    siendo correcta: los FASTA ya están escritos."""
+    bloqueo = tmp_path / "no_es_directorio"
+    bloqueo.write_text("", encoding="utf-8")
+    result = subprocess.run(
+        [sys.executable, str(CLI_SCRIPT),
+         "--genome", str(test_data_dir / "test_genome.fa"),
+         "--peaks", str(test_data_dir / "test_peaks.tsv"),
+         "--outdir", str(tmp_path / "output"),
+         "--logs", str(tmp_path / "logs"),
+         "--metrics-file", str(bloqueo / "metricas.prom")],
+        capture_output=True,
+        text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "No se publicaron las métricas finales" in result.stderr
+    assert (tmp_path / "output" / "TF1.fa").exists()
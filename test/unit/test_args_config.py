@@ -126,4 +126,35 @@ class TestConfigurarArgumentos:
             assert flag in help_text
         assert "Extrae secuencias FASTA" in help_text
 
+    @pytest.mark.parametrize("valor,esperado", [
+        ("1024", 1024), ("512M", 512 * 2**20), ("2G", 2 * 2**30),
+        ("1.5k", 1536), ("4GB", 4 * 2**30)
+    ])
+    def test_max_memory_unidades(self, valor, esperado):
+        """--max-memory acepta sufijos K, M, G y T."""
+        parser = configurar_argumentos()
+        args = parser.parse_args(["-g", "g.fa", "-p", "p.tsv",
+                                  "--max-memory", valor])
+        assert args.max_memory == esperado
+
+    def test_max_memory_invalido(self):
+        """--max-memory rechaza valores no numéricos."""
+        parser = configurar_argumentos()
+        with pytest.raises(SystemExit):
+            parser.parse_args(["-g", "g.fa", "-p", "p.tsv",
+                               "--max-memory", "mucho"])
 
+    @pytest.mark.parametrize("valor", ["0", "17", "seis"])
+    def test_kmers_fuera_de_rango(self, valor):
+        """--kmers rechaza longitudes fuera de 1-16 al leer los argumentos."""
+        parser = configurar_argumentos()
+        with pytest.raises(SystemExit):
+            parser.parse_args(["-g", "g.fa", "-p", "p.tsv",
+                               "--kmers", "6", valor])
+
+    def test_kmers_validos(self):
+        """--kmers acepta los extremos del rango."""
+        parser = configurar_argumentos()
+        args = parser.parse_args(["-g", "g.fa", "-p", "p.tsv",
+                                  "--kmers", "1", "16"])
+        assert args.kmers == [1, 16]
@@ -0,0 +1,140 @@
+"""
+Pruebas unitarias para el módulo batch.py
+
+Este conjunto de tests cubre:
+  - Lectura de manifiestos y construcción de entradas por glob.
+  - Procesamiento de varios archivos de picos contra un mismo genoma,
+    con errores aislados por entrada (procesar_lote).
+  - Escritura del resumen consolidado y el punto de entrada main().
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import os
+import pytest
+from unittest.mock import patch
+from src.batch import (leer_manifiesto, entradas_desde_glob, procesar_lote,
+                       escribir_resumen, main)
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+CABECERA = "TF_name\tPeak_start\tPeak_end\n"
+
+@pytest.fixture
+def datos_lote(tmp_path):
+    """Crea un genoma y dos archivos de picos con un manifiesto."""
+    genoma = tmp_path / "genoma.fa"
+    genoma.write_text(">chr\n" + "ACGT" * 25 + "\n", encoding="utf-8")
+    (tmp_path / "exp1.tsv").write_text(
+        CABECERA + "TF1\t1\t5\nTF2\t10\t20\n", encoding="utf-8")
+    (tmp_path / "exp2.tsv").write_text(
+        CABECERA + "TF1\t4\t8\nTF1\t9\t3\n", encoding="utf-8")
+    manifiesto = tmp_path / "manifiesto.tsv"
+    manifiesto.write_text(
+        "# entradas\nexp1.tsv\tsalida1\n\nexp2.tsv\n", encoding="utf-8")
+    return tmp_path
+
+
+class TestEntradas:
+    """Pruebas para leer_manifiesto() y entradas_desde_glob()"""
+
+    def test_manifiesto(self, datos_lote):
+        """Resuelve rutas relativas y usa el directorio base por defecto."""
+        entradas = leer_manifiesto(str(datos_lote / "manifiesto.tsv"),
+                                   "base")
+        assert entradas == [
+            (str(datos_lote / "exp1.tsv"), str(datos_lote / "salida1")),
+            (str(datos_lote / "exp2.tsv"), os.path.join("base", "exp2")),
+        ]
+
+    def test_manifiesto_inexistente(self, tmp_path):
+        """Lanza FileNotFoundError si el manifiesto no existe."""
+        with pytest.raises(FileNotFoundError):
+            leer_manifiesto(str(tmp_path / "no.tsv"))
+
+    def test_manifiesto_vacio(self, tmp_path):
+        """Lanza ValueError si el manifiesto no tiene entradas."""
+        vacio = tmp_path / "vacio.tsv"
+        vacio.write_text("# nada\n\n", encoding="utf-8")
+        with pytest.raises(ValueError):
+            leer_manifiesto(str(vacio))
+
+    def test_glob(self, datos_lote):
+        """Cada archivo del patrón obtiene su propio directorio."""
+        entradas = entradas_desde_glob(str(datos_lote / "exp*.tsv"), "out")
+        assert [os.path.basename(p) for p, _ in entradas] == \
+            ["exp1.tsv", "exp2.tsv"]
+        assert entradas[0][1] == os.path.join("out", "exp1")
+
+    def test_glob_comprimido(self, tmp_path):
+        """Quita la extensión de compresión y la del TSV."""
+        (tmp_path / "exp.tsv.gz").write_bytes(b"")
+        entradas = entradas_desde_glob(str(tmp_path / "*.gz"), "out")
+        assert entradas[0][1] == os.path.join("out", "exp")
+
+    def test_glob_sin_coincidencias(self, tmp_path):
+        """Lanza ValueError si el patrón no coincide con nada."""
+        with pytest.raises(ValueError):
+            entradas_desde_glob(str(tmp_path / "*.tsv"))
+
+
+class TestProcesarLote:
+    """Pruebas para procesar_lote() y el punto de entrada."""
+
+    def test_resumen_por_entrada(self, datos_lote):
+        """Cada entrada produce su resumen; los errores no detienen el lote."""
+        genoma = "ACGT" * 25
+        entradas = [
+            (str(datos_lote / "exp1.tsv"), str(datos_lote / "o1")),
+            (str(datos_lote / "falta.tsv"), str(datos_lote / "o2")),
+            (str(datos_lote / "exp2.tsv"), str(datos_lote / "o3")),
+        ]
+        resumenes = procesar_lote(genoma, entradas, workers=2)
+
+        assert [r["estado"] == "ok" for r in resumenes] == \
+            [True, False, True]
+        assert resumenes[0]["picos_validos"] == 2
+        assert resumenes[0]["archivos"] == 2
+        assert resumenes[2]["picos_invalidos"] == 1
+        assert (datos_lote / "o1" / "TF2.fa").exists()
+
+        ruta = datos_lote / "resumen.tsv"
+        escribir_resumen(resumenes, str(ruta))
+        lineas = ruta.read_text(encoding="utf-8").splitlines()
+        assert lineas[0].startswith("peaks\toutdir\testado")
+        assert len(lineas) == 4
+
+    def test_outdir_repetido(self, tmp_path):
+        """Dos entradas con el mismo nombre de archivo no comparten salida."""
+        for sub in ("a", "b"):
+            (tmp_path / sub).mkdir()
+            (tmp_path / sub / "peaks.tsv").write_text(
+                CABECERA + "TF1\t1\t5\n", encoding="utf-8")
+        entradas = entradas_desde_glob(str(tmp_path / "*" / "peaks.tsv"),
+                                       str(tmp_path / "out"))
+        with pytest.raises(ValueError, match="repetido"):
+            procesar_lote("ACGT" * 25, entradas)
+        assert not (tmp_path / "out").exists()
+
+    def test_main_carga_genoma_una_vez(self, datos_lote):
+        """El genoma se carga una sola vez para todo el lote."""
+        from src import batch
+        with patch.object(batch, "cargar_genoma",
+                          wraps=batch.cargar_genoma) as espia:
+            codigo = main([
+                "-g", str(datos_lote / "genoma.fa"),
+                "--glob", str(datos_lote / "exp*.tsv"),
+                "-o", str(datos_lote / "salida"),
+                "--logs", str(datos_lote / "logs"),
+                "--resumen", str(datos_lote / "resumen.tsv"),
+            ])
+        assert codigo == 0
+        assert espia.call_count == 1
+        assert (datos_lote / "salida" / "exp2" / "TF1.fa").exists()
+        assert (datos_lote / "resumen.tsv").exists()
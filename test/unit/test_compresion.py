@@ -0,0 +1,151 @@
+"""
+Pruebas unitarias para el módulo compresion.py
+
+Este conjunto de tests cubre:
+  - Detección de gzip y BGZF por bytes mágicos (es_gzip, es_bgzf).
+  - Tamaño sin comprimir de archivos planos y gzip
+    (tamano_sin_comprimir).
+  - Acceso aleatorio a un FASTA BGZF con índices .fai y .gzi, inflando
+    solo los bloques necesarios (GenomaBGZF, abrir_genoma).
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import gzip
+import zlib
+import random
+import struct
+import pytest
+from src.compresion import (es_gzip, es_bgzf, tamano_sin_comprimir,
+                            GenomaBGZF)
+from src.genome import cargar_genoma, abrir_genoma
+from src.peaks import extraer_secuencias
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+FASTA = ">chr1 cromosoma\nACGTACGTAC\nGTACGTAC\n>chr2\nttttgggg\ncc\n"
+GENOMA = "ACGTACGTACGTACGTACTTTTGGGGCC"
+
+def _bloque_bgzf(datos: bytes) -> bytes:
+    """Comprime `datos` en un bloque BGZF (miembro gzip con extra BC)."""
+    compresor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    cuerpo = compresor.compress(datos) + compresor.flush()
+    tamano = 18 + len(cuerpo) + 8
+    cabecera = (b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff"
+                + struct.pack("<H2sHH", 6, b"BC", 2, tamano - 1))
+    return cabecera + cuerpo + struct.pack("<II", zlib.crc32(datos),
+                                           len(datos))
+
+
+def escribir_bgzf(ruta, texto: str, bytes_bloque: int = 7) -> None:
+    """
+    Escribe `texto` como FASTA BGZF con bloques de `bytes_bloque` bytes
+    sin comprimir, junto con sus índices .gzi y .fai.
+    """
+    datos = texto.encode("ascii")
+    bloques = [datos[i:i + bytes_bloque]
+               for i in range(0, len(datos), bytes_bloque)]
+    comprimido, indice = b"", []
+    for i, bloque in enumerate(bloques):
+        if i:
+            indice.append((len(comprimido), i * bytes_bloque))
+        comprimido += _bloque_bgzf(bloque)
+    ruta.write_bytes(comprimido + _bloque_bgzf(b""))
+    (ruta.parent / (ruta.name + ".gzi")).write_bytes(
+        struct.pack("<Q", len(indice))
+        + b"".join(struct.pack("<QQ", *par) for par in indice))
+
+    # Índice .fai: nombre, longitud, desplazamiento, bases y bytes por línea
+    filas, posicion, registro = [], 0, None
+    for linea in texto.splitlines(keepends=True):
+        if linea.startswith(">"):
+            registro = [linea[1:].split()[0], 0, posicion + len(linea), 0, 0]
+            filas.append(registro)
+        else:
+            registro[1] += len(linea.strip())
+            if not registro[3]:
+                registro[3], registro[4] = len(linea.strip()), len(linea)
+        posicion += len(linea)
+    (ruta.parent / (ruta.name + ".fai")).write_text(
+        "".join("\t".join(map(str, f)) + "\n" for f in filas))
+
+
+@pytest.fixture
+def bgzf(tmp_path):
+    """FASTA de dos registros comprimido con BGZF e indexado."""
+    ruta = tmp_path / "genoma.fa.gz"
+    escribir_bgzf(ruta, FASTA)
+    return ruta
+
+
+class TestDeteccion:
+    """Pruebas para es_gzip(), es_bgzf() y tamano_sin_comprimir()"""
+
+    def test_firmas(self, tmp_path, bgzf):
+        """Distingue texto plano, gzip y BGZF sin mirar la extensión."""
+        plano = tmp_path / "plano.fa"
+        plano.write_text(FASTA)
+        comprimido = tmp_path / "comprimido.fa"
+        comprimido.write_bytes(gzip.compress(FASTA.encode()))
+        assert (es_gzip(str(plano)), es_bgzf(str(plano))) == (False, False)
+        assert (es_gzip(str(comprimido)),
+                es_bgzf(str(comprimido))) == (True, False)
+        assert (es_gzip(str(bgzf)), es_bgzf(str(bgzf))) == (True, True)
+
+    def test_tamano_sin_comprimir(self, tmp_path, bgzf):
+        """Usa el tamaño en disco, el ISIZE de gzip o el .fai."""
+        plano = tmp_path / "plano.fa"
+        plano.write_text(FASTA * 10)
+        comprimido = tmp_path / "comprimido.fa"
+        comprimido.write_bytes(gzip.compress(plano.read_bytes()))
+        assert tamano_sin_comprimir(str(plano)) == len(FASTA) * 10
+        assert tamano_sin_comprimir(str(comprimido)) == len(FASTA) * 10
+        assert tamano_sin_comprimir(str(bgzf)) == len(GENOMA)
+
+
+class TestGenomaBGZF:
+    """Pruebas para GenomaBGZF y abrir_genoma()"""
+
+    def test_igual_que_cargar_genoma(self, bgzf):
+        """Los recortes coinciden con la secuencia cargada entera, también
+        los que cruzan bloques y registros."""
+        genoma = GenomaBGZF(str(bgzf))
+        assert cargar_genoma(str(bgzf)) == GENOMA
+        assert len(genoma) == len(GENOMA)
+        generador = random.Random(0)
+        for _ in range(200):
+            start = generador.randrange(len(GENOMA))
+            end = generador.randrange(start, len(GENOMA) + 1)
+            assert genoma[start:end] == GENOMA[start:end]
+        assert genoma[:] == GENOMA
+        genoma.cerrar()
+
+    def test_infla_solo_bloques_necesarios(self, tmp_path):
+        """Un pico pequeño descomprime solo sus bloques."""
+        ruta = tmp_path / "largo.fa.gz"
+        texto = ">chr\n" + "".join(
+            "ACGT"[i % 4] * 60 + "\n" for i in range(200))
+        escribir_bgzf(ruta, texto, bytes_bloque=1000)
+        genoma = GenomaBGZF(str(ruta))
+        secuencias = extraer_secuencias({"TF1": [(6000, 6100)]}, genoma, {})
+        assert secuencias["TF1"][0] == cargar_genoma(str(ruta))[6000:6100]
+        assert genoma.bloques_inflados <= 2
+
+    def test_abrir_genoma(self, tmp_path, bgzf):
+        """Con índices devuelve la vista BGZF; sin ellos, la cadena."""
+        assert isinstance(abrir_genoma(str(bgzf)), GenomaBGZF)
+        comprimido = tmp_path / "comprimido.fa"
+        comprimido.write_bytes(gzip.compress(FASTA.encode()))
+        assert abrir_genoma(str(comprimido)) == GENOMA
+
+    def test_indice_faltante(self, tmp_path, bgzf):
+        """Sin .gzi lanza FileNotFoundError."""
+        (tmp_path / "genoma.fa.gz.gzi").unlink()
+        with pytest.raises(FileNotFoundError):
+            GenomaBGZF(str(bgzf))
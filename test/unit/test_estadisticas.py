@@ -0,0 +1,89 @@
+"""
+Pruebas unitarias para el módulo estadisticas.py
+
+Este conjunto de tests cubre:
+  - Longitud, GC, N y CpG por pico frente a contar sobre las secuencias
+    extraídas, incluidos picos circulares y de la hebra - (agregar).
+  - Numeración continua entre lotes y escritura por TF (escribir).
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import random
+import pytest
+import pandas as pd
+from src.estadisticas import EstadisticasPicos, COLUMNAS_ESTADISTICAS
+from src.peaks import extraer_secuencias
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+GENOMA = "GATNNCGCGTAACGTTTGCAGC"
+
+
+def _esperado(secuencia):
+    return (len(secuencia),
+            round(100 * (secuencia.count("G") + secuencia.count("C"))
+                  / len(secuencia), 2),
+            secuencia.count("N"), secuencia.count("CG"))
+
+
+class TestEstadisticasPicos:
+    """Pruebas para EstadisticasPicos"""
+
+    def test_igual_que_secuencias(self):
+        """Las estadísticas coinciden con las de las secuencias extraídas,
+        también al cruzar el origen y en la hebra -; los rangos inválidos
+        se omiten como en extraer_secuencias."""
+        rangos = [(0, 6), (6, 14), (13, 14), (20, 3, "+"), (18, 24),
+                  (30, 40), (2, 10, "-")]
+        rangos = [r[:2] + ("+",) if len(r) == 2 else r for r in rangos]
+        composicion = EstadisticasPicos(GENOMA)
+        secuencias = extraer_secuencias({"TF1": rangos}, GENOMA, {},
+                                        circular=True,
+                                        composicion=composicion)["TF1"]
+        tabla = composicion.tabla("TF1")
+        assert list(tabla.columns) == COLUMNAS_ESTADISTICAS
+        assert list(tabla["pico"]) == list(range(1, len(secuencias) + 1))
+        obtenido = list(zip(tabla["longitud"], tabla["gc"], tabla["n"],
+                            tabla["cpg"]))
+        assert obtenido == [_esperado(s) for s in secuencias]
+
+    def test_genoma_aleatorio(self):
+        """Coincide en muchos picos de un genoma aleatorio."""
+        generador = random.Random(2)
+        genoma = "".join(generador.choice("ACGTN") for _ in range(5000))
+        rangos = [(s, s + generador.randint(1, 300))
+                  for s in (generador.randrange(4700) for _ in range(300))]
+        composicion = EstadisticasPicos(genoma)
+        composicion.agregar("TF1", rangos)
+        tabla = composicion.tabla("TF1")
+        assert (list(zip(tabla["longitud"], tabla["gc"], tabla["n"],
+                         tabla["cpg"]))
+                == [_esperado(genoma[s:e]) for s, e in rangos])
+
+    def test_lotes_y_escritura(self, tmp_path, caplog):
+        """La numeración continúa entre lotes; sin pyarrow, parquet se
+        escribe como TSV."""
+        composicion = EstadisticasPicos(GENOMA)
+        composicion.agregar("TF1", [(0, 4)])
+        composicion.agregar("TF2", [(100, 200)])
+        composicion.agregar("TF1", [(5, 9), (1, 3)])
+        archivos = composicion.escribir(str(tmp_path))
+        assert archivos == [str(tmp_path / "TF1.estadisticas.tsv")]
+        tabla = pd.read_csv(archivos[0], sep="\t")
+        assert list(tabla["pico"]) == [1, 2, 3]
+        assert list(tabla["start"]) == [0, 5, 1]
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            assert composicion.escribir(str(tmp_path), "parquet") == archivos
+            assert "pyarrow no está instalado" in caplog.text
+        with pytest.raises(ValueError):
+            composicion.escribir(str(tmp_path), "xlsx")
@@ -0,0 +1,128 @@
+"""
+Pruebas unitarias para el módulo extractor.py
+
+Este conjunto de tests cubre:
+  - Construcción de PeakExtractor desde archivo o cadena.
+  - Caché de archivos de picos por ruta y mtime, con desalojo LRU.
+  - Extracción por región, por TF y completa (extract).
+  - Generación de registros FASTA (iter_fasta).
+  - Cierre del genoma BGZF abierto por el extractor (cerrar, with).
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import os
+import pytest
+from unittest.mock import patch
+from src import PeakExtractor
+from src.io_utils import escribir_fasta
+from src.peaks import lectura_peaks, extraer_secuencias
+from test.unit.test_compresion import escribir_bgzf
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+GENOMA = "ACGTTGCA" * 4
+
+@pytest.fixture
+def picos(tmp_path):
+    """Crea un TSV de picos con dos TFs."""
+    ruta = tmp_path / "picos.tsv"
+    ruta.write_text("TF_name\tPeak_start\tPeak_end\n"
+                    "TF1\t1\t5\nTF2\t8\t16\nTF1\t20\t30\n",
+                    encoding="utf-8")
+    return str(ruta)
+
+
+class TestPeakExtractor:
+    """Pruebas para la clase PeakExtractor"""
+
+    def test_carga_desde_archivo(self, tmp_path):
+        """Carga el genoma una sola vez desde el FASTA."""
+        fasta = tmp_path / "g.fa"
+        fasta.write_text(">chr\n" + GENOMA + "\n", encoding="utf-8")
+        px = PeakExtractor(str(fasta))
+        assert px.genoma == GENOMA
+
+    def test_cierra_genoma_bgzf(self, tmp_path):
+        """Un genoma BGZF abierto por el extractor se cierra al salir del
+        bloque with; uno recibido ya abierto no se cierra."""
+        fasta = tmp_path / "g.fa.gz"
+        escribir_bgzf(fasta, ">chr\n" + GENOMA + "\n")
+        with PeakExtractor(str(fasta)) as px:
+            assert px.extract(region=(0, 8)) == GENOMA[:8]
+        assert px.genoma._arch.closed
+
+        from src.genome import abrir_genoma
+        genoma = abrir_genoma(str(fasta))
+        PeakExtractor(genoma=genoma).cerrar()
+        assert not genoma._arch.closed
+        genoma.cerrar()
+
+    def test_argumentos_invalidos(self):
+        """Requiere exactamente una fuente de genoma."""
+        with pytest.raises(ValueError):
+            PeakExtractor()
+        with pytest.raises(ValueError):
+            PeakExtractor("g.fa", genoma=GENOMA)
+
+    def test_extract_region(self):
+        """Extrae regiones únicas y listas de regiones."""
+        px = PeakExtractor(genoma=GENOMA)
+        assert px.extract(region=(0, 4)) == "ACGT"
+        assert px.extract(region=[(0, 4), (30, 40)]) == ["ACGT", None]
+        with pytest.raises(ValueError):
+            px.extract(region=(30, 40))
+
+    def test_extract_tf_y_todos(self, picos):
+        """Extrae un TF o todos, igual que las funciones libres."""
+        px = PeakExtractor(genoma=GENOMA, peaks_path=picos)
+        esperado = extraer_secuencias(lectura_peaks(picos), GENOMA)
+        assert px.extract(tf="TF1") == esperado["TF1"]
+        assert px.extract() == esperado
+        with pytest.raises(KeyError):
+            px.extract(tf="TF9")
+
+    def test_cache_por_mtime(self, picos):
+        """Reutiliza la lectura y la invalida si el archivo cambia."""
+        px = PeakExtractor(genoma=GENOMA, peaks_path=picos)
+        with patch("src.extractor.lectura_peaks",
+                   wraps=lectura_peaks) as espia:
+            px.extract(tf="TF1")
+            px.extract(tf="TF2")
+            assert espia.call_count == 1
+
+            with open(picos, "a", encoding="utf-8") as arch:
+                arch.write("TF3\t2\t6\n")
+            os.utime(picos, ns=(0, os.stat(picos).st_mtime_ns + 10**9))
+            assert px.extract(tf="TF3") == ["GTTG"]
+            assert espia.call_count == 2
+        assert (px.aciertos, px.fallos) == (1, 2)
+
+    def test_desalojo_lru(self, tmp_path):
+        """Con max_archivos=1, leer otro archivo desaloja el anterior."""
+        rutas = []
+        for i in range(2):
+            ruta = tmp_path / f"p{i}.tsv"
+            ruta.write_text(f"TF_name\tPeak_start\tPeak_end\nTF{i}\t1\t5\n",
+                            encoding="utf-8")
+            rutas.append(str(ruta))
+        px = PeakExtractor(genoma=GENOMA, max_archivos=1)
+        px.coordenadas(rutas[0])
+        px.coordenadas(rutas[1])
+        px.coordenadas(rutas[0])
+        assert px.fallos == 3
+
+    def test_iter_fasta_igual_que_escribir_fasta(self, picos, tmp_path):
+        """Los registros coinciden con los archivos de escribir_fasta."""
+        px = PeakExtractor(genoma=GENOMA, peaks_path=picos)
+        escribir_fasta(px.extract(), str(tmp_path / "out"), 3)
+        for tf in ("TF1", "TF2"):
+            texto = "".join(r for nombre, r in px.iter_fasta(
+                chars_por_linea=3) if nombre == tf)
+            assert texto == (tmp_path / "out" / f"{tf}.fa").read_text()
@@ -0,0 +1,134 @@
+"""
+Pruebas unitarias para el módulo fondo.py
+
+Este conjunto de tests cubre:
+  - Sumas acumuladas de GC y de bases ambiguas (prefijos_gc).
+  - Fondo emparejado por longitud y clase de GC, sin N ni solapamientos
+    y reproducible con la semilla; los picos inválidos no piden fondo
+    (generar_fondo).
+  - Escritura en el formato de escribir_fasta (escribir_fondo).
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import random
+import pytest
+import numpy as np
+from src.fondo import prefijos_gc, generar_fondo, escribir_fondo
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+@pytest.fixture
+def genoma():
+    """Genoma con regiones ricas en AT y en GC y un tramo de N."""
+    generador = random.Random(11)
+    return ("".join(generador.choice("AATTGC") for _ in range(20000))
+            + "N" * 500
+            + "".join(generador.choice("GGCCAT") for _ in range(20000)))
+
+
+def _gc(secuencia):
+    return (secuencia.count("G") + secuencia.count("C")) / len(secuencia)
+
+
+class TestPrefijosGC:
+    """Pruebas para prefijos_gc()"""
+
+    def test_sumas(self):
+        """El GC y las N de un intervalo salen de dos restas."""
+        gc, ambiguas = prefijos_gc("ACGTNNGGca")
+        assert gc[-1] == 5
+        assert gc[4] - gc[1] == 2
+        assert ambiguas[6] - ambiguas[0] == 2
+
+
+class TestGenerarFondo:
+    """Pruebas para generar_fondo() y escribir_fondo()"""
+
+    def test_emparejado(self, genoma):
+        """Cada secuencia de fondo tiene la longitud y la clase de GC de
+        su pico, no tiene N y no se solapa con los picos."""
+        picos = {"TF1": [(100, 300), (25000, 25150), (31000, 31400)]}
+        fondo = generar_fondo(picos, genoma, veces=3, bins_gc=10)
+
+        secuencias = fondo["TF1"]
+        assert len(secuencias) == 9
+        for i, (start, end) in enumerate(picos["TF1"]):
+            clase = min(int(_gc(genoma[start:end]) * 10), 9)
+            for secuencia in secuencias[3 * i:3 * i + 3]:
+                assert len(secuencia) == end - start
+                assert min(int(_gc(secuencia) * 10), 9) == clase
+                assert "N" not in secuencia
+                inicio = genoma.find(secuencia)
+                assert all(inicio + len(secuencia) <= s or inicio >= e
+                           for s, e in picos["TF1"])
+
+    def test_reproducible(self, genoma):
+        """La misma semilla da el mismo fondo sin importar los otros TF;
+        otra semilla da otro."""
+        picos = {"TF1": [(100, 300)], "TF2": [(25000, 25150)]}
+        a = generar_fondo(picos, genoma, veces=2, semilla=1)
+        b = generar_fondo({"TF2": picos["TF2"]}, genoma, veces=2, semilla=1)
+        c = generar_fondo(picos, genoma, veces=2, semilla=2)
+        assert a["TF2"] == b["TF2"]
+        assert a["TF2"] != c["TF2"]
+
+    def test_no_solapados(self):
+        """Con espacio justo, los intervalos de fondo no se solapan."""
+        genoma = "ACGT" * 500
+        fondo = generar_fondo({"TF1": [(0, 100)]}, genoma, veces=10,
+                              bins_gc=1)
+        assert len(fondo["TF1"]) == 10
+        # Genoma periódico: se comprueba con las posiciones sorteadas
+        arreglo = np.zeros(len(genoma), dtype=int)
+        from src import fondo as modulo
+        inicios, longitudes, pedidas = modulo._muestrear_tf(
+            [(0, 100)], prefijos_gc(genoma), 10, 1,
+            np.random.default_rng(0))
+        for s, n in zip(inicios, longitudes):
+            arreglo[s:s + n] += 1
+        assert arreglo.max() == 1 and arreglo[:100].sum() == 0
+        assert pedidas == 10
+
+    def test_pico_circular_ocupado(self):
+        """En un genoma circular, el fondo no se solapa con los dos tramos
+        de un pico que cruza el origen."""
+        genoma = "ACGT" * 50
+        from src import fondo as modulo
+        # El pico (150, 50) ocupa [150, 200) y [0, 50); queda [100, 150)
+        # libre para el fondo del pico (100, 110)
+        inicios, longitudes, pedidas = modulo._muestrear_tf(
+            [(100, 110), (150, 50)], prefijos_gc(genoma), 10, 1,
+            np.random.default_rng(0), circular=True)
+        assert pedidas == 10
+        assert len(inicios) > 0
+        for s, n in zip(inicios.tolist(), longitudes.tolist()):
+            assert 50 <= s and s + n <= 150
+            assert not (s < 110 and 100 < s + n)
+
+    def test_picos_invalidos_sin_advertencia(self, genoma, caplog):
+        """Los picos inválidos no cuentan como secuencias pedidas."""
+        picos = {"TF1": [(100, 300), (300, 100), (0, 10 ** 9)]}
+        fondo = generar_fondo(picos, genoma, veces=2)
+        assert len(fondo["TF1"]) == 2
+        assert "emparejadas" not in caplog.text
+
+    def test_parametros_invalidos(self, genoma):
+        """veces o bins_gc no positivos lanzan ValueError."""
+        with pytest.raises(ValueError):
+            generar_fondo({"TF1": [(0, 10)]}, genoma, veces=0)
+
+    def test_escribir(self, tmp_path, genoma):
+        """Los FASTA de fondo siguen el formato de escribir_fasta."""
+        archivos = escribir_fondo({"TF1": [(100, 300)]}, genoma,
+                                  str(tmp_path), chars_por_linea=60)
+        assert archivos == [str(tmp_path / "fondo" / "TF1.fa")]
+        lineas = (tmp_path / "fondo" / "TF1.fa").read_text().splitlines()
+        assert lineas[0] == ">TF1_pico_1_len=200"
+        assert [len(l) for l in lineas[1:]] == [60, 60, 60, 20]
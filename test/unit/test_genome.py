@@ -13,6 +13,7 @@ funcionalidades.
 # =============================================================================
 import pytest
 import os
+import gzip
 import logging
 from src.genome import cargar_genoma
 
@@ -87,3 +88,21 @@ def test_permission_error(monkeypatch):
     with pytest.raises(ValueError) as e:
         cargar_genoma("dummy.fa")
     assert "Permiso denegado" in str(e.value)
+
+def test_genoma_comprimido(tmp_path):
+    """
+    Descomprime en streaming un FASTA gzip, detectado por su firma.
+    """
+    f = tmp_path / "genoma.fa"
+    f.write_bytes(gzip.compress(b">chr1\nacgt\n>sec\nCCCC\n"))
+    assert cargar_genoma(str(f)) == "ACGTCCCC"
+
+def test_genoma_comprimido_truncado(tmp_path):
+    """
+    Un gzip truncado lanza ValueError.
+    """
+    f = tmp_path / "genoma.fa.gz"
+    f.write_bytes(gzip.compress(b">chr1\n" + b"ACGT" * 1000)[:-20])
+    with pytest.raises(ValueError) as e:
+        cargar_genoma(str(f))
+    assert "Archivo comprimido dañado" in str(e.value)
@@ -9,6 +9,8 @@ escenarios:
   - Omisión cuando no hay secuencias.
   - Formateo de líneas según `chars_por_linea`.
   - Manejo de errores al crear directorios y al escribir archivos.
+  - Escritura atómica y diario de TF terminados para --resume
+    (iniciar_diario, registrar_completados).
 
 Autor: Ashley Yael Montiel Vargas
 Fecha: 2025-05-29
@@ -21,7 +23,8 @@ import os
 import sys
 import logging
 import pytest
-from src.io_utils import escribir_fasta
+from src.io_utils import (escribir_fasta, iniciar_diario,
+                          registrar_completados)
 
 
 # =============================================================================
@@ -136,3 +139,65 @@ class TestEscribirFasta:
             ">TF1_pico_1_len=40",
             ">TF1_pico_2_len=20"
         ]
+
+    def test_escritura_por_lotes(self, tmp_path):
+        """Con contadores, los lotes no contiguos se añaden y numeran."""
+        outdir = tmp_path / "lotes"
+        contadores = {}
+        escribir_fasta({"TF1": ["AAAA"]}, str(outdir), 80, contadores)
+        escribir_fasta({"TF2": ["CCCC"]}, str(outdir), 80, contadores)
+        escribir_fasta({"TF1": ["GGGG", "TT"]}, str(outdir), 80, contadores)
+
+        assert contadores == {"TF1": 3, "TF2": 1}
+        headers = [l.strip() for l in open(outdir / "TF1.fa", encoding="utf-8")
+                   if l.startswith(">")]
+        assert headers == [
+            ">TF1_pico_1_len=4",
+            ">TF1_pico_2_len=4",
+            ">TF1_pico_3_len=2"
+        ]
+
+    def test_escritura_atomica(self, tmp_path, monkeypatch):
+        """Si la escritura falla, el FASTA anterior queda intacto y no se
+        deja un archivo truncado con el nombre final."""
+        outdir = tmp_path / "atomico"
+        escribir_fasta({"TF1": ["AAAA"]}, str(outdir))
+        original = (outdir / "TF1.fa").read_text()
+
+        import src.io_utils as io_utils
+        def falla(*args, **kwargs):
+            raise IOError("disco lleno")
+        monkeypatch.setattr(io_utils, "formatear_registro", falla)
+        with pytest.raises(IOError):
+            escribir_fasta({"TF1": ["CCCC"]}, str(outdir))
+        assert (outdir / "TF1.fa").read_text() == original
+        assert sorted(os.listdir(outdir)) == ["TF1.fa", "TF1.fa.tmp"]
+
+
+class TestDiario:
+    """Pruebas para iniciar_diario() y registrar_completados()."""
+
+    def test_reanudar(self, tmp_path):
+        """Solo cuentan como terminados los TF registrados cuyo FASTA
+        conserva su tamaño; los temporales se eliminan."""
+        outdir = str(tmp_path)
+        contadores = {}
+        escribir_fasta({"TF1": ["AAAA"], "TF2": ["CC", "GG"], "TF3": ["T"]},
+                       outdir, 80, contadores)
+        assert iniciar_diario(outdir) == {}
+        registrar_completados(outdir, ["TF1", "TF2", "TF4"], contadores)
+        with open(tmp_path / "TF2.fa", "a", encoding="utf-8") as arch:
+            arch.write(">TF2_pico_3_len=1\nA\n")
+        (tmp_path / "TF3.fa.tmp").write_text(">TF3_pico_1")
+
+        assert iniciar_diario(outdir, reanudar=True) == {"TF1": 1}
+        assert not (tmp_path / "TF3.fa.tmp").exists()
+
+    def test_ejecucion_nueva_borra_diario(self, tmp_path):
+        """Sin reanudar, el diario anterior se descarta."""
+        outdir = str(tmp_path)
+        contadores = {}
+        escribir_fasta({"TF1": ["AAAA"]}, outdir, 80, contadores)
+        registrar_completados(outdir, contadores, contadores)
+        assert iniciar_diario(outdir) == {}
+        assert iniciar_diario(outdir, reanudar=True) == {}
@@ -0,0 +1,113 @@
+"""
+Pruebas unitarias para el módulo kmers.py
+
+Este conjunto de tests cubre:
+  - Conteo de k-mers (denso y por ordenamiento) frente a un conteo con
+    Counter, con y sin modo canónico (contar_kmers).
+  - Conteo del genoma por bloques solapados (contar_kmers_genoma).
+  - Acumulación por lotes y escritura de conteos y enriquecidos
+    (acumular_kmers, escribir_kmers).
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import random
+from collections import Counter
+import pytest
+import numpy as np
+import pandas as pd
+from src import kmers
+from src.kmers import (contar_kmers, contar_kmers_genoma, decodificar_kmers,
+                       acumular_kmers, escribir_kmers, COLUMNAS_KMERS)
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+def _reverso(kmer):
+    return kmer.translate(str.maketrans("ACGT", "TGCA"))[::-1]
+
+
+def _conteo_ingenuo(secuencias, k, canonico=False):
+    """Conteo de referencia recorriendo las cadenas."""
+    conteo = Counter()
+    for secuencia in secuencias:
+        for i in range(len(secuencia) - k + 1):
+            kmer = secuencia[i:i + k].upper()
+            if set(kmer) <= set("ACGT"):
+                conteo[min(kmer, _reverso(kmer)) if canonico else kmer] += 1
+    return conteo
+
+
+def _como_counter(resultado, k):
+    codigos, conteos = resultado
+    return Counter(dict(zip(decodificar_kmers(codigos, k), conteos.tolist())))
+
+
+@pytest.fixture
+def secuencias():
+    generador = random.Random(3)
+    return ["".join(generador.choice("ACGTNacgt") for _ in range(n))
+            for n in (0, 3, 50, 400, 1200)]
+
+
+class TestContarKmers:
+    """Pruebas para contar_kmers() y contar_kmers_genoma()"""
+
+    @pytest.mark.parametrize("k", [1, 4, 11])
+    @pytest.mark.parametrize("canonico", [False, True])
+    def test_igual_que_conteo_ingenuo(self, secuencias, k, canonico):
+        """Coincide con Counter en el modo denso (k <= 10) y disperso."""
+        resultado = contar_kmers(secuencias, k, canonico)
+        assert np.all(np.diff(resultado[0].astype(np.int64)) > 0)
+        assert (_como_counter(resultado, k)
+                == _conteo_ingenuo(secuencias, k, canonico))
+
+    def test_k_fuera_de_rango(self):
+        """k = 0 o mayor que K_MAXIMO lanza ValueError."""
+        with pytest.raises(ValueError):
+            contar_kmers(["ACGT"], 0)
+        with pytest.raises(ValueError):
+            contar_kmers(["ACGT"], kmers.K_MAXIMO + 1)
+
+    def test_genoma_por_bloques(self, monkeypatch):
+        """Los bloques solapados cuentan cada k-mer del genoma una vez."""
+        generador = random.Random(5)
+        genoma = "".join(generador.choice("ACGT") for _ in range(5000))
+        monkeypatch.setattr(kmers, "BASES_POR_BLOQUE", 333)
+        resultado = contar_kmers_genoma(genoma, 7, canonico=True)
+        assert (_como_counter(resultado, 7)
+                == _conteo_ingenuo([genoma], 7, canonico=True))
+
+
+class TestEscribirKmers:
+    """Pruebas para acumular_kmers() y escribir_kmers()"""
+
+    def test_lotes_y_salida(self, tmp_path):
+        """Los lotes se suman y el k-mer sobrerrepresentado encabeza el
+        TSV de enriquecidos."""
+        generador = random.Random(7)
+        genoma = "".join(generador.choice("ACGT") for _ in range(20000))
+        picos = [genoma[i:i + 30] + "GGGCCC" + genoma[i + 30:i + 60]
+                 for i in range(0, 3000, 100)]
+
+        acumulados = {}
+        acumular_kmers(acumulados, {"TF1": picos[:10]}, [6])
+        acumular_kmers(acumulados, {"TF1": picos[10:], "TF2": []}, [6])
+        esperado = contar_kmers(picos, 6)
+        assert list(acumulados) == ["TF1"]
+        assert np.array_equal(acumulados["TF1"][6][1], esperado[1])
+
+        archivos = escribir_kmers(acumulados, genoma, str(tmp_path), top=5)
+        guardado = np.load(tmp_path / "kmers" / "TF1_k6.npz")
+        assert np.array_equal(guardado["codigos"], esperado[0])
+        tabla = pd.read_csv(tmp_path / "kmers_enriquecidos.tsv", sep="\t")
+        assert list(tabla.columns) == COLUMNAS_KMERS
+        assert len(tabla) == 5
+        assert tabla.loc[0, "kmer"] == "GGGCCC"
+        assert tabla.loc[0, "conteo"] >= len(picos)
+        assert len(archivos) == 2
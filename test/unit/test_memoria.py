@@ -0,0 +1,191 @@
+"""
+Pruebas de regresión de memoria con datos sintéticos.
+
+Cada etapa se ejecuta sobre entradas generadas de tamaño conocido y su
+pico de memoria se compara con un múltiplo del tamaño de la entrada, de
+modo que un cambio que copie de más los datos falle en revisión:
+  - cargar_genoma, lectura_peaks, extraer_secuencias y escribir_fasta,
+    con el pico de `tracemalloc` (Python y numpy).
+  - La tabla columnar con lectura por bloques, que no retiene las
+    secuencias de los bloques anteriores.
+  - El pipeline completo (main.py), con el RSS máximo del proceso hijo
+    descontado el de una ejecución con entradas mínimas en el mismo modo.
+
+Los límites dejan un margen de al menos un tercio sobre lo medido al
+escribirlos.
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import os
+import sys
+import subprocess
+import tracemalloc
+from pathlib import Path
+import numpy as np
+import pytest
+from src.genome import cargar_genoma
+from src.peaks import lectura_peaks, extraer_secuencias
+from src.io_utils import escribir_fasta
+from src.tabular import EscritorTabular
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+CLI_SCRIPT = Path(__file__).parent.parent.parent / "src" / "main.py"
+
+# Tamaño de las entradas sintéticas
+LONGITUD_GENOMA = 4_000_000
+NUMERO_PICOS = 20_000
+
+# Ejecuta main.py e imprime en stderr el RSS máximo (VmHWM, KiB) del
+# proceso; se lee de /proc porque `ru_maxrss` incluye el del proceso padre
+# cuando este es mayor
+LANZADOR = r"""
+import os, sys, runpy
+script = sys.argv[1]
+sys.argv = sys.argv[1:]
+sys.path.insert(0, os.path.dirname(script))
+try:
+    runpy.run_path(script, run_name="__main__")
+finally:
+    with open("/proc/self/status") as estado:
+        for linea in estado:
+            if linea.startswith("VmHWM"):
+                print("VmHWM", linea.split()[1], file=sys.stderr)
+"""
+
+
+def _pico(funcion, *args, **kwargs):
+    """Ejecuta la función y devuelve (resultado, pico de tracemalloc)."""
+    tracemalloc.start()
+    try:
+        resultado = funcion(*args, **kwargs)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, pico
+
+
+@pytest.fixture(scope="module")
+def datos(tmp_path_factory):
+    """Genoma aleatorio en líneas de 60 bases y TSV de picos de 50-300 pb
+    en 20 TF."""
+    directorio = tmp_path_factory.mktemp("memoria")
+    generador = np.random.default_rng(0)
+    bases = np.frombuffer(b"ACGT", dtype=np.uint8)
+    genoma = bases[generador.integers(0, 4, LONGITUD_GENOMA)].tobytes()
+    with open(directorio / "genoma.fa", "wb") as arch:
+        arch.write(b">chr1\n")
+        arch.write(b"\n".join(genoma[i:i + 60]
+                              for i in range(0, LONGITUD_GENOMA, 60)))
+        arch.write(b"\n")
+
+    inicios = generador.integers(0, LONGITUD_GENOMA - 300, NUMERO_PICOS)
+    finales = inicios + generador.integers(50, 300, NUMERO_PICOS)
+    tfs = generador.integers(0, 20, NUMERO_PICOS)
+    with open(directorio / "picos.tsv", "w") as arch:
+        arch.write("TF_name\tPeak_start\tPeak_end\n")
+        arch.writelines(f"TF{t}\t{s}\t{e}\n"
+                        for t, s, e in zip(tfs, inicios, finales))
+
+    # Entradas mínimas para el RSS base del pipeline
+    (directorio / "minimo.fa").write_text(">chr1\nACGTACGT\n")
+    (directorio / "minimo.tsv").write_text(
+        "TF_name\tPeak_start\tPeak_end\nTF1\t0\t4\n")
+    return directorio
+
+
+class TestMemoriaEtapas:
+    """Pico de tracemalloc de cada etapa"""
+
+    def test_cargar_genoma(self, datos):
+        """El genoma cargado cuesta a lo más 4 veces el FASTA."""
+        ruta = datos / "genoma.fa"
+        genoma, pico = _pico(cargar_genoma, str(ruta))
+        assert len(genoma) == LONGITUD_GENOMA
+        assert pico <= 4 * os.path.getsize(ruta)
+
+    def test_lectura_peaks(self, datos):
+        """Las coordenadas cuestan a lo más 10 veces el TSV."""
+        ruta = datos / "picos.tsv"
+        coordenadas, pico = _pico(lectura_peaks, str(ruta))
+        assert sum(map(len, coordenadas.values())) == NUMERO_PICOS
+        assert pico <= 10 * os.path.getsize(ruta)
+
+    def test_extraer_y_escribir(self, datos, tmp_path):
+        """La extracción cuesta a lo más 2 veces las bases extraídas y la
+        escritura es en flujo (a lo más 10% de las bases)."""
+        genoma = cargar_genoma(str(datos / "genoma.fa"))
+        coordenadas = lectura_peaks(str(datos / "picos.tsv"))
+        secuencias, pico = _pico(extraer_secuencias, coordenadas, genoma, {})
+        extraidas = sum(len(s) for lista in secuencias.values()
+                        for s in lista)
+        assert pico <= 2 * extraidas
+
+        archivos, pico = _pico(escribir_fasta, secuencias, str(tmp_path))
+        assert len(archivos) == 20
+        assert pico <= extraidas // 10
+
+    def test_tabla_por_bloques(self, datos, tmp_path):
+        """Con --table y lectura por bloques, lo pendiente de la tabla se
+        acota a `bytes_pendientes` en lugar de crecer con cada bloque."""
+        pytest.importorskip("pyarrow")
+        genoma = cargar_genoma(str(datos / "genoma.fa"))
+        coordenadas = lectura_peaks(str(datos / "picos.tsv"))
+        bloques = [{tf: rangos[i:i + 100] for tf, rangos in
+                    coordenadas.items()} for i in range(0, 1000, 100)]
+        limite = 1 << 18
+        tabla = EscritorTabular(str(tmp_path), bytes_pendientes=limite)
+
+        def procesar():
+            extraidas = 0
+            for bloque in bloques:
+                secuencias = extraer_secuencias(bloque, genoma, {},
+                                                tabla=tabla)
+                extraidas += sum(len(s) for lista in secuencias.values()
+                                 for s in lista)
+                del secuencias
+                assert tabla._bytes <= limite
+            return extraidas
+
+        extraidas, pico = _pico(procesar)
+        tabla.cerrar()
+        # El pico corresponde a un bloque más lo pendiente, no al total
+        assert extraidas > 8 * limite
+        assert pico <= extraidas // 2
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"),
+                    reason="Requiere /proc (Linux)")
+class TestMemoriaPipeline:
+    """RSS máximo del pipeline completo"""
+
+    def _rss(self, genoma, picos, salida, extra):
+        resultado = subprocess.run(
+            [sys.executable, "-c", LANZADOR, str(CLI_SCRIPT),
+             "--genome", str(genoma), "--peaks", str(picos),
+             "--outdir", str(salida), "--logs", str(salida / "logs"),
+             "--progress-interval", "0", *extra],
+            capture_output=True, text=True)
+        assert resultado.returncode == 0, resultado.stderr
+        linea = [l for l in resultado.stderr.splitlines()
+                 if l.startswith("VmHWM")][-1]
+        return int(linea.split()[1]) * 1024
+
+    @pytest.mark.parametrize("extra", [[], ["--chunksize", "5000"]],
+                             ids=["completo", "por_lotes"])
+    def test_pipeline(self, datos, tmp_path, extra):
+        """El RSS por encima de la base es a lo más 5 veces las entradas."""
+        base = self._rss(datos / "minimo.fa", datos / "minimo.tsv",
+                         tmp_path / "minimo", extra)
+        rss = self._rss(datos / "genoma.fa", datos / "picos.tsv",
+                        tmp_path / "salida", extra)
+        entradas = (os.path.getsize(datos / "genoma.fa")
+                    + os.path.getsize(datos / "picos.tsv"))
+        assert rss - base <= 5 * entradas
@@ -0,0 +1,96 @@
+"""
+Pruebas unitarias para el módulo metricas.py
+
+Este conjunto de tests cubre:
+  - Formato de exposición de Prometheus y escape de etiquetas
+    (formatear_metricas).
+  - Escritura atómica sin temporales residuales (escribir_metricas).
+  - Escritura periódica y final con los resultados (EscritorMetricas).
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import io
+import time
+import pytest
+from src.metricas import (EscritorMetricas, escribir_metricas,
+                          formatear_metricas)
+from src.progreso import Progreso, avanzar
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+def _muestras(texto):
+    return {linea.rsplit(" ", 1)[0]: float(linea.rsplit(" ", 1)[1])
+            for linea in texto.splitlines() if not linea.startswith("#")}
+
+
+class TestFormato:
+    """Pruebas para formatear_metricas y escribir_metricas"""
+
+    def test_formato(self):
+        """HELP y TYPE una vez por métrica; etiquetas escapadas."""
+        texto = formatear_metricas([
+            ("etapa_segundos", "Duración.", {"etapa": "genoma"}, 1.5),
+            ("etapa_segundos", "Duración.", {"etapa": 'a"b\\c'}, 2),
+        ])
+        assert texto.splitlines() == [
+            "# HELP extraccion_fasta_etapa_segundos Duración.",
+            "# TYPE extraccion_fasta_etapa_segundos gauge",
+            'extraccion_fasta_etapa_segundos{etapa="genoma"} 1.5',
+            'extraccion_fasta_etapa_segundos{etapa="a\\"b\\\\c"} 2',
+        ]
+
+    def test_escritura_atomica(self, tmp_path):
+        """Se reemplaza el archivo completo sin dejar temporales."""
+        ruta = tmp_path / "prom" / "extraccion.prom"
+        escribir_metricas(str(ruta), [("exito", "Éxito.", {}, 0)])
+        escribir_metricas(str(ruta), [("exito", "Éxito.", {}, 1)])
+        assert _muestras(ruta.read_text()) == {"extraccion_fasta_exito": 1}
+        assert [p.name for p in ruta.parent.iterdir()] == ["extraccion.prom"]
+
+    def test_error_escritura(self, tmp_path):
+        """Un destino no escribible produce RuntimeError."""
+        ruta = tmp_path / "archivo"
+        ruta.write_text("")
+        with pytest.raises(RuntimeError):
+            escribir_metricas(str(ruta / "m.prom"), [])
+
+
+class TestEscritorMetricas:
+    """Pruebas para EscritorMetricas"""
+
+    def test_periodico_y_final(self, tmp_path):
+        """Durante la ejecución se publican los contadores; al final, el
+        éxito, los tiempos por etapa y las estadísticas."""
+        ruta = tmp_path / "m.prom"
+        with Progreso(intervalo=0, flujo=io.StringIO()) as reporte:
+            escritor = EscritorMetricas(str(ruta), reporte, 0.01).iniciar()
+            avanzar("picos", 7)
+            time.sleep(0.1)
+            muestras = _muestras(ruta.read_text())
+            assert muestras["extraccion_fasta_en_curso"] == 1
+            assert muestras["extraccion_fasta_picos_procesados"] == 7
+
+            escritor.escribir_final(
+                True, {"genoma": 0.5, "total": 2.0},
+                {"picos_totales": 10, "picos_validos": 8,
+                 "picos_invalidos": 2},
+                {"sec_validos": 7, "sec_invalidos": 1},
+                {"genoma": 0.5, "fondo": 0.25})
+        muestras = _muestras(ruta.read_text())
+        assert muestras["extraccion_fasta_en_curso"] == 0
+        assert muestras["extraccion_fasta_exito"] == 1
+        assert muestras[
+            'extraccion_fasta_etapa_fin_segundos{etapa="total"}'] == 2
+        assert muestras[
+            'extraccion_fasta_etapa_duracion_segundos{etapa="fondo"}'] == 0.25
+        assert muestras["extraccion_fasta_filas_rechazadas"] == 2
+        assert muestras["extraccion_fasta_picos_extraidos"] == 7
+        assert muestras["extraccion_fasta_rss_maximo_bytes"] > 0
+        assert "extraccion_fasta_filas_filtradas" not in muestras
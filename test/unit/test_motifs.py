@@ -0,0 +1,133 @@
+"""
+Pruebas unitarias para el módulo motifs.py
+
+Este conjunto de tests cubre:
+  - Lectura de consensos IUPAC y PWM en formato JASPAR (leer_motivos).
+  - Autómata Shift-And multi-patrón frente a una búsqueda con
+    expresiones regulares (AutomataIUPAC).
+  - Sitios en ambas hebras, umbral de las PWM y numeración de picos por
+    lotes (escanear_motivos).
+  - Escritura y anexado del TSV de sitios (escribir_sitios).
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import re
+import random
+import pytest
+import numpy as np
+import pandas as pd
+from src.motifs import (leer_motivos, AutomataIUPAC, escanear_motivos,
+                        escribir_sitios, reverso_complementario_iupac,
+                        IUPAC, COLUMNAS_SITIOS)
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+@pytest.fixture
+def archivo_motivos(tmp_path):
+    """Un consenso IUPAC y una PWM JASPAR que prefiere TTA."""
+    ruta = tmp_path / "motivos.txt"
+    ruta.write_text("# motivos de prueba\n"
+                    "caja\tGATNC\n"
+                    ">MA0001.1 tta\n"
+                    "A [ 0 0 9 ]\n"
+                    "C [ 0 0 0 ]\n"
+                    "G [ 0 0 0 ]\n"
+                    "T [ 9 9 0 ]\n", encoding="utf-8")
+    return str(ruta)
+
+
+class TestLeerMotivos:
+    """Pruebas para leer_motivos()"""
+
+    def test_consensos_y_pwm(self, archivo_motivos):
+        """Lee el consenso y convierte la PWM en log-odds (longitud, 4)."""
+        consensos, pwms = leer_motivos(archivo_motivos)
+        assert consensos == [("caja", "GATNC")]
+        nombre, matriz = pwms[0]
+        assert nombre == "tta"
+        assert matriz.shape == (3, 4)
+        assert matriz[0].argmax() == 3 and matriz[2].argmax() == 0
+
+    def test_consenso_invalido(self, tmp_path):
+        """Un consenso con letras no IUPAC lanza ValueError."""
+        ruta = tmp_path / "malo.txt"
+        ruta.write_text("caja\tGAXC\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="línea 1"):
+            leer_motivos(str(ruta))
+
+
+class TestAutomata:
+    """Pruebas para AutomataIUPAC"""
+
+    def test_igual_que_expresiones_regulares(self):
+        """Encuentra los mismos sitios (incluidos los solapados) que una
+        búsqueda por patrón con expresiones regulares."""
+        consensos = [("m1", "GATNC"), ("m2", "RYAAT"), ("m3", "AAA")]
+        automata = AutomataIUPAC(consensos)
+        generador = random.Random(1)
+        secuencia = "".join(generador.choice("ACGTN") for _ in range(3000))
+
+        encontrados = sorted(
+            (automata.patrones[p][0], automata.patrones[p][1], inicio)
+            for p, inicio in automata.buscar(secuencia))
+        esperados = []
+        for nombre, consenso in consensos:
+            for hebra, patron in (("+", consenso), ("-",
+                                  reverso_complementario_iupac(consenso))):
+                regex = "".join(f"[{IUPAC[c]}]" for c in patron)
+                esperados += [(nombre, hebra, m.start()) for m in
+                              re.finditer(f"(?=({regex}))", secuencia)]
+        assert encontrados == sorted(esperados)
+
+
+class TestEscanearMotivos:
+    """Pruebas para escanear_motivos() y escribir_sitios()"""
+
+    def test_ambas_hebras(self, archivo_motivos):
+        """El consenso y la PWM se encuentran en las dos hebras, con la
+        secuencia del sitio en la hebra del motivo."""
+        consensos, pwms = leer_motivos(archivo_motivos)
+        sitios = escanear_motivos({"TF1": ["CCGATACCC", "CTAACGTATC"]},
+                                  consensos, pwms, umbral=0.9)
+        assert ("TF1", 1, "caja", "+", 2, 7, None, "GATAC") in sitios
+        assert ("TF1", 2, "caja", "-", 5, 10, None, "GATAC") in sitios
+        pwm = [s for s in sitios if s[2] == "tta"]
+        assert [(s[1], s[3], s[4], s[7]) for s in pwm] == \
+            [(2, "-", 1, "TTA")]
+        assert pwm[0][6] > 0
+
+    def test_umbral_y_desplazamientos(self, archivo_motivos):
+        """Con umbral 0 toda ventana puntúa; los picos se numeran tras
+        los ya escritos."""
+        _, pwms = leer_motivos(archivo_motivos)
+        sitios = escanear_motivos({"TF1": ["ACGTA"]}, [], pwms, umbral=0,
+                                  desplazamientos={"TF1": 4})
+        assert len(sitios) == 2 * 3
+        assert {s[1] for s in sitios} == {5}
+        with pytest.raises(ValueError):
+            escanear_motivos({"TF1": ["ACGT"]}, [], pwms, umbral=1.5)
+
+    def test_ventanas_con_n_omitidas(self):
+        """Las PWM no puntúan ventanas con N ni entre picos."""
+        matriz = np.zeros((2, 4))
+        sitios = escanear_motivos({"TF1": ["AC", "NG", "T"]}, [],
+                                  [("cero", matriz)], umbral=0)
+        assert sorted((s[1], s[4]) for s in sitios) == [(1, 0), (1, 0)]
+
+    def test_escribir_y_anexar(self, tmp_path):
+        """El TSV tiene cabecera una vez y los lotes se añaden."""
+        ruta = tmp_path / "salida" / "motivos.tsv"
+        sitio = ("TF1", 1, "caja", "+", 2, 7, None, "GATAC")
+        assert escribir_sitios([sitio], str(ruta)) == 1
+        escribir_sitios([sitio], str(ruta), anexar=True)
+        tabla = pd.read_csv(ruta, sep="\t")
+        assert list(tabla.columns) == COLUMNAS_SITIOS
+        assert len(tabla) == 2
+        assert tabla["puntuacion"].isna().all()
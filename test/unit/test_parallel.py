@@ -0,0 +1,227 @@
+"""
+Pruebas unitarias para el módulo parallel.py
+
+Este conjunto de tests cubre:
+  - Reparto equilibrado de TFs entre trabajadores (particionar_tfs).
+  - Acceso al genoma mapeado en memoria (GenomaMapeado).
+  - Equivalencia de la extracción en paralelo con el modo secuencial
+    (extraer_y_escribir_paralelo).
+  - Pool y genoma publicado reutilizados entre lotes, y secuencias
+    devueltas por los trabajadores (PoolExtraccion).
+  - Lectura del TSV por rangos de bytes idéntica a la secuencial
+    (lectura_peaks_paralela).
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import os
+import logging
+import pytest
+from src.parallel import (particionar_tfs, extraer_y_escribir_paralelo,
+                          lectura_peaks_paralela, GenomaMapeado,
+                          PoolExtraccion, _publicar_genoma)
+from src.peaks import lectura_peaks, extraer_secuencias, crear_filtros
+from src.io_utils import escribir_fasta
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+class TestParticionarTFs:
+    """Pruebas para la función particionar_tfs()"""
+
+    def test_equilibrio_por_bases(self):
+        """El TF más pesado queda solo y el resto se agrupa."""
+        coords = {
+            "grande": [(0, 100)],
+            "medio": [(0, 60)],
+            "chico1": [(0, 30)],
+            "chico2": [(0, 30)],
+        }
+        grupos = particionar_tfs(coords, 2)
+        assert sorted(map(sorted, grupos)) == \
+            [["chico1", "chico2", "medio"], ["grande"]]
+
+    def test_mas_partes_que_tfs(self):
+        """No se devuelven grupos vacíos."""
+        grupos = particionar_tfs({"TF1": [(0, 4)]}, 8)
+        assert grupos == [["TF1"]]
+
+
+class TestExtraccionParalela:
+    """Pruebas para la función extraer_y_escribir_paralelo()"""
+
+    @pytest.fixture
+    def genoma(self):
+        """Retorna una secuencia de 64 bases."""
+        return "ACGTTGCA" * 8
+
+    def test_genoma_mapeado(self, genoma):
+        """La vista mapeada se comporta como la cadena original."""
+        ruta = _publicar_genoma(genoma)
+        try:
+            vista = GenomaMapeado(ruta)
+            assert len(vista) == len(genoma)
+            assert vista[3:11] == genoma[3:11]
+            vista.cerrar()
+        finally:
+            os.remove(ruta)
+
+    def test_igual_que_secuencial(self, genoma, tmp_path):
+        """Los FASTA y las estadísticas coinciden con el modo secuencial."""
+        coords = {
+            "TF1": [(0, 8), (10, 30)],
+            "TF2": [(5, 9), (60, 70)],
+            "TF3": [(1, 64)],
+        }
+        secuencial = tmp_path / "secuencial"
+        paralelo = tmp_path / "paralelo"
+        escribir_fasta(extraer_secuencias(coords, genoma), str(secuencial), 7)
+        estadisticas = {}
+        archivos = extraer_y_escribir_paralelo(
+            coords, genoma, str(paralelo), 7, procesos=2,
+            estadisticas=estadisticas)
+
+        assert sorted(os.path.basename(a) for a in archivos) == \
+            ["TF1.fa", "TF2.fa", "TF3.fa"]
+        for nombre in ("TF1.fa", "TF2.fa", "TF3.fa"):
+            assert (secuencial / nombre).read_text() == \
+                (paralelo / nombre).read_text()
+        assert estadisticas == {
+            'sec_totales': 5, 'sec_validos': 4, 'sec_invalidos': 1}
+
+    def test_circular_igual_que_secuencial(self, genoma, tmp_path):
+        """El modo circular extrae los picos que cruzan el origen."""
+        coords = {"TF1": [(60, 4), (62, 70)], "TF2": [(1, 9)]}
+        archivos = extraer_y_escribir_paralelo(
+            coords, genoma, str(tmp_path / "paralelo"), procesos=2,
+            circular=True)
+        escribir_fasta(extraer_secuencias(coords, genoma, circular=True),
+                       str(tmp_path / "secuencial"))
+        assert len(archivos) == 2
+        for nombre in ("TF1.fa", "TF2.fa"):
+            assert (tmp_path / "secuencial" / nombre).read_text() == \
+                (tmp_path / "paralelo" / nombre).read_text()
+        assert "ACGTTGCA"[4:] + "ACGT" in \
+            (tmp_path / "paralelo" / "TF1.fa").read_text()
+
+    def test_contadores_entre_lotes(self, genoma, tmp_path):
+        """Los lotes posteriores continúan la numeración de cada TF."""
+        contadores = {}
+        extraer_y_escribir_paralelo({"TF1": [(0, 4)]}, genoma,
+                                    str(tmp_path), procesos=2,
+                                    contadores=contadores)
+        extraer_y_escribir_paralelo({"TF1": [(4, 8)], "TF2": [(0, 2)]},
+                                    genoma, str(tmp_path), procesos=2,
+                                    contadores=contadores)
+        assert contadores == {"TF1": 2, "TF2": 1}
+        headers = [l for l in (tmp_path / "TF1.fa").read_text().splitlines()
+                   if l.startswith(">")]
+        assert headers == [">TF1_pico_1_len=4", ">TF1_pico_2_len=4"]
+
+    def test_pool_compartido_entre_lotes(self, genoma, tmp_path):
+        """El genoma se publica y el pool se crea una sola vez por
+        ejecución; al cerrar se borra el genoma publicado."""
+        contadores = {}
+        with PoolExtraccion(2, str(tmp_path)) as extraccion:
+            extraccion.extraer_y_escribir({"TF1": [(0, 4)]}, genoma,
+                                          contadores)
+            ruta, pool = extraccion._ruta_genoma, extraccion._pool
+            extraccion.extraer_y_escribir(
+                {"TF1": [(4, 8)], "TF2": [(0, 2)]}, genoma, contadores)
+            assert extraccion._ruta_genoma == ruta
+            assert extraccion._pool is pool
+            assert os.path.exists(ruta)
+        assert not os.path.exists(ruta)
+        assert contadores == {"TF1": 2, "TF2": 1}
+
+    def test_devuelve_secuencias_y_tabla(self, genoma, tmp_path):
+        """Con `secuencias` y `tabla`, los trabajadores devuelven lo mismo
+        que extraer_secuencias, en el orden de los TF del lote."""
+        class Registros(list):
+            def agregar(self, tf, rangos, secuencias):
+                self.append((tf, list(rangos), list(secuencias)))
+
+        coords = {"TF3": [(1, 9, "-")], "TF1": [(0, 8), (70, 80)],
+                  "TF2": [(5, 9)]}
+        esperada = Registros()
+        esperadas = extraer_secuencias(coords, genoma, tabla=esperada)
+
+        tabla, secuencias = Registros(), {}
+        with PoolExtraccion(2, str(tmp_path)) as extraccion:
+            extraccion.extraer_y_escribir(coords, genoma, tabla=tabla,
+                                          secuencias=secuencias)
+        assert list(secuencias) == ["TF3", "TF1", "TF2"]
+        assert secuencias == esperadas
+        assert tabla == esperada
+
+
+class TestLecturaParalela:
+    """Pruebas para la función lectura_peaks_paralela()"""
+
+    @pytest.fixture
+    def archivo_con_errores(self, tmp_path):
+        """TSV con líneas vacías y errores repartidos por el archivo."""
+        filas = ["TF_name\tPeak_start\tPeak_end"]
+        for i in range(60):
+            tf = f"TF{i % 7}"
+            if i % 13 == 5:
+                filas.append(f"{tf}\tabc\t{i + 10}")
+            elif i % 17 == 3:
+                filas.append(f"{tf}\t{i + 50}\t{i + 10}")
+            elif i % 19 == 7:
+                filas.append("")
+            else:
+                filas.append(f"{tf}\t{i * 10 + 1}\t{i * 10 + 50}")
+        ruta = tmp_path / "picos_paralelo.tsv"
+        ruta.write_text("\n".join(filas) + "\n", encoding="utf-8")
+        return str(ruta)
+
+    @pytest.mark.parametrize("procesos", [1, 3])
+    @pytest.mark.parametrize("parser", ["c", "native"])
+    def test_identico_a_secuencial(self, archivo_con_errores, procesos,
+                                   parser, caplog):
+        """Coordenadas, estadísticas y advertencias coinciden."""
+        caplog.set_level(logging.DEBUG)
+        est_serial, est_paralelo = {}, {}
+        serial = lectura_peaks(archivo_con_errores, parser, est_serial)
+        mensajes_serial = [r.getMessage() for r in caplog.records
+                           if r.levelno == logging.WARNING
+                           or "Vacía" in r.getMessage()]
+        caplog.clear()
+
+        paralelo = lectura_peaks_paralela(archivo_con_errores, procesos,
+                                          parser, est_paralelo)
+        mensajes_paralelo = [r.getMessage() for r in caplog.records
+                             if r.levelno == logging.WARNING
+                             or "Vacía" in r.getMessage()]
+
+        assert paralelo == serial
+        assert list(paralelo) == list(serial)
+        assert est_paralelo == est_serial
+        assert mensajes_paralelo == mensajes_serial
+
+    def test_filtros_igual_que_secuencial(self, tmp_path):
+        """Los filtros por rango y el top-N al combinar coinciden con la
+        lectura secuencial."""
+        filas = ["TF_name\tPeak_start\tPeak_end\tMax_Fold_Enrichment"]
+        filas += [f"TF{i % 4}\t{i * 10 + 1}\t{i * 10 + 9}\t{(i * 7) % 11}"
+                  for i in range(80)]
+        ruta = tmp_path / "picos_filtros.tsv"
+        ruta.write_text("\n".join(filas) + "\n", encoding="utf-8")
+        filtros = crear_filtros(["TF1", "TF2"], 3, 5)
+        est_serial, est_paralelo = {}, {}
+        serial = lectura_peaks(str(ruta), "c", est_serial, filtros=filtros)
+        assert lectura_peaks_paralela(str(ruta), 3, "c", est_paralelo,
+                                      filtros=filtros) == serial
+        assert est_paralelo == est_serial
+        assert [len(v) for v in serial.values()] == [5, 5]
+
+    def test_archivo_inexistente(self, tmp_path):
+        """Lanza FileNotFoundError si el archivo no existe."""
+        with pytest.raises(FileNotFoundError):
+            lectura_peaks_paralela(str(tmp_path / "no_existe.tsv"), 2)
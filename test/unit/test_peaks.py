@@ -7,6 +7,10 @@ Este conjunto de tests cubre:
     formato inválido, campos vacíos y archivo vacío.
   - Extracción de secuencias de ADN a partir de coordenadas válidas
     e inválidas (extraer_secuencias).
+  - Filtros de TF, umbral de enriquecimiento y top-N aplicados durante
+    la lectura (crear_filtros).
+  - Muestreo reproducible por TF, por número, fracción o ponderado por
+    enriquecimiento, igual en todas las rutas de lectura.
 
 Autor: Ashley Yael Montiel Vargas
 Fecha: 29-05-2025
@@ -17,10 +21,14 @@ Fecha: 29-05-2025
 # =============================================================================
 import pytest
 import os
+import gzip
+import random
 import logging
 import pandas as pd
 from unittest.mock import patch, mock_open
-from src.peaks import lectura_peaks, extraer_secuencias
+from src.peaks import (lectura_peaks, iterar_peaks, extraer_secuencias,
+                       reverso_complementario, crear_filtros,
+                       _clave_muestreo, _claves_muestreo)
 
 # =============================================================================
 # TEST
@@ -174,9 +182,459 @@ class TestExtraerSecuencias:
         seqs = extraer_secuencias(coords, genoma)
         assert seqs["TF1"] == ["ACGT", genoma[46:50]]
 
+class TestGenomaCircular:
+    """Pruebas del modo circular de lectura_peaks() y extraer_secuencias()"""
 
+    GENOMA = "AACCGGTTAC"
 
+    def test_extraccion_cruzando_el_origen(self):
+        """start > end y end > longitud unen el final y el principio."""
+        coords = {"TF1": [(8, 3), (7, 12), (12, 15), (2, 5)]}
+        seqs = extraer_secuencias(coords, self.GENOMA, circular=True)
+        assert seqs["TF1"] == ["ACAAC", "TACAA", "CCG", "CCG"]
 
+    def test_rangos_invalidos_en_circular(self, caplog):
+        """Se rechazan coordenadas negativas, vacías o más largas que el
+        genoma."""
+        caplog.set_level(logging.WARNING)
+        coords = {"TF1": [(-1, 3), (4, 4), (0, 11), (12, 1)]}
+        estadisticas = {}
+        seqs = extraer_secuencias(coords, self.GENOMA, estadisticas,
+                                  circular=True)
+        assert seqs["TF1"] == []
+        assert estadisticas['sec_invalidos'] == 4
+
+    def test_sin_circular_se_rechaza(self):
+        """Fuera del modo circular el comportamiento no cambia."""
+        seqs = extraer_secuencias({"TF1": [(8, 3), (7, 12)]}, self.GENOMA)
+        assert seqs["TF1"] == []
+
+    @pytest.mark.parametrize("parser", ["auto", "c", "native"])
+    def test_lectura_acepta_start_mayor(self, tmp_path, parser, caplog):
+        """start > end es válido en circular; start == end no."""
+        ruta = tmp_path / "picos.tsv"
+        ruta.write_text("TF_name\tPeak_start\tPeak_end\n"
+                        "TF1\t8\t3\nTF1\t5\t5\nTF2\t1\t4\n",
+                        encoding="utf-8")
+        caplog.set_level(logging.WARNING)
+        assert lectura_peaks(str(ruta), parser) == {"TF2": [(1, 4)]}
+        estadisticas = {}
+        coords = lectura_peaks(str(ruta), parser, estadisticas,
+                               circular=True)
+        assert coords == {"TF1": [(8, 3)], "TF2": [(1, 4)]}
+        assert estadisticas['picos_invalidos'] == 1
+        assert "Fila 3: start ≥ end (5 ≥ 5)" in caplog.text
+
+class TestHebra:
+    """Pruebas de la columna Strand y del reverso complementario"""
+
+    @pytest.fixture
+    def archivo_hebras(self, tmp_path):
+        """TSV con hebras +, -, '.' y una fila inválida."""
+        ruta = tmp_path / "hebras.tsv"
+        ruta.write_text("TF_name\tPeak_start\tPeak_end\tStrand\n"
+                        "TF1\t1\t5\t+\n"
+                        "TF1\t4\t9\t-\n"
+                        "TF2\t2\t6\t.\n"
+                        "TF2\t9\t3\t-\n"
+                        "TF2\t6\t10\t-\n",
+                        encoding="utf-8")
+        return str(ruta)
+
+    def test_reverso_complementario_por_lote(self):
+        """Complementa e invierte cada secuencia del lote."""
+        assert reverso_complementario(["AACG", "", "acgTN", "RYK"]) == \
+            ["CGTT", "", "NAcgt", "MRY"]
+        assert reverso_complementario([]) == []
+
+    @pytest.mark.parametrize("parser", ["auto", "c", "native"])
+    def test_lectura_con_hebra(self, archivo_hebras, parser):
+        """Las tuplas incluyen la hebra normalizada a '+' o '-'."""
+        coords = lectura_peaks(archivo_hebras, parser, hebra=True)
+        assert coords == {"TF1": [(1, 5, "+"), (4, 9, "-")],
+                          "TF2": [(2, 6, "+"), (6, 10, "-")]}
+        assert lectura_peaks(archivo_hebras, parser) == \
+            {"TF1": [(1, 5), (4, 9)], "TF2": [(2, 6), (6, 10)]}
+
+    def test_bloques_con_hebra(self, archivo_hebras):
+        """iterar_peaks también propaga la hebra."""
+        lotes = list(iterar_peaks(archivo_hebras, chunksize=2, hebra=True))
+        assert lotes[0] == {"TF1": [(1, 5, "+"), (4, 9, "-")]}
+
+    def test_columna_ausente(self, tmp_path, caplog):
+        """Sin columna Strand se advierte y se usan pares (start, end)."""
+        ruta = tmp_path / "sin_hebra.tsv"
+        ruta.write_text("TF_name\tPeak_start\tPeak_end\nTF1\t1\t5\n",
+                        encoding="utf-8")
+        caplog.set_level(logging.WARNING)
+        assert lectura_peaks(str(ruta), hebra=True) == {"TF1": [(1, 5)]}
+        assert "Strand" in caplog.text
+
+    def test_extraccion_hebra_menos(self):
+        """Las secuencias de la hebra '-' se invierten y complementan,
+        conservando el orden y omitiendo los rangos inválidos."""
+        genoma = "AACCGGTTAC"
+        coords = {"TF1": [(0, 4, "-"), (2, 6, "+"), (8, 20, "-"),
+                          (6, 10, "-")]}
+        estadisticas = {}
+        seqs = extraer_secuencias(coords, genoma, estadisticas)
+        assert seqs["TF1"] == ["GGTT", "CCGG", "GTAA"]
+        assert estadisticas['sec_invalidos'] == 1
+
+class TestParsers:
+    """Pruebas para los motores de lectura de lectura_peaks()"""
+
+    @pytest.fixture
+    def archivo_completo(self, tmp_path):
+        """TSV con todas las columnas del archivo de uniones."""
+        contenido = (
+            "\tDataset_Ids\tTF_name\tPeak_start\tPeak_end\tPeak_center\t"
+            "Proximal_genes\n"
+            "0\tds1,ds2\taraC\t100.0\t200.0\t150.0\tgenA,genB\n"
+            "1\tds1\tlacI\t50.0\t80.0\t65.0\tgenC\n"
+            "2\tds1,ds2\taraC\t300.0\t420.0\t360.0\tgenD\n"
+            "3\tds3\tlacI\tabc\t90.0\t70.0\tgenE\n"
+        )
+        ruta = tmp_path / "picos_completos.tsv"
+        ruta.write_text(contenido, encoding="utf-8")
+        return str(ruta)
+
+    @pytest.mark.parametrize("parser", ["auto", "c", "native"])
+    def test_resultado_igual_entre_parsers(self, archivo_completo, parser):
+        """Todos los motores producen las mismas coordenadas."""
+        coords = lectura_peaks(archivo_completo, parser=parser)
+        assert list(coords) == ["araC", "lacI"]
+        assert coords["araC"] == [(100, 200), (300, 420)]
+        assert coords["lacI"] == [(50, 80)]
+
+    @pytest.mark.parametrize("parser", ["auto", "c", "native"])
+    def test_tsv_comprimido(self, archivo_completo, parser):
+        """Un TSV gzip se detecta por su firma, aun sin extensión .gz, y
+        produce el mismo resultado que el original."""
+        comprimido = archivo_completo + ".datos"
+        with open(archivo_completo, "rb") as origen, \
+                gzip.open(comprimido, "wb") as destino:
+            destino.write(origen.read())
+        estadisticas, originales = {}, {}
+        assert lectura_peaks(comprimido, parser, estadisticas) == \
+            lectura_peaks(archivo_completo, parser, originales)
+        assert estadisticas == originales
+        unidos = {}
+        for lote in iterar_peaks(comprimido, chunksize=1, parser=parser):
+            for tf, pares in lote.items():
+                unidos.setdefault(tf, []).extend(pares)
+        assert unidos == lectura_peaks(archivo_completo, parser)
+
+    def test_lectura_rapida_igual_a_pandas(self, tmp_path, caplog):
+        """La ruta rápida de "auto" reproduce coordenadas, estadísticas y
+        advertencias del parser "c"."""
+        ruta = tmp_path / "picos_errores.tsv"
+        ruta.write_text(
+            "TF_name\tPeak_start\tPeak_end\n"
+            "araC\t100.7\t200\n"
+            "\n"
+            " lacI \t50\t80\n"
+            "lacI\t\t90\n"
+            "araC\tabc\t10\n"
+            "araC\t-5\t10\n"
+            "lacI\t90\t40\n"
+            "araC\tinf\t10\n"
+            "lacI\t7\n"
+            "araC\t300\t420\n",
+            encoding="utf-8")
+        caplog.set_level(logging.WARNING)
+        resultados = []
+        for parser in ("auto", "c"):
+            caplog.clear()
+            estadisticas = {}
+            coords = lectura_peaks(str(ruta), parser, estadisticas)
+            resultados.append((coords, list(coords), estadisticas,
+                               caplog.messages))
+        assert resultados[0] == resultados[1]
+        assert resultados[0][0] == {"araC": [(100, 200), (300, 420)],
+                                    "lacI": [(50, 80)]}
+
+    def test_na_igual_entre_parsers(self, tmp_path):
+        """"NA" y "nan" se leen igual con todos los motores, con y sin
+        pandas: son nombres de TF y coordenadas con error de formato, no
+        campos vacíos."""
+        ruta = tmp_path / "picos_na.tsv"
+        ruta.write_text(
+            "TF_name\tPeak_start\tPeak_end\n"
+            "NA\t10\t20\n"
+            "araC\tNA\t30\n"
+            "araC\tnan\t30\n"
+            "araC\t40\t50\n",
+            encoding="utf-8")
+        resultados = []
+        for parser in ("auto", "c", "pyarrow", "native"):
+            estadisticas = {}
+            coords = lectura_peaks(str(ruta), parser, estadisticas)
+            resultados.append((coords, estadisticas))
+        assert all(r == resultados[0] for r in resultados)
+        coords, estadisticas = resultados[0]
+        assert coords == {"NA": [(10, 20)], "araC": [(40, 50)]}
+        assert estadisticas['picos_validos'] == 2
+        assert estadisticas['errores']['formato'] == 2
+        assert estadisticas['advertencias']['campos_vacios'] == 0
+
+    @pytest.mark.parametrize("valor", ["NA", "nan", "-nan", " ", ""])
+    def test_nulos_igual_entre_motores(self, tmp_path, valor):
+        """c, pyarrow y native clasifican igual los campos con valores
+        tipo NA, "nan" o solo espacios."""
+        ruta = tmp_path / "picos_nulos.tsv"
+        ruta.write_text(
+            "TF_name\tPeak_start\tPeak_end\n"
+            f"araC\t{valor}\t30\n"
+            f"{valor}\t10\t20\n"
+            "araC\t40\t50\n",
+            encoding="utf-8")
+        resultados = []
+        for parser in ("c", "pyarrow", "native"):
+            estadisticas = {}
+            coords = lectura_peaks(str(ruta), parser, estadisticas)
+            resultados.append((coords, estadisticas))
+        assert resultados[0] == resultados[1] == resultados[2]
+
+    def test_pyarrow_sin_instalar(self, archivo_completo, caplog):
+        """Sin pyarrow se recurre al parser 'c' con una advertencia."""
+        caplog.set_level(logging.WARNING)
+        with patch.dict("sys.modules", {"pyarrow": None}):
+            coords = lectura_peaks(archivo_completo, parser="pyarrow")
+        assert coords["araC"] == [(100, 200), (300, 420)]
+        assert "pyarrow no está instalado" in caplog.text
+
+    def test_parser_desconocido(self, archivo_completo):
+        """Un motor no soportado lanza ValueError."""
+        with pytest.raises(ValueError) as exc:
+            lectura_peaks(archivo_completo, parser="rust")
+        assert "Parser desconocido" in str(exc.value)
+
+    def test_estadisticas_expuestas(self, archivo_completo):
+        """Las estadísticas se devuelven en el diccionario recibido."""
+        estadisticas = {}
+        lectura_peaks(archivo_completo, estadisticas=estadisticas)
+        assert estadisticas['picos_totales'] == 4
+        assert estadisticas['picos_validos'] == 3
+        assert estadisticas['errores']['formato'] == 1
+
+class TestIterarPeaks:
+    """Pruebas para la lectura por bloques iterar_peaks()"""
+
+    @pytest.fixture
+    def archivo_mixto(self, tmp_path):
+        """TSV con TFs no contiguos y una fila inválida."""
+        contenido = (
+            "TF_name\tPeak_start\tPeak_end\n"
+            "TF1\t100\t200\n"
+            "TF2\t150\t250\n"
+            "TF1\t300\t400\n"
+            "TF3\tabc\t10\n"
+            "TF2\t500\t600\n"
+        )
+        ruta = tmp_path / "picos_mixtos.tsv"
+        ruta.write_text(contenido, encoding="utf-8")
+        return str(ruta)
+
+    @pytest.mark.parametrize("parser", ["c", "native"])
+    def test_bloques_equivalen_a_lectura_completa(self, archivo_mixto, parser):
+        """La unión de los lotes coincide con lectura_peaks()."""
+        completo = lectura_peaks(archivo_mixto, parser=parser)
+        unidos = {}
+        for lote in iterar_peaks(archivo_mixto, chunksize=2, parser=parser):
+            for tf, pares in lote.items():
+                unidos.setdefault(tf, []).extend(pares)
+        assert unidos == completo
+
+    @pytest.mark.parametrize("parser", ["c", "native"])
+    def test_estadisticas_y_filas_exactas(self, archivo_mixto, parser, caplog):
+        """Las estadísticas acumuladas y los números de fila son exactos."""
+        caplog.set_level(logging.WARNING)
+        estadisticas = {}
+        lotes = list(iterar_peaks(archivo_mixto, chunksize=2, parser=parser,
+                                  estadisticas=estadisticas))
+        assert len(lotes) == 3
+        assert estadisticas['picos_totales'] == 5
+        assert estadisticas['picos_validos'] == 4
+        assert estadisticas['errores']['formato'] == 1
+        assert "Fila 5: error de formato" in caplog.text
+
+    def test_chunksize_invalido(self, archivo_mixto):
+        """Un tamaño de bloque no positivo lanza ValueError."""
+        with pytest.raises(ValueError):
+            next(iterar_peaks(archivo_mixto, chunksize=0))
+
+
+class TestFiltros:
+    """Pruebas para los filtros de lectura (crear_filtros)"""
+
+    @pytest.fixture
+    def archivo_enriquecimiento(self, tmp_path):
+        """TSV con Max_Fold_Enrichment, un valor ausente y una fila
+        inválida."""
+        contenido = (
+            "TF_name\tPeak_start\tPeak_end\tMax_Fold_Enrichment\n"
+            "TF1\t10\t20\t5.0\n"
+            "TF2\t30\t40\t9.0\n"
+            "TF1\t50\t60\t8.0\n"
+            "TF1\t70\t80\t\n"
+            "TF3\tabc\t10\t7.0\n"
+            "TF1\t90\t95\t8.0\n"
+            "TF2\t100\t110\t1.0\n"
+        )
+        ruta = tmp_path / "picos_enriquecimiento.tsv"
+        ruta.write_text(contenido, encoding="utf-8")
+        return str(ruta)
+
+    @pytest.mark.parametrize("parser", ["auto", "c", "native"])
+    def test_tf_y_umbral(self, archivo_enriquecimiento, parser, caplog):
+        """Los TF no pedidos y los picos bajo el umbral se omiten sin
+        validarse."""
+        caplog.set_level(logging.WARNING)
+        estadisticas = {}
+        coords = lectura_peaks(archivo_enriquecimiento, parser, estadisticas,
+                               filtros=crear_filtros(["TF1", "TF3"], 6))
+        assert coords == {"TF1": [(50, 60), (90, 95)]}
+        assert estadisticas['filtrados'] == {
+            'tf': 2, 'enriquecimiento': 2, 'top_n': 0, 'muestra': 0}
+        assert estadisticas['picos_totales'] == 7
+        assert estadisticas['picos_validos'] == 2
+        assert estadisticas['picos_invalidos'] == 1
+        assert "Fila 6: error de formato" in caplog.text
+
+    @pytest.mark.parametrize("parser", ["auto", "c", "native"])
+    def test_top_n(self, archivo_enriquecimiento, parser):
+        """Conserva los N más enriquecidos de cada TF en su orden original;
+        los empates se resuelven por orden de aparición."""
+        estadisticas = {}
+        coords = lectura_peaks(archivo_enriquecimiento, parser, estadisticas,
+                               filtros=crear_filtros(top_n=1))
+        assert coords == {"TF1": [(50, 60)], "TF2": [(30, 40)]}
+        coords = lectura_peaks(archivo_enriquecimiento, parser,
+                               filtros=crear_filtros(top_n=3))
+        assert coords["TF1"] == [(10, 20), (50, 60), (90, 95)]
+        assert estadisticas['filtrados']['top_n'] == 4
+
+    def test_top_n_por_bloques(self, archivo_enriquecimiento):
+        """Con bloques, el top-N se acumula y se produce al final."""
+        filtros = crear_filtros(top_n=2)
+        lotes = list(iterar_peaks(archivo_enriquecimiento, chunksize=2,
+                                  filtros=filtros))
+        assert lotes == [lectura_peaks(archivo_enriquecimiento, "c",
+                                       filtros=filtros)]
+
+    def test_columna_ausente(self, tmp_path):
+        """Filtrar por enriquecimiento sin la columna lanza ValueError."""
+        ruta = tmp_path / "sin_enriquecimiento.tsv"
+        ruta.write_text("TF_name\tPeak_start\tPeak_end\nTF1\t1\t5\n")
+        with pytest.raises(ValueError, match="Max_Fold_Enrichment"):
+            lectura_peaks(str(ruta), filtros=crear_filtros(top_n=1))
+
+    def test_top_n_invalido(self):
+        """Un top-N no positivo lanza ValueError; sin filtros, None."""
+        with pytest.raises(ValueError):
+            crear_filtros(top_n=0)
+        assert crear_filtros() is None
+
+
+class TestMuestreo:
+    """Pruebas para el muestreo de picos (crear_filtros con muestra)"""
+
+    @pytest.fixture
+    def archivo_grande(self, tmp_path):
+        """TSV de 3 TF con 200 picos cada uno, enriquecimiento aleatorio
+        (algunos ausentes) y una fila inválida."""
+        generador = random.Random(0)
+        filas = ["TF_name\tPeak_start\tPeak_end\tMax_Fold_Enrichment"]
+        for i in range(600):
+            inicio = generador.randrange(1, 10_000)
+            valor = ("" if i % 50 == 0
+                     else f"{generador.uniform(0.5, 20):.3f}")
+            filas.append(f"TF{i % 3}\t{inicio}\t{inicio + 100}\t{valor}")
+        filas.append("TF1\tabc\t10\t3.0")
+        ruta = tmp_path / "picos_muestreo.tsv"
+        ruta.write_text("\n".join(filas) + "\n", encoding="utf-8")
+        return str(ruta)
+
+    def test_claves(self, archivo_grande):
+        """Las claves vectorizadas coinciden con las escalares."""
+        tabla = pd.read_csv(archivo_grande, sep="\t").iloc[:-1]
+        tabla[["Peak_start", "Peak_end"]] = tabla[
+            ["Peak_start", "Peak_end"]].astype("int64")
+        claves = _claves_muestreo(tabla, 7)
+        assert list(claves) == [
+            _clave_muestreo(tf, int(s), int(e), 7) for tf, s, e in zip(
+                tabla["TF_name"], tabla["Peak_start"], tabla["Peak_end"])]
+        assert 0 < claves.min() and claves.max() < 1
+
+    @pytest.mark.parametrize("ponderar", [False, True])
+    def test_muestra_reproducible(self, archivo_grande, ponderar):
+        """N picos por TF, en su orden original, iguales con todos los
+        parsers y por bloques; otra semilla da otra muestra."""
+        completo = lectura_peaks(archivo_grande, "c")
+        filtros = crear_filtros(muestra=20, semilla=3, ponderar=ponderar)
+        estadisticas = {}
+        coords = lectura_peaks(archivo_grande, "auto", estadisticas,
+                               filtros=filtros)
+        assert {tf: len(r) for tf, r in coords.items()} == {
+            "TF0": 20, "TF1": 20, "TF2": 20}
+        for tf, rangos in coords.items():
+            posiciones = [completo[tf].index(r) for r in rangos]
+            assert posiciones == sorted(posiciones)
+        assert estadisticas['filtrados']['muestra'] == 600 - 60
+        assert estadisticas['picos_validos'] == 60
+
+        for parser in ("c", "native"):
+            assert lectura_peaks(archivo_grande, parser,
+                                 filtros=filtros) == coords
+        lotes = list(iterar_peaks(archivo_grande, chunksize=64,
+                                  filtros=filtros))
+        assert lotes == [coords]
+        assert lectura_peaks(archivo_grande, filtros=crear_filtros(
+            muestra=20, semilla=4, ponderar=ponderar)) != coords
+
+    def test_ponderado(self, archivo_grande):
+        """Ponderando, los picos sin enriquecimiento no se eligen mientras
+        haya otros y el enriquecimiento medio elegido sube."""
+        tabla = pd.read_csv(archivo_grande, sep="\t").iloc[:-1]
+        valores = {(tf, int(s), int(e)): v for tf, s, e, v
+                   in tabla.itertuples(index=False)}
+
+        def elegidos(ponderar):
+            coords = lectura_peaks(archivo_grande, filtros=crear_filtros(
+                muestra=50, semilla=1, ponderar=ponderar))
+            return [valores[(tf, s, e)] for tf, rangos in coords.items()
+                    for s, e in rangos]
 
+        ponderados = elegidos(True)
+        assert not any(pd.isna(ponderados))
+        uniformes = [v for v in elegidos(False) if not pd.isna(v)]
+        assert (sum(ponderados) / len(ponderados)
+                > sum(uniformes) / len(uniformes))
 
+    def test_fraccion(self, archivo_grande):
+        """Una fracción conserva aproximadamente esa parte de cada TF,
+        igual con todos los parsers y por bloques."""
+        filtros = crear_filtros(fraccion=0.25, semilla=5)
+        coords = lectura_peaks(archivo_grande, "auto", filtros=filtros)
+        for rangos in coords.values():
+            assert 25 <= len(rangos) <= 75
+        assert lectura_peaks(archivo_grande, "c", filtros=filtros) == coords
+        unidos = {}
+        for lote in iterar_peaks(archivo_grande, chunksize=64,
+                                 filtros=filtros):
+            for tf, rangos in lote.items():
+                unidos.setdefault(tf, []).extend(rangos)
+        assert unidos == coords
+        assert lectura_peaks(archivo_grande, filtros=crear_filtros(
+            fraccion=1.0)) == lectura_peaks(archivo_grande)
 
+    def test_parametros_invalidos(self):
+        """Muestra no positiva, fracción fuera de (0, 1], muestra y
+        fracción juntas o ponderar sin muestra lanzan ValueError."""
+        for argumentos in ({"muestra": 0}, {"fraccion": 0},
+                           {"fraccion": 1.5},
+                           {"muestra": 5, "fraccion": 0.5},
+                           {"fraccion": 0.5, "ponderar": True}):
+            with pytest.raises(ValueError):
+                crear_filtros(**argumentos)
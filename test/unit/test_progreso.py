@@ -0,0 +1,92 @@
+"""
+Pruebas unitarias para el módulo progreso.py
+
+Este conjunto de tests cubre:
+  - Contadores globales activos solo mientras hay un reporte (avanzar).
+  - Línea de terminal con tasas y tiempo restante (Progreso en terminal).
+  - Líneas de log estructuradas fuera de una terminal.
+  - Sin reporte con intervalo 0, también en una terminal.
+  - Conteo de filas, picos y bytes desde las etapas instrumentadas.
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import io
+import time
+import logging
+from src import progreso
+from src.progreso import Progreso, avanzar, fijar_total
+from src.peaks import lectura_peaks, extraer_secuencias
+from src.io_utils import escribir_fasta
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+class TestProgreso:
+    """Pruebas para Progreso y avanzar()"""
+
+    def test_sin_reporte_activo(self):
+        """Sin reporte activo, avanzar no hace nada."""
+        assert progreso._activo is None
+        avanzar("picos", 10)
+
+    def test_terminal(self):
+        """En terminal se reescribe una línea y la final termina en salto
+        de línea con las tasas medias."""
+        flujo = io.StringIO()
+        reporte = Progreso(flujo=flujo, terminal=True)
+        with reporte:
+            fijar_total("picos", 100)
+            avanzar("filas", 2000)
+            avanzar("picos", 50)
+            avanzar("bytes", 3 * 2**20)
+        assert progreso._activo is None
+        final = flujo.getvalue().rsplit("\r\033[K", 1)[-1]
+        assert final.startswith("filas 2.0k (")
+        assert "picos 50/100" in final and "3.0 MB" in final
+        assert final.endswith("\n")
+        assert reporte.metricas()["eta_s"] >= 0
+
+    def test_log_estructurado(self, caplog):
+        """Fuera de una terminal se registran líneas clave=valor."""
+        caplog.set_level(logging.INFO)
+        with Progreso(intervalo=0.01, flujo=io.StringIO(), terminal=False):
+            avanzar("picos", 5)
+            time.sleep(0.1)
+        lineas = [r.getMessage() for r in caplog.records
+                  if r.getMessage().startswith("progreso ")]
+        assert lineas and "picos=5" in lineas[-1]
+        assert "eta_s=-1" in lineas[-1]
+
+    def test_intervalo_cero_en_terminal(self, caplog):
+        """Con intervalo 0 no se reporta, ni siquiera en una terminal, pero
+        los contadores siguen activos."""
+        caplog.set_level(logging.INFO)
+        flujo = io.StringIO()
+        with Progreso(intervalo=0, flujo=flujo, terminal=True) as reporte:
+            assert reporte._hilo is None
+            avanzar("picos", 3)
+            time.sleep(0.1)
+        assert reporte.contadores["picos"] == 3
+        assert flujo.getvalue() == ""
+        assert not [r for r in caplog.records
+                    if r.getMessage().startswith("progreso ")]
+
+    def test_etapas_instrumentadas(self, tmp_path):
+        """Lectura, extracción y escritura alimentan los contadores."""
+        peaks = tmp_path / "picos.tsv"
+        peaks.write_text("TF_name\tPeak_start\tPeak_end\n"
+                         "TF1\t1\t5\nTF1\t3\t9\nTF2\t2\t4\n")
+        with Progreso(flujo=io.StringIO(), terminal=False) as reporte:
+            coordenadas = lectura_peaks(str(peaks))
+            secuencias = extraer_secuencias(coordenadas, "ACGTACGTAC", {})
+            escribir_fasta(secuencias, str(tmp_path / "salida"))
+        assert reporte.contadores["filas"] == 3
+        assert reporte.contadores["picos"] == 3
+        assert reporte.contadores["bytes"] == sum(
+            p.stat().st_size for p in (tmp_path / "salida").iterdir())
@@ -0,0 +1,139 @@
+"""
+Pruebas unitarias para el módulo server.py
+
+Este conjunto de tests cubre:
+  - Operaciones del servidor residente (extraer, tf, estadisticas) y
+    manejo de solicitudes inválidas (ServidorExtraccion.procesar).
+  - Contadores de latencia y rendimiento.
+  - Intercambio JSON por líneas sobre un socket Unix (servir).
+  - Cierre del genoma BGZF al detener el servidor (main).
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import json
+import asyncio
+import pytest
+from unittest.mock import patch
+from src.server import ServidorExtraccion, servir, main
+from src.compresion import GenomaBGZF
+from test.unit.test_compresion import escribir_bgzf
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+GENOMA = "ACGTTGCA" * 4
+
+class TestServidorExtraccion:
+    """Pruebas para ServidorExtraccion.procesar()"""
+
+    @pytest.fixture
+    def servidor(self):
+        """Servidor con un índice de picos de dos TFs."""
+        return ServidorExtraccion(GENOMA, {"TF1": [(0, 4), (8, 12)],
+                                           "TF2": [(30, 40)]})
+
+    def test_extraer_regiones(self, servidor):
+        """Devuelve las secuencias en orden y marca las inválidas."""
+        r = servidor.procesar({"op": "extraer",
+                               "regiones": [[0, 4], [5, 3], [4, 8]]})
+        assert r["ok"] is True
+        assert r["secuencias"] == ["ACGT", None, "TGCA"]
+        assert r["invalidas"] == [1]
+
+    def test_extraer_por_tf(self, servidor):
+        """La operación tf usa el índice de picos cargado."""
+        r = servidor.procesar({"op": "tf", "tf": "TF1"})
+        assert r["secuencias"] == ["ACGT", "ACGT"]
+        r = servidor.procesar({"op": "tf", "tf": "TF2"})
+        assert r["secuencias"] == [None]
+
+    def test_errores(self, servidor):
+        """Solicitudes mal formadas devuelven ok=False sin excepción."""
+        assert servidor.procesar({"op": "tf", "tf": "X"})["ok"] is False
+        assert servidor.procesar({"op": "borrar"})["ok"] is False
+        assert servidor.procesar({"op": "extraer"})["ok"] is False
+        assert servidor.contadores["errores"] == 3
+
+    def test_coordenada_infinita(self, servidor):
+        """Una coordenada que no cabe en un entero devuelve ok=False."""
+        r = servidor.procesar(json.loads('{"regiones": [[0, 1e400]]}'))
+        assert r["ok"] is False
+        assert servidor.contadores["errores"] == 1
+
+    def test_estadisticas(self, servidor):
+        """Los contadores acumulan solicitudes, regiones y bases."""
+        servidor.procesar({"regiones": [[0, 4], [4, 10]]})
+        est = servidor.procesar({"op": "estadisticas"})
+        assert est["solicitudes"] == 1
+        assert est["regiones"] == 2
+        assert est["bases"] == 10
+        assert est["latencia_media_ms"] >= 0
+        assert est["solicitudes_por_s"] > 0
+
+
+class TestSocketUnix:
+    """Prueba de extremo a extremo sobre un socket Unix."""
+
+    def test_intercambio_json(self, tmp_path):
+        """Un cliente recibe una respuesta por cada línea enviada."""
+        ruta = str(tmp_path / "picos.sock")
+
+        async def escenario():
+            listo, detener = asyncio.Event(), asyncio.Event()
+            tarea = asyncio.create_task(servir(
+                ServidorExtraccion(GENOMA), ruta, listo=listo,
+                detener=detener))
+            await listo.wait()
+            reader, writer = await asyncio.open_unix_connection(ruta)
+            respuestas = []
+            for linea in (b'{"regiones": [[0, 8]]}\n', b'no json\n',
+                          b'{"op": "estadisticas"}\n'):
+                writer.write(linea)
+                await writer.drain()
+                respuestas.append(json.loads(await reader.readline()))
+            writer.close()
+            detener.set()
+            await tarea
+            return respuestas
+
+        respuestas = asyncio.run(escenario())
+        assert respuestas[0]["secuencias"] == ["ACGTTGCA"]
+        assert respuestas[1]["ok"] is False
+        assert respuestas[2]["solicitudes"] == 1
+        assert not (tmp_path / "picos.sock").exists()
+
+    def test_ruta_no_socket(self, tmp_path):
+        """No borra un archivo normal pasado como ruta del socket."""
+        ruta = tmp_path / "datos.txt"
+        ruta.write_text("importante", encoding="utf-8")
+        with pytest.raises(FileExistsError):
+            asyncio.run(servir(ServidorExtraccion(GENOMA), str(ruta),
+                               detener=asyncio.Event()))
+        assert ruta.read_text(encoding="utf-8") == "importante"
+
+
+class TestMain:
+    """Pruebas para el punto de entrada del servidor."""
+
+    def test_cierra_genoma_bgzf(self, tmp_path):
+        """El genoma BGZF se cierra al detenerse el servidor."""
+        fasta = tmp_path / "g.fa.gz"
+        escribir_bgzf(fasta, ">chr\n" + GENOMA + "\n")
+
+        async def servir_y_detener(servidor, socket_path, port):
+            assert isinstance(servidor.genoma, GenomaBGZF)
+            abiertos.append(servidor.genoma)
+
+        abiertos = []
+        with patch("src.server.servir", servir_y_detener):
+            codigo = main(["-g", str(fasta), "--socket",
+                           str(tmp_path / "s.sock"),
+                           "--logs", str(tmp_path / "logs")])
+        assert codigo == 0
+        assert abiertos[0]._arch.closed
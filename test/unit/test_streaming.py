@@ -0,0 +1,129 @@
+"""
+Pruebas unitarias para el módulo pipeline.py
+
+Este conjunto de tests cubre:
+  - Estimaciones de memoria del modo completo y de la lectura del TSV.
+  - Orquestación concurrente de carga, lectura y consumo, y consumo de
+    cada lote conforme se produce en modo secuencial
+    (ejecutar_concurrente).
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import time
+import pytest
+from src.pipeline import (estimar_memoria_completa, estimar_memoria_lectura,
+                          memoria_maxima, ejecutar_concurrente)
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+class TestEstimaciones:
+    """Pruebas para las estimaciones de memoria."""
+
+    def test_estimacion_completa_crece_con_bases(self):
+        """La estimación incluye el genoma y las bases extraídas."""
+        pequeno = estimar_memoria_completa({"TF1": [(0, 10)]}, 1000)
+        grande = estimar_memoria_completa({"TF1": [(0, 1000)]}, 1000)
+        assert pequeno > 1000
+        assert grande - pequeno == 990
+
+    def test_estimacion_lectura(self, tmp_path):
+        """La estimación de lectura es proporcional al número de filas."""
+        ruta = tmp_path / "picos.tsv"
+        ruta.write_text("TF_name\tPeak_start\tPeak_end\n" +
+                        "TF1\t100\t200\n" * 99, encoding="utf-8")
+        assert estimar_memoria_lectura(str(ruta)) > 0
+
+    def test_memoria_maxima(self):
+        """El RSS máximo del proceso es positivo en Unix."""
+        assert memoria_maxima() >= 0
+
+
+class TestEjecutarConcurrente:
+    """Pruebas para la función ejecutar_concurrente()"""
+
+    LOTES = [{"TF1": [(0, 4)]}, {"TF2": [(4, 8)]}, {"TF1": [(8, 12)]}]
+
+    @pytest.mark.parametrize("concurrente", [True, False])
+    def test_consume_todos_los_lotes(self, concurrente):
+        """Todos los lotes llegan al consumidor, en orden."""
+        recibidos = []
+
+        def consumir(genoma, lote):
+            recibidos.append((genoma, lote))
+            return [f"{tf}.fa" for tf in lote]
+
+        duraciones = {}
+        archivos, tiempos = ejecutar_concurrente(
+            lambda: "ACGT", lambda: iter(self.LOTES), consumir,
+            max_lotes=1, concurrente=concurrente, duraciones=duraciones)
+
+        assert recibidos == [("ACGT", lote) for lote in self.LOTES]
+        assert archivos == ["TF1.fa", "TF2.fa"]
+        for etapa in ("genoma", "picos", "primer_archivo", "total"):
+            assert etapa in tiempos
+        assert tiempos["primer_archivo"] <= tiempos["total"]
+        assert sorted(duraciones) == ["extraccion", "genoma", "picos"]
+
+    def test_duraciones_por_etapa(self):
+        """Cada etapa suma solo su propio trabajo, no el de las demás."""
+        def producir():
+            for lote in self.LOTES:
+                time.sleep(0.01)
+                yield lote
+
+        def consumir(genoma, lote):
+            time.sleep(0.05)
+            return []
+
+        duraciones = {}
+        ejecutar_concurrente(lambda: "ACGT", producir, consumir,
+                             concurrente=False, duraciones=duraciones)
+        assert duraciones["extraccion"] >= 0.15
+        assert 0.03 <= duraciones["picos"] < 0.15
+
+    def test_secuencial_sin_acumular(self):
+        """En modo secuencial cada lote se consume antes de producir el
+        siguiente."""
+        eventos = []
+
+        def producir():
+            for i, lote in enumerate(self.LOTES):
+                eventos.append(("producido", i))
+                yield lote
+
+        def consumir(genoma, lote):
+            eventos.append(("consumido", self.LOTES.index(lote)))
+            return []
+
+        ejecutar_concurrente(lambda: "ACGT", producir, consumir,
+                             concurrente=False)
+        assert eventos[:4] == [("producido", 0), ("consumido", 0),
+                               ("producido", 1), ("consumido", 1)]
+
+    def test_error_en_productor(self):
+        """Un error durante la lectura se propaga al llamador."""
+        def producir():
+            yield {"TF1": [(0, 4)]}
+            raise ValueError("TSV corrupto")
+
+        with pytest.raises(ValueError) as exc:
+            ejecutar_concurrente(lambda: "ACGT", producir,
+                                 lambda genoma, lote: [])
+        assert "TSV corrupto" in str(exc.value)
+
+    def test_error_en_consumidor(self):
+        """Un error al consumir no deja bloqueado al productor."""
+        def consumir(genoma, lote):
+            raise IOError("disco lleno")
+
+        lotes = ({"TF": [(0, 1)]} for _ in range(100))
+        with pytest.raises(IOError):
+            ejecutar_concurrente(lambda: "ACGT", lambda: lotes, consumir,
+                                 max_lotes=1)
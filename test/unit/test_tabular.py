@@ -0,0 +1,136 @@
+"""
+Pruebas unitarias para el módulo tabular.py
+
+Este conjunto de tests cubre:
+  - Registros iguales a los FASTA, con hebras y rangos inválidos
+    (extraer_secuencias con tabla).
+  - Grupos de filas y numeración continua entre lotes (Parquet).
+  - Escritura de los grupos incompletos al superar los bytes pendientes.
+  - Archivos Arrow IPC legibles con memory_map.
+  - Formato inválido y ausencia de pyarrow (abrir_tabla).
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import sys
+import pytest
+from src.tabular import EscritorTabular, abrir_tabla, COLUMNAS_TABLA
+from src.peaks import extraer_secuencias
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+GENOMA = "ACGTACGTTTGGCCAAGGTTCCAA"
+
+
+class TestEscritorTabular:
+    """Pruebas para EscritorTabular"""
+
+    def test_igual_que_secuencias(self, tmp_path):
+        """Cada pico válido se escribe con su número, coordenadas y
+        secuencia orientada; la columna tf es un diccionario."""
+        pa = pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+
+        coordenadas = {"TF1": [(0, 4, "+"), (30, 40, "+"), (8, 12, "-")],
+                       "TF2": [(4, 10, "+")]}
+        tabla = EscritorTabular(str(tmp_path))
+        secuencias = extraer_secuencias(coordenadas, GENOMA, {},
+                                        tabla=tabla)
+        archivos = tabla.cerrar()
+        directorio = tmp_path / "secuencias"
+        assert sorted(archivos) == [str(directorio / "TF1.parquet"),
+                                    str(directorio / "TF2.parquet")]
+        assert not list(directorio.glob("*.tmp"))
+
+        leida = pq.read_table(str(directorio / "TF1.parquet"))
+        assert leida.column_names == COLUMNAS_TABLA
+        assert pa.types.is_dictionary(leida.schema.field("tf").type)
+        assert leida.to_pydict() == {
+            "tf": ["TF1", "TF1"], "pico": [1, 2], "start": [0, 8],
+            "end": [4, 12], "longitud": [4, 4],
+            "secuencia": secuencias["TF1"]}
+        assert secuencias["TF1"] == ["ACGT", "CCAA"]
+
+    def test_grupos_y_lotes(self, tmp_path):
+        """Los registros se escriben en grupos de filas y la numeración
+        continúa entre lotes de un mismo TF."""
+        pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+
+        tabla = EscritorTabular(str(tmp_path), filas_por_grupo=2)
+        extraer_secuencias({"TF1": [(0, 2), (2, 4), (4, 6)]}, GENOMA, {},
+                           tabla=tabla)
+        extraer_secuencias({"TF1": [(6, 8)]}, GENOMA, {}, tabla=tabla)
+        ruta, = tabla.cerrar()
+        archivo = pq.ParquetFile(ruta)
+        assert archivo.metadata.num_row_groups == 2
+        leida = archivo.read(columns=["pico", "secuencia"]).to_pydict()
+        assert leida == {"pico": [1, 2, 3, 4],
+                         "secuencia": ["AC", "GT", "AC", "GT"]}
+
+    def test_bytes_pendientes(self, tmp_path):
+        """Al superar `bytes_pendientes` se escriben los grupos incompletos
+        de todos los TF, sin esperar a cerrar."""
+        pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+
+        tabla = EscritorTabular(str(tmp_path), bytes_pendientes=10)
+        tabla.agregar("TF1", [(0, 4), (4, 8)], ["ACGT", "ACGT"])
+        assert tabla.contadores == {}
+        tabla.agregar("TF2", [(8, 12)], ["TTGG"])
+        assert tabla.contadores == {"TF1": 2, "TF2": 1}
+        assert tabla._bytes == 0
+        tabla.agregar("TF1", [(12, 16)], ["CCAA"])
+        rutas = tabla.cerrar()
+        assert [pq.ParquetFile(r).metadata.num_row_groups
+                for r in sorted(rutas)] == [2, 1]
+
+    def test_completos(self, tmp_path):
+        """Con TF completos, cada archivo se cierra y renombra al
+        agregarlo, sin dejar escritores abiertos hasta cerrar."""
+        pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+
+        tabla = EscritorTabular(str(tmp_path), completos=True)
+        extraer_secuencias({"TF1": [(0, 4)], "TF2": [(4, 8), (30, 40)]},
+                           GENOMA, {}, tabla=tabla)
+        directorio = tmp_path / "secuencias"
+        assert tabla._escritores == {}
+        assert sorted(p.name for p in directorio.iterdir()) == \
+            ["TF1.parquet", "TF2.parquet"]
+        rutas = tabla.cerrar()
+        assert sorted(rutas) == [str(directorio / "TF1.parquet"),
+                                 str(directorio / "TF2.parquet")]
+        assert pq.read_table(sorted(rutas)[1]).column("pico").to_pylist() \
+            == [1]
+
+    def test_arrow(self, tmp_path):
+        """En formato Arrow IPC el archivo se lee con memory_map."""
+        pa = pytest.importorskip("pyarrow")
+
+        tabla = EscritorTabular(str(tmp_path), "arrow", filas_por_grupo=1)
+        tabla.agregar("TF1", [(0, 4), (4, 8)], ["ACGT", "ACGT"])
+        ruta, = tabla.cerrar()
+        assert ruta.endswith("TF1.arrow")
+        with pa.memory_map(ruta) as fuente:
+            lector = pa.ipc.open_file(fuente)
+            assert lector.num_record_batches == 2
+            assert lector.read_all().column("end").to_pylist() == [4, 8]
+
+    def test_formato_invalido(self, tmp_path):
+        """Un formato desconocido produce ValueError."""
+        pytest.importorskip("pyarrow")
+        with pytest.raises(ValueError):
+            EscritorTabular(str(tmp_path), "csv")
+
+    def test_sin_pyarrow(self, tmp_path, monkeypatch, caplog):
+        """Sin pyarrow se omite la tabla con una advertencia."""
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+        assert abrir_tabla(str(tmp_path)) is None
+        assert "pyarrow no está instalado" in caplog.text
@@ -0,0 +1,179 @@
+"""
+Pruebas unitarias para el módulo windows.py
+
+Este conjunto de tests cubre:
+  - Cálculo de anclas desde Peak_center, Peak_start o Peak_end, con el
+    punto medio como respaldo (lectura_anclas).
+  - Extracción vectorizada de ventanas y omisión de las que exceden el
+    genoma (extraer_ventanas).
+  - Codificación one-hot y escritura de matrices .npy con metadatos
+    (procesar_ventanas).
+
+Autor: Ashley Yael Montiel Vargas
+Fecha: 29-05-2025
+"""
+
+# =============================================================================
+# IMPORTS
+# =============================================================================
+import pytest
+import numpy as np
+import pandas as pd
+from src.windows import (lectura_anclas, extraer_ventanas,
+                         codificar_one_hot, genoma_como_arreglo,
+                         procesar_ventanas)
+
+# =============================================================================
+# TEST
+# =============================================================================
+
+GENOMA = "ACGTTGCANN" * 4
+
+@pytest.fixture
+def picos(tmp_path):
+    """TSV con Peak_center, un centro ausente y una fila inválida."""
+    ruta = tmp_path / "picos.tsv"
+    ruta.write_text("TF_name\tPeak_start\tPeak_end\tPeak_center\n"
+                    "TF1\t2\t10\t5\n"
+                    "TF2\t10\t20\t\n"
+                    "TF1\t30\t38\t36\n"
+                    "TF2\tabc\t20\t15\n",
+                    encoding="utf-8")
+    return str(ruta)
+
+
+class TestLecturaAnclas:
+    """Pruebas para lectura_anclas()"""
+
+    def test_ancla_centro(self, picos):
+        """Usa Peak_center y el punto medio si falta."""
+        estadisticas = {}
+        anclas = lectura_anclas(picos, "center", estadisticas)
+        assert list(anclas) == ["TF1", "TF2"]
+        assert anclas["TF1"]["ancla"].tolist() == [5, 36]
+        assert anclas["TF2"]["ancla"].tolist() == [15]
+        assert estadisticas["picos_validos"] == 3
+        assert estadisticas["errores"]["formato"] == 1
+
+    @pytest.mark.parametrize("anchor,esperado", [
+        ("start", [2, 30]), ("end", [10, 38])
+    ])
+    def test_anclas_extremos(self, picos, anchor, esperado):
+        """Las anclas start y end toman las coordenadas del pico."""
+        assert lectura_anclas(picos, anchor)["TF1"]["ancla"].tolist() \
+            == esperado
+
+    @pytest.mark.parametrize("parser", ["c", "native"])
+    def test_parser(self, picos, parser):
+        """El motor indicado produce las mismas anclas; "native" usa "c"."""
+        anclas = lectura_anclas(picos, parser=parser)
+        assert anclas["TF1"]["ancla"].tolist() == [5, 36]
+        with pytest.raises(ValueError):
+            lectura_anclas(picos, parser="rust")
+
+    def test_ancla_desconocida(self, picos):
+        """Un ancla no soportada lanza ValueError."""
+        with pytest.raises(ValueError):
+            lectura_anclas(picos, "summit")
+
+
+class TestVentanas:
+    """Pruebas para extraer_ventanas() y codificar_one_hot()"""
+
+    def test_matriz_y_mascara(self):
+        """Cada fila es la ventana centrada; las que no caben se omiten."""
+        genoma = genoma_como_arreglo(GENOMA)
+        matriz, validas = extraer_ventanas(genoma, np.array([5, 1, 39]), 4)
+        assert matriz.shape == (1, 4)
+        assert matriz.dtype == np.uint8
+        assert matriz.flags["C_CONTIGUOUS"]
+        assert bytes(matriz[0]) == GENOMA[3:7].encode()
+        assert validas.tolist() == [True, False, False]
+
+    def test_ancho_invalido(self):
+        """Un ancho no positivo lanza ValueError."""
+        with pytest.raises(ValueError):
+            extraer_ventanas(genoma_como_arreglo(GENOMA), np.array([5]), 0)
+
+    def test_circular(self):
+        """En circular, las ventanas que cruzan el origen se completan con
+        el principio del genoma."""
+        genoma = genoma_como_arreglo(GENOMA)
+        matriz, validas = extraer_ventanas(genoma, np.array([5, 1, 39]), 4,
+                                           circular=True)
+        assert validas.all()
+        assert [bytes(fila).decode() for fila in matriz] == \
+            [GENOMA[3:7], GENOMA[-1] + GENOMA[:3], GENOMA[37:] + GENOMA[:1]]
+
+    def test_one_hot(self):
+        """A, C, G, T activan una columna; N queda en cero."""
+        codificada = codificar_one_hot(genoma_como_arreglo("ACGTN")[None])
+        assert codificada.shape == (1, 5, 4)
+        assert codificada[0].tolist() == [[1, 0, 0, 0], [0, 1, 0, 0],
+                                          [0, 0, 1, 0], [0, 0, 0, 1],
+                                          [0, 0, 0, 0]]
+
+
+class TestProcesarVentanas:
+    """Pruebas para procesar_ventanas()"""
+
+    def test_archivos_npy_y_metadatos(self, picos, tmp_path):
+        """Escribe una matriz memory-mappable y su TSV por TF."""
+        salida = tmp_path / "ventanas"
+        estadisticas = {}
+        archivos = procesar_ventanas(lectura_anclas(picos), GENOMA,
+                                     str(salida), 4,
+                                     estadisticas=estadisticas)
+        assert archivos == [str(salida / "TF1.npy"), str(salida / "TF2.npy")]
+        assert estadisticas == {'sec_totales': 3, 'sec_validos': 3,
+                                'sec_invalidos': 0}
+
+        matriz = np.load(salida / "TF1.npy", mmap_mode="r")
+        assert [bytes(fila).decode() for fila in matriz] == \
+            [GENOMA[3:7], GENOMA[34:38]]
+        metadatos = pd.read_csv(salida / "TF1.tsv", sep="\t")
+        assert metadatos["fila"].tolist() == [0, 1]
+        assert metadatos["ventana_start"].tolist() == [3, 34]
+        assert metadatos["ventana_end"].tolist() == [7, 38]
+
+    def test_punto_medio_circular(self, tmp_path):
+        """Un pico que cruza el origen sin Peak_center se centra en su
+        punto medio circular."""
+        ruta = tmp_path / "circular.tsv"
+        ruta.write_text("TF_name\tPeak_start\tPeak_end\n"
+                        "TF1\t36\t4\n", encoding="utf-8")
+        salida = tmp_path / "ventanas"
+        procesar_ventanas(lectura_anclas(str(ruta), circular=True), GENOMA,
+                          str(salida), 4, circular=True)
+        metadatos = pd.read_csv(salida / "TF1.tsv", sep="\t")
+        assert metadatos["ancla"].tolist() == [0]
+        assert metadatos["ventana_start"].tolist() == [38]
+        assert metadatos["ventana_end"].tolist() == [42]
+        matriz = np.load(salida / "TF1.npy")
+        assert bytes(matriz[0]).decode() == GENOMA[38:] + GENOMA[:2]
+
+    def test_hebra_menos(self, tmp_path):
+        """Las filas de la hebra '-' se guardan como reverso
+        complementario."""
+        ruta = tmp_path / "hebras.tsv"
+        ruta.write_text("TF_name\tPeak_start\tPeak_end\tStrand\n"
+                        "TF1\t2\t6\t-\nTF1\t30\t38\t+\n",
+                        encoding="utf-8")
+        salida = tmp_path / "ventanas"
+        procesar_ventanas(lectura_anclas(str(ruta), hebra=True), GENOMA,
+                          str(salida), 4)
+        matriz = np.load(salida / "TF1.npy")
+        assert [bytes(fila).decode() for fila in matriz] == ["CAAC", "GTTG"]
+        metadatos = pd.read_csv(salida / "TF1.tsv", sep="\t")
+        assert metadatos["Strand"].tolist() == ["-", "+"]
+
+    def test_one_hot_y_fuera_de_rango(self, picos, tmp_path, caplog):
+        """Las ventanas fuera del genoma se omiten con advertencia."""
+        salida = tmp_path / "ventanas"
+        procesar_ventanas(lectura_anclas(picos), GENOMA, str(salida), 10,
+                          one_hot=True)
+        matriz = np.load(salida / "TF1.npy")
+        assert matriz.shape == (1, 10, 4)
+        assert "ventana fuera del genoma (31, 41)" in caplog.text
+        metadatos = pd.read_csv(salida / "TF1.tsv", sep="\t")
+        assert metadatos["Peak_start"].tolist() == [2]